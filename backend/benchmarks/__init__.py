@@ -0,0 +1,38 @@
+"""
+Benchmarks — reproducible timing for the performance claims in service docstrings.
+
+Several engines advertise hard numbers ("<20ms per analysis", "<8ms for 100
+candles", "O(n log n)"). This package turns those claims into checks:
+
+    • fixtures.py       seeded synthetic ticks/candles (TestDataFactory) and
+                        recorded candles from data/candle_backups
+    • harness.py        @benchmark registry, warmup + repeat timing, budget
+                        checks and per-commit history (results/history.jsonl)
+    • bench_engines.py  analysis entry points of the volume / zone / pivot engines
+    • bench_feed.py     MarketFeedService tick path (normalize → queue → broadcast)
+    • bench_routers.py  routers/advanced_analysis.py handlers with data fetch stubbed
+    • bench_stats.py    rolling-statistics accumulators vs refitting lists
+    • fake_kite.py      local Kite Connect REST server (quotes, candles,
+                        instruments, token errors) for the Kite gateway
+
+Run from backend/:
+
+    python -m benchmarks.run                   # all benchmarks, append history
+    python -m benchmarks.run -k zone --check   # exit 1 on budget miss / regression
+"""
+
+from benchmarks.harness import (
+    BenchmarkResult,
+    benchmark,
+    load_history,
+    registry,
+    run_benchmarks,
+)
+
+__all__ = [
+    "BenchmarkResult",
+    "benchmark",
+    "load_history",
+    "registry",
+    "run_benchmarks",
+]
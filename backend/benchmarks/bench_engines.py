@@ -0,0 +1,170 @@
+"""
+Engine benchmarks — the analysis entry points whose docstrings carry budgets.
+
+    services/volume_pulse_engine.py       <20ms per analysis, 500+ ticks/sec
+    services/volume_profile_analyzer.py   <15ms per analysis
+    services/volume_statistics_engine.py  <12ms per analysis
+    services/zone_control_service.py      <8ms for 100 candles, O(n log n)
+    services/pivot_indicators_service.py  <50ms, O(1) from cache
+    services/observatory_store.py         90-day strategy rankings in milliseconds
+"""
+
+from __future__ import annotations
+
+import itertools
+import random
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+
+
+# ── Volume pulse ──────────────────────────────────────────────────────────
+
+async def _primed_pulse_engine(symbol: str):
+    from services.volume_pulse_engine import VolumePulseEngine
+
+    engine = VolumePulseEngine()
+    ticks = fixtures.synthetic_ticks(symbol, 600)
+    # Fill the lookback window so every timed call takes the full-analysis path
+    for tick in ticks[:engine.lookback_bars]:
+        await engine.analyze_volume_action(tick, symbol)
+    return engine, itertools.cycle(ticks[engine.lookback_bars:])
+
+
+@benchmark("engines.volume_pulse.analyze", budget_ms=20.0,
+           claim="volume_pulse_engine: <20ms per analysis")
+async def bench_volume_pulse():
+    engine, ticks = await _primed_pulse_engine("NIFTY")
+
+    async def step():
+        await engine.analyze_volume_action(next(ticks), "NIFTY")
+    return step
+
+
+@benchmark("engines.volume_pulse.throughput", min_rate=500.0, ops_per_call=100, repeat=10,
+           claim="volume_pulse_engine: 500+ ticks/sec throughput")
+async def bench_volume_pulse_throughput():
+    engine, ticks = await _primed_pulse_engine("BANKNIFTY")
+    batch = [next(ticks) for _ in range(100)]
+
+    async def step():
+        for tick in batch:
+            await engine.analyze_volume_action(tick, "BANKNIFTY")
+    return step
+
+
+# ── Volume profile / statistics ───────────────────────────────────────────
+
+@benchmark("engines.volume_profile.analyze", budget_ms=15.0,
+           claim="volume_profile_analyzer: <15ms per analysis")
+def bench_volume_profile():
+    from services.volume_profile_analyzer import VolumeProfileAnalyzer
+
+    analyzer = VolumeProfileAnalyzer()
+    candles = fixtures.recorded_candles("NIFTY", 100)
+
+    async def step():
+        await analyzer.analyze_volume_profile("NIFTY", candles)
+    return step
+
+
+@benchmark("engines.volume_statistics.calculate", budget_ms=12.0,
+           claim="volume_statistics_engine: <12ms per analysis")
+def bench_volume_statistics():
+    from services.volume_statistics_engine import VolumeStatisticsEngine
+
+    engine = VolumeStatisticsEngine()
+    volumes = [float(c["volume"]) for c in reversed(fixtures.recorded_candles("NIFTY", engine.lookback))]
+
+    async def step():
+        await engine.calculate_statistics("NIFTY", volumes)
+    return step
+
+
+# ── Zone control ──────────────────────────────────────────────────────────
+
+@benchmark("engines.zone_control.analyze", budget_ms=8.0,
+           claim="zone_control_service: <8ms for 100 candles")
+def bench_zone_control():
+    from services.zone_control_service import get_zone_control_engine
+
+    engine = get_zone_control_engine()
+    df = fixtures.candle_frame(fixtures.recorded_candles("NIFTY", 100))
+    return lambda: engine.analyze("NIFTY", df)
+
+
+@benchmark("engines.zone_control.scaling", max_exponent=1.35, repeat=20,
+           claim="zone_control_service: O(n log n) time")
+def bench_zone_control_scaling():
+    from services.zone_control_service import ZoneControlEngine
+
+    steps = {}
+    for n in (100, 200, 400, 800, 1600):
+        engine = ZoneControlEngine(lookback=n)
+        df = fixtures.candle_frame(fixtures.synthetic_candles("NIFTY", n))
+        steps[n] = (lambda e, d: (lambda: e.analyze("NIFTY", d)))(engine, df)
+    return steps
+
+
+# ── Pivots ────────────────────────────────────────────────────────────────
+
+@benchmark("engines.pivots.classic_camarilla", budget_ms=0.05,
+           claim="pivot_indicators_service: O(1) pivot maths")
+def bench_pivot_maths():
+    from services.pivot_indicators_service import PivotIndicatorsService
+
+    svc = PivotIndicatorsService()
+    c = fixtures.recorded_candles("NIFTY", 75)
+    high, low, close = max(x["high"] for x in c), min(x["low"] for x in c), c[-1]["close"]
+
+    def step():
+        svc.calculate_classic_pivots(high, low, close)
+        svc.calculate_camarilla_pivots(high, low, close)
+    return step
+
+
+@benchmark("engines.pivots.get_indicators", budget_ms=50.0,
+           claim="pivot_indicators_service: <50ms response, all from cache")
+async def bench_pivot_indicators():
+    from services.cache import get_redis
+    from services.pivot_indicators_service import PivotIndicatorsService
+
+    cache = await get_redis()
+    tick = fixtures.synthetic_ticks("NIFTY", 1)[0]
+    await cache.set_market_data("NIFTY", tick)
+    svc = PivotIndicatorsService()
+
+    async def step():
+        await svc.get_indicators("NIFTY")
+    return step
+
+
+# ── Observatory rankings ──────────────────────────────────────────────────
+
+@benchmark("engines.observatory.rankings_90d", budget_ms=2.0,
+           claim="observatory_store: 90-day strategy rankings in milliseconds")
+def bench_observatory_rankings():
+    from services import observatory_service as observatory
+    from services.observatory_store import ObservatoryStore
+
+    rng = random.Random(7)
+    today = observatory._now_ist().date()
+    store = ObservatoryStore(Path(tempfile.mkdtemp()) / "observatory.db", symbols=observatory.SYMBOLS)
+    for back in range(90):
+        day = (today - timedelta(days=back)).isoformat()
+        store.record_report({"date": day, "symbols": {
+            sym: {"strategy_performance": {
+                key: {"morning_signal": "BULLISH", "morning_confidence": rng.randint(40, 95),
+                      "was_correct": rng.choice((True, False, None))}
+                for key in observatory.STRATEGY_META
+            }} for sym in observatory.SYMBOLS
+        }})
+    svc = observatory.ObservatoryService()
+    svc._store = store
+
+    def step():
+        svc.get_strategy_rankings(90)
+    return step
@@ -0,0 +1,225 @@
+"""
+MarketFeedService tick-path benchmarks.
+
+Times the three stages a KiteTicker tick passes through, using recorded-shape
+FULL-mode ticks and a stub WebSocket manager (no sockets, no Zerodha):
+
+    _normalize_tick         Zerodha dict → our tick format
+    _on_ticks               KiteTicker thread callback (rate limit + queue)
+    _update_and_broadcast   PCR/candles/order flow/cache write/broadcast
+    universe scaling        _on_ticks + candle drain for 50…3000 non-index
+                            instruments — per-tick cost must stay flat (O(1))
+    session profile         futures tick → session VWAP / volume-at-price, and
+                            the /vwap-live answer read back from it
+    depth book              full-mode depth snapshot → ring row + features
+    tick frame encoding     the broadcast tick message as JSON text vs the
+                            opt-in MessagePack + field-id frame (ws_codec)
+
+The slow path (`_run_background_analysis`) is replaced with a no-op so the
+numbers reflect what the event loop pays per tick. Each stage must sustain
+the same 500+ ticks/sec the volume pulse engine advertises.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+
+_BATCH = 60
+
+
+class _StubWsManager:
+    def __init__(self):
+        self.sent = 0
+        self.messages = []
+
+    async def broadcast(self, message):
+        self.sent += 1
+        if len(self.messages) < 600:
+            self.messages.append(message)
+
+
+def _feed():
+    from services.cache import CacheService
+    from services.market_feed import MarketFeedService, TOKEN_SYMBOL_MAP
+
+    svc = MarketFeedService(CacheService(), _StubWsManager())
+
+    async def _no_background(*args, **kwargs):
+        return None
+
+    svc._run_background_analysis = _no_background
+    tokens = {sym: tok for tok, sym in TOKEN_SYMBOL_MAP.items() if sym in fixtures.SYMBOLS}
+    return svc, fixtures.kite_ticks(tokens, 600)
+
+
+@benchmark("feed.normalize_tick", min_rate=500.0, ops_per_call=_BATCH,
+           claim="tick path: 500+ ticks/sec")
+def bench_normalize_tick():
+    svc, ticks = _feed()
+    batch = ticks[:_BATCH]
+
+    def step():
+        for tick in batch:
+            svc._normalize_tick(tick)
+    return step
+
+
+@benchmark("feed.on_ticks", min_rate=500.0, ops_per_call=_BATCH,
+           claim="tick path: 500+ ticks/sec")
+def bench_on_ticks():
+    svc, ticks = _feed()
+    batches = itertools.cycle([ticks[i:i + 3] for i in range(0, len(ticks), 3)])
+    per_call = _BATCH // 3
+
+    def step():
+        for _ in range(per_call):
+            svc._on_ticks(None, next(batches))
+        while not svc._tick_queue.empty():
+            svc._tick_queue.get_nowait()
+    return step
+
+
+@benchmark("feed.update_and_broadcast", min_rate=500.0, ops_per_call=_BATCH,
+           claim="tick path: 500+ ticks/sec")
+def bench_update_and_broadcast():
+    svc, ticks = _feed()
+    normalized = itertools.cycle([svc._normalize_tick(t) for t in ticks])
+
+    async def step():
+        for _ in range(_BATCH):
+            await svc._update_and_broadcast(dict(next(normalized)))
+    return step
+
+
+@benchmark("feed.universe.scaling", max_exponent=0.2, repeat=20, ops_per_call=_BATCH,
+           claim="instrument universe: O(1) per tick for 500+ instruments")
+def bench_universe_scaling():
+    from services.market_feed import MarketFeedService
+    from services.cache import CacheService
+
+    svc = MarketFeedService(CacheService(), _StubWsManager())
+    steps = {}
+    for n in (50, 200, 800, 3000):
+        tokens = [9_100_000 + i for i in range(n)]
+        for token in tokens:
+            svc.universe.add(token, f"BENCH{token}FUT", kind="FUTURE", exchange="NFO")
+        ticks = itertools.cycle([
+            [{"instrument_token": tokens[(i * 7919) % n], "last_price": 100.0 + (i % 50) * 0.05,
+              "volume_traded": 1000 + i, "oi": 5000}]
+            for i in range(4 * _BATCH)
+        ])
+
+        async def step(ticks=ticks):
+            for _ in range(_BATCH):
+                svc._on_ticks(None, next(ticks))
+            await svc._drain_instrument_ticks()
+        steps[n] = step
+    return steps
+
+
+@benchmark("feed.session_profile.tick", min_rate=20_000.0, ops_per_call=_BATCH, repeat=20,
+           claim="session VWAP / volume-at-price update per futures tick (universe listener)")
+def bench_session_profile_tick():
+    from services.instrument_universe import InstrumentUniverse
+    from services.session_profile import SessionProfiles
+
+    universe = InstrumentUniverse()
+    iid = universe.add(9_200_000, "NIFTY-FUT", kind="FUTURE", exchange="NFO", underlying="NIFTY")
+    SessionProfiles(universe)
+    start = time.time()
+    prices = [25000.0 + ((i * 7919) % 400) * 0.5 - 100 for i in range(4 * _BATCH)]
+    state = {"volume": 0, "i": 0}
+
+    def step():
+        i = state["i"]
+        for _ in range(_BATCH):
+            state["volume"] += 75
+            universe.on_tick(iid, prices[i % len(prices)], state["volume"], 0, start)
+            i += 1
+        state["i"] = i
+    return step
+
+
+@benchmark("feed.session_profile.read", budget_ms=1.0, repeat=50,
+           claim="vwap-live answer from ticks: bands + POC + value area, no Zerodha call")
+def bench_session_profile_read():
+    from services.instrument_universe import InstrumentUniverse
+    from services.session_profile import SessionProfiles
+
+    universe = InstrumentUniverse()
+    iid = universe.add(9_200_001, "NIFTY-FUT", kind="FUTURE", exchange="NFO", underlying="NIFTY")
+    profiles = SessionProfiles(universe)
+    start = time.time()
+    for i in range(20_000):                    # a session's worth of price range
+        universe.on_tick(iid, 25000.0 + ((i * 7919) % 800) * 0.5 - 200, 75 * (i + 1), 0, start)
+    state = {"volume": 75 * 20_000}
+
+    def step():
+        state["volume"] += 75                   # one new tick so the value area is recomputed
+        universe.on_tick(iid, 25010.0, state["volume"], 0, start)
+        assert profiles.vwap_result("NIFTY") is not None
+    return step
+
+
+@benchmark("feed.depth_book.tick", min_rate=10_000.0, ops_per_call=_BATCH, repeat=20,
+           claim="full-mode futures depth → NumPy ring row + microstructure features per tick")
+def bench_depth_book_tick():
+    from services.depth_book import DepthBook
+
+    book = DepthBook("NIFTY-FUT", capacity=4096)
+    snapshots = []
+    for i in range(4 * _BATCH):
+        touch = 25000.0 + (i % 7) * 0.05
+        snapshots.append((
+            [{"price": touch - k * 0.05, "quantity": 75 * (k + 1 + i % 5), "orders": k + 1} for k in range(5)],
+            [{"price": touch + 0.1 + k * 0.05, "quantity": 75 * (k + 1 + i % 3), "orders": k + 1} for k in range(5)],
+        ))
+    ticks = itertools.cycle(snapshots)
+    state = {"volume": 0}
+
+    def step():
+        for _ in range(_BATCH):
+            buy, sell = next(ticks)
+            state["volume"] += 75
+            book.update(buy, sell, None, 25000.05, state["volume"])
+    return step
+
+
+async def _tick_frames():
+    """The tick messages _update_and_broadcast hands the WebSocket manager."""
+    svc, ticks = _feed()
+    for tick in ticks[:4 * _BATCH]:
+        await svc._update_and_broadcast(svc._normalize_tick(tick))
+    return svc.ws_manager.messages
+
+
+@benchmark("feed.tick_frame.json", ops_per_call=_BATCH, repeat=20,
+           claim="baseline: json.dumps of each broadcast tick")
+async def bench_tick_frame_json():
+    from services.ws_codec import dumps_json
+
+    frames = itertools.cycle(await _tick_frames())
+
+    def step():
+        for _ in range(_BATCH):
+            dumps_json(next(frames))
+    return step
+
+
+@benchmark("feed.tick_frame.msgpack", min_rate=5_000.0, ops_per_call=_BATCH, repeat=20,
+           claim="ws_codec: MessagePack + field ids, ~2.5x smaller than the JSON frame")
+async def bench_tick_frame_msgpack():
+    from services.ws_codec import msgpack_available, pack
+
+    if not msgpack_available():
+        raise RuntimeError("optional msgpack package not installed")
+    frames = itertools.cycle(await _tick_frames())
+
+    def step():
+        for _ in range(_BATCH):
+            pack(next(frames))
+    return step
@@ -0,0 +1,117 @@
+"""
+routers/advanced_analysis.py handler benchmarks.
+
+Handlers are called directly (no HTTP stack) with the Zerodha fetches and the
+token check patched to serve recorded candles, and the live candle list
+(`analysis_candles:{symbol}`) seeded the way MarketFeedService fills it.
+
+Each handler is timed twice, against the budgets in its docstring:
+
+    *.cold    shared + response caches emptied before every call  ("<200ms live update")
+    *.cached  second call inside the handler's cache TTL ("<10ms cached")
+
+The response cache's market phase is pinned to CLOSED so the cached numbers do
+not depend on the wall clock (smart_money_flow is not cached while LIVE).
+"""
+
+from __future__ import annotations
+
+import json
+
+from benchmarks import fixtures
+from benchmarks.harness import benchmark
+
+SYMBOL = "NIFTY"
+
+# name → (handler attribute, cold budget ms, cached budget ms)
+_HANDLERS = {
+    "all_analysis": ("get_all_analysis_ultra_fast", 500.0, 10.0),
+    "zone_control": ("get_zone_control", None, 10.0),
+    "volume_pulse": ("get_volume_pulse", None, 10.0),
+    "supertrend": ("get_supertrend", 200.0, 10.0),
+    "rsi_60_40": ("get_rsi_60_40_momentum", 200.0, 10.0),
+    "camarilla_cpr": ("get_camarilla_cpr_zones", 200.0, 10.0),
+    "vwma_20_entry": ("get_vwma_20_entry_filter", 200.0, 10.0),
+    "high_volume_candle": ("get_high_volume_candle_scanner", 200.0, 10.0),
+    "smart_money_flow": ("get_smart_money_flow", 200.0, 10.0),
+}
+
+
+async def _patched_router():
+    """Async generator: yields (router module, reset_fn); restores patches on close."""
+    from routers import advanced_analysis as aa
+    from services import global_token_manager as gtm
+    from services.cache import _SHARED_CACHE
+    from services.response_cache import response_cache
+
+    candles = fixtures.recorded_candles(SYMBOL, 100)
+    df = fixtures.candle_frame(candles)
+
+    async def _historical(symbol, lookback=50, *args, **kwargs):
+        return df.tail(lookback).reset_index(drop=True)
+
+    async def _token_ok():
+        return {"valid": True, "source": "benchmark"}
+
+    saved = (aa._get_historical_data, aa._get_historical_data_extended, gtm.check_global_token_status,
+             response_cache.status)
+    aa._get_historical_data = _historical
+    aa._get_historical_data_extended = _historical
+    gtm.check_global_token_status = _token_ok
+    response_cache.status = lambda: "CLOSED"
+
+    cache = aa.get_cache()
+    key = f"analysis_candles:{SYMBOL}"
+    await cache.delete(key)
+    for candle in candles:                       # lpush → newest first
+        await cache.lpush(key, json.dumps(candle))
+    await cache.set_market_data(SYMBOL, fixtures.synthetic_ticks(SYMBOL, 1)[0])
+    seeded = set(_SHARED_CACHE)
+
+    def reset():
+        for k in [k for k in _SHARED_CACHE if k not in seeded]:
+            _SHARED_CACHE.pop(k, None)
+        response_cache.invalidate()
+
+    try:
+        yield aa, reset
+    finally:
+        reset()
+        (aa._get_historical_data, aa._get_historical_data_extended, gtm.check_global_token_status,
+         response_cache.status) = saved
+
+
+def _register(name: str, attr: str, cold_ms, cached_ms) -> None:
+    @benchmark(f"routers.{name}.cold", budget_ms=cold_ms, repeat=20,
+               claim=f"advanced_analysis.{attr}: live update")
+    async def cold():
+        patched = _patched_router()
+        aa, reset = await patched.__anext__()
+        handler = getattr(aa, attr)
+
+        async def step():
+            reset()
+            await handler(SYMBOL)
+        try:
+            yield step
+        finally:
+            await patched.aclose()
+
+    @benchmark(f"routers.{name}.cached", budget_ms=cached_ms,
+               claim=f"advanced_analysis.{attr}: cached response")
+    async def cached():
+        patched = _patched_router()
+        aa, _ = await patched.__anext__()
+        handler = getattr(aa, attr)
+        await handler(SYMBOL)
+
+        async def step():
+            await handler(SYMBOL)
+        try:
+            yield step
+        finally:
+            await patched.aclose()
+
+
+for _name, (_attr, _cold, _cached) in _HANDLERS.items():
+    _register(_name, _attr, _cold, _cached)
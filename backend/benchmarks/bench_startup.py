@@ -0,0 +1,91 @@
+"""
+Worker cold-start benchmarks.
+
+Each sample is a fresh interpreter that imports `main` and answers one
+GET /health through the ASGI app (no lifespan, so no feed or service boot):
+the time until a new worker can accept HTTP.
+
+    startup.accepting_http         lazy feature routers (default)
+    startup.accepting_http.eager   LAZY_ROUTERS=false, for comparison — no budget
+    startup.framework_floor        interpreter + fastapi + httpx, nothing of ours
+
+The "<1s to accept HTTP" target is for the app's own share: accepting_http
+minus framework_floor. The floor alone is 0.6–0.8s on the boxes measured so
+far (pydantic building fastapi's OpenAPI models) and moves with the machine,
+so accepting_http's setup measures it first and the budget is that floor
++ APP_BUDGET_MS; the eager build measured 2.3–2.9s wall.
+`python -m services.import_profiler` shows where the remaining time goes.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.harness import BACKEND_DIR, benchmark
+
+_PROBE = """
+import asyncio, httpx
+import main
+
+async def probe():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/health")
+        assert response.status_code == 200, response.status_code
+
+asyncio.run(probe())
+"""
+
+
+_FLOOR = "import asyncio, httpx, fastapi"
+
+APP_BUDGET_MS = 1000.0      # the app's share of a cold start, above the framework floor
+FLOOR_SAMPLES = 3
+
+_floor_ms = 0.0
+
+
+def _cold_start(lazy: bool, script: str = _PROBE):
+    env = {**os.environ, "LAZY_ROUTERS": "true" if lazy else "false"}
+
+    def step():
+        proc = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, env=env,
+                              capture_output=True, text=True, timeout=120)
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "probe failed")
+    return step
+
+
+def _measure_floor() -> float:
+    step = _cold_start(lazy=True, script=_FLOOR)
+    step()                                              # warm the OS file cache
+    samples = []
+    for _ in range(FLOOR_SAMPLES):
+        started = time.perf_counter()
+        step()
+        samples.append((time.perf_counter() - started) * 1000.0)
+    return statistics.median(samples)
+
+
+@benchmark("startup.accepting_http", budget_ms=lambda: _floor_ms + APP_BUDGET_MS, warmup=1, repeat=5,
+           claim="fresh worker: import main + first /health, <1s above the framework floor")
+def accepting_http():
+    global _floor_ms
+    _floor_ms = _measure_floor()
+    return _cold_start(lazy=True)
+
+
+@benchmark("startup.accepting_http.eager", warmup=1, repeat=3,
+           claim="same, with every feature router imported at startup")
+def accepting_http_eager():
+    return _cold_start(lazy=False)
+
+
+@benchmark("startup.framework_floor", warmup=1, repeat=5,
+           claim="interpreter + fastapi + httpx import, the part startup cannot shave")
+def framework_floor():
+    return _cold_start(lazy=True, script=_FLOOR)
@@ -0,0 +1,122 @@
+"""
+Rolling-statistics microbenchmarks (services/rolling_stats.py).
+
+    stats.oi_history.rolling     expiry OIHistory: push a reading into six
+                                 40-value windows, read all six slopes
+    stats.oi_history.refit       the same with `linear_slope(list(deque))`
+                                 per read, as OIHistory did — no budget
+    stats.slope.scaling          push + slope / std / z-score at windows of
+                                 50…3200 values — cost must not grow with n
+    stats.covariance.push_query  one (x, y) pair in, correlation and beta out
+    stats.ewma.push              Ewma push + z-score
+
+Each call processes _BATCH readings, so rates are per reading.
+"""
+
+from __future__ import annotations
+
+import collections
+import itertools
+import random
+
+from benchmarks.harness import benchmark
+
+_BATCH = 200
+
+
+def _readings(n: int = 5000, seed: int = 7):
+    rng = random.Random(seed)
+    price = 25000.0
+    out = []
+    for _ in range(n):
+        price += rng.gauss(0, 4)
+        out.append(price)
+    return out
+
+
+@benchmark("stats.oi_history.rolling", min_rate=50_000.0, ops_per_call=_BATCH,
+           claim="rolling_stats: O(1) push and query")
+def bench_oi_history_rolling():
+    from services.rolling_stats import RollingSlope
+
+    windows = [RollingSlope(40) for _ in range(6)]
+    feed = itertools.cycle(_readings())
+
+    def step():
+        for _ in range(_BATCH):
+            value = next(feed)
+            for w in windows:
+                w.push(value)
+            for w in windows:
+                w.slope
+    return step
+
+
+@benchmark("stats.oi_history.refit", ops_per_call=_BATCH, repeat=20,
+           claim="baseline: list(deque) refit per read")
+def bench_oi_history_refit():
+    from services.rolling_stats import linear_slope
+
+    windows = [collections.deque(maxlen=40) for _ in range(6)]
+    feed = itertools.cycle(_readings())
+
+    def step():
+        for _ in range(_BATCH):
+            value = next(feed)
+            for w in windows:
+                w.append(value)
+            for w in windows:
+                linear_slope(list(w))
+    return step
+
+
+@benchmark("stats.slope.scaling", max_exponent=0.2, repeat=20,
+           claim="rolling_stats: query cost independent of window length")
+def bench_slope_scaling():
+    from services.rolling_stats import RollingSlope
+
+    steps = {}
+    readings = _readings()
+    for n in (50, 200, 800, 3200):
+        window = RollingSlope(n)
+        window.extend(readings[:n])
+        feed = itertools.cycle(readings)
+
+        def step(w=window, f=feed):
+            for _ in range(_BATCH):
+                w.push(next(f))
+                w.slope, w.std, w.zscore()
+        steps[n] = step
+    return steps
+
+
+@benchmark("stats.covariance.push_query", min_rate=100_000.0, ops_per_call=_BATCH,
+           claim="rolling_stats: O(1) correlation update")
+def bench_covariance():
+    from services.rolling_stats import RollingCovariance
+
+    cov = RollingCovariance(100)
+    xs = _readings(seed=1)
+    ys = _readings(seed=2)
+    pairs = itertools.cycle(zip(xs, ys))
+
+    def step():
+        for _ in range(_BATCH):
+            cov.push(*next(pairs))
+            cov.correlation, cov.beta
+    return step
+
+
+@benchmark("stats.ewma.push", min_rate=300_000.0, ops_per_call=_BATCH,
+           claim="rolling_stats: O(1) EWMA")
+def bench_ewma():
+    from services.rolling_stats import Ewma
+
+    ewma = Ewma(span=20)
+    feed = itertools.cycle(_readings())
+
+    def step():
+        for _ in range(_BATCH):
+            ewma.push(next(feed))
+            ewma.zscore()
+    return step
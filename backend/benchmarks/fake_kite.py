@@ -0,0 +1,221 @@
+"""
+Local fake of the Kite Connect REST API for tests and benchmarks.
+
+    with FakeKite(tokens={"tok"}) as fake:
+        gateway = KiteGateway("key", "tok", root=fake.url, env_file=None)
+        await gateway.quote(["NSE:NIFTY 50"])
+        fake.requests        # [(method, path, access_token), ...]
+
+Serves the endpoints this backend calls, in Kite's envelope
+({"status": "success", "data": ...}, CSV for instrument dumps):
+
+    GET /user/profile, /user/margins
+    GET /quote, /quote/ltp, /quote/ohlc              ?i=EXCHANGE:SYMBOL or token (repeatable)
+    GET /instruments/historical/{token}/{interval}   ?from=&to=  (deterministic candles)
+    GET /instruments, /instruments/{exchange}        CSV
+
+Requests without a token in `tokens` get Kite's 403 TokenException; `latency`
+delays every response and `fail_next(n, status)` makes the next n requests
+fail with a GeneralException, so timeouts, token expiry and retries can be
+exercised without touching Zerodha. Runs a ThreadingHTTPServer on an
+ephemeral 127.0.0.1 port.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+INSTRUMENTS: List[Dict[str, Any]] = [
+    {"instrument_token": 256265, "tradingsymbol": "NIFTY 50", "name": "NIFTY 50", "exchange": "NSE",
+     "segment": "INDICES", "instrument_type": "EQ", "expiry": "", "lot_size": 0, "last_price": 25000.0},
+    {"instrument_token": 260105, "tradingsymbol": "NIFTY BANK", "name": "NIFTY BANK", "exchange": "NSE",
+     "segment": "INDICES", "instrument_type": "EQ", "expiry": "", "lot_size": 0, "last_price": 55000.0},
+    {"instrument_token": 265, "tradingsymbol": "SENSEX", "name": "SENSEX", "exchange": "BSE",
+     "segment": "INDICES", "instrument_type": "EQ", "expiry": "", "lot_size": 0, "last_price": 82000.0},
+    {"instrument_token": 12683010, "tradingsymbol": "NIFTY26JANFUT", "name": "NIFTY", "exchange": "NFO",
+     "segment": "NFO-FUT", "instrument_type": "FUT", "expiry": "2026-01-27", "lot_size": 75, "last_price": 25050.0},
+    {"instrument_token": 12674050, "tradingsymbol": "BANKNIFTY26JANFUT", "name": "BANKNIFTY", "exchange": "NFO",
+     "segment": "NFO-FUT", "instrument_type": "FUT", "expiry": "2026-01-27", "lot_size": 35, "last_price": 55100.0},
+    {"instrument_token": 292786437, "tradingsymbol": "SENSEX26JANFUT", "name": "SENSEX", "exchange": "BFO",
+     "segment": "BFO-FUT", "instrument_type": "FUT", "expiry": "2026-01-29", "lot_size": 20, "last_price": 82100.0},
+]
+
+_CSV_FIELDS = ("instrument_token", "exchange_token", "tradingsymbol", "name", "last_price", "expiry",
+               "strike", "tick_size", "lot_size", "instrument_type", "segment", "exchange")
+_INTERVAL_S = {"minute": 60, "3minute": 180, "5minute": 300, "15minute": 900, "30minute": 1800,
+               "60minute": 3600, "day": 86400}
+
+
+class FakeKite:
+    """A fake Kite REST server; use as a context manager or call start()/stop()."""
+
+    def __init__(self, tokens: Iterable[str] = ("fake-token",), latency: float = 0.0,
+                 instruments: Optional[List[Dict[str, Any]]] = None) -> None:
+        self.tokens = set(tokens)
+        self.latency = latency
+        self.instruments = list(instruments or INSTRUMENTS)
+        self.requests: List[Tuple[str, str, Optional[str]]] = []
+        self._failures: List[int] = []
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # --- lifecycle ----------------------------------------------------------
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeKite":
+        fake = self
+
+        class Handler(_Handler):
+            server_fake = fake
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-kite", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeKite":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def fail_next(self, n: int = 1, status: int = 500) -> None:
+        with self._lock:
+            self._failures.extend([status] * n)
+
+    def count(self, path_prefix: str) -> int:
+        return sum(1 for _, path, _ in self.requests if path.startswith(path_prefix))
+
+    # --- data ---------------------------------------------------------------
+
+    def _by_key(self) -> Dict[str, Dict[str, Any]]:
+        # Kite accepts "EXCHANGE:SYMBOL" or a bare instrument token, and echoes the key back
+        known = {f"{i['exchange']}:{i['tradingsymbol']}": i for i in self.instruments}
+        known.update((str(i["instrument_token"]), i) for i in self.instruments)
+        return known
+
+    def quote(self, keys: List[str], mode: str) -> Dict[str, Any]:
+        known = self._by_key()
+        out: Dict[str, Any] = {}
+        for key in keys:
+            inst = known.get(key)
+            if inst is None:
+                continue
+            price = inst["last_price"]
+            row: Dict[str, Any] = {"instrument_token": inst["instrument_token"], "last_price": price}
+            if mode in ("ohlc", "full"):
+                row["ohlc"] = {"open": price * 0.998, "high": price * 1.004,
+                               "low": price * 0.995, "close": price * 0.999}
+            if mode == "full":
+                row.update(volume=1_250_000 if inst["lot_size"] else 0, oi=0, net_change=price * 0.001,
+                           timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                           depth={"buy": [{"price": price - 0.05, "quantity": 300, "orders": 4}] * 5,
+                                  "sell": [{"price": price + 0.05, "quantity": 300, "orders": 4}] * 5})
+            out[key] = row
+        return out
+
+    def candles(self, token: int, interval: str, start: str, end: str) -> List[List[Any]]:
+        step = _INTERVAL_S.get(interval, 300)
+        t0 = datetime.strptime(start[:19], "%Y-%m-%d %H:%M:%S")
+        t1 = datetime.strptime(end[:19], "%Y-%m-%d %H:%M:%S")
+        base = next((i["last_price"] for i in self.instruments if i["instrument_token"] == token), 100.0)
+        rows: List[List[Any]] = []
+        t = t0
+        while t <= t1 and len(rows) < 5000:
+            # Deterministic per (token, bar): repeatable across runs and processes
+            wiggle = (zlib.crc32(f"{token}:{t.isoformat()}".encode()) % 2001 - 1000) / 1000 * base * 0.001
+            o, c = base, base + wiggle
+            rows.append([t.strftime("%Y-%m-%dT%H:%M:%S+0530"), round(o, 2), round(max(o, c) + base * 0.0005, 2),
+                         round(min(o, c) - base * 0.0005, 2), round(c, 2), 1000 + len(rows)])
+            base = c
+            t += timedelta(seconds=step)
+        return rows
+
+    def instruments_csv(self, exchange: Optional[str]) -> str:
+        lines = [",".join(_CSV_FIELDS)]
+        for i in self.instruments:
+            if exchange and i["exchange"] != exchange:
+                continue
+            row = {"exchange_token": i["instrument_token"] // 256, "strike": 0, "tick_size": 0.05, **i}
+            lines.append(",".join(str(row[f]) for f in _CSV_FIELDS))
+        return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_fake: FakeKite
+    protocol_version = "HTTP/1.1"          # keep-alive, like api.kite.trade
+    # Headers + body in one buffered write, no Nagle: otherwise delayed ACKs
+    # add ~40ms to every keep-alive response
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, payload: Dict[str, Any]) -> None:
+        self._send(status, json.dumps(payload, default=str).encode(), "application/json")
+
+    def _error(self, status: int, error_type: str, message: str) -> None:
+        self._json(status, {"status": "error", "error_type": error_type, "message": message, "data": None})
+
+    def do_GET(self) -> None:
+        fake = self.server_fake
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        auth = self.headers.get("Authorization", "")
+        token = auth.split(":", 1)[1] if auth.startswith("token ") and ":" in auth else None
+        with fake._lock:
+            fake.requests.append(("GET", parts.path, token))
+            failure = fake._failures.pop(0) if fake._failures else None
+        if fake.latency:
+            time.sleep(fake.latency)
+        if failure is not None:
+            return self._error(failure, "GeneralException", "Injected failure")
+        if token not in fake.tokens:
+            return self._error(403, "TokenException", "Incorrect `api_key` or `access_token`.")
+
+        path = parts.path.rstrip("/")
+        if path == "/user/profile":
+            return self._json(200, {"status": "success", "data": {
+                "user_id": "FK0001", "user_name": "Fake Trader", "email": "fake@example.com",
+                "broker": "ZERODHA", "exchanges": ["NSE", "NFO", "BSE", "BFO"]}})
+        if path == "/user/margins":
+            return self._json(200, {"status": "success", "data": {
+                "equity": {"enabled": True, "net": 100000.0, "available": {"cash": 100000.0}}}})
+        if path in ("/quote", "/quote/ltp", "/quote/ohlc"):
+            mode = {"/quote": "full", "/quote/ltp": "ltp", "/quote/ohlc": "ohlc"}[path]
+            return self._json(200, {"status": "success", "data": fake.quote(query.get("i", []), mode)})
+        if path.startswith("/instruments/historical/"):
+            _, _, _, token_s, interval = path.split("/")
+            candles = fake.candles(int(token_s), interval, query["from"][0], query["to"][0])
+            return self._json(200, {"status": "success", "data": {"candles": candles}})
+        if path == "/instruments" or path.startswith("/instruments/"):
+            exchange = path.split("/")[2] if path.count("/") == 2 else None
+            return self._send(200, fake.instruments_csv(exchange).encode(), "text/csv")
+        return self._error(404, "GeneralException", f"Route not found: {path}")
@@ -0,0 +1,123 @@
+"""
+Benchmark fixtures — deterministic market data.
+
+Synthetic data is seeded so every run times the same inputs; recorded data is
+read from the candle backups in data/candle_backups (the same files the live
+service restores on warm start). Price/volume scales come from
+TestDataFactory so benchmarks and tests agree on what "realistic" means.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from data.test_data_factory import TestDataFactory
+
+BACKUP_DIR = Path(__file__).resolve().parent.parent / "data" / "candle_backups"
+SYMBOLS = tuple(TestDataFactory.BASE_PRICES)
+SEED = 20260310
+
+
+def synthetic_candles(symbol: str = "NIFTY", n: int = 100, seed: int = SEED,
+                      interval_minutes: int = 5) -> List[Dict[str, Any]]:
+    """Seeded random-walk OHLCV candles in the candle-backup format."""
+    rng = random.Random(f"{seed}:{symbol}:{n}")
+    price = TestDataFactory.BASE_PRICES.get(symbol, 20000.0)
+    vol_lo, vol_hi = TestDataFactory.VOLUME_RANGES.get(symbol, (100000, 500000))
+    oi_lo, oi_hi = TestDataFactory.OI_RANGES.get(symbol, (1000000, 10000000))
+    oi = rng.randint(oi_lo, oi_hi)
+    start = datetime(2026, 3, 10, 9, 15)
+
+    candles = []
+    for i in range(n):
+        open_ = price
+        close = round(open_ * (1 + rng.gauss(0, 0.0015)), 2)
+        high = round(max(open_, close) * (1 + abs(rng.gauss(0, 0.0007))), 2)
+        low = round(min(open_, close) * (1 - abs(rng.gauss(0, 0.0007))), 2)
+        oi_prev, oi = oi, max(0, oi + rng.randint(-50000, 50000))
+        candles.append({
+            "timestamp": (start + timedelta(minutes=interval_minutes * i)).isoformat(),
+            "open": round(open_, 2),
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": rng.randint(vol_lo, vol_hi) // 100,
+            "oi": oi,
+            "oi_prev": oi_prev,
+        })
+        price = close
+    return candles
+
+
+@lru_cache(maxsize=16)
+def _recorded(symbol: str) -> tuple:
+    candles: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(BACKUP_DIR.glob(f"{symbol}_candles_*.json")):
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        for candle in payload.get("candles", []):
+            candles[candle["timestamp"]] = candle
+    return tuple(candles[ts] for ts in sorted(candles))
+
+
+def recorded_candles(symbol: str = "NIFTY", n: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Deduplicated candles from the backups, oldest first (synthetic if none)."""
+    candles = list(_recorded(symbol))
+    if not candles:
+        return synthetic_candles(symbol, n or 100)
+    return candles[-n:] if n else candles
+
+
+def candle_frame(candles: List[Dict[str, Any]]):
+    """DataFrame shaped like ``_get_historical_data``: date, open, high, low, close, volume."""
+    import pandas as pd
+
+    df = pd.DataFrame(candles).rename(columns={"timestamp": "date"})
+    df["date"] = pd.to_datetime(df["date"])
+    return df[["date", "open", "high", "low", "close", "volume"]].reset_index(drop=True)
+
+
+def synthetic_ticks(symbol: str = "NIFTY", n: int = 500, seed: int = SEED) -> List[Dict[str, Any]]:
+    """Normalized ticks from TestDataFactory under a fixed seed."""
+    state = random.getstate()
+    random.seed(f"{seed}:{symbol}:ticks")
+    try:
+        return [TestDataFactory.generate_tick(symbol, price_variance=0.005) for _ in range(n)]
+    finally:
+        random.setstate(state)
+
+
+def kite_ticks(tokens: Dict[str, int], n: int = 500, seed: int = SEED) -> List[Dict[str, Any]]:
+    """Raw KiteTicker-shaped FULL-mode ticks (with 5-level depth), round-robin by symbol."""
+    rng = random.Random(f"{seed}:kite")
+    prices = {s: TestDataFactory.BASE_PRICES.get(s, 20000.0) for s in tokens}
+    volumes = {s: 0 for s in tokens}
+    symbols = list(tokens)
+    ticks = []
+    for i in range(n):
+        symbol = symbols[i % len(symbols)]
+        prices[symbol] = round(prices[symbol] * (1 + rng.gauss(0, 0.0003)), 2)
+        volumes[symbol] += rng.randint(0, 5000)
+        ltp = prices[symbol]
+        base = TestDataFactory.BASE_PRICES.get(symbol, 20000.0)
+        ticks.append({
+            "instrument_token": tokens[symbol],
+            "last_price": ltp,
+            "volume_traded": volumes[symbol],
+            "oi": 0,
+            "ohlc": {"open": base, "high": max(base, ltp), "low": min(base, ltp), "close": base},
+            "depth": {
+                "buy": [{"price": round(ltp - 0.05 * (k + 1), 2), "quantity": rng.randint(50, 5000),
+                         "orders": rng.randint(1, 40)} for k in range(5)],
+                "sell": [{"price": round(ltp + 0.05 * (k + 1), 2), "quantity": rng.randint(50, 5000),
+                          "orders": rng.randint(1, 40)} for k in range(5)],
+            },
+        })
+    return ticks
@@ -0,0 +1,355 @@
+"""
+Benchmark harness — registry, timing loop, budget checks and history.
+
+A benchmark is a *setup* function registered with ``@benchmark``. Setup runs
+once (sync or async) and returns — or, when it needs teardown, yields — what
+should be timed:
+
+    • a callable (sync or async) — timed ``repeat`` times after ``warmup`` calls
+    • a dict ``{n: callable}`` — timed at each input size ``n``; the log-log
+      slope of median time vs ``n`` is reported as ``exponent`` so complexity
+      claims ("O(n log n)") can be checked alongside the wall-clock budget
+
+Setup and measurement share one event loop, so async engines keep their locks
+and caches across iterations. ``budget_ms`` may be a callable, read after setup
+— for budgets relative to a reference the setup measured on the same box.
+stdout is silenced while timing — the handlers print heavily and terminal I/O
+would otherwise dominate the numbers.
+
+Every run is appended to ``results/history.jsonl`` keyed by git commit; the
+latest run from a *different* commit is the regression baseline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import fnmatch
+import inspect
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+HISTORY_FILE = Path(__file__).resolve().parent / "results" / "history.jsonl"
+
+# Median slower than baseline by this factor is a regression...
+REGRESSION_FACTOR = 1.25
+# ...unless the absolute difference is below timer/scheduler noise.
+REGRESSION_FLOOR_MS = 0.05
+# Wall-clock budgets are host-dependent: ``python -m benchmarks.run --check``
+# enforces them as written, the unit suite only when this is set
+# (BENCHMARK_BUDGETS=1). Otherwise the suite holds benchmarks to loose limits,
+# so a gross regression still fails on any host:
+BUDGETS_ENV = "BENCHMARK_BUDGETS"
+LOOSE_BUDGET_FACTOR = 3.0       # median up to 3x budget_ms, rate down to 1/3 of min_rate
+LOOSE_EXPONENT_MARGIN = 0.3     # scaling exponent up to max_exponent + 0.3
+
+
+def budgets_enforced() -> bool:
+    """Whether tests should assert budgets as written rather than the loose limits."""
+    return os.environ.get(BUDGETS_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def budget_failures(result: "BenchmarkResult") -> List[str]:
+    """``result``'s budget failures at the tolerance the unit suite runs with."""
+    if budgets_enforced():
+        return result.budget_failures()
+    return result.budget_failures(LOOSE_BUDGET_FACTOR, LOOSE_EXPONENT_MARGIN)
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Any]
+    claim: str = ""
+    budget_ms: Union[float, Callable[[], float], None] = None   # median per call must stay below
+    min_rate: Optional[float] = None        # calls/sec must stay above
+    max_exponent: Optional[float] = None    # scaling slope must stay below
+    ops_per_call: int = 1                   # items processed per timed call
+    warmup: int = 5
+    repeat: int = 50
+
+    def budget(self) -> Optional[float]:
+        return self.budget_ms() if callable(self.budget_ms) else self.budget_ms
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    claim: str = ""
+    budget_ms: Optional[float] = None
+    min_rate: Optional[float] = None
+    max_exponent: Optional[float] = None
+    samples: int = 0
+    median_ms: float = 0.0
+    p95_ms: float = 0.0
+    mean_ms: float = 0.0
+    min_ms: float = 0.0
+    ops_per_sec: float = 0.0
+    exponent: Optional[float] = None
+    scaling: Dict[str, float] = field(default_factory=dict)
+    baseline_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def within_budget(self) -> bool:
+        return not self.budget_failures()
+
+    @property
+    def regressed(self) -> bool:
+        if self.error or not self.baseline_ms:
+            return False
+        return (self.median_ms > self.baseline_ms * REGRESSION_FACTOR
+                and self.median_ms - self.baseline_ms > REGRESSION_FLOOR_MS)
+
+    def budget_failures(self, factor: float = 1.0, exponent_margin: float = 0.0) -> List[str]:
+        """Budget checks, with limits loosened by ``factor`` / ``exponent_margin``."""
+        if self.error:
+            return [f"error: {self.error}"]
+        out = []
+        if self.budget_ms is not None and self.median_ms > self.budget_ms * factor:
+            out.append(f"median {self.median_ms:.3f}ms > budget {self.budget_ms * factor:g}ms")
+        if self.min_rate is not None and self.ops_per_sec < self.min_rate / factor:
+            out.append(f"{self.ops_per_sec:.0f}/s < required {self.min_rate / factor:.0f}/s")
+        if self.max_exponent is not None and self.exponent is not None \
+                and self.exponent > self.max_exponent + exponent_margin:
+            out.append(f"scaling exponent {self.exponent:.2f} > {self.max_exponent + exponent_margin:g}")
+        return out
+
+    def failures(self) -> List[str]:
+        out = self.budget_failures()
+        if self.error:
+            return out
+        if self.regressed:
+            out.append(f"regressed {self.median_ms:.3f}ms vs baseline {self.baseline_ms:.3f}ms")
+        return out
+
+    def as_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["within_budget"] = self.within_budget
+        data["regressed"] = self.regressed
+        return data
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+registry: Dict[str, Benchmark] = {}
+
+SUITES = ("benchmarks.bench_engines", "benchmarks.bench_feed", "benchmarks.bench_routers",
+          "benchmarks.bench_startup", "benchmarks.bench_stats")
+
+
+def benchmark(name: str, *, claim: str = "", budget_ms: Union[float, Callable[[], float], None] = None,
+              min_rate: Optional[float] = None, max_exponent: Optional[float] = None,
+              ops_per_call: int = 1, warmup: int = 5, repeat: int = 50):
+    """Register a benchmark setup function under ``name``."""
+    def decorator(setup: Callable[[], Any]) -> Callable[[], Any]:
+        registry[name] = Benchmark(
+            name=name, setup=setup, claim=claim, budget_ms=budget_ms,
+            min_rate=min_rate, max_exponent=max_exponent,
+            ops_per_call=ops_per_call, warmup=warmup, repeat=repeat,
+        )
+        return setup
+    return decorator
+
+
+def load_suites() -> List[BenchmarkResult]:
+    """Import every benchmark module; import failures come back as error results."""
+    import importlib
+
+    errors = []
+    for module in SUITES:
+        try:
+            importlib.import_module(module)
+        except Exception as exc:
+            errors.append(BenchmarkResult(name=f"{module}:import", error=f"{type(exc).__name__}: {exc}"))
+    return errors
+
+
+# ---------------------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------------------
+
+async def _call(fn: Callable[[], Any], is_async: bool) -> None:
+    if is_async:
+        await fn()
+    else:
+        fn()
+
+
+async def _time(fn: Callable[[], Any], warmup: int, repeat: int) -> List[float]:
+    is_async = inspect.iscoroutinefunction(fn)
+    for _ in range(warmup):
+        await _call(fn, is_async)
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        await _call(fn, is_async)
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+    return samples
+
+
+def _summarise(result: BenchmarkResult, samples: List[float], ops_per_call: int = 1) -> None:
+    ordered = sorted(samples)
+    result.samples = len(ordered)
+    result.median_ms = statistics.median(ordered)
+    result.p95_ms = ordered[min(len(ordered) - 1, int(math.ceil(0.95 * len(ordered))) - 1)]
+    result.mean_ms = statistics.fmean(ordered)
+    result.min_ms = ordered[0]
+    result.ops_per_sec = ops_per_call * 1000.0 / result.mean_ms if result.mean_ms > 0 else float("inf")
+
+
+def scaling_exponent(sizes: List[int], medians: List[float]) -> float:
+    """Least-squares slope of log(time) vs log(n)."""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(m, 1e-6)) for m in medians]
+    mx, my = statistics.fmean(xs), statistics.fmean(ys)
+    num = sum((x - mx) * (y - my) for x, y in zip(xs, ys))
+    den = sum((x - mx) ** 2 for x in xs)
+    return num / den if den else 0.0
+
+
+async def _run_one(bench: Benchmark, repeat: int) -> BenchmarkResult:
+    result = BenchmarkResult(
+        name=bench.name, claim=bench.claim,
+        min_rate=bench.min_rate, max_exponent=bench.max_exponent,
+    )
+    made = bench.setup()
+    if inspect.isasyncgen(made):
+        target = await made.__anext__()
+    elif inspect.isgenerator(made):
+        target = next(made)
+    elif inspect.isawaitable(made):
+        target = await made
+    else:
+        target = made
+    result.budget_ms = bench.budget()
+
+    try:
+        if isinstance(target, dict):
+            sizes = sorted(target)
+            medians = []
+            for n in sizes:
+                samples = await _time(target[n], bench.warmup, repeat)
+                medians.append(statistics.median(samples))
+                result.scaling[str(n)] = round(medians[-1], 4)
+            result.exponent = round(scaling_exponent(sizes, medians), 3)
+            _summarise(result, samples, bench.ops_per_call)   # headline numbers at the largest size
+        else:
+            _summarise(result, await _time(target, bench.warmup, repeat), bench.ops_per_call)
+    finally:
+        # Generator setups run their teardown (undo patches, clear caches) here
+        if inspect.isasyncgen(made):
+            await made.aclose()
+        elif inspect.isgenerator(made):
+            made.close()
+    return result
+
+
+def run_benchmark(bench: Benchmark, repeat: Optional[int] = None, quiet: bool = True) -> BenchmarkResult:
+    sink = io.StringIO() if quiet else None
+    try:
+        with contextlib.redirect_stdout(sink) if quiet else contextlib.nullcontext():
+            return asyncio.run(_run_one(bench, repeat or bench.repeat))
+    except Exception as exc:
+        return BenchmarkResult(
+            name=bench.name, claim=bench.claim,
+            budget_ms=None if callable(bench.budget_ms) else bench.budget_ms, min_rate=bench.min_rate, max_exponent=bench.max_exponent,
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+
+# ---------------------------------------------------------------------------
+# History
+# ---------------------------------------------------------------------------
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, timeout=5,
+        )
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def load_history(path: Path = HISTORY_FILE) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    runs = []
+    with path.open(encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if line:
+                try:
+                    runs.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return runs
+
+
+def _baseline(history: List[Dict[str, Any]], commit: str) -> Dict[str, float]:
+    """Medians from the most recent run recorded against a different commit."""
+    for run in reversed(history):
+        if run.get("commit") != commit:
+            return {name: r.get("median_ms") for name, r in run.get("results", {}).items()
+                    if not r.get("error")}
+    return {}
+
+
+def append_history(results: List[BenchmarkResult], commit: str, path: Path = HISTORY_FILE) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    entry = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {
+            r.name: {
+                "median_ms": round(r.median_ms, 4),
+                "p95_ms": round(r.p95_ms, 4),
+                "ops_per_sec": round(r.ops_per_sec, 1),
+                "exponent": r.exponent,
+                "error": r.error,
+            }
+            for r in results
+        },
+    }
+    with path.open("a", encoding="utf-8") as fh:
+        fh.write(json.dumps(entry) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def run_benchmarks(pattern: Optional[str] = None, repeat: Optional[int] = None,
+                   record: bool = False, history_path: Path = HISTORY_FILE) -> List[BenchmarkResult]:
+    """Run registered benchmarks matching the glob ``pattern``."""
+    results = load_suites()
+    commit = git_commit()
+    baseline = _baseline(load_history(history_path), commit)
+
+    for name in sorted(registry):
+        if pattern and not fnmatch.fnmatch(name, f"*{pattern}*"):
+            continue
+        result = run_benchmark(registry[name], repeat=repeat)
+        result.baseline_ms = baseline.get(name)
+        results.append(result)
+
+    if record:
+        append_history(results, commit, history_path)
+    return results
@@ -0,0 +1,74 @@
+"""
+Run the benchmark suite.
+
+    python -m benchmarks.run                      # run all, append to history
+    python -m benchmarks.run -k engines.zone      # filter by name substring/glob
+    python -m benchmarks.run --check              # exit 1 on budget miss or regression
+    python -m benchmarks.run --json out.json      # full results for CI artifacts
+    python -m benchmarks.run --history            # per-commit medians, oldest first
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.harness import HISTORY_FILE, load_history, run_benchmarks  # noqa: E402
+
+
+def _print_history(pattern):
+    runs = load_history()
+    if not runs:
+        print(f"No history at {HISTORY_FILE}")
+        return
+    names = sorted({n for r in runs for n in r.get("results", {}) if not pattern or pattern in n})
+    for name in names:
+        print(name)
+        for run in runs:
+            r = run.get("results", {}).get(name)
+            if r and not r.get("error"):
+                print(f"   {run['commit']:<10} {run['timestamp']}  median {r['median_ms']:.3f}ms")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark documented performance claims")
+    parser.add_argument("-k", "--filter", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, help="override timed iterations per benchmark")
+    parser.add_argument("--check", action="store_true", help="exit 1 on budget miss or regression")
+    parser.add_argument("--no-record", action="store_true", help="do not append to history")
+    parser.add_argument("--json", type=Path, help="write full results to this file")
+    parser.add_argument("--history", action="store_true", help="print recorded history and exit")
+    args = parser.parse_args(argv)
+
+    if args.history:
+        _print_history(args.filter)
+        return 0
+
+    results = run_benchmarks(args.filter, repeat=args.repeat, record=not args.no_record)
+
+    failed = 0
+    print(f"{'benchmark':<40} {'median':>10} {'p95':>10} {'ops/s':>10}  status")
+    print("─" * 88)
+    for r in results:
+        problems = r.failures()
+        status = "OK" if not problems else "; ".join(problems)
+        failed += bool(problems)
+        extra = f" (n^{r.exponent})" if r.exponent is not None else ""
+        print(f"{r.name:<40} {r.median_ms:>8.3f}ms {r.p95_ms:>8.3f}ms {r.ops_per_sec:>10.0f}  {status}{extra}")
+    print("─" * 88)
+    print(f"{len(results) - failed}/{len(results)} within budget")
+
+    if args.json:
+        args.json.write_text(json.dumps([r.as_dict() for r in results], indent=2), encoding="utf-8")
+
+    return 1 if args.check and failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
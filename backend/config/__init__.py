@@ -70,6 +70,8 @@ class Settings(BaseSettings):
     enable_scheduler: bool = Field(default=True, env="ENABLE_SCHEDULER")
     # Fast local dev mode: start core feed first, defer heavy optional services.
     fast_startup_mode: bool = Field(default=False, env="FAST_STARTUP_MODE")
+    # Import feature routers on first request instead of at `import main` (see services/lazy_routers.py).
+    lazy_routers: bool = Field(default=True, env="LAZY_ROUTERS")
     
     # ==================== AI / LLM (Smart AI Algo) ====================
     openai_api_key: Optional[str] = Field(default=None, env="OPENAI_API_KEY")
@@ -133,12 +135,36 @@ class Settings(BaseSettings):
     banknifty_fut_token: int = Field(default=12674050, env="BANKNIFTY_FUT_TOKEN")  # BANKNIFTY Current Month Future
     sensex_fut_token: int = Field(default=292786437, env="SENSEX_FUT_TOKEN")  # SENSEX26JANFUT (Updated: Dec 30, 2025)
     # ✅ SENSEX futures ARE available on BFO exchange (BSE Futures & Options)
+    # Cap on KiteTicker subscriptions across all universe slices (Zerodha allows 3000 per connection)
+    feed_max_tokens: int = Field(default=3000, env="FEED_MAX_TOKENS")
+    # Extra KiteTicker connections opened only when subscriptions overflow FEED_MAX_TOKENS (Zerodha allows 3)
+    feed_max_connections: int = Field(default=2, env="FEED_MAX_CONNECTIONS")
+    # Option-chain mirror: nearest-expiry strikes within ±width of ATM streamed over KiteTicker
+    option_chain_enabled: bool = Field(default=True, env="OPTION_CHAIN_ENABLED")
+    option_chain_width: int = Field(default=20, env="OPTION_CHAIN_WIDTH")  # strikes each side of ATM
+    option_chain_mode: str = Field(default="full", env="OPTION_CHAIN_MODE")  # ltp / quote / full (depth)
+    # Cross-asset correlation matrix: indices, futures, INDIA VIX and global indices sampled per bar
+    correlation_enabled: bool = Field(default=True, env="CORRELATION_ENABLED")
+    correlation_bar_seconds: float = Field(default=60.0, env="CORRELATION_BAR_SECONDS")
+    correlation_window: int = Field(default=120, env="CORRELATION_WINDOW")  # bars
+    correlation_max_lag: int = Field(default=3, env="CORRELATION_MAX_LAG")  # bars of lead-lag examined
+    # Adaptive broadcast-loop cadences (services/cadence.py): volatility speeds loops up, load slows them down
+    cadence_adaptive: bool = Field(default=True, env="CADENCE_ADAPTIVE")  # False → every loop at its base interval
+    cadence_sample_seconds: float = Field(default=1.0, env="CADENCE_SAMPLE_SECONDS")
+    cadence_loop_lag_ms: float = Field(default=50.0, env="CADENCE_LOOP_LAG_MS")  # event-loop lag that starts backing off
+    cadence_compute_budget: float = Field(default=0.5, env="CADENCE_COMPUTE_BUDGET")  # max share of an interval spent computing
+    cadence_bounds: str = Field(default="", env="CADENCE_BOUNDS")  # per-loop min:max overrides, e.g. "compass=1:6,liquidity=0.5:3"
     
     # ==================== PERFORMANCE & TIMING ====================
     # WebSocket settings
     ws_ping_interval: int = 25  # seconds
     ws_reconnect_delay: int = 3  # seconds
     ws_timeout: int = 60  # seconds
+    # Per-client outbound WebSocket queues (services/ws_outbox.py)
+    ws_outbox_depth: int = Field(default=256, env="WS_OUTBOX_DEPTH")  # messages queued per client
+    ws_send_timeout: float = Field(default=3.0, env="WS_SEND_TIMEOUT")  # one send longer than this → slow client
+    ws_max_lag_seconds: float = Field(default=10.0, env="WS_MAX_LAG_SECONDS")  # oldest queued message older → slow client
+    stream_heartbeat_seconds: float = Field(default=30.0, env="STREAM_HEARTBEAT_SECONDS")  # /ws/stream idle heartbeat (services/ws_hub.py)
     
     # Market feed settings
     market_feed_retry_interval: int = 30  # seconds
@@ -149,12 +175,27 @@ class Settings(BaseSettings):
     # ai_analysis_interval: int = 180  # REMOVED - AI Engine disabled
     # ai_retry_interval: int = 60  # REMOVED - AI Engine disabled
     
+    # User analytics (services/user_analytics.py): events group-committed to data/analytics/analytics.db
+    analytics_flush_ms: int = Field(default=500, env="ANALYTICS_FLUSH_MS")  # batcher commit interval
+    analytics_max_pending: int = Field(default=10000, env="ANALYTICS_MAX_PENDING")  # queued events kept if the disk lags
+
     # Cache settings
     pcr_cache_ttl: int = 30  # seconds
     market_data_cache_ttl: int = 5  # seconds
     instruments_cache_days: int = 1  # days
     advanced_analysis_cache_ttl: int = 5  # seconds for Volume Pulse, Trend Base, News
     
+    # ==================== MEMORY LIMITS ====================
+    # services/memory_guard.py sweeps expired cache keys and enforces these caps
+    memory_sweep_interval: int = Field(default=30, env="MEMORY_SWEEP_INTERVAL")  # seconds
+    shared_cache_max_keys: int = Field(default=20000, env="SHARED_CACHE_MAX_KEYS")  # 0 = unlimited
+    shared_cache_max_mb: int = Field(default=256, env="SHARED_CACHE_MAX_MB")  # 0 = unlimited
+    shared_cache_eviction: str = Field(default="volatile-ttl", env="SHARED_CACHE_EVICTION")  # volatile-ttl|fifo
+    orderflow_history_maxlen: int = Field(default=1000, env="ORDERFLOW_HISTORY_MAXLEN")  # metrics per symbol
+    depth_history_ticks: int = Field(default=32768, env="DEPTH_HISTORY_TICKS")  # depth snapshots per instrument (~170 B each)
+    orderflow_optimizer_cache_max: int = Field(default=5000, env="ORDERFLOW_OPTIMIZER_CACHE_MAX")  # entries
+    quantedge_ml_buffer_size: int = Field(default=800, env="QUANTEDGE_ML_BUFFER_SIZE")  # training samples per symbol (min 120)
+
     # PCR fetch delays (stagger to avoid rate limits)
     pcr_delay_nifty: int = 0  # seconds
     pcr_delay_banknifty: int = 10  # seconds
@@ -164,6 +205,15 @@ class Settings(BaseSettings):
     zerodha_rate_limit_per_second: int = 3
     zerodha_backoff_multiplier: float = 1.5
     zerodha_max_backoff: int = 60  # seconds
+
+    # ==================== KITE GATEWAY ====================
+    kite_api_root: str = Field(default="", env="KITE_API_ROOT")  # "" = api.kite.trade; a fake server in tests
+    kite_pool_size: int = Field(default=8, env="KITE_POOL_SIZE")  # keep-alive connections = executor threads
+    kite_max_pending: int = Field(default=64, env="KITE_MAX_PENDING")  # queued calls before callers wait
+    kite_timeout: float = Field(default=7.0, env="KITE_TIMEOUT")  # seconds per REST call
+    kite_quote_rate: float = Field(default=1.0, env="KITE_QUOTE_RATE")  # quote/ltp/ohlc requests per second (broker limit)
+    kite_quote_burst: int = Field(default=1, env="KITE_QUOTE_BURST")  # token-bucket depth
+    kite_quote_window_ms: float = Field(default=25.0, env="KITE_QUOTE_WINDOW_MS")  # merge window before a batch goes out
     
     class Config:
         env_file = str(ENV_FILE)
@@ -26,43 +26,22 @@ from services.market_feed import MarketFeedService
 from services.cache import CacheService
 from services.token_watcher import start_token_watcher
 from services.auth_state_machine import auth_state_manager
+from services.conditional_responses import ConditionalResponseMiddleware
+from services.lazy_routers import add_lazy_router, preload as preload_lazy_routers
 
+# Core routers load eagerly (health, auth, the market feed WebSocket).
+# Feature routers are registered lazily further down — see services/lazy_routers.py.
 from routers import (
     auth,
     market,
     health,
-    analysis,
-    advanced_analysis,
     token_status,
     system_health,
-    pivot_indicators,
     diagnostics,
-    market_outlook,
-    vix,
     user_analytics,
     app_access,
-    trade_status,
+    stream,
 )
-from routers.compass import http_router as compass_http, ws_router as compass_ws
-from routers.global_indices import http_router as global_indices_http, ws_router as global_indices_ws
-from routers.liquidity import http_router as liq_http, ws_router as liq_ws
-from routers.ict import http_router as ict_http, ws_router as ict_ws
-from routers.expiry_explosion import http_router as expiry_http, ws_router as expiry_ws
-from routers.market_edge import http_router as edge_http, ws_router as edge_ws
-from routers.candle_intelligence import http_router as candle_intel_http, ws_router as candle_intel_ws
-from routers.market_regime import http_router as regime_http, ws_router as regime_ws
-from routers.strike_intelligence import http_router as strike_intel_http, ws_router as strike_intel_ws
-from routers.chart_intelligence import http_router as chart_intel_http, ws_router as chart_intel_ws
-from routers.global_news import http_router as global_news_http, ws_router as global_news_ws
-from routers.observatory import http_router as observatory_http
-from routers import smart_money
-from routers.trend_base import router as trend_base_http, ws_router as trend_base_ws
-from routers.volume_pulse import router as volume_pulse_http, ws_router as volume_pulse_ws
-from routers.ict_bias import router as ict_bias_http, ws_router as ict_bias_ws
-from routers.market_compass import router as market_compass_http, ws_router as market_compass_ws
-from routers.trading_intelligence import http_router as tie_http, ws_router as tie_ws
-from routers.fii_dii import router as fii_dii_router, ws_router as fii_dii_ws
-from routers.smart_ai_algo import http_router as algo_http, ws_router as algo_ws
 
 # Windows console fix already applied in config/__init__.py
 
@@ -129,6 +108,22 @@ async def lifespan(app: FastAPI):
     # Token watcher (file system monitor — instant)
     token_observer = start_token_watcher(market_feed, auth_state_manager)
 
+    # Session clock — precomputed phase timeline + transition events (instant)
+    from services.session_clock import session_clock
+    await session_clock.start()
+
+    # Memory guard — shared-cache TTL sweep + hard caps (instant)
+    from services.memory_guard import memory_guard
+    await memory_guard.start()
+
+    # Cadence controller — samples volatility and loop lag for the broadcast loops (instant)
+    from services.cadence import get_cadence_controller
+    await get_cadence_controller().start()
+
+    # User analytics — reload persisted totals, start the group-commit batcher
+    from services.user_analytics import user_analytics as analytics_service
+    await analytics_service.start()
+
     # ── Variables shared with shutdown ────────────────────────────────
     scheduler = None
     feed_task = None
@@ -169,6 +164,22 @@ async def lifespan(app: FastAPI):
             except Exception as exc:
                 logger.error("OI Momentum broadcaster failed to start: %s", exc, exc_info=True)
 
+        async def start_option_chains():
+            try:
+                from services.option_chain import get_option_chains
+                await get_option_chains().start()
+                print("🔗 Option Chain mirror: ON")
+            except Exception as exc:
+                logger.error("Option chain mirror failed to start: %s", exc, exc_info=True)
+
+        async def start_correlations():
+            try:
+                from services.correlation_matrix import get_correlation_service
+                await get_correlation_service().start()
+                print("🔀 Correlation matrix: ON")
+            except Exception as exc:
+                logger.error("Correlation sampler failed to start: %s", exc, exc_info=True)
+
         async def start_compass():
             try:
                 from services.compass_service import get_compass_service
@@ -284,6 +295,8 @@ async def lifespan(app: FastAPI):
             await asyncio.gather(
                 restore_candles(),
                 start_oi_broadcaster(),
+                start_option_chains(),
+                start_correlations(),
                 start_compass(),
                 start_liquidity(),
                 start_ict(),
@@ -303,6 +316,8 @@ async def lifespan(app: FastAPI):
                 start_scheduler(),
                 restore_candles(),
                 start_oi_broadcaster(),
+                start_option_chains(),
+                start_correlations(),
                 start_compass(),
                 start_liquidity(),
                 start_ict(),
@@ -319,6 +334,10 @@ async def lifespan(app: FastAPI):
             )
         print("🚀 All services READY")
 
+        # Import the remaining lazy feature routers off the event loop so the
+        # first request to each one does not pay for the import.
+        await preload_lazy_routers(app)
+
     # 🔥 Fire background boot — server starts accepting HTTP immediately
     _bg_boot = asyncio.create_task(_boot_services())
 
@@ -427,6 +446,20 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
     
+    # Stop option chain roll check
+    try:
+        from services.option_chain import get_option_chains
+        await get_option_chains().stop()
+    except Exception:
+        pass
+
+    # Stop correlation sampler
+    try:
+        from services.correlation_matrix import get_correlation_service
+        await get_correlation_service().stop()
+    except Exception:
+        pass
+
     # Stop Observatory Service
     try:
         from services.observatory_service import get_observatory_service
@@ -434,10 +467,31 @@ async def lifespan(app: FastAPI):
     except Exception:
         pass
 
+    # Close pooled outbound HTTP clients (Yahoo/Stooq/RSS/Moneycontrol/OpenAI)
+    try:
+        from services.http_client import close_http_pool
+        await close_http_pool()
+    except Exception:
+        pass
+
+    # Stop the quote dispatcher, then close the pooled Kite REST session and its executor
+    try:
+        from services.quote_scheduler import close_quote_scheduler
+        from services.kite_gateway import close_kite_gateway
+        close_quote_scheduler()
+        close_kite_gateway()
+    except Exception:
+        pass
+
     # Stop unified auth monitor
     from services.unified_auth_service import unified_auth
     await unified_auth.stop_auto_refresh_monitor()
     
+    await session_clock.stop()
+    await memory_guard.stop()
+    await get_cadence_controller().stop()
+    await analytics_service.stop()
+
     if scheduler:
         await scheduler.stop()
     if market_feed:
@@ -551,6 +605,10 @@ async def cors_middleware(request: Request, call_next):
         response.headers["Vary"] = "Origin"
     return response
 
+
+# ETag / 304 / gzip-br for polled JSON endpoints (outermost, so it sees CORS headers)
+app.add_middleware(ConditionalResponseMiddleware, prefixes=("/api/",))
+
 # ── Global exception handler — prevents stack trace leaks ────────────
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -572,82 +630,62 @@ app.include_router(app_access.router, prefix="/api/app-access", tags=["App Acces
 
 # ✅ IMPORTANT: keep WS router clean
 app.include_router(market.router, prefix="/ws", tags=["Market Data"])
-
-app.include_router(analysis.router, tags=["Analysis"])
-app.include_router(advanced_analysis.router, tags=["Advanced Technical Analysis"])
-app.include_router(pivot_indicators.router, tags=["Pivot Indicators"])
-app.include_router(market_outlook.router, tags=["Market Outlook"])
-app.include_router(vix.router, tags=["India VIX"])
-app.include_router(trade_status.router, tags=["Trade Status"])
-
-# 🧭 Institutional Market Compass
-app.include_router(compass_ws,   prefix="/ws",  tags=["Compass"])
-app.include_router(compass_http, prefix="/api", tags=["Compass"])
-
-# 🌍 Global Indices Adapter Layer
-app.include_router(global_indices_ws,   prefix="/ws",  tags=["Global Indices"])
-app.include_router(global_indices_http, prefix="/api", tags=["Global Indices"])
-
-# 🏛️ Smart Money Order Logic (NEW)
-app.include_router(smart_money.router, prefix="/ws", tags=["Smart Money Order Logic"])
-
-# ⚡ Pure Liquidity Intelligence
-app.include_router(liq_ws,   prefix="/ws",  tags=["Liquidity"])
-app.include_router(liq_http, prefix="/api", tags=["Liquidity"])
-
-# 🏦 ICT Smart Money Intelligence
-app.include_router(ict_ws,   prefix="/ws",  tags=["ICT"])
-app.include_router(ict_http, prefix="/api", tags=["ICT"])
-
-# 💥 Expiry Explosion Zone
-app.include_router(expiry_ws,   prefix="/ws",  tags=["Expiry Explosion"])
-app.include_router(expiry_http, prefix="/api", tags=["Expiry Explosion"])
-
-# 📈 MarketEdge Intelligence
-app.include_router(edge_ws,   prefix="/ws",  tags=["MarketEdge"])
-app.include_router(edge_http, prefix="/api", tags=["MarketEdge"])
-
-# 🕯️ Candle Intelligence Engine
-app.include_router(candle_intel_ws,   prefix="/ws",  tags=["Candle Intelligence"])
-app.include_router(candle_intel_http, prefix="/api", tags=["Candle Intelligence"])
-
-# 📊 Market Regime Intelligence
-app.include_router(regime_ws,   prefix="/ws",  tags=["Market Regime"])
-app.include_router(regime_http, prefix="/api", tags=["Market Regime"])
-
-# 🎯 Strike Intelligence
-app.include_router(strike_intel_ws,   prefix="/ws",  tags=["Strike Intelligence"])
-app.include_router(strike_intel_http, prefix="/api", tags=["Strike Intelligence"])
-
-# 📈 Chart Intelligence
-app.include_router(chart_intel_ws,   prefix="/ws",  tags=["Chart Intelligence"])
-app.include_router(chart_intel_http, prefix="/api", tags=["Chart Intelligence"])
-
-# 📰 Global Impact Radar
-app.include_router(global_news_ws,   prefix="/ws",  tags=["Global Impact Radar"])
-app.include_router(global_news_http, prefix="/api", tags=["Global Impact Radar"])
-
-# � Trend Base - Higher Low Structure Analysis (NEW)
-app.include_router(trend_base_ws,   prefix="/ws",  tags=["Trend Base"])
-app.include_router(trend_base_http, prefix="/api", tags=["Trend Base"])
-# 📊 Volume Pulse - Candle Volume Analysis (NEW)
-app.include_router(volume_pulse_ws,   prefix="/ws",  tags=["Volume Pulse"])
-app.include_router(volume_pulse_http, prefix="/api", tags=["Volume Pulse"])
-# 🎯 ICT Bias - Institutional Bias & Smart Money Analysis (NEW)
-app.include_router(ict_bias_ws,   prefix="/ws",  tags=["ICT Bias"])
-app.include_router(ict_bias_http, prefix="/api", tags=["ICT Bias"])
-# 🧭 Market Compass - Multi-Market Correlation & Global Impact Analysis (NEW)
-app.include_router(market_compass_ws,   prefix="/ws",  tags=["Market Compass"])
-app.include_router(market_compass_http, prefix="/api", tags=["Market Compass"])
-# ⚡ Trading Intelligence Engine — NumPy + LightGBM + PyTorch LSTM + TensorFlow
-app.include_router(tie_ws,   prefix="/ws",  tags=["Trading Intelligence"])
-app.include_router(tie_http, prefix="/api", tags=["Trading Intelligence"])
-# 💸 FII / DII real flow (NSE-sourced)
-app.include_router(fii_dii_ws, prefix="/ws", tags=["FII / DII"])
-app.include_router(fii_dii_router, prefix="/api", tags=["FII / DII"])# 🤖 Smart AI Algo — entry/SL/target/TSL with OpenAI enrichment
-app.include_router(algo_http, tags=["Smart AI Algo"])
-app.include_router(algo_ws, tags=["Smart AI Algo"])# �🔭 Market Intelligence Observatory
-app.include_router(observatory_http, tags=["Observatory"])
+app.include_router(stream.router, prefix="/ws", tags=["Stream"])
+
+# Feature routers: imported on first request (or by the background preload
+# after boot) so `import main` stays light. LAZY_ROUTERS=false imports them here.
+# (module, [(router attribute, include prefix)], tags) — registration order is route order.
+FEATURE_ROUTERS = [
+    ("routers.analysis", [("router", "")], ["Analysis"]),
+    ("routers.advanced_analysis", [("router", "")], ["Advanced Technical Analysis"]),
+    ("routers.pivot_indicators", [("router", "")], ["Pivot Indicators"]),
+    ("routers.market_outlook", [("router", "")], ["Market Outlook"]),
+    ("routers.vix", [("router", "")], ["India VIX"]),
+    ("routers.trade_status", [("router", "")], ["Trade Status"]),
+    # 🧭 Institutional Market Compass
+    ("routers.compass", [("ws_router", "/ws"), ("http_router", "/api")], ["Compass"]),
+    # 🌍 Global Indices Adapter Layer
+    ("routers.global_indices", [("ws_router", "/ws"), ("http_router", "/api")], ["Global Indices"]),
+    # 🏛️ Smart Money Order Logic
+    ("routers.smart_money", [("router", "/ws")], ["Smart Money Order Logic"]),
+    # ⚡ Pure Liquidity Intelligence
+    ("routers.liquidity", [("ws_router", "/ws"), ("http_router", "/api")], ["Liquidity"]),
+    # 🏦 ICT Smart Money Intelligence
+    ("routers.ict", [("ws_router", "/ws"), ("http_router", "/api")], ["ICT"]),
+    # 💥 Expiry Explosion Zone
+    ("routers.expiry_explosion", [("ws_router", "/ws"), ("http_router", "/api")], ["Expiry Explosion"]),
+    # 📈 MarketEdge Intelligence
+    ("routers.market_edge", [("ws_router", "/ws"), ("http_router", "/api")], ["MarketEdge"]),
+    # 🕯️ Candle Intelligence Engine
+    ("routers.candle_intelligence", [("ws_router", "/ws"), ("http_router", "/api")], ["Candle Intelligence"]),
+    # 📊 Market Regime Intelligence
+    ("routers.market_regime", [("ws_router", "/ws"), ("http_router", "/api")], ["Market Regime"]),
+    # 🎯 Strike Intelligence
+    ("routers.strike_intelligence", [("ws_router", "/ws"), ("http_router", "/api")], ["Strike Intelligence"]),
+    # 📈 Chart Intelligence
+    ("routers.chart_intelligence", [("ws_router", "/ws"), ("http_router", "/api")], ["Chart Intelligence"]),
+    # 📰 Global Impact Radar
+    ("routers.global_news", [("ws_router", "/ws"), ("http_router", "/api")], ["Global Impact Radar"]),
+    # 📈 Trend Base - Higher Low Structure Analysis
+    ("routers.trend_base", [("ws_router", "/ws"), ("router", "/api")], ["Trend Base"]),
+    # 📊 Volume Pulse - Candle Volume Analysis
+    ("routers.volume_pulse", [("ws_router", "/ws"), ("router", "/api")], ["Volume Pulse"]),
+    # 🎯 ICT Bias - Institutional Bias & Smart Money Analysis
+    ("routers.ict_bias", [("ws_router", "/ws"), ("router", "/api")], ["ICT Bias"]),
+    # 🧭 Market Compass - Multi-Market Correlation & Global Impact Analysis
+    ("routers.market_compass", [("ws_router", "/ws"), ("router", "/api")], ["Market Compass"]),
+    # ⚡ Trading Intelligence Engine — NumPy + LightGBM + PyTorch LSTM + TensorFlow
+    ("routers.trading_intelligence", [("ws_router", "/ws"), ("http_router", "/api")], ["Trading Intelligence"]),
+    # 💸 FII / DII real flow (NSE-sourced)
+    ("routers.fii_dii", [("ws_router", "/ws"), ("router", "/api")], ["FII / DII"]),
+    # 🤖 Smart AI Algo — entry/SL/target/TSL with OpenAI enrichment
+    ("routers.smart_ai_algo", [("http_router", ""), ("ws_router", "")], ["Smart AI Algo"]),
+    # 🔭 Market Intelligence Observatory
+    ("routers.observatory", [("http_router", "")], ["Observatory"]),
+]
+
+for _module, _mounts, _tags in FEATURE_ROUTERS:
+    add_lazy_router(app, _module, _mounts, tags=_tags, lazy=settings.lazy_routers)
 
 
 @app.get("/")
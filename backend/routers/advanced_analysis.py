@@ -6,7 +6,7 @@ Performance: <10ms response time with caching
 """
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Header
+from fastapi import APIRouter, HTTPException, WebSocket, Header
 from pydantic import BaseModel
 from typing import Dict, Any
 import asyncio
@@ -33,6 +33,8 @@ pd = _LazyPandas()
 
 from config import get_settings
 from services.cache import CacheService
+from services.response_cache import cached_response
+from services.ws_hub import get_stream_hub
 import os
 
 router = APIRouter(prefix="/api/advanced", tags=["Advanced Technical Analysis"])
@@ -99,6 +101,7 @@ def get_cache() -> CacheService:
 # ═══════════════════════════════════════════════════════════
 
 @router.get("/all-analysis/{symbol}")
+@cached_response("all_analysis", ttl={"LIVE": 5, "default": 60}, stale=30)
 async def get_all_analysis_ultra_fast(symbol: str) -> Dict[str, Any]:
     """
     🚀 ULTRA FAST: Fetch ALL analysis sections in ONE request
@@ -115,12 +118,6 @@ async def get_all_analysis_ultra_fast(symbol: str) -> Dict[str, Any]:
         symbol = symbol.upper()
         cache = get_cache()
         
-        # Check cache first (5-second cache for ultra-fast response)
-        cache_key = f"all_analysis:{symbol}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-        
         # Token validation (cached, fast)
         from services.global_token_manager import check_global_token_status
         token_status = await check_global_token_status()
@@ -183,9 +180,6 @@ async def get_all_analysis_ultra_fast(symbol: str) -> Dict[str, Any]:
             "timestamp": datetime.now().isoformat()
         }
         
-        # Cache for 5 seconds (ultra-fast repeat requests)
-        await cache.set(cache_key, response, expire=5)
-        
         return response
         
     except Exception as e:
@@ -420,6 +414,7 @@ async def get_all_volume_pulse() -> Dict[str, Any]:
 # ═══════════════════════════════════════════════════════════
 
 @router.get("/trend-base/{symbol}")
+@cached_response("trend_base", ttl={"LIVE": 2, "default": 30}, stale=10)
 async def get_trend_base(symbol: str) -> Dict[str, Any]:
     """
     🎯 Trend Base – Multi-Factor Higher-Low Structure Analysis
@@ -824,31 +819,16 @@ async def get_all_combined() -> Dict[str, Any]:
 # WEBSOCKET ENDPOINT (Real-time updates)
 # ═══════════════════════════════════════════════════════════
 
+get_stream_hub().register("advanced", poll=get_all_combined, interval=settings.advanced_analysis_cache_ttl)
+
+
 @router.websocket("/ws/advanced")
 async def websocket_advanced_analysis(websocket: WebSocket):
     """
     WebSocket for real-time Volume Pulse + Trend Base updates
-    Updates every 5 seconds
+    Updates every 5 seconds — one shared poll for all clients (stream hub "advanced" topic)
     """
-    await websocket.accept()
-    print("[ADVANCED-WS] Client connected")
-    
-    try:
-        while True:
-            # Get all data
-            data = await get_all_combined()
-            
-            # Send to client
-            await websocket.send_json(data)
-            
-            # Wait before next update
-            await asyncio.sleep(settings.advanced_analysis_cache_ttl)
-            
-    except WebSocketDisconnect:
-        print("[ADVANCED-WS] Client disconnected")
-    except Exception as e:
-        print(f"[ADVANCED-WS] Error: {e}")
-        await websocket.close()
+    await get_stream_hub().serve(websocket, topics=["advanced"], framed=False)
 
 
 # ═══════════════════════════════════════════════════════════
@@ -868,7 +848,7 @@ async def _get_historical_data(symbol: str, lookback: int = 50) -> pd.DataFrame:
         DataFrame with columns: date, open, high, low, close, volume
     """
     try:
-        from kiteconnect import KiteConnect
+        from services.kite_gateway import get_kite_gateway
         from datetime import timedelta
         
         # ✅ GLOBAL TOKEN VALIDATION - Force reload from .env
@@ -885,8 +865,8 @@ async def _get_historical_data(symbol: str, lookback: int = 50) -> pd.DataFrame:
             print(f"   → Access Token: {'Present' if settings.zerodha_access_token else 'MISSING'}")
             return pd.DataFrame()
         
-        # Initialize Kite with token from .env
-        kite = KiteConnect(api_key=settings.zerodha_api_key)
+        # Shared Kite gateway, with the token just re-read from .env
+        kite = get_kite_gateway()
         kite.set_access_token(settings.zerodha_access_token)
         
         print(f"[DATA-FETCH] ✅ Token configured from .env")
@@ -918,13 +898,7 @@ async def _get_historical_data(symbol: str, lookback: int = 50) -> pd.DataFrame:
         # 🚀 OPTIMIZED: Run blocking Zerodha API call with 6s timeout (was 10s)
         try:
             data = await asyncio.wait_for(
-                asyncio.to_thread(
-                    kite.historical_data,
-                    instrument_token=token,
-                    from_date=from_date,
-                    to_date=to_date,
-                    interval="3minute"  # 3-min candles
-                ),
+                kite.historical_data(token, from_date, to_date, "3minute"),  # 3-min candles
                 timeout=6.0  # ⚡ Reduced from 10s to 6s for faster timeout
             )
         except asyncio.TimeoutError:
@@ -1015,7 +989,7 @@ async def _get_historical_data_extended(symbol: str, lookback: int = 100, days_b
         
         print(f"[DATA-FETCH] {symbol}: Fetching fresh data from Zerodha...")
         
-        from kiteconnect import KiteConnect
+        from services.kite_gateway import get_kite_gateway
         from datetime import timedelta
         
         # 🔥 ALWAYS RELOAD settings from .env to get latest token
@@ -1038,7 +1012,7 @@ async def _get_historical_data_extended(symbol: str, lookback: int = 100, days_b
         
         print(f"[DATA-FETCH-EXT] 🔑 Zerodha credentials loaded from .env")
         
-        kite = KiteConnect(api_key=settings.zerodha_api_key)
+        kite = get_kite_gateway()
         kite.set_access_token(settings.zerodha_access_token)
         
         # Get instrument token for symbol
@@ -1076,13 +1050,7 @@ async def _get_historical_data_extended(symbol: str, lookback: int = 100, days_b
         # 🚀 OPTIMIZED: 5-min candles (faster than 3-min) + 15s timeout (increased for reliability)
         try:
             data = await asyncio.wait_for(
-                asyncio.to_thread(
-                    kite.historical_data,
-                    instrument_token=token,
-                    from_date=from_date,
-                    to_date=to_date,
-                    interval="5minute"  # ⚡ Changed from 3-min to 5-min for faster API response
-                ),
+                kite.historical_data(token, from_date, to_date, "5minute"),  # ⚡ Changed from 3-min to 5-min for faster API response
                 timeout=15.0  # ⚡ Increased from 6s to 15s - Zerodha API can be slow during market hours
             )
         except asyncio.TimeoutError:
@@ -1286,6 +1254,16 @@ async def get_zone_control(symbol: str) -> Dict[str, Any]:
     
     Performance: <10ms with caching
     """
+    from services.global_token_manager import check_global_token_status
+    result = await _compute_zone_control(symbol)
+    # Token status is per request, not per cached analysis (the cached dict is shared)
+    token_status = await check_global_token_status()
+    return {**result, "token_valid": token_status["valid"]}
+
+
+@cached_response("zone_control", ttl={"LIVE": 5, "default": 60}, stale=30)
+async def _compute_zone_control(symbol: str) -> Dict[str, Any]:
+    """Zone control analysis for ``symbol``, served through the response cache."""
     try:
         symbol = symbol.upper()
         print(f"\n{'='*60}")
@@ -1298,16 +1276,7 @@ async def get_zone_control(symbol: str) -> Dict[str, Any]:
         
         print(f"[GLOBAL-TOKEN] Status: {'✅ Valid' if token_status['valid'] else '❌ Expired'}")
         
-        # Check cache first
         cache = get_cache()
-        cache_key = f"zone_control:{symbol}"
-        cached = await cache.get(cache_key)
-        
-        if cached:
-            # Update cache with current token status
-            cached["token_valid"] = token_status["valid"]
-            print(f"[ZONE-CONTROL] ⚡ Cache hit for {symbol}")
-            return cached
         
         # Fetch fresh historical data (extended range to get last available data)
         print(f"[ZONE-CONTROL] 🚀 Fetching LIVE data from Zerodha...")
@@ -1429,9 +1398,6 @@ async def get_zone_control(symbol: str) -> Dict[str, Any]:
         
         result["candles_analyzed"] = len(df)
         
-        # Cache result for 5 seconds (fast refresh)
-        await cache.set(cache_key, result, expire=5)
-        
         # 🔥 PERMANENT FIX: Save as 24-hour backup for when token expires
         backup_cache_key = f"zone_control_backup:{symbol}"
         await cache.set(backup_cache_key, result, expire=86400)
@@ -2625,6 +2591,7 @@ async def get_high_volume_candle_scanner(symbol: str) -> Dict[str, Any]:
 # ═══════════════════════════════════════════════════════════
 
 @router.get("/smart-money-flow/{symbol}")
+@cached_response("smart_money_flow", ttl={"LIVE": 0, "default": 60}, stale=30)
 async def get_smart_money_flow(symbol: str) -> Dict[str, Any]:
     """
     🧠 Smart Money Flow – Institutional Order Structure Intelligence
@@ -2647,18 +2614,12 @@ async def get_smart_money_flow(symbol: str) -> Dict[str, Any]:
     - NEUTRAL: Balanced order flow (<52% on either side)
     
     Performance: <10ms cached, <200ms live update
-    Caching: 5s live + 60s outside trading hours + 24h backup
+    Caching: fresh every request while LIVE, 60s outside trading hours (cached_response) + 24h backup
     """
     try:
         symbol = symbol.upper()
         cache = get_cache()
         
-        # Check cache first (5-second cache for ultra-fast response)
-        cache_key = f"smart_money_flow:{symbol}"
-        cached = await cache.get(cache_key)
-        if cached:
-            return cached
-        
         # Token validation
         from services.global_token_manager import check_global_token_status
         token_status = await check_global_token_status()
@@ -2896,18 +2857,6 @@ async def get_smart_money_flow(symbol: str) -> Dict[str, Any]:
             "candles_analyzed": len(df),
         }
         
-        # Determine if trading hours
-        from datetime import datetime as dt
-        now = dt.now()
-        is_trading = 9 <= now.hour <= 15 and now.weekday() < 5
-        
-        # Smart cache strategy
-        if is_trading:
-            print(f"[SMART-MONEY] 🚀 Trading hours - Fresh analysis, no cache")
-        else:
-            await cache.set(cache_key, result, expire=60)
-            print(f"[SMART-MONEY] 💾 Non-trading hours - Cached for 60s")
-        
         # Save 24-hour backup
         backup_cache_key = f"smart_money_flow_backup:{symbol}"
         await cache.set(backup_cache_key, result, expire=86400)
@@ -3434,6 +3383,7 @@ async def get_trade_zones(symbol: str) -> Dict[str, Any]:
 
 
 @router.get("/trade-zones/all")
+@cached_response("trade_zones_all", ttl={"LIVE": 2, "default": 60}, stale=10)
 async def get_all_trade_zones() -> Dict[str, Any]:
     """
     💰 Trade Zones Matrix (All Indices)
@@ -6,9 +6,8 @@ Direct REST API access to Zerodha
 🔥 IMPROVED: Smart caching (no cache during 9:15-3:30 IST trading hours)
 """
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, WebSocket
 from typing import Dict
-import asyncio
 from datetime import datetime
 from pytz import timezone
 
@@ -17,7 +16,7 @@ from pytz import timezone
 # - oi_momentum_service (from services.oi_momentum_service) — pandas+numpy
 from services.instant_analysis import get_instant_analysis, get_all_instant_analysis
 from services.cache import get_redis, get_cache
-from services.websocket_manager import manager
+from services.ws_hub import get_stream_hub
 from config import get_settings
 
 settings = get_settings()
@@ -1079,55 +1078,27 @@ async def get_cache_status_symbol(symbol: str):
         }
 
 
+async def _analysis_update() -> Dict:
+    """All symbols' instant analysis — one computation shared by every /ws/analysis client."""
+    cache = await get_redis()
+    analyses = await get_all_instant_analysis(cache)
+
+    # Add symbol names
+    for symbol in analyses:
+        if symbol in SYMBOL_MAPPING:
+            analyses[symbol]['symbol_name'] = SYMBOL_MAPPING[symbol]['name']
+
+    return {
+        "type": "analysis_update",
+        "data": analyses,
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+get_stream_hub().register("analysis", poll=_analysis_update, interval=settings.analysis_update_interval)
+
+
 @router.websocket("/ws/analysis")
 async def websocket_analysis_endpoint(websocket: WebSocket):
-    """WebSocket for INSTANT analysis updates every 3 seconds"""
-    await manager.connect(websocket)
-    
-    try:
-        cache = await get_redis()
-        
-        # Send immediate first update
-        analyses = await get_all_instant_analysis(cache)
-        
-        # Add symbol names
-        for symbol in analyses:
-            if symbol in SYMBOL_MAPPING:
-                analyses[symbol]['symbol_name'] = SYMBOL_MAPPING[symbol]['name']
-        
-        await manager.send_personal_message(
-            {
-                "type": "analysis_update",
-                "data": analyses,
-                "timestamp": datetime.now().isoformat(),
-            },
-            websocket
-        )
-        
-        while True:
-            # Wait before next update
-            await asyncio.sleep(settings.analysis_update_interval)
-            
-            # Get instant analysis for all symbols
-            analyses = await get_all_instant_analysis(cache)
-            
-            # Add symbol names
-            for symbol in analyses:
-                if symbol in SYMBOL_MAPPING:
-                    analyses[symbol]['symbol_name'] = SYMBOL_MAPPING[symbol]['name']
-            
-            # Send to client
-            await manager.send_personal_message(
-                {
-                    "type": "analysis_update",
-                    "data": analyses,
-                    "timestamp": datetime.now().isoformat(),
-                },
-                websocket
-            )
-            
-    except WebSocketDisconnect:
-        manager.disconnect(websocket)
-    except Exception as e:
-        print(f"WebSocket error: {e}")
-        manager.disconnect(websocket)
+    """WebSocket for INSTANT analysis updates every 3 seconds (the stream hub's "analysis" topic)"""
+    await get_stream_hub().serve(websocket, topics=["analysis"], framed=False)
@@ -87,15 +87,11 @@ async def validate_token():
     
     # 🔥 FIX: Actually validate token by making a quick API call
     try:
-        from kiteconnect import KiteConnect
-        kite = KiteConnect(api_key=current_settings.zerodha_api_key)
-        kite.set_access_token(current_settings.zerodha_access_token)
-        
-        # Quick profile check to validate token — run in executor, not blocking event loop
-        loop = asyncio.get_event_loop()
+        from services.kite_gateway import get_kite_gateway
+        # Quick profile check to validate token — on the gateway executor, not blocking
+        # event loop, and without swapping the token every other service uses
         profile = await asyncio.wait_for(
-            loop.run_in_executor(None, kite.profile),
-            timeout=10.0
+            get_kite_gateway().profile(token=current_settings.zerodha_access_token), timeout=10.0
         )
         
         return {
@@ -153,19 +149,13 @@ async def zerodha_callback(request_token: str = Query(...), status: str = Query(
         return RedirectResponse(url=f"{settings.frontend_url}/?auth=error&message=Authentication cancelled")
     
     try:
-        from kiteconnect import KiteConnect
+        from services.kite_gateway import get_kite_gateway
         import html as _html
 
-        print("📡 Initializing KiteConnect...")
-        kite = KiteConnect(api_key=settings.zerodha_api_key)
-        
+        # generate_session also installs the new token on the shared client
         print("🔄 Generating session with request token...")
-        loop = asyncio.get_event_loop()
         data = await asyncio.wait_for(
-            loop.run_in_executor(
-                None,
-                lambda: kite.generate_session(request_token, api_secret=settings.zerodha_api_secret)
-            ),
+            get_kite_gateway().call("generate_session", request_token, api_secret=settings.zerodha_api_secret),
             timeout=15.0
         )
         
@@ -175,7 +165,7 @@ async def zerodha_callback(request_token: str = Query(...), status: str = Query(
 
         # Track successful login in analytics (best effort, never block auth flow).
         try:
-            await user_analytics.register_login(
+            user_analytics.register_login(
                 user_id=user_id,
                 user_name=user_name,
             )
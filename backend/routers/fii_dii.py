@@ -10,15 +10,15 @@ WebSocket:
 
 from __future__ import annotations
 
-import asyncio
-import json
+import time
 from datetime import datetime
 
-from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, Query, WebSocket
 
 from services.cache import get_cache
 from services.fii_dii_realtime_ai import fii_dii_realtime_ai_engine
 from services.fii_dii_service import fii_dii_service
+from services.ws_hub import get_stream_hub
 
 router = APIRouter()
 ws_router = APIRouter()
@@ -28,27 +28,6 @@ _OFFICIAL_REFRESH_SEC = 60
 _REALTIME_PUSH_SEC = 2
 
 
-class _FIIDIIWSManager:
-    def __init__(self) -> None:
-        self._connections: set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, websocket: WebSocket) -> None:
-        await websocket.accept()
-        async with self._lock:
-            self._connections.add(websocket)
-
-    async def disconnect(self, websocket: WebSocket) -> None:
-        async with self._lock:
-            self._connections.discard(websocket)
-
-    async def send_personal(self, websocket: WebSocket, payload: dict) -> None:
-        await websocket.send_json(payload)
-
-
-_ws_manager = _FIIDIIWSManager()
-
-
 async def _build_realtime_snapshot() -> dict:
     """Build realtime proxy from latest live market ticks in cache.
 
@@ -100,65 +79,44 @@ async def get_fii_dii(force: bool = Query(False, description="Bypass cache and r
     }
 
 
+async def _fii_dii_snapshot() -> dict:
+    return {
+        "type": "fii_dii_snapshot",
+        "data": {
+            "official": await fii_dii_service.get_snapshot(force=False),
+            "realtime": await _build_realtime_snapshot(),
+        },
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+
+
+_official_refresh_due = 0.0
+
+
+async def _fii_dii_updates() -> list:
+    """Realtime inference every poll, the official numbers every _OFFICIAL_REFRESH_SEC."""
+    global _official_refresh_due
+    now = time.monotonic()
+    messages = [{
+        "type": "fii_dii_realtime_update",
+        "data": await _build_realtime_snapshot(),
+        "timestamp": datetime.utcnow().isoformat(),
+    }]
+    if now >= _official_refresh_due:
+        if _official_refresh_due:           # the first poll follows a snapshot
+            messages.append({
+                "type": "fii_dii_official_update",
+                "data": await fii_dii_service.get_snapshot(force=False),
+                "timestamp": datetime.utcnow().isoformat(),
+            })
+        _official_refresh_due = now + _OFFICIAL_REFRESH_SEC
+    return messages
+
+
+# One shared poll for every /ws/fii-dii client and /ws/stream "fii_dii" subscriber
+get_stream_hub().register("fii_dii", snapshot=_fii_dii_snapshot, poll=_fii_dii_updates, interval=_REALTIME_PUSH_SEC)
+
+
 @ws_router.websocket("/fii-dii")
 async def fii_dii_websocket(websocket: WebSocket):
-    await _ws_manager.connect(websocket)
-    try:
-        official = await fii_dii_service.get_snapshot(force=False)
-        realtime = await _build_realtime_snapshot()
-        await _ws_manager.send_personal(
-            websocket,
-            {
-                "type": "fii_dii_snapshot",
-                "data": {
-                    "official": official,
-                    "realtime": realtime,
-                },
-                "timestamp": datetime.utcnow().isoformat(),
-            },
-        )
-
-        official_refresh_due = asyncio.get_event_loop().time() + _OFFICIAL_REFRESH_SEC
-        realtime_push_due = asyncio.get_event_loop().time() + _REALTIME_PUSH_SEC
-
-        while True:
-            now = asyncio.get_event_loop().time()
-            timeout = max(0.1, min(official_refresh_due, realtime_push_due) - now)
-
-            try:
-                raw = await asyncio.wait_for(websocket.receive_text(), timeout=timeout)
-                msg = json.loads(raw)
-                if msg.get("type") == "ping":
-                    await _ws_manager.send_personal(websocket, {"type": "pong"})
-            except asyncio.TimeoutError:
-                pass
-
-            now = asyncio.get_event_loop().time()
-            if now >= realtime_push_due:
-                realtime = await _build_realtime_snapshot()
-                await _ws_manager.send_personal(
-                    websocket,
-                    {
-                        "type": "fii_dii_realtime_update",
-                        "data": realtime,
-                        "timestamp": datetime.utcnow().isoformat(),
-                    },
-                )
-                realtime_push_due = now + _REALTIME_PUSH_SEC
-
-            if now >= official_refresh_due:
-                official = await fii_dii_service.get_snapshot(force=False)
-                await _ws_manager.send_personal(
-                    websocket,
-                    {
-                        "type": "fii_dii_official_update",
-                        "data": official,
-                        "timestamp": datetime.utcnow().isoformat(),
-                    },
-                )
-                official_refresh_due = now + _OFFICIAL_REFRESH_SEC
-
-    except WebSocketDisconnect:
-        pass
-    finally:
-        await _ws_manager.disconnect(websocket)
+    await get_stream_hub().serve(websocket, topics=["fii_dii"], framed=False)
@@ -26,6 +26,21 @@ def _verify_admin_key(x_admin_key: str = Header(None, alias="X-Admin-Key")):
     return True
 
 
+# ContractManager reused across /vwap-live calls on the shared Kite gateway
+# client (whose token is swapped in place). ContractManager caches the NFO/BFO
+# instrument dump for an hour, which a per-request instance re-downloaded every time.
+_vwap_kite: Dict[str, Any] = {}
+
+
+def _vwap_kite_client():
+    from services.contract_manager import ContractManager
+    from services.kite_gateway import get_kite_gateway
+
+    gateway = get_kite_gateway()
+    if _vwap_kite.get("gateway") is not gateway:
+        _vwap_kite.update(gateway=gateway, contracts=ContractManager(gateway.client()))
+    return gateway, _vwap_kite["contracts"]
+
 
 
 async def _get_market_data_with_fallback(cache: CacheService) -> Dict[str, Any]:
@@ -70,6 +85,11 @@ async def get_vwap_live(symbol: str):
     Get LIVE intraday VWAP for a futures symbol
     
     ✅ Uses ONLY live Zerodha API data - NO hardcoded/dummy data
+
+    Served from the tick-built session profile (services/session_profile.py)
+    once it covers the session — adds sigma, ±1/2/3σ bands, POC and value
+    area, "source": "ticks". Until then: 5m historical candles, which also
+    seed the profile.
     
     URL: GET /api/market/vwap-live/NIFTY
     
@@ -91,8 +111,8 @@ async def get_vwap_live(symbol: str):
     }
     """
     try:
-        from kiteconnect import KiteConnect
         from services.vwap_live_service import VWAPLiveCalculator
+        from services.session_profile import get_session_profiles
         import asyncio
         
         symbol = symbol.upper()
@@ -106,21 +126,23 @@ async def get_vwap_live(symbol: str):
                 "symbol": symbol
             }
         
+        # Tick-built session profile: no Zerodha round trip at all
+        profiles = get_session_profiles()
+        tick_result = profiles.vwap_result(symbol)
+        if tick_result is not None:
+            return tick_result
+
         # Initialize Zerodha connection with LIVE access token
-        kite = KiteConnect(api_key=settings.zerodha_api_key)
         if not settings.zerodha_access_token:
             return {
                 "success": False,
                 "error": "No Zerodha access token configured",
                 "symbol": symbol
             }
-        kite.set_access_token(settings.zerodha_access_token)
+        gateway, manager = _vwap_kite_client()
         
         # Get current month's futures token using ContractManager (auto-switches monthly!)
-        from services.contract_manager import ContractManager
-        
         try:
-            manager = ContractManager(kite)
             instrument_token = manager.get_current_contract_token(symbol, debug=False)
             
             if not instrument_token:
@@ -169,22 +191,14 @@ async def get_vwap_live(symbol: str):
             now = datetime.now(IST)
             market_open = now.replace(hour=9, minute=15, second=0, microsecond=0)
 
-            loop = asyncio.get_event_loop()
             latest_data = await asyncio.wait_for(
-                loop.run_in_executor(
-                    None,
-                    lambda: kite.historical_data(
-                        instrument_token=instrument_token,
-                        from_date=market_open,
-                        to_date=now,
-                        interval="5minute"
-                    )
-                ),
+                gateway.historical_data(instrument_token, market_open, now, "5minute"),
                 timeout=10.0
             )
             
             if latest_data and len(latest_data) > 0:
                 current_price = latest_data[-1]['close']  # Latest candle close
+                profiles.seed(symbol, latest_data, 300, token=instrument_token)
             else:
                 return {
                     "success": False,
@@ -206,7 +220,7 @@ async def get_vwap_live(symbol: str):
         print(f"   📊 Calculating VWAP from live market data...")
         
         loop = asyncio.get_event_loop()
-        calculator = VWAPLiveCalculator(kite)
+        calculator = VWAPLiveCalculator(gateway.client())
         
         # Run in executor to avoid blocking
         result = await loop.run_in_executor(
@@ -262,7 +276,7 @@ async def market_websocket(websocket: WebSocket):
     try:
         await manager.connect(websocket)
         print(f"✅ [WS-MARKET] Client connected. Total clients: {manager.connection_count}")
-        await user_analytics.connect_session(
+        user_analytics.connect_session(
             session_id=session_id,
             visitor_id=visitor_id,
             user_id=user_id,
@@ -529,6 +543,6 @@ async def market_websocket(websocket: WebSocket):
             heartbeat_task.cancel()
         except Exception:
             pass
-        await user_analytics.disconnect_session(session_id)
+        user_analytics.disconnect_session(session_id)
         await manager.disconnect(websocket)
         await cache.disconnect()
@@ -10,6 +10,7 @@ from services.live_market_indices_integration import (
     MarketStatus
 )
 from services.order_flow_analyzer import order_flow_analyzer
+from services.response_cache import cached_response
 
 router = APIRouter(prefix="/api/analysis", tags=["market-outlook"])
 
@@ -397,6 +398,7 @@ class MarketOutlookCalculator:
 
 
 @router.get("/market-outlook/{symbol}")
+@cached_response("market_outlook", ttl={"LIVE": 2, "default": 30}, stale=10)
 async def get_market_outlook(symbol: str):
     """
     Get comprehensive market outlook with all 12 integrated signals
@@ -463,6 +465,7 @@ async def get_all_symbols_market_outlook():
 
 
 @router.get("/market-outlook-all")
+@cached_response("market_outlook_all", ttl={"LIVE": 2, "default": 30}, stale=10)
 async def get_market_outlook_all_formatted():
     """
     Get market outlook for NIFTY, BANKNIFTY, SENSEX with properly formatted response
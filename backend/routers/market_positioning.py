@@ -12,7 +12,8 @@ All config from environment. Zero impact on other routers.
 
 from fastapi import APIRouter
 from datetime import datetime
-from services.cache import get_cache, _SHARED_CACHE
+from services.cache import get_cache
+from services.snapshot_bus import MARKET, snapshot_bus
 from services.market_feed import get_market_status
 from services.market_positioning_5m_predictor import (
     PositioningBuffer,
@@ -656,37 +657,21 @@ async def _analyse_symbol(symbol: str, data: dict) -> dict:
     }
 
 
-def _get_data_from_shared_cache(symbol: str) -> dict | None:
-    """
-    Read market data directly from _SHARED_CACHE, intentionally bypassing TTL.
-    The 5-second TTL on market data means during sparse ticks / closed market
-    get_market_data() returns None even though the key exists.  We want the
-    latest available data regardless of staleness.
-    """
-    raw = _SHARED_CACHE.get(f"market:{symbol}")
-    if raw:
-        try:
-            value, _expire = raw   # (json_str, expire_timestamp) – ignore expiry
-            data = json.loads(value)
-            if isinstance(data, dict) and data.get("price", 0) > 0:
-                return data
-        except Exception:
-            pass
-    return None
-
-
 async def _get_symbol_data(symbol: str) -> dict | None:
     """
-    Try live cache first (respects TTL); fall back to stale-but-present
-    entry from _SHARED_CACHE so the section never shows empty.
+    Latest published tick from the snapshot bus — present regardless of age,
+    so the section never shows empty during sparse ticks / closed market.
+    Before the first tick of this process, fall back to the cache (which
+    serves the persisted last-known state).
     """
+    data = snapshot_bus.value(MARKET, symbol)
+    if data and data.get("price", 0) > 0:
+        return data
     # get_cache() is SYNCHRONOUS — do not await it
-    cache = get_cache()
-    data = await cache.get_market_data(symbol)
+    data = await get_cache().get_market_data(symbol)
     if data and data.get("price", 0) > 0:
         return data
-    # Fallback: stale entry (market closed or sparse ticks)
-    return _get_data_from_shared_cache(symbol)
+    return None
 
 
 @router.get("")
@@ -1,9 +1,9 @@
 """
 🔭 Market Intelligence Observatory — REST API Router
 ====================================================
-GET  /api/observatory/snapshot        — today's live strategy signals
+GET  /api/observatory/snapshot?since=0 — today's live strategy signals + snapshots after a cursor
 GET  /api/observatory/report?days=7   — historical daily reports
-GET  /api/observatory/rankings?days=10 — strategy accuracy rankings
+GET  /api/observatory/rankings?days=10 — strategy accuracy rankings (up to 90 days)
 GET  /api/observatory/daily/{date}    — one specific day's report
 GET  /api/observatory/dates           — list of available report dates
 POST /api/observatory/capture         — manually trigger a snapshot
@@ -22,15 +22,19 @@ http_router = APIRouter(prefix="/api/observatory", tags=["Observatory"])
 
 
 @http_router.get("/snapshot")
-async def get_today_snapshot():
+async def get_today_snapshot(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=200),
+):
     """
     Current day's live strategy signal state.
-    Returns all snapshots taken today + the most recent strategy readings.
+    Returns the most recent strategy readings + up to `limit` snapshots taken
+    after `since`; poll with the returned `cursor` to receive only new ones.
     """
     svc = get_observatory_service()
     return {
         "success": True,
-        "data": svc.get_today_snapshot(),
+        "data": svc.get_today_snapshot(since, limit),
         "timestamp": datetime.utcnow().isoformat(),
     }
 
@@ -50,7 +54,7 @@ async def get_historical_report(days: int = Query(default=7, ge=1, le=30)):
 
 
 @http_router.get("/rankings")
-async def get_strategy_rankings(days: int = Query(default=10, ge=1, le=30)):
+async def get_strategy_rankings(days: int = Query(default=10, ge=1, le=90)):
     """Strategy accuracy rankings over the last N trading days."""
     svc = get_observatory_service()
     data = svc.get_strategy_rankings(days)
@@ -138,10 +142,11 @@ async def manual_capture():
     """
     from services.observatory_service import _now_ist
     svc = get_observatory_service()
+    before = sum(svc.get_today_snapshot(limit=0)["snapshot_count"].values())
     await svc._take_snapshot(_now_ist())
     return {
         "success": True,
         "message": "Snapshot captured successfully",
-        "snapshot": svc.get_today_snapshot(),
+        "snapshot": svc.get_today_snapshot(since=before),
         "timestamp": datetime.utcnow().isoformat(),
     }
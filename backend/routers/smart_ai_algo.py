@@ -12,16 +12,16 @@ Endpoints:
   WS   /ws/algo                  → live stream (2s cadence)
 """
 
-import asyncio
 import logging
 import time
 from typing import Any, Dict
 
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi import APIRouter, WebSocket, HTTPException
 from pydantic import BaseModel, Field
 
 from config import get_settings
 from services.smart_ai_algo_service import get_algo_service
+from services.ws_hub import get_stream_hub
 
 logger = logging.getLogger(__name__)
 
@@ -131,32 +131,20 @@ async def toggle_algo(req: ToggleRequest) -> Dict[str, Any]:
 
 # ── WebSocket ────────────────────────────────────────────────────────────────
 
+def _algo_message(kind: str = "update") -> Dict[str, Any]:
+    svc = get_algo_service()
+    return {
+        "type": kind,
+        "data": svc.get_all_results(),
+        "ai_enabled": svc.get_ai_enabled(),
+        "ts": int(time.time() * 1000),
+    }
+
+
+# One 2s poll shared by every /ws/algo client (and /ws/stream "algo" subscribers)
+get_stream_hub().register("algo", snapshot=lambda: _algo_message("snapshot"), poll=_algo_message, interval=2)
+
+
 @ws_router.websocket("/ws/algo")
 async def ws_algo(websocket: WebSocket) -> None:
-    await websocket.accept()
-    svc = get_algo_service()
-    try:
-        # Send initial snapshot + ai_enabled state immediately
-        await websocket.send_json({
-            "type": "snapshot",
-            "data": svc.get_all_results(),
-            "ai_enabled": svc.get_ai_enabled(),
-            "ts": int(time.time() * 1000),
-        })
-
-        while True:
-            await asyncio.sleep(2)
-            await websocket.send_json({
-                "type": "update",
-                "data": svc.get_all_results(),
-                "ai_enabled": svc.get_ai_enabled(),
-                "ts": int(time.time() * 1000),
-            })
-    except WebSocketDisconnect:
-        pass
-    except Exception as exc:
-        logger.debug("Algo WS closed: %s", exc)
-        try:
-            await websocket.close()
-        except Exception:
-            pass
+    await get_stream_hub().serve(websocket, topics=["algo"], framed=False)
@@ -25,6 +25,7 @@ from services.smart_money_signal_engine import smart_money_engine
 from services.institutional_flow_tracker import institutional_flow_tracker
 from services.real_time_alert_system import alert_system
 from services.order_flow_optimizer import order_flow_optimizer
+from services.ws_outbox import BroadcastManager
 
 router = APIRouter(prefix="/api/smart-money", tags=["Smart Money Order Logic"])
 
@@ -265,7 +266,7 @@ async def clear_cache(symbol: Optional[str] = None):
 # WEBSOCKET ENDPOINT
 # ─────────────────────────────────────────────────────────────────────────────
 
-connected_clients = []
+smart_money_manager = BroadcastManager("smart_money")
 
 
 @router.websocket("/ws/smart-money")
@@ -289,8 +290,7 @@ async def websocket_smart_money(websocket: WebSocket):
     }
     ```
     """
-    await websocket.accept()
-    connected_clients.append(websocket)
+    await smart_money_manager.connect(websocket)
     
     subscriptions = set()  # Symbols this client is subscribed to
     
@@ -303,7 +303,7 @@ async def websocket_smart_money(websocket: WebSocket):
             
             # Validate symbol
             if symbol and symbol not in ["NIFTY", "BANKNIFTY", "SENSEX"]:
-                await websocket.send_json({
+                await smart_money_manager.send_personal(websocket, {
                     "type": "error",
                     "message": "Invalid symbol"
                 })
@@ -318,7 +318,7 @@ async def websocket_smart_money(websocket: WebSocket):
                 alerts = alert_system.get_active_alerts(symbol)
                 structure = institutional_flow_tracker.get_market_structure(symbol)
                 
-                await websocket.send_json({
+                await smart_money_manager.send_personal(websocket, {
                     "type": "snapshot",
                     "symbol": symbol,
                     "timestamp": datetime.now().isoformat(),
@@ -337,7 +337,7 @@ async def websocket_smart_money(websocket: WebSocket):
                 
                 if data_type == 'signal':
                     signal = smart_money_engine.get_current_signal(symbol)
-                    await websocket.send_json({
+                    await smart_money_manager.send_personal(websocket, {
                         "type": "signal",
                         "symbol": symbol,
                         "data": signal
@@ -345,7 +345,7 @@ async def websocket_smart_money(websocket: WebSocket):
                 
                 elif data_type == 'volume_profile':
                     profile = smart_money_engine.get_volume_profile(symbol)
-                    await websocket.send_json({
+                    await smart_money_manager.send_personal(websocket, {
                         "type": "volume_profile",
                         "symbol": symbol,
                         "data": profile
@@ -353,7 +353,7 @@ async def websocket_smart_money(websocket: WebSocket):
                 
                 elif data_type == 'positioning':
                     positioning = institutional_flow_tracker.get_institutional_positioning(symbol)
-                    await websocket.send_json({
+                    await smart_money_manager.send_personal(websocket, {
                         "type": "positioning",
                         "symbol": symbol,
                         "data": positioning
@@ -361,22 +361,21 @@ async def websocket_smart_money(websocket: WebSocket):
                 
                 elif data_type == 'performance':
                     perf = order_flow_optimizer.get_performance_metrics(symbol)
-                    await websocket.send_json({
+                    await smart_money_manager.send_personal(websocket, {
                         "type": "performance",
                         "symbol": symbol,
                         "data": perf
                     })
     
     except WebSocketDisconnect:
-        connected_clients.remove(websocket)
+        await smart_money_manager.disconnect(websocket)
     except Exception as e:
         print(f"❌ WebSocket error: {e}")
+        await smart_money_manager.disconnect(websocket)
         try:
             await websocket.close()
         except:
             pass
-        if websocket in connected_clients:
-            connected_clients.remove(websocket)
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -385,28 +384,20 @@ async def websocket_smart_money(websocket: WebSocket):
 
 async def broadcast_alert(alert):
     """Broadcast an alert to all connected WebSocket clients."""
-    for client in connected_clients:
-        try:
-            await client.send_json({
-                "type": "alert",
-                "symbol": alert.symbol,
-                "data": alert.to_dict()
-            })
-        except:
-            pass
+    await smart_money_manager.broadcast({
+        "type": "alert",
+        "symbol": alert.symbol,
+        "data": alert.to_dict()
+    })
 
 
 async def broadcast_signal_update(symbol: str, signal: dict):
     """Broadcast a signal update to interested clients."""
-    for client in connected_clients:
-        try:
-            await client.send_json({
-                "type": "signal_update",
-                "symbol": symbol,
-                "data": signal
-            })
-        except:
-            pass
+    await smart_money_manager.broadcast({
+        "type": "signal_update",
+        "symbol": symbol,
+        "data": signal
+    })
 
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -0,0 +1,21 @@
+"""Multiplexed WebSocket — every live topic over one connection.
+
+WebSocket: /ws/stream[?topics=compass,market]  → see services/ws_hub.py for the protocol
+"""
+from fastapi import APIRouter, WebSocket
+
+from services.ws_hub import get_stream_hub
+
+router = APIRouter()
+
+
+@router.websocket("/stream")
+async def stream_websocket(websocket: WebSocket):
+    """
+    One socket for all panels. Subscribe with
+        { "action": "subscribe", "topics": ["compass", "liquidity"] }
+        { "action": "subscribe", "topic": "ict", "symbols": ["NIFTY"] }
+    and receive each topic's messages with a "topic" field added.
+    """
+    topics = [name.strip() for name in websocket.query_params.get("topics", "").split(",") if name.strip()]
+    await get_stream_hub().serve(websocket, topics=topics)
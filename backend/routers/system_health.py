@@ -1,5 +1,8 @@
 """\nSystem Health Status Endpoint\n\u2705 Exposes all 3 independent state machines\n\u2705 Auth State (VALID/EXPIRED/REQUIRED)\n\u2705 Feed State (CONNECTED/STALE/DISCONNECTED)\n\u2705 Market Session (PRE_OPEN/LIVE/CLOSED)\n"""
-from fastapi import APIRouter, Header, HTTPException
+import asyncio
+import importlib
+
+from fastapi import APIRouter, Header, HTTPException, Request
 from datetime import datetime
 import pytz
 
@@ -7,10 +10,61 @@ from config import get_settings
 from services.market_session_controller import market_session, MarketPhase
 from services.auth_state_machine import auth_state_manager
 from services.feed_watchdog import feed_watchdog
+from services.lazy_routers import lazy_router_report
 
 router = APIRouter()
 IST = pytz.timezone('Asia/Kolkata')
 
+# Component reports served at /health/<name>: (module, accessor, description).
+# Resolved on request so this router does not import every service at startup;
+# the accessor is a dotted path whose "()" parts are called, and the last part
+# is called for the report.
+_COMPONENTS = {
+    "http": ("services.http_client", "get_http_pool().metrics",
+             "Outbound HTTP pool: hosts, conditional-GET cache and per-provider latency/errors"),
+    "http/responses": ("services.conditional_responses", "conditional_metrics",
+                       "Inbound conditional GET / compression: 304s, bytes saved, encoded-body reuse"),
+    "kite": ("services.kite_gateway", "get_kite_gateway().metrics",
+             "Kite REST gateway: pool size, in-flight calls, token swaps and per-endpoint latency/errors"),
+    "kite/quotes": ("services.quote_scheduler", "get_quote_scheduler().metrics",
+                    "Quote scheduler: merged batches, dedupe ratio, rate-limit waits and queue time per priority"),
+    "instruments": ("services.instrument_universe", "get_instrument_universe().report",
+                    "Instrument universe: registered/ticking instruments, per-service slices, subscribed tokens"),
+    "session-profile": ("services.session_profile", "get_session_profiles().report",
+                        "Tick-built session VWAP / volume profiles of the index futures"),
+    "depth": ("services.depth_book", "get_depth_books().report",
+              "Depth rings of the index futures: stored history, latest microstructure features, rolling aggregates"),
+    "option-chain": ("services.option_chain", "get_option_chains().report",
+                     "Streaming option chains: ATM window, live PCR / max pain / OI change, quotes served from the mirror"),
+    "correlations": ("services.correlation_matrix", "get_correlation_service().report",
+                     "Cross-asset correlation matrix: bars sampled, ready assets, same-bar correlations, futures lead-lag"),
+    "cadence": ("services.cadence", "get_cadence_controller().report",
+                "Adaptive broadcast-loop cadences: loop lag, tick-rate and ATR activity, each loop's interval and why"),
+    "websockets": ("services.ws_outbox", "outbox_report",
+                   "Per-client WebSocket outboxes of every manager: queue depth by priority, lag, coalesced / dropped"),
+    "stream": ("services.ws_hub", "get_stream_hub().report",
+               "Multiplexed /ws/stream hub: sessions, per-topic subscribers, publishes, pollers"),
+    "analytics": ("services.user_analytics", "user_analytics.stats",
+                  "User analytics persistence: queued events, group commits, drops, active sessions"),
+    "snapshots": ("services.snapshot_bus", "get_snapshot_bus().report",
+                  "Snapshot bus: latest version and age of every published (topic, symbol)"),
+    "memory": ("services.memory_guard", "memory_guard.report",
+               "Approximate bytes per subsystem and shared-cache key prefix, RSS and sweeper stats"),
+    "response-cache": ("services.response_cache", "response_cache.stats",
+                       "Coalescing / stale-while-revalidate counters per cached REST route"),
+}
+
+
+def _component_report(name: str):
+    module, accessor, _ = _COMPONENTS[name]
+    target = importlib.import_module(module)
+    for part in accessor.split("."):
+        call = part.endswith("()")
+        target = getattr(target, part[:-2] if call else part)
+        if call:
+            target = target()
+    return target()
+
 
 def _verify_admin_key(x_admin_key: str = Header(None, alias="X-Admin-Key")):
     """Verify admin API key for protected health endpoints."""
@@ -139,6 +193,18 @@ async def get_market_status():
     }
 
 
+@router.get("/health/session")
+async def get_session_timeline():
+    """Today's precomputed session timeline and the next transition"""
+    from services.session_clock import session_clock
+    return {
+        "status": session_clock.status(),
+        "seconds_to_next": round(session_clock.seconds_until_next_transition(), 1),
+        "timeline": session_clock.timeline(),
+        "timestamp": session_clock.now().isoformat(),
+    }
+
+
 @router.get("/health/auth")
 async def get_auth_status(x_admin_key: str = Header(None, alias="X-Admin-Key")):
     """Get auth status — admin protected to prevent timing attacks"""
@@ -157,6 +223,31 @@ async def get_feed_status():
     return feed_watchdog.get_health_metrics()
 
 
+@router.get("/health/routers")
+async def get_router_load_status(request: Request):
+    """Lazy feature routers: loaded yet, import time and the path that triggered it"""
+    return {"lazy_routers": lazy_router_report(request.app)}
+
+
+@router.get("/health/imports")
+async def get_import_profile(request: Request, top: int = 25,
+                             x_admin_key: str = Header(None, alias="X-Admin-Key")):
+    """Per-module import cost of `import main` (fresh -X importtime process) — admin protected"""
+    _verify_admin_key(x_admin_key)
+    from services.import_profiler import profile_imports
+    report = await asyncio.to_thread(profile_imports, "main", top)
+    report["lazy_routers"] = lazy_router_report(request.app)
+    return report
+
+
+@router.post("/health/memory/sweep")
+async def run_memory_sweep(x_admin_key: str = Header(None, alias="X-Admin-Key")):
+    """Run a TTL sweep + cap enforcement now — admin protected"""
+    _verify_admin_key(x_admin_key)
+    from services.memory_guard import memory_guard
+    return memory_guard.sweep_once()
+
+
 @router.post("/health/auth/verify")
 async def verify_token(x_admin_key: str = Header(None, alias="X-Admin-Key")):
     """Verify token with actual Zerodha API call — admin protected"""
@@ -194,3 +285,18 @@ async def get_health_summary():
         "requires_action": auth_state_manager.requires_login,
         "timestamp": now.isoformat(),
     }
+
+
+@router.get("/health/components")
+async def get_component_index():
+    """Component reports available at /health/<name>"""
+    return {name: description for name, (_, _, description) in _COMPONENTS.items()}
+
+
+# Registered last so the explicit /health/* routes above take precedence
+@router.get("/health/{component:path}")
+async def get_component_status(component: str):
+    """One component's report (see /health/components), its service imported on first request"""
+    if component not in _COMPONENTS:
+        raise HTTPException(status_code=404, detail=f"Unknown health component: {component}")
+    return _component_report(component)
@@ -19,7 +19,7 @@ class VisitPayload(BaseModel):
 @router.post("/visit")
 async def register_visit(payload: VisitPayload):
     """Register a user visit (best-effort analytics)."""
-    await user_analytics.register_visit(
+    user_analytics.register_visit(
         visitor_id=payload.visitor_id,
         user_id=payload.user_id,
         user_name=payload.user_name,
@@ -30,4 +30,4 @@ async def register_visit(payload: VisitPayload):
 @router.get("/summary")
 async def analytics_summary(limit: int = 10):
     """Get aggregate and per-user analytics."""
-    return await user_analytics.get_summary(limit=limit)
+    return user_analytics.get_summary(limit=limit)
@@ -32,15 +32,13 @@ async def _get_prev_close() -> float | None:
 
     try:
         from config import get_settings
-        from kiteconnect import KiteConnect
+        from services.kite_gateway import get_kite_gateway
         settings = get_settings()
         if not settings.zerodha_api_key or not settings.zerodha_access_token:
             return _prev_close_cache.get("value")
-        kite = KiteConnect(api_key=settings.zerodha_api_key)
-        kite.set_access_token(settings.zerodha_access_token)
         to_date = datetime.now(IST)
         from_date = to_date - timedelta(days=10)
-        hist = kite.historical_data(_VIX_INSTRUMENT_TOKEN, from_date, to_date, "day")
+        hist = await get_kite_gateway().historical_data(_VIX_INSTRUMENT_TOKEN, from_date, to_date, "day")
         if hist and len(hist) >= 2:
             # Last completed day's close (second-to-last candle)
             prev = hist[-2]
@@ -66,13 +64,13 @@ async def _fetch_vix_from_zerodha() -> Dict[str, Any] | None:
     """Direct REST call to Zerodha — gets LTP + historical prev close for accurate change."""
     try:
         from config import get_settings
-        from kiteconnect import KiteConnect
+        from services.kite_gateway import get_kite_gateway
+        from services.quote_scheduler import Priority, get_quote_scheduler
         settings = get_settings()
         if not settings.zerodha_api_key or not settings.zerodha_access_token:
             return None
-        kite = KiteConnect(api_key=settings.zerodha_api_key)
-        kite.set_access_token(settings.zerodha_access_token)
-        quotes = kite.quote(["NSE:INDIA VIX"])
+        kite = get_kite_gateway()
+        quotes = await get_quote_scheduler().quote(["NSE:INDIA VIX"], Priority.UI)
         q = quotes.get("NSE:INDIA VIX")
         if not q:
             return None
@@ -113,7 +111,7 @@ async def _get_today_ohlc(kite, ltp: float) -> Dict[str, float]:
     """Get today's VIX OHLC from historical API (quote OHLC is wrong for VIX)."""
     try:
         today = datetime.now(IST).date()
-        hist = kite.historical_data(
+        hist = await kite.historical_data(
             _VIX_INSTRUMENT_TOKEN,
             datetime.combine(today, datetime.min.time()),
             datetime.now(IST),
@@ -0,0 +1,108 @@
+"""
+Analytics Store — append-only log of user-analytics events, plus the
+per-identity records and running totals they produce.
+
+Layout: data/analytics/analytics.db (SQLite, WAL journal)
+
+    events   one row per login / visit / session connect / disconnect   (seq)
+    records  latest user and login record per identity                  (kind, id)
+    totals   running event counters                                     (name)
+
+Writes arrive in batches from UserAnalyticsService's background flusher: a
+batch's events are appended and the records it touched upserted in one
+transaction (one fsync per batch), so a restart reloads records and totals
+without replaying the log. The log stays for audit and offline analysis.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+DB_NAME = "analytics.db"
+
+USER = "user"
+LOGIN = "login"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq     INTEGER PRIMARY KEY AUTOINCREMENT,
+    at      TEXT NOT NULL,
+    kind    TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS records (
+    kind   TEXT NOT NULL,
+    id     TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE TABLE IF NOT EXISTS totals (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+Event = Tuple[str, str, Dict[str, Any]]          # (at, kind, payload)
+
+
+class AnalyticsStore:
+    """SQLite-backed analytics event log with materialised records."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def write_batch(self, events: Iterable[Event],
+                    records: Iterable[Tuple[str, str, Dict[str, Any]]] = (),
+                    totals: Optional[Dict[str, int]] = None) -> int:
+        """Append ``events`` and upsert ``records`` / ``totals`` in one transaction."""
+        event_rows = [(at, kind, json.dumps(payload)) for at, kind, payload in events]
+        record_rows = [(kind, rid, json.dumps(record)) for kind, rid, record in records]
+        with self._lock:
+            db = self._db
+            db.execute("BEGIN")
+            try:
+                db.executemany("INSERT INTO events (at, kind, payload) VALUES (?, ?, ?)", event_rows)
+                db.executemany("INSERT OR REPLACE INTO records (kind, id, record) VALUES (?, ?, ?)", record_rows)
+                db.executemany("INSERT OR REPLACE INTO totals (name, value) VALUES (?, ?)",
+                               list((totals or {}).items()))
+                db.execute("COMMIT")
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+        return len(event_rows)
+
+    def load(self) -> Tuple[Dict[str, Dict[str, Dict[str, Any]]], Dict[str, int]]:
+        """``({kind: {id: record}}, totals)`` as of the last committed batch."""
+        with self._lock:
+            rows = self._db.execute("SELECT kind, id, record FROM records").fetchall()
+            totals = dict(self._db.execute("SELECT name, value FROM totals").fetchall())
+        records: Dict[str, Dict[str, Dict[str, Any]]] = {USER: {}, LOGIN: {}}
+        for kind, rid, record in rows:
+            records.setdefault(kind, {})[rid] = json.loads(record)
+        return records, totals
+
+    def event_count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+
+    def events(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """The most recent ``limit`` events, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT seq, at, kind, payload FROM events ORDER BY seq DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"seq": seq, "at": at, "kind": kind, **json.loads(payload)} for seq, at, kind, payload in rows]
@@ -196,13 +196,10 @@ class AuthStateManager:
             return False, "No token available"
         
         try:
-            from kiteconnect import KiteConnect
+            from services.kite_gateway import get_kite_gateway
             
-            kite = KiteConnect(api_key=self._settings.zerodha_api_key)
-            kite.set_access_token(self._token)
-            
-            # Make a lightweight API call to verify token
-            profile = kite.profile()
+            # Make a lightweight API call to verify token (without swapping the shared one)
+            profile = await get_kite_gateway().profile(token=self._token)
             
             # If we got here, token is valid
             self.mark_api_success()
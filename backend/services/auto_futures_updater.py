@@ -9,7 +9,7 @@ import re
 import asyncio
 from pathlib import Path
 
-from kiteconnect import KiteConnect
+from services.kite_gateway import get_kite_gateway
 from config import get_settings
 
 
@@ -113,8 +113,7 @@ class AutoFuturesUpdater:
                 print("❌ Zerodha credentials not configured")
                 return None
             
-            kite = KiteConnect(api_key=self.settings.zerodha_api_key)
-            kite.set_access_token(self.settings.zerodha_access_token)
+            kite = get_kite_gateway().sync_client(self.settings.zerodha_access_token)
             
             print("🔍 Searching for next month futures contracts...")
             
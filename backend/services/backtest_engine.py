@@ -0,0 +1,693 @@
+"""
+Backtest Engine — vectorized multi-day strategy evaluation.
+
+Candles for a symbol are loaded once as column arrays (one NumPy array per
+field, oldest first, each candle tagged with its trading session) and the
+intraday filters are evaluated as boolean masks over the whole history:
+
+    ema_cross    EMA20/50 cross with the EMA200 bias     (services.trading_signals)
+    vwma_entry   VWMA-20 fresh cross / dip-bounce + volume (VWMAEntryFilter)
+    rsi_60_40    RSI entering the >60 / <40 zones          (RSI6040MomentumFilter)
+    supertrend   close breaking the (10, 2) ATR bands       (SuperTrendFilter)
+    camarilla    H3/H4 and L3/L4 on prior-session levels    (CaramillaPivotFilter)
+
+Only the first candle of each signal run is an entry. Entries fill at that
+candle's close; stop loss and target come from
+`trading_signals.calculate_risk_reward` (fixed points, or ATR-scaled points
+with sl_mode="atr"). The first later candle whose range touches either one
+closes the trade — stop first when both are touched in the same candle — and
+anything still open squares off at the session's last close. On daily candles
+(one per session) positions carry across sessions instead, until touched,
+max_hold_bars or the last candle. One position per strategy at a time.
+
+Parameter sweeps fan out over a process pool; each worker receives the
+candle columns once through the pool initializer.
+
+    python -m services.backtest_engine NIFTY --strategy supertrend \\
+        --sweep st_multiplier=1.5,2,3 --sweep rr_ratio=1.5,2
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from services.trading_signals import calculate_risk_reward
+
+logger = logging.getLogger(__name__)
+
+Masks = Tuple[np.ndarray, np.ndarray]
+
+
+# ============================================
+# CANDLE COLUMNS
+# ============================================
+
+@dataclass
+class CandleColumns:
+    """One symbol's candles as parallel arrays, oldest first."""
+    symbol: str
+    timestamp: np.ndarray   # datetime64[us], exchange-local wall clock
+    session: np.ndarray     # int64 trading-date ordinal
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def sessions(self) -> int:
+        return int(len(np.unique(self.session)))
+
+    @property
+    def intraday(self) -> bool:
+        """True when some session has more than one candle (not daily bars)."""
+        return len(self) > self.sessions
+
+    def session_end(self) -> np.ndarray:
+        """Index of the last candle in each candle's session."""
+        return np.searchsorted(self.session, self.session, side="right") - 1
+
+    def between(self, start: Optional[date] = None, end: Optional[date] = None) -> "CandleColumns":
+        """Candles whose session falls in [start, end] (either bound optional)."""
+        keep = np.ones(len(self), dtype=bool)
+        if start is not None:
+            keep &= self.session >= start.toordinal()
+        if end is not None:
+            keep &= self.session <= end.toordinal()
+        if keep.all():
+            return self
+        return CandleColumns(self.symbol, *(getattr(self, f.name)[keep] for f in fields(self)[1:]))
+
+    @classmethod
+    def from_candles(cls, symbol: str, candles: Iterable[Dict[str, Any]]) -> "CandleColumns":
+        """Build from candle dicts (backup/cache format or DataFrame records); dedups by timestamp."""
+        by_time: Dict[datetime, Dict[str, Any]] = {}
+        for candle in candles:
+            stamp = candle.get("timestamp") or candle.get("date") or candle.get("time")
+            if stamp is None:
+                continue
+            try:
+                when = stamp if isinstance(stamp, datetime) else datetime.fromisoformat(str(stamp))
+            except ValueError:
+                continue
+            by_time[when.replace(tzinfo=None)] = candle
+
+        order = sorted(by_time)
+        rows = [by_time[t] for t in order]
+
+        def column(key: str, fallback: str = "close") -> np.ndarray:
+            return np.array([float(r.get(key) or r.get(fallback) or 0.0) for r in rows], dtype=np.float64)
+
+        return cls(
+            symbol=symbol,
+            timestamp=np.array(order, dtype="datetime64[us]"),
+            session=np.array([t.toordinal() for t in order], dtype=np.int64),
+            open=column("open"),
+            high=column("high"),
+            low=column("low"),
+            close=column("close"),
+            volume=np.array([float(r.get("volume") or 0) for r in rows], dtype=np.float64),
+        )
+
+
+def load_candles(
+    symbol: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    timeframe: str = "5m",
+) -> CandleColumns:
+    """Archived candles for ``symbol`` as columns, sessions in [start, end] (services.candle_archive)."""
+    from services.candle_archive import get_candle_archive
+
+    return get_candle_archive().columns(
+        symbol.upper(),
+        timeframe,
+        datetime.combine(start, time.min) if start is not None else None,
+        datetime.combine(end, time.max) if end is not None else None,
+    )
+
+
+# ============================================
+# INDICATORS (whole-history arrays)
+# ============================================
+
+def ema(values: np.ndarray, span: int) -> np.ndarray:
+    """EMA with the same smoothing as trading_signals.add_ema (adjust=False)."""
+    return pd.Series(values).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    return pd.Series(values).rolling(window=period).mean().to_numpy()
+
+
+def vwma(close: np.ndarray, volume: np.ndarray, period: int) -> np.ndarray:
+    """VWMA as in trading_signals.add_vwma (SMA when the feed carries no volume)."""
+    if not volume.any():
+        return sma(close, period)
+    num = pd.Series(close * volume).rolling(window=period).sum().to_numpy()
+    den = pd.Series(volume).rolling(window=period).sum().to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """RSI from rolling-mean gains/losses (analysis_service.calculate_rsi)."""
+    delta = np.diff(close, prepend=np.nan)
+    gain = sma(np.where(delta > 0, delta, 0.0), period)
+    loss = sma(np.where(delta < 0, -delta, 0.0), period)
+    gain[: period] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = 100.0 - 100.0 / (1.0 + gain / loss)
+    return np.where((loss == 0) & (gain > 0), 100.0, np.where((loss == 0) & (gain == 0), 50.0, out))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 10) -> np.ndarray:
+    """Mean true range over ``period`` candles (SuperTrendFilter.calculate_atr)."""
+    prev_close = np.concatenate((close[:1], close[:-1]))
+    true_range = np.maximum.reduce([high - low, np.abs(high - prev_close), np.abs(low - prev_close)])
+    return sma(true_range, period)
+
+
+def _prev(values: np.ndarray, fill: Any = np.nan) -> np.ndarray:
+    out = np.empty_like(values)
+    if len(values):
+        out[0] = fill
+        out[1:] = values[:-1]
+    return out
+
+
+def _crossed_above(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    return (_prev(fast) <= _prev(slow)) & (fast > slow)
+
+
+def _crossed_below(fast: np.ndarray, slow: np.ndarray) -> np.ndarray:
+    return (_prev(fast) >= _prev(slow)) & (fast < slow)
+
+
+def _rising_edge(mask: np.ndarray) -> np.ndarray:
+    return mask & ~_prev(mask, False)
+
+
+# ============================================
+# PARAMETERS
+# ============================================
+
+@dataclass(frozen=True)
+class BacktestParams:
+    """Every tunable of the engine; sweep grids are keyed by these field names."""
+    # Risk — SL/target via calculate_risk_reward. ATR defaults mirror
+    # IntraDayEntrySystem (SL 1.5 × ATR, target 3 × ATR).
+    sl_mode: str = "atr"            # "atr" | "points"
+    sl_points: float = 10.0
+    sl_atr_mult: float = 1.5
+    rr_ratio: float = 2.0
+    atr_period: int = 10
+    max_hold_bars: int = 0          # 0 = hold until the session's last candle
+    # ema_cross
+    ema_fast: int = 20
+    ema_slow: int = 50
+    ema_anchor: int = 200
+    bias_band: float = 0.005
+    # vwma_entry
+    vwma_period: int = 20
+    volume_period: int = 50
+    min_confidence: float = 60.0
+    # rsi_60_40
+    rsi_period: int = 14
+    rsi_upper: float = 60.0
+    rsi_lower: float = 40.0
+    # supertrend
+    st_period: int = 10
+    st_multiplier: float = 2.0
+    # camarilla
+    cam_tolerance: float = 0.01
+
+
+# ============================================
+# STRATEGY MASKS
+# ============================================
+
+VWMA_BUY, VWMA_BUY_CONTINUATION, VWMA_SELL, VWMA_HOLD = 1, 2, -1, -2
+
+
+def vwma_entry_signals(
+    price: np.ndarray,
+    vwma_20: np.ndarray,
+    prev_price: np.ndarray,
+    prev_vwma_20: np.ndarray,
+    volume: np.ndarray,
+    avg_volume: np.ndarray,
+    ema_20: Optional[np.ndarray] = None,
+    ema_50: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    VWMAEntryFilter.analyze_vwma_entry over arrays.
+
+    Returns (signal code, confidence) per candle; codes are VWMA_BUY,
+    VWMA_BUY_CONTINUATION, VWMA_SELL, VWMA_HOLD or 0 (no signal).
+    """
+    above = price > vwma_20
+    prev_above = prev_price > prev_vwma_20
+    bullish_cross = ~prev_above & above
+    bearish_cross = prev_above & ~above
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        volume_ratio = np.where(avg_volume > 0, volume / avg_volume, 1.0)
+        distance_pct = np.where(vwma_20 > 0, np.abs(price - vwma_20) / vwma_20 * 100, 0.0)
+    volume_strong = volume_ratio > 1.2
+    volume_extreme = volume_ratio > 1.5
+
+    fresh_buy = above & bullish_cross & volume_strong
+    dip_buy = above & ~fresh_buy & (distance_pct < 0.3) & volume_strong
+    holding_above = above & ~fresh_buy & ~dip_buy & (distance_pct < 1.5)
+    fresh_sell = ~above & bearish_cross & volume_strong
+    holding_below = ~above & ~fresh_sell & (distance_pct < 1.5)
+
+    signal = np.select(
+        [fresh_buy | dip_buy, holding_above, fresh_sell, holding_below],
+        [VWMA_BUY, VWMA_BUY_CONTINUATION, VWMA_SELL, VWMA_HOLD], 0,
+    )
+    confidence = np.select(
+        [fresh_buy | fresh_sell, dip_buy, holding_above, holding_below],
+        [np.where(volume_extreme, 85.0, 75.0), 70.0, 60.0, 40.0], 0.0,
+    )
+
+    if ema_20 is not None and ema_50 is not None:
+        have_emas = (ema_20 != 0) & (ema_50 != 0)
+        uptrend = ema_20 > ema_50
+        buyish = (signal == VWMA_BUY) | (signal == VWMA_BUY_CONTINUATION)
+        sell = signal == VWMA_SELL
+        confidence = confidence + np.select(
+            [have_emas & buyish & uptrend, have_emas & sell & ~uptrend,
+             have_emas & buyish & ~uptrend, have_emas & sell & uptrend],
+            [10.0, 10.0, -15.0, -15.0], 0.0,
+        )
+    return signal, np.clip(confidence, 0.0, 95.0)
+
+
+def _ema_cross(cols: CandleColumns, p: BacktestParams) -> Masks:
+    close = cols.close
+    fast, slow, anchor = ema(close, p.ema_fast), ema(close, p.ema_slow), ema(close, p.ema_anchor)
+    band = anchor * p.bias_band
+    long_ = (close > anchor + band) & _crossed_above(fast, slow) & (close >= slow)
+    short = (close < anchor - band) & _crossed_below(fast, slow) & (close <= slow)
+    return long_, short
+
+
+def _vwma_entry(cols: CandleColumns, p: BacktestParams) -> Masks:
+    close = cols.close
+    vw = vwma(close, cols.volume, p.vwma_period)
+    signal, confidence = vwma_entry_signals(
+        close, vw, _prev(close), _prev(vw), cols.volume, sma(cols.volume, p.volume_period),
+        ema(close, p.ema_fast), ema(close, p.ema_slow),
+    )
+    strong = confidence >= p.min_confidence
+    return (signal == VWMA_BUY) & strong, (signal == VWMA_SELL) & strong
+
+
+def _rsi_60_40(cols: CandleColumns, p: BacktestParams) -> Masks:
+    value = rsi(cols.close, p.rsi_period)
+    prev = _prev(value)
+    return (prev <= p.rsi_upper) & (value > p.rsi_upper), (prev >= p.rsi_lower) & (value < p.rsi_lower)
+
+
+def _supertrend(cols: CandleColumns, p: BacktestParams) -> Masks:
+    band = p.st_multiplier * atr(cols.high, cols.low, cols.close, p.st_period)
+    hl_avg = (cols.high + cols.low) / 2
+    breaks = np.select([cols.close > hl_avg + band, cols.close < hl_avg - band], [1, -1], 0)
+    # Trend = direction of the latest band break; starts BULLISH like analyze_supertrend.
+    states = np.concatenate(([1], breaks))
+    last = np.maximum.accumulate(np.where(states != 0, np.arange(len(states)), 0))
+    trend = states[last]
+    prev, now = trend[:-1], trend[1:]
+    return (prev == -1) & (now == 1), (prev == 1) & (now == -1)
+
+
+_CAMARILLA = (1.1, 0.55, 0.275, 0.1375, None, -0.1375, -0.275, -0.55, -1.1)   # h4 … pivot … l4
+
+
+def camarilla_levels(cols: CandleColumns) -> np.ndarray:
+    """(n, 9) array of h4, h3, h2, h1, pivot, l1, l2, l3, l4 from the previous session."""
+    n = len(cols)
+    if not n:
+        return np.empty((0, 9))
+    first = np.concatenate(([True], cols.session[1:] != cols.session[:-1]))
+    starts = np.flatnonzero(first)
+    day_high = np.maximum.reduceat(cols.high, starts)
+    day_low = np.minimum.reduceat(cols.low, starts)
+    day_close = cols.close[np.concatenate((starts[1:] - 1, [n - 1]))]
+
+    # Shift by one session: candle i sees the day before its own; the first session has none.
+    prior = np.cumsum(first) - 2
+    has_prior = prior >= 0
+    prior = np.maximum(prior, 0)
+    high = np.where(has_prior, day_high[prior], np.nan)
+    low = np.where(has_prior, day_low[prior], np.nan)
+    close = np.where(has_prior, day_close[prior], np.nan)
+
+    hl_range = high - low
+    return np.column_stack([
+        (high + low + close) / 3 if k is None else close + k * hl_range for k in _CAMARILLA
+    ])
+
+
+def _camarilla(cols: CandleColumns, p: BacktestParams) -> Masks:
+    close = cols.close
+    levels = camarilla_levels(cols)
+    if not len(close):
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
+    distance = np.abs(levels - close[:, None])
+    nearest = np.argmin(np.where(np.isnan(distance), np.inf, distance), axis=1)
+    at_level = np.take_along_axis(distance, nearest[:, None], axis=1)[:, 0] <= close * p.cam_tolerance
+    prev = _prev(close)
+    up, down = close > prev, close < prev
+    h4, l4 = levels[:, 0], levels[:, 8]
+    long_ = at_level & ((nearest == 7) | ((nearest == 8) & down & (prev >= l4)))
+    short = at_level & ((nearest == 1) | ((nearest == 0) & up & (prev <= h4)))
+    return long_, short
+
+
+STRATEGIES: Dict[str, Callable[[CandleColumns, BacktestParams], Masks]] = {
+    "ema_cross": _ema_cross,
+    "vwma_entry": _vwma_entry,
+    "rsi_60_40": _rsi_60_40,
+    "supertrend": _supertrend,
+    "camarilla": _camarilla,
+}
+
+
+def strategy_masks(name: str, cols: CandleColumns, params: BacktestParams) -> Masks:
+    """(long entries, short entries) for ``name`` — first candle of each signal run only."""
+    try:
+        fn = STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy: {name} (expected one of {', '.join(STRATEGIES)})")
+    long_, short = fn(cols, params)
+    long_ = _rising_edge(np.asarray(long_, dtype=bool))
+    return long_, _rising_edge(np.asarray(short, dtype=bool)) & ~long_
+
+
+# ============================================
+# TRADE SIMULATION
+# ============================================
+
+EXIT_TARGET, EXIT_STOP, EXIT_SQUAREOFF, EXIT_MAX_HOLD = 0, 1, 2, 3
+EXIT_NAMES = ("target", "stop", "squareoff", "max_hold")
+
+_TRADE_FIELDS = ("entry_index", "exit_index", "direction", "entry_price", "exit_price",
+                 "stop_loss", "target", "exit_reason", "pnl")
+
+
+def simulate(
+    cols: CandleColumns,
+    long_entry: np.ndarray,
+    short_entry: np.ndarray,
+    params: BacktestParams,
+    atr_values: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Fill entries at close, exit on the first stop/target touch or at session end.
+
+    Exits are found for every candidate entry at once by scanning a
+    (entries × remaining-session) window of highs/lows; only the pass that
+    drops entries taken while a position is open walks the entries in order.
+    """
+    n = len(cols)
+    empty = {f: np.array([], dtype=np.int64 if f in ("entry_index", "exit_index", "direction", "exit_reason")
+                         else np.float64) for f in _TRADE_FIELDS}
+    # Daily candles are each their own session: hold until the last candle instead
+    session_end = cols.session_end() if cols.intraday else np.full(n, n - 1)
+    entries = np.flatnonzero(np.asarray(long_entry) | np.asarray(short_entry))
+    entries = entries[entries < session_end[entries]]
+    if not len(entries):
+        return empty
+
+    direction = np.where(np.asarray(long_entry)[entries], 1, -1)
+    if params.sl_mode == "atr":
+        if atr_values is None:
+            atr_values = atr(cols.high, cols.low, cols.close, params.atr_period)
+        sl_points = atr_values[entries] * params.sl_atr_mult
+    elif params.sl_mode == "points":
+        sl_points = np.full(len(entries), float(params.sl_points))
+    else:
+        raise ValueError(f"Invalid sl_mode: {params.sl_mode}")
+    usable = np.isfinite(sl_points) & (sl_points > 0)
+    entries, direction, sl_points = entries[usable], direction[usable], sl_points[usable]
+    if not len(entries):
+        return empty
+
+    entry_price = cols.close[entries]
+    levels = [
+        calculate_risk_reward(float(price), "BUY" if d > 0 else "SELL", float(points), params.rr_ratio)
+        for price, d, points in zip(entry_price, direction, sl_points)
+    ]
+    stop = np.array([lv[0] for lv in levels])
+    target = np.array([lv[1] for lv in levels])
+
+    limit = session_end[entries]
+    if params.max_hold_bars > 0:
+        limit = np.minimum(limit, entries + params.max_hold_bars)
+    width = int((limit - entries).max())
+    window = entries[:, None] + np.arange(1, width + 1)
+    in_window = window <= limit[:, None]
+    window = np.minimum(window, n - 1)
+    highs, lows = cols.high[window], cols.low[window]
+    is_long = (direction > 0)[:, None]
+    stop_hit = in_window & np.where(is_long, lows <= stop[:, None], highs >= stop[:, None])
+    target_hit = in_window & np.where(is_long, highs >= target[:, None], lows <= target[:, None])
+
+    first_stop = np.where(stop_hit.any(axis=1), stop_hit.argmax(axis=1), width)
+    first_target = np.where(target_hit.any(axis=1), target_hit.argmax(axis=1), width)
+    touched = np.minimum(first_stop, first_target) < width
+    exit_index = np.where(touched, entries + 1 + np.minimum(first_stop, first_target), limit)
+    reason = np.where(
+        touched,
+        np.where(first_stop <= first_target, EXIT_STOP, EXIT_TARGET),
+        np.where(limit == session_end[entries], EXIT_SQUAREOFF, EXIT_MAX_HOLD),
+    )
+    exit_price = np.select([reason == EXIT_STOP, reason == EXIT_TARGET], [stop, target], cols.close[exit_index])
+
+    keep = np.zeros(len(entries), dtype=bool)
+    busy_until = -1
+    for k, (entry, exit_) in enumerate(zip(entries.tolist(), exit_index.tolist())):
+        if entry >= busy_until:
+            keep[k] = True
+            busy_until = exit_
+
+    return {
+        "entry_index": entries[keep],
+        "exit_index": exit_index[keep],
+        "direction": direction[keep],
+        "entry_price": entry_price[keep],
+        "exit_price": exit_price[keep],
+        "stop_loss": stop[keep],
+        "target": target[keep],
+        "exit_reason": reason[keep],
+        "pnl": (direction * (exit_price - entry_price))[keep],
+    }
+
+
+def performance(trades: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """P&L (points and % of entry), hit rate and max drawdown for one trade log."""
+    pnl = trades["pnl"]
+    count = len(pnl)
+    equity = np.cumsum(pnl)
+    peak = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:]
+    wins, losses = pnl[pnl > 0], pnl[pnl < 0]
+    gross_loss = float(-losses.sum())
+    return {
+        "trades": count,
+        "wins": int(len(wins)),
+        "losses": int(len(losses)),
+        "hit_rate": round(len(wins) / count * 100, 2) if count else 0.0,
+        "pnl_points": round(float(pnl.sum()), 2),
+        "return_pct": round(float((pnl / trades["entry_price"]).sum() * 100), 3) if count else 0.0,
+        "avg_trade": round(float(pnl.mean()), 2) if count else 0.0,
+        "avg_win": round(float(wins.mean()), 2) if len(wins) else 0.0,
+        "avg_loss": round(float(losses.mean()), 2) if len(losses) else 0.0,
+        "profit_factor": round(float(wins.sum()) / gross_loss, 2) if gross_loss else None,
+        "max_drawdown_points": round(float((peak - equity).max()), 2) if count else 0.0,
+        "long_trades": int((trades["direction"] > 0).sum()),
+        "short_trades": int((trades["direction"] < 0).sum()),
+        "exits": {name: int((trades["exit_reason"] == code).sum()) for code, name in enumerate(EXIT_NAMES)},
+    }
+
+
+def trade_records(cols: CandleColumns, trades: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
+    """Trade log as JSON-ready dicts."""
+    return [
+        {
+            "entry_time": str(cols.timestamp[entry]),
+            "exit_time": str(cols.timestamp[exit_]),
+            "direction": "BUY" if d > 0 else "SELL",
+            "entry": round(float(ep), 2),
+            "exit": round(float(xp), 2),
+            "stop_loss": float(sl),
+            "target": float(tg),
+            "exit_reason": EXIT_NAMES[int(r)],
+            "pnl": round(float(pnl), 2),
+        }
+        for entry, exit_, d, ep, xp, sl, tg, r, pnl in zip(*(trades[f].tolist() for f in _TRADE_FIELDS))
+    ]
+
+
+# ============================================
+# RUNNERS
+# ============================================
+
+def _evaluate(cols: CandleColumns, strategy: str, params: BacktestParams) -> Dict[str, np.ndarray]:
+    long_, short = strategy_masks(strategy, cols, params)
+    return simulate(cols, long_, short, params)
+
+
+def run_backtest(
+    candles: Union[str, CandleColumns],
+    strategies: Optional[Sequence[str]] = None,
+    params: Optional[BacktestParams] = None,
+    include_trades: bool = False,
+) -> Dict[str, Any]:
+    """Backtest each strategy over the full history; returns metrics per strategy."""
+    cols = load_candles(candles) if isinstance(candles, str) else candles
+    params = params or BacktestParams()
+    results: Dict[str, Any] = {}
+    for name in strategies or STRATEGIES:
+        trades = _evaluate(cols, name, params)
+        results[name] = performance(trades)
+        if include_trades:
+            results[name]["trade_log"] = trade_records(cols, trades)
+    return {
+        "symbol": cols.symbol,
+        "candles": len(cols),
+        "sessions": cols.sessions,
+        "from": str(cols.timestamp[0]) if len(cols) else None,
+        "to": str(cols.timestamp[-1]) if len(cols) else None,
+        "params": asdict(params),
+        "strategies": results,
+    }
+
+
+_WORKER_COLUMNS: Optional[CandleColumns] = None
+
+
+def _init_worker(cols: CandleColumns) -> None:
+    global _WORKER_COLUMNS
+    _WORKER_COLUMNS = cols
+
+
+def _sweep_point(task: Tuple[str, BacktestParams]) -> Dict[str, Any]:
+    strategy, params = task
+    return performance(_evaluate(_WORKER_COLUMNS, strategy, params))
+
+
+def run_sweep(
+    candles: Union[str, CandleColumns],
+    strategy: str,
+    grid: Dict[str, Sequence[Any]],
+    base: Optional[BacktestParams] = None,
+    processes: Optional[int] = None,
+    rank_by: str = "pnl_points",
+) -> List[Dict[str, Any]]:
+    """
+    Backtest every combination in ``grid`` (BacktestParams field -> values).
+
+    Runs across a process pool (``processes`` workers, default one per CPU up
+    to the number of combinations; 1 runs inline). Rows come back best first
+    by ``rank_by``.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy} (expected one of {', '.join(STRATEGIES)})")
+    unknown = set(grid) - {f.name for f in fields(BacktestParams)}
+    if unknown:
+        raise ValueError(f"Unknown backtest parameters: {', '.join(sorted(unknown))}")
+
+    cols = load_candles(candles) if isinstance(candles, str) else candles
+    base = base or BacktestParams()
+    keys = list(grid)
+    combos = [replace(base, **dict(zip(keys, values))) for values in itertools.product(*grid.values())]
+    tasks = [(strategy, params) for params in combos]
+    workers = min(len(tasks), processes or os.cpu_count() or 1)
+
+    if workers <= 1:
+        results = [performance(_evaluate(cols, strategy, params)) for params in combos]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cols,)) as pool:
+            results = list(pool.map(_sweep_point, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
+
+    rows = [{"params": {k: getattr(p, k) for k in keys}, **r} for p, r in zip(combos, results)]
+    rows.sort(key=lambda r: (r.get(rank_by) is not None, r.get(rank_by) or 0), reverse=True)
+    return rows
+
+
+def _parse_sweep(specs: Sequence[str]) -> Dict[str, List[Any]]:
+    defaults = BacktestParams()
+    grid: Dict[str, List[Any]] = {}
+    for spec in specs:
+        key, _, values = spec.partition("=")
+        if not hasattr(defaults, key):
+            raise SystemExit(f"Unknown parameter: {key}")
+        cast = type(getattr(defaults, key))
+        grid[key] = [cast(v) for v in values.split(",") if v]
+    return grid
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Vectorized backtest over archived candles")
+    parser.add_argument("symbol")
+    parser.add_argument("--strategy", action="append", choices=list(STRATEGIES),
+                        help="strategy to run (repeatable; default: all)")
+    parser.add_argument("--sweep", action="append", default=[], metavar="PARAM=V1,V2",
+                        help="parameter grid for a sweep (repeatable)")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--timeframe", default="5m", choices=["3m", "5m", "15m", "1d"])
+    parser.add_argument("--from", dest="start", type=date.fromisoformat)
+    parser.add_argument("--to", dest="end", type=date.fromisoformat)
+    parser.add_argument("--json", action="store_true", help="print raw JSON")
+    args = parser.parse_args(argv)
+
+    cols = load_candles(args.symbol, args.start, args.end, args.timeframe)
+    if not len(cols):
+        print(f"No candles for {args.symbol}")
+        return 1
+
+    if args.sweep:
+        grid = _parse_sweep(args.sweep)
+        output = {name: run_sweep(cols, name, grid, processes=args.processes)
+                  for name in args.strategy or STRATEGIES}
+        if args.json:
+            print(json.dumps(output, indent=2, default=str))
+            return 0
+        for name, rows in output.items():
+            print(f"\n{name} — {len(rows)} combinations")
+            for row in rows[:10]:
+                print(f"  {row['params']}  trades={row['trades']:<4} hit={row['hit_rate']:>6.2f}%  "
+                      f"pnl={row['pnl_points']:>10.2f}  dd={row['max_drawdown_points']:>9.2f}")
+        return 0
+
+    report = run_backtest(cols, args.strategy)
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return 0
+    print(f"{report['symbol']}: {report['candles']} candles, {report['sessions']} sessions "
+          f"({report['from']} → {report['to']})")
+    for name, m in report["strategies"].items():
+        print(f"  {name:<11} trades={m['trades']:<4} hit={m['hit_rate']:>6.2f}%  "
+              f"pnl={m['pnl_points']:>10.2f}  dd={m['max_drawdown_points']:>9.2f}  pf={m['profit_factor']}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,12 +2,15 @@
 import json
 import time
 import os
-from typing import Optional, Dict, Any, List, Tuple
+import sys
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 from pathlib import Path
 from datetime import datetime
 
 from config import get_settings
+from services.instrument_universe import get_instrument_universe
 from services.persistent_market_state import PersistentMarketState
+from services.snapshot_bus import MARKET, snapshot_bus
 
 settings = get_settings()
 
@@ -127,6 +130,9 @@ class CacheService:
         # Old 5s TTL caused cache expiry between ticks → frontend showed OFFLINE/CLOSED
         # 30s is safe: data is overwritten on every tick anyway (~every 0.5-2s)
         await self.set(f"market:{symbol}", data, expire=30)
+        # In-process readers take the dict itself from the snapshot bus (no JSON, no TTL)
+        if isinstance(data, dict):
+            snapshot_bus.publish(MARKET, symbol, data)
         
         # 🔥 SILENT PERSISTENCE: Save to persistent state WITHOUT disrupting live flow
         # This runs in background - doesn't block market feed
@@ -165,12 +171,14 @@ class CacheService:
         # Last resort: no data available at all
         return None
     
-    async def get_all_market_data(self) -> Dict[str, Dict[str, Any]]:
+    async def get_all_market_data(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
         """
         Get all market data for all symbols with intelligent fallback.
         Uses live data when available, falls back to persistent cache otherwise.
+        `symbols` defaults to the instrument universe's "dashboard" slice (the indices).
         """
-        symbols = ["NIFTY", "BANKNIFTY", "SENSEX"]
+        if symbols is None:
+            symbols = get_instrument_universe().symbols("dashboard")
         result = {}
         for symbol in symbols:
             # This now uses the intelligent fallback logic in get_market_data
@@ -219,22 +227,22 @@ class CacheService:
                 pass
         return []
     
-    async def lpush(self, key: str, value: str):
-        """Push to list (Redis-compatible API)."""
+    async def lpush(self, key: str, *values: str):
+        """Push to list (Redis-compatible API: each value goes to the head in turn)."""
         cached = _SHARED_CACHE.get(key)
         expire_at = time.time() + 3600  # Default 1 hour for lists - REFRESH on each push
+        pushed = list(reversed(values))
         if cached:
             try:
                 existing_value, existing_expire = cached
                 items = json.loads(existing_value)
                 if isinstance(items, list):
-                    items.insert(0, value)
                     # CRITICAL FIX: Refresh TTL when new data is pushed (was using existing_expire)
-                    _SHARED_CACHE[key] = (json.dumps(items), expire_at)  # Refresh TTL
+                    _SHARED_CACHE[key] = (json.dumps(pushed + items), expire_at)  # Refresh TTL
                     return
             except Exception:
                 pass
-        _SHARED_CACHE[key] = (json.dumps([value]), expire_at)
+        _SHARED_CACHE[key] = (json.dumps(pushed), expire_at)
     
     async def ltrim(self, key: str, start: int, end: int):
         """Trim list (Redis-compatible API)."""
@@ -288,3 +296,86 @@ def get_cache() -> CacheService:
     if _cache_instance is None:
         _cache_instance = CacheService()
     return _cache_instance
+
+
+# ── Shared cache housekeeping ────────────────────────────────────────────────
+# Entries are only expired lazily on read, so keys that are written once and
+# never read again (per-request analysis results, old symbols) would stay
+# forever. services/memory_guard.py calls these periodically.
+
+# Never evicted by the size caps (only by their own TTL)
+PROTECTED_PREFIXES: Tuple[str, ...] = ("market:",)
+
+_ENTRY_OVERHEAD = sys.getsizeof((None, 0.0)) + sys.getsizeof(0.0)
+
+
+def _entry_bytes(key: str, value: str) -> int:
+    return sys.getsizeof(key) + sys.getsizeof(value) + _ENTRY_OVERHEAD
+
+
+def key_prefix(key: str) -> str:
+    """Grouping prefix for accounting: 'zone_control:NIFTY' → 'zone_control'."""
+    return key.split(":", 1)[0]
+
+
+def sweep_expired(now: Optional[float] = None) -> int:
+    """Delete every expired entry. Returns the number removed."""
+    now = now or time.time()
+    expired = [k for k, (_, expire_at) in list(_SHARED_CACHE.items()) if expire_at <= now]
+    for key in expired:
+        _SHARED_CACHE.pop(key, None)
+    return len(expired)
+
+
+def enforce_limits(max_keys: int, max_bytes: int, policy: str = "volatile-ttl") -> int:
+    """
+    Evict entries until the cache is within ``max_keys`` and ``max_bytes``.
+
+    policy:
+        volatile-ttl  evict the entries closest to expiry first (Redis-style)
+        fifo          evict the oldest-written entries first
+    Keys under PROTECTED_PREFIXES are never evicted here.
+    """
+    items = list(_SHARED_CACHE.items())
+    total = sum(_entry_bytes(k, v) for k, (v, _) in items)
+    over_keys = len(items) - max_keys if max_keys > 0 else 0
+    over_bytes = total - max_bytes if max_bytes > 0 else 0
+    if over_keys <= 0 and over_bytes <= 0:
+        return 0
+
+    candidates = [(k, v, exp) for k, (v, exp) in items if not k.startswith(PROTECTED_PREFIXES)]
+    if policy == "volatile-ttl":
+        candidates.sort(key=lambda c: c[2])
+    # fifo: dict order is write order (re-writes of an existing key keep its slot)
+
+    evicted = 0
+    for key, value, _ in candidates:
+        if over_keys <= 0 and over_bytes <= 0:
+            break
+        if _SHARED_CACHE.pop(key, None) is not None:
+            evicted += 1
+            over_keys -= 1
+            over_bytes -= _entry_bytes(key, value)
+    return evicted
+
+
+def shared_cache_stats(now: Optional[float] = None) -> Dict[str, Any]:
+    """Approximate bytes and key counts, total and per key prefix."""
+    now = now or time.time()
+    prefixes: Dict[str, Dict[str, int]] = {}
+    total = expired = 0
+    items = list(_SHARED_CACHE.items())
+    for key, (value, expire_at) in items:
+        size = _entry_bytes(key, value)
+        total += size
+        if expire_at <= now:
+            expired += 1
+        bucket = prefixes.setdefault(key_prefix(key), {"keys": 0, "bytes": 0})
+        bucket["keys"] += 1
+        bucket["bytes"] += size
+    return {
+        "keys": len(items),
+        "bytes": total,
+        "expiredPending": expired,
+        "prefixes": dict(sorted(prefixes.items(), key=lambda kv: kv[1]["bytes"], reverse=True)),
+    }
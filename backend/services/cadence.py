@@ -0,0 +1,307 @@
+"""Adaptive service cadences — refresh intervals driven by volatility and load.
+
+The broadcast loops ran at fixed constants (compass 2 s, liquidity 1 s,
+market edge 1.5 s, expiry 2 s, Smart AI algo 2 s, trading intelligence 1.5 s,
+strike / chart intelligence 0.5 s): wasted work on a quiet afternoon, and
+loops that fall behind and pile onto the event loop during a volatile open.
+Each loop now registers its fixed interval as a base and sleeps for the
+interval the controller chooses:
+
+    cadence = get_cadence_controller().register("compass", base=2.0)
+    while running:
+        started = time.perf_counter()
+        ...compute and broadcast...
+        cadence.record(time.perf_counter() - started)
+        await asyncio.sleep(cadence.interval)
+
+Every CADENCE_SAMPLE_SECONDS the controller samples
+
+    loop lag      how late its own sleep woke up (EWMA)
+    tick rate     ticks/s across the instrument universe, against its
+                  session baseline (fast / slow EWMA)
+    ATR           per index, Wilder-style true range of finished 3m bars
+                  (instrument universe candle book), fast / slow EWMA
+
+Activity is the largest of the ratios that have a baseline yet (1.0 while
+none has), clamped to [0.25, 4]. A service's interval is its base divided by
+activity, then raised so the measured iteration time stays within
+CADENCE_COMPUTE_BUDGET of the interval, then stretched while the loop lag is
+above CADENCE_LOOP_LAG_MS, and finally clamped to the service's bounds —
+base/2 … 3×base unless given, overridable per service with CADENCE_BOUNDS
+("compass=1:6,liquidity=0.5:3"). The reason for each choice is kept with it
+and reported on /health/cadence. Baselines are relative to the session so
+far; CADENCE_ADAPTIVE=false pins every service to its base interval.
+
+Single writer (the sampler and the loops, all on the event loop).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from config import get_settings
+from services.instrument_universe import INDEX_SYMBOLS, InstrumentUniverse, get_instrument_universe
+from services.rolling_stats import Ewma
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_FLOOR = 0.25
+ACTIVITY_CEILING = 4.0
+ATR_TIMEFRAME = "3m"
+MIN_BASELINE_SAMPLES = 10    # tick-rate samples before the ratio counts
+MIN_ATR_BARS = 3             # finished bars before an index's ATR ratio counts
+
+
+def _rounded(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 3)
+
+
+def parse_bounds(spec: str) -> Dict[str, Tuple[float, float]]:
+    """``"compass=1:6,liquidity=0.5:3"`` → ``{"compass": (1.0, 6.0), ...}`` (bad entries skipped)."""
+    bounds: Dict[str, Tuple[float, float]] = {}
+    for item in (spec or "").split(","):
+        name, _, rng = item.partition("=")
+        lo, _, hi = rng.partition(":")
+        try:
+            low, high = float(lo), float(hi)
+        except ValueError:
+            continue
+        if name.strip() and 0 < low <= high:
+            bounds[name.strip()] = (low, high)
+    return bounds
+
+
+class _AtrTracker:
+    """Wilder-style ATR of one instrument's finished bars, fast against slow."""
+
+    __slots__ = ("fast", "slow", "bucket", "ohlc", "prev_close")
+
+    def __init__(self) -> None:
+        self.fast = Ewma(alpha=1.0 / 5)        # ~5 bars
+        self.slow = Ewma(alpha=1.0 / 40)       # ~2 hours of 3m bars
+        self.bucket = -1
+        self.ohlc: Optional[np.ndarray] = None
+        self.prev_close = 0.0
+
+    def observe(self, bucket: int, ohlc: np.ndarray) -> None:
+        if bucket < 0:
+            return
+        if self.ohlc is not None and bucket != self.bucket:
+            _, high, low, close = self.ohlc      # last sample of the bar that just finished
+            if close > 0:
+                prev = self.prev_close or close
+                true_range = (max(high, prev) - min(low, prev)) / close
+                self.fast.push(true_range)
+                self.slow.push(true_range)
+                self.prev_close = close
+        self.bucket = bucket
+        self.ohlc = ohlc.copy()
+
+    @property
+    def ratio(self) -> Optional[float]:
+        if self.slow.count < MIN_ATR_BARS or self.slow.mean <= 0:
+            return None
+        return self.fast.mean / self.slow.mean
+
+
+class ServiceCadence:
+    """One loop's chosen interval, its bounds and why."""
+
+    def __init__(self, controller: "CadenceController", name: str, base: float, lo: float, hi: float) -> None:
+        self.controller = controller
+        self.name = name
+        self.base = base
+        self.lo = lo
+        self.hi = hi
+        self.interval = base
+        self.reason = "base"
+        self.compute = Ewma(span=5)             # seconds per iteration
+        self.runs = 0
+
+    def record(self, seconds: float) -> float:
+        """Note one iteration's duration and return the interval to sleep next."""
+        self.compute.push(max(seconds, 0.0))
+        self.runs += 1
+        self.controller.decide(self)
+        return self.interval
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "intervalSec": round(self.interval, 3),
+            "reason": self.reason,
+            "baseSec": self.base,
+            "minSec": self.lo,
+            "maxSec": self.hi,
+            "computeMs": round(self.compute.mean * 1000.0, 2),
+            "runs": self.runs,
+        }
+
+
+class CadenceController:
+    """Samples volatility and event-loop load and sets each registered loop's interval."""
+
+    def __init__(self, universe: Optional[InstrumentUniverse] = None, sample_seconds: Optional[float] = None,
+                 adaptive: Optional[bool] = None) -> None:
+        settings = get_settings()
+        self.universe = universe or get_instrument_universe()
+        self.sample_seconds = sample_seconds or settings.cadence_sample_seconds
+        self.adaptive = settings.cadence_adaptive if adaptive is None else adaptive
+        self.lag_threshold = settings.cadence_loop_lag_ms / 1000.0
+        self.compute_budget = settings.cadence_compute_budget
+        self.bounds = parse_bounds(settings.cadence_bounds)
+        self.services: Dict[str, ServiceCadence] = {}
+
+        self.loop_lag = Ewma(span=5)            # seconds
+        self.tick_rate = Ewma(span=10)          # ticks/s, recent
+        self.tick_baseline = Ewma(span=1800)    # ticks/s, session (~30 min at 1 s samples)
+        self._atr: Dict[str, _AtrTracker] = {s: _AtrTracker() for s in INDEX_SYMBOLS}
+        self._ticks_seen: Optional[int] = None
+        self.samples = 0
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    # ── Registration ────────────────────────────────────────────────────
+
+    def register(self, name: str, base: float, lo: Optional[float] = None,
+                 hi: Optional[float] = None) -> ServiceCadence:
+        """The cadence of loop ``name`` (idempotent); bounds default to base/2 … 3×base."""
+        cadence = self.services.get(name)
+        if cadence is None:
+            low, high = self.bounds.get(name, (lo or base / 2.0, hi or base * 3.0))
+            cadence = self.services[name] = ServiceCadence(self, name, base, low, high)
+        return cadence
+
+    # ── Signals ─────────────────────────────────────────────────────────
+
+    def sample(self, elapsed: float, lag: float = 0.0) -> None:
+        """Fold in one sampler tick: ``elapsed`` seconds since the last, woken ``lag`` seconds late."""
+        self.loop_lag.push(max(lag, 0.0))
+        universe = self.universe
+        state = universe.state
+        count = len(universe)
+        ticks = int(state.ticks[:count].sum())
+        if self._ticks_seen is not None and elapsed > 0:
+            rate = max(ticks - self._ticks_seen, 0) / elapsed
+            self.tick_rate.push(rate)
+            self.tick_baseline.push(rate)
+        self._ticks_seen = ticks
+
+        book = universe.candles.get(ATR_TIMEFRAME)
+        if book is not None:
+            for symbol, tracker in self._atr.items():
+                iid = universe.id_of(symbol)
+                if iid is not None and iid < count:
+                    tracker.observe(int(book.bucket[iid]), book.ohlc[iid])
+        self.samples += 1
+
+    @property
+    def tick_ratio(self) -> Optional[float]:
+        baseline = self.tick_baseline
+        if baseline.count < MIN_BASELINE_SAMPLES or baseline.mean <= 0:
+            return None
+        return self.tick_rate.mean / baseline.mean
+
+    @property
+    def atr_ratio(self) -> Optional[float]:
+        ratios = [r for r in (tracker.ratio for tracker in self._atr.values()) if r is not None]
+        return max(ratios) if ratios else None
+
+    @property
+    def activity(self) -> float:
+        ratios = [r for r in (self.tick_ratio, self.atr_ratio) if r is not None]
+        return min(max(max(ratios, default=1.0), ACTIVITY_FLOOR), ACTIVITY_CEILING)
+
+    # ── Decision ────────────────────────────────────────────────────────
+
+    def decide(self, cadence: ServiceCadence) -> None:
+        if not self.adaptive:
+            cadence.interval, cadence.reason = cadence.base, "fixed (CADENCE_ADAPTIVE off)"
+            return
+
+        activity = self.activity
+        interval = cadence.base / activity
+        if activity >= 1.25:
+            reason = f"volatile: activity x{activity:.2f}"
+        elif activity <= 0.8:
+            reason = f"quiet: activity x{activity:.2f}"
+        else:
+            reason = "normal"
+
+        compute_floor = cadence.compute.mean / self.compute_budget
+        if compute_floor > interval:
+            interval = compute_floor
+            reason = f"compute-bound: {cadence.compute.mean * 1000:.0f} ms per run"
+
+        lag = self.loop_lag.mean
+        if self.lag_threshold > 0 and lag > self.lag_threshold:
+            interval *= min(lag / self.lag_threshold, ACTIVITY_CEILING)
+            reason = f"loop lag {lag * 1000:.0f} ms"
+
+        if interval <= cadence.lo:
+            interval, reason = cadence.lo, f"{reason} (at min)"
+        elif interval >= cadence.hi:
+            interval, reason = cadence.hi, f"{reason} (at max)"
+        cadence.interval, cadence.reason = interval, reason
+
+    # ── Sampler ─────────────────────────────────────────────────────────
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        last = loop.time()
+        while self._running:
+            try:
+                await asyncio.sleep(self.sample_seconds)
+                now = loop.time()
+                self.sample(now - last, lag=now - last - self.sample_seconds)
+                last = now
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                logger.error("Cadence sampler error: %s", exc)
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "running": self._running,
+            "adaptive": self.adaptive,
+            "sampleSeconds": self.sample_seconds,
+            "samples": self.samples,
+            "signals": {
+                "loopLagMs": round(self.loop_lag.mean * 1000.0, 2),
+                "tickRate": round(self.tick_rate.mean, 2),
+                "tickRateBaseline": round(self.tick_baseline.mean, 2),
+                "tickRatio": _rounded(self.tick_ratio),
+                "atrRatio": {s: _rounded(t.ratio) for s, t in self._atr.items()},
+                "activity": round(self.activity, 3),
+            },
+            "services": {name: cadence.report() for name, cadence in sorted(self.services.items())},
+        }
+
+
+_controller: Optional[CadenceController] = None
+
+
+def get_cadence_controller() -> CadenceController:
+    global _controller
+    if _controller is None:
+        _controller = CadenceController()
+    return _controller
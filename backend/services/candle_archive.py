@@ -0,0 +1,404 @@
+"""
+Candle Archive — append-only columnar OHLCV store for every timeframe.
+
+Layout under data/candle_archive/:
+
+    <SYMBOL>/index.json            rows / first / last / updated per timeframe + month
+    <SYMBOL>/<tf>/<YYYY-MM>.bin    fixed-width RECORD rows, oldest first
+
+A partition is a headerless array of RECORD (int64 epoch-second timestamp,
+float64 OHLC, int64 volume / oi / oi_prev), so an append is one write at EOF
+and a read is an `np.memmap` view. "Last N bars" and "bars between T1 and T2"
+open only the months the index says overlap and slice rows with a binary
+search on the timestamp column — nothing is parsed.
+
+Timeframes 3m / 5m / 15m are the live candle builders' cache lists
+(analysis_candles_3m, analysis_candles, analysis_candles_15m); 1d is rolled up
+from 5m. Months and days are IST (UTC+05:30, no DST).
+
+Writes are idempotent: rows already archived unchanged are skipped, a changed
+or back-filled row rewrites just its month, and the index (written last,
+atomically) is the source of truth for row counts, so a torn append is
+truncated away on the next write.
+
+The per-day JSON files in data/candle_backups/ are imported once per symbol on
+first use.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pytz
+
+logger = logging.getLogger(__name__)
+
+IST = pytz.timezone("Asia/Kolkata")
+IST_OFFSET = 19800          # seconds; IST has no DST so day/month math is integer arithmetic
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+ARCHIVE_DIR = Path(__file__).parent.parent / "data" / "candle_archive"
+LEGACY_BACKUP_DIR = Path(__file__).parent.parent / "data" / "candle_backups"
+
+TIMEFRAMES: Dict[str, int] = {"3m": 180, "5m": 300, "15m": 900, "1d": 86400}
+CACHE_KEYS: Dict[str, str] = {
+    "3m": "analysis_candles_3m",
+    "5m": "analysis_candles",
+    "15m": "analysis_candles_15m",
+}
+
+RECORD = np.dtype([
+    ("ts", "<i8"),
+    ("open", "<f8"),
+    ("high", "<f8"),
+    ("low", "<f8"),
+    ("close", "<f8"),
+    ("volume", "<i8"),
+    ("oi", "<i8"),
+    ("oi_prev", "<i8"),
+])
+
+Stamp = Union[int, float, str, datetime, None]
+
+
+# ============================================
+# CONVERSIONS
+# ============================================
+
+def to_epoch(stamp: Stamp) -> Optional[int]:
+    """Epoch seconds for an ISO string / datetime (naive = IST) / number."""
+    if stamp is None:
+        return None
+    if isinstance(stamp, (int, float, np.integer)):
+        return int(stamp)
+    try:
+        when = stamp if isinstance(stamp, datetime) else datetime.fromisoformat(str(stamp))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = IST.localize(when)
+    return int(when.timestamp())
+
+
+def records_from_candles(candles: Iterable[Dict[str, Any]]) -> np.ndarray:
+    """Candle dicts (cache / backup format) -> sorted RECORD array, last duplicate wins."""
+    rows = []
+    for c in candles:
+        ts = to_epoch(c.get("timestamp") or c.get("date") or c.get("time"))
+        if ts is None:
+            continue
+        close = float(c.get("close") or 0)
+        rows.append((
+            ts,
+            float(c.get("open") or close),
+            float(c.get("high") or close),
+            float(c.get("low") or close),
+            close,
+            int(c.get("volume") or 0),
+            int(c.get("oi") or 0),
+            int(c.get("oi_prev") or 0),
+        ))
+    return _dedupe(np.array(rows, dtype=RECORD))
+
+
+def _dedupe(records: np.ndarray) -> np.ndarray:
+    """Sort by timestamp keeping the last occurrence of each."""
+    if len(records) < 2:
+        return records
+    flipped = records[::-1]
+    _, first = np.unique(flipped["ts"], return_index=True)
+    return flipped[first]
+
+
+def candles_from_records(records: np.ndarray) -> List[Dict[str, Any]]:
+    """RECORD rows -> candle dicts with IST ISO timestamps (cache / backup format)."""
+    return [
+        {
+            "timestamp": datetime.fromtimestamp(ts, IST).isoformat(),
+            "open": o, "high": h, "low": l, "close": c,
+            "volume": v, "oi": oi, "oi_prev": oi_prev,
+        }
+        for ts, o, h, l, c, v, oi, oi_prev in records.tolist()
+    ]
+
+
+def month_of(ts: np.ndarray) -> np.ndarray:
+    """IST calendar month ('YYYY-MM') of each timestamp."""
+    return (np.asarray(ts) + IST_OFFSET).astype("datetime64[s]").astype("datetime64[M]").astype(str)
+
+
+def session_of(ts: np.ndarray) -> np.ndarray:
+    """IST trading-date ordinal of each timestamp."""
+    return (np.asarray(ts) + IST_OFFSET) // 86400 + _EPOCH_ORDINAL
+
+
+def aggregate(records: np.ndarray, timeframe: str) -> np.ndarray:
+    """Roll sorted RECORD rows up to ``timeframe`` (IST-aligned buckets)."""
+    if not len(records):
+        return np.empty(0, dtype=RECORD)
+    seconds = TIMEFRAMES[timeframe]
+    bucket = (records["ts"] + IST_OFFSET) // seconds * seconds - IST_OFFSET
+    starts = np.flatnonzero(np.concatenate(([True], bucket[1:] != bucket[:-1])))
+    ends = np.concatenate((starts[1:], [len(records)])) - 1
+
+    out = np.empty(len(starts), dtype=RECORD)
+    out["ts"] = bucket[starts]
+    out["open"] = records["open"][starts]
+    out["high"] = np.maximum.reduceat(records["high"], starts)
+    out["low"] = np.minimum.reduceat(records["low"], starts)
+    out["close"] = records["close"][ends]
+    out["volume"] = np.add.reduceat(records["volume"], starts)
+    out["oi"] = records["oi"][ends]
+    out["oi_prev"] = records["oi_prev"][starts]
+    return out
+
+
+# ============================================
+# ARCHIVE
+# ============================================
+
+class CandleArchive:
+    """Per-symbol, per-timeframe, per-month partitions plus a JSON index."""
+
+    def __init__(self, root: Path = ARCHIVE_DIR, legacy_dir: Optional[Path] = LEGACY_BACKUP_DIR):
+        self.root = Path(root)
+        self.legacy_dir = Path(legacy_dir) if legacy_dir else None
+        self._lock = threading.RLock()
+        self._indexes: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+        self._imported: set = set()
+
+    # ── index ───────────────────────────────────────────────────────────
+    def _symbol_dir(self, symbol: str) -> Path:
+        return self.root / symbol.upper()
+
+    def _partition_path(self, symbol: str, timeframe: str, month: str) -> Path:
+        return self._symbol_dir(symbol) / timeframe / f"{month}.bin"
+
+    def index(self, symbol: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """{timeframe: {month: {rows, first, last, updated}}} for ``symbol``."""
+        symbol = symbol.upper()
+        with self._lock:
+            if symbol not in self._indexes:
+                path = self._symbol_dir(symbol) / "index.json"
+                try:
+                    self._indexes[symbol] = json.loads(path.read_text(encoding="utf-8"))
+                except FileNotFoundError:
+                    self._indexes[symbol] = {}
+                except (OSError, json.JSONDecodeError) as exc:
+                    logger.error("Candle archive index for %s unreadable (%s); rebuilding", symbol, exc)
+                    self._indexes[symbol] = self._rebuild_index(symbol)
+            return self._indexes[symbol]
+
+    def _months(self, symbol: str, timeframe: str) -> Dict[str, Dict[str, Any]]:
+        """A copy of ``{month: meta}`` taken under the lock, safe to iterate while appends run."""
+        with self._lock:
+            return {month: dict(meta) for month, meta in self.index(symbol).get(timeframe, {}).items()}
+
+    def _rebuild_index(self, symbol: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        index: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for path in sorted(self._symbol_dir(symbol).glob("*/*.bin")):
+            rows = path.stat().st_size // RECORD.itemsize
+            if not rows:
+                continue
+            data = np.memmap(path, dtype=RECORD, mode="r", shape=(rows,))
+            index.setdefault(path.parent.name, {})[path.stem] = self._meta(data)
+        return index
+
+    @staticmethod
+    def _meta(data: np.ndarray) -> Dict[str, Any]:
+        return {
+            "rows": int(len(data)),
+            "first": int(data["ts"][0]),
+            "last": int(data["ts"][-1]),
+            "updated": datetime.now(IST).isoformat(),
+        }
+
+    def _save_index(self, symbol: str) -> None:
+        path = self._symbol_dir(symbol) / "index.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._indexes[symbol.upper()], indent=1, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def symbols(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.iterdir() if (p / "index.json").exists())
+
+    # ── writes ──────────────────────────────────────────────────────────
+    def append(self, symbol: str, timeframe: str, candles: Union[np.ndarray, Iterable[Dict[str, Any]]]) -> int:
+        """Archive candles (dicts or RECORD rows); returns rows added or changed."""
+        if timeframe not in TIMEFRAMES:
+            raise ValueError(f"Unknown timeframe: {timeframe} (expected one of {', '.join(TIMEFRAMES)})")
+        records = _dedupe(np.asarray(candles, dtype=RECORD)) if isinstance(candles, np.ndarray) \
+            else records_from_candles(candles)
+        if not len(records):
+            return 0
+
+        symbol = symbol.upper()
+        months = month_of(records["ts"])
+        written = 0
+        with self._lock:
+            tf_index = self.index(symbol).setdefault(timeframe, {})
+            for month in np.unique(months):
+                written += self._write_partition(symbol, timeframe, str(month), records[months == month], tf_index)
+            if written:
+                self._save_index(symbol)
+        return written
+
+    def _write_partition(self, symbol: str, timeframe: str, month: str,
+                         part: np.ndarray, tf_index: Dict[str, Dict[str, Any]]) -> int:
+        path = self._partition_path(symbol, timeframe, month)
+        meta = tf_index.get(month)
+        rows = meta["rows"] if meta else 0
+
+        if rows:
+            existing = np.memmap(path, dtype=RECORD, mode="r", shape=(rows,))
+            older = part[part["ts"] <= meta["last"]]
+            if len(older):
+                pos = np.minimum(np.searchsorted(existing["ts"], older["ts"]), rows - 1)
+                unchanged = existing[pos] == older
+                if not unchanged.all():
+                    merged = _dedupe(np.concatenate((np.asarray(existing), part)))
+                    del existing
+                    tmp = path.with_suffix(".tmp")
+                    merged.tofile(tmp)
+                    os.replace(tmp, path)
+                    tf_index[month] = self._meta(merged)
+                    return int((~unchanged).sum()) + int((part["ts"] > meta["last"]).sum())
+            del existing
+            part = part[part["ts"] > meta["last"]]
+            if not len(part):
+                return 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "r+b" if path.exists() else "wb") as fh:
+            if fh.seek(0, os.SEEK_END) != rows * RECORD.itemsize:
+                fh.truncate(rows * RECORD.itemsize)      # drop a torn tail the index never counted
+                fh.seek(0, os.SEEK_END)
+            fh.write(part.tobytes())
+        tf_index[month] = {
+            "rows": rows + len(part),
+            "first": meta["first"] if meta else int(part["ts"][0]),
+            "last": int(part["ts"][-1]),
+            "updated": datetime.now(IST).isoformat(),
+        }
+        return len(part)
+
+    # ── reads ───────────────────────────────────────────────────────────
+    def _open(self, symbol: str, timeframe: str, month: str, rows: int) -> np.ndarray:
+        if not rows:
+            return np.empty(0, dtype=RECORD)
+        return np.memmap(self._partition_path(symbol, timeframe, month), dtype=RECORD, mode="r", shape=(rows,))
+
+    def read(self, symbol: str, timeframe: str, start: Stamp = None, end: Stamp = None) -> np.ndarray:
+        """Bars with start <= ts <= end (either bound optional), oldest first."""
+        symbol = symbol.upper()
+        self.ensure_imported(symbol)
+        lo_ts, hi_ts = to_epoch(start), to_epoch(end)
+        chunks = []
+        for month, meta in sorted(self._months(symbol, timeframe).items()):
+            if (lo_ts is not None and meta["last"] < lo_ts) or (hi_ts is not None and meta["first"] > hi_ts):
+                continue
+            data = self._open(symbol, timeframe, month, meta["rows"])
+            lo = np.searchsorted(data["ts"], lo_ts, "left") if lo_ts is not None else 0
+            hi = np.searchsorted(data["ts"], hi_ts, "right") if hi_ts is not None else len(data)
+            if hi > lo:
+                chunks.append(data[lo:hi])
+        if not chunks:
+            return np.empty(0, dtype=RECORD)
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+    def last(self, symbol: str, timeframe: str, n: int) -> np.ndarray:
+        """The most recent ``n`` bars, oldest first."""
+        symbol = symbol.upper()
+        self.ensure_imported(symbol)
+        chunks: List[np.ndarray] = []
+        need = n
+        for month, meta in sorted(self._months(symbol, timeframe).items(), reverse=True):
+            if need <= 0:
+                break
+            data = self._open(symbol, timeframe, month, meta["rows"])
+            chunks.append(data[max(0, len(data) - need):])
+            need -= len(chunks[-1])
+        if not chunks:
+            return np.empty(0, dtype=RECORD)
+        return chunks[0] if len(chunks) == 1 else np.concatenate(chunks[::-1])
+
+    def columns(self, symbol: str, timeframe: str = "5m", start: Stamp = None, end: Stamp = None):
+        """Range read as backtest_engine.CandleColumns (IST wall-clock timestamps)."""
+        from services.backtest_engine import CandleColumns
+
+        data = self.read(symbol, timeframe, start, end)
+        return CandleColumns(
+            symbol=symbol.upper(),
+            timestamp=(data["ts"] + IST_OFFSET).astype("datetime64[s]"),
+            session=session_of(data["ts"]).astype(np.int64),
+            open=np.asarray(data["open"], dtype=np.float64),
+            high=np.asarray(data["high"], dtype=np.float64),
+            low=np.asarray(data["low"], dtype=np.float64),
+            close=np.asarray(data["close"], dtype=np.float64),
+            volume=np.asarray(data["volume"], dtype=np.float64),
+        )
+
+    # ── catalogue ───────────────────────────────────────────────────────
+    def partitions(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Index entries (no partition is opened), newest month first."""
+        out = []
+        for sym in [symbol.upper()] if symbol else self.symbols():
+            with self._lock:
+                timeframes = list(self.index(sym))
+            for timeframe in timeframes:
+                for month, meta in self._months(sym, timeframe).items():
+                    out.append({
+                        "symbol": sym,
+                        "timeframe": timeframe,
+                        "month": month,
+                        "file": str(self._partition_path(sym, timeframe, month).relative_to(self.root)),
+                        "bytes": meta["rows"] * RECORD.itemsize,
+                        **meta,
+                    })
+        return sorted(out, key=lambda p: (p["month"], p["symbol"], TIMEFRAMES.get(p["timeframe"], 0)), reverse=True)
+
+    # ── legacy import ───────────────────────────────────────────────────
+    def ensure_imported(self, symbol: str) -> int:
+        """Import data/candle_backups/<symbol>_candles_*.json once, if the archive is empty."""
+        symbol = symbol.upper()
+        if symbol in self._imported:
+            return 0
+        with self._lock:
+            if symbol in self._imported:
+                return 0
+            self._imported.add(symbol)
+            if self.index(symbol).get("5m") or not self.legacy_dir:
+                return 0
+            return self.import_legacy(symbol)
+
+    def import_legacy(self, symbol: str) -> int:
+        candles: List[Dict[str, Any]] = []
+        for path in sorted(self.legacy_dir.glob(f"{symbol}_candles_*.json")):
+            try:
+                candles.extend(json.loads(path.read_text(encoding="utf-8")).get("candles", []))
+            except (OSError, json.JSONDecodeError) as exc:
+                logger.warning("Skipping unreadable candle backup %s: %s", path.name, exc)
+        records = records_from_candles(candles)
+        if not len(records):
+            return 0
+        added = self.append(symbol, "5m", records)
+        self.append(symbol, "1d", aggregate(records, "1d"))
+        logger.info("Imported %d legacy 5m candles for %s into the candle archive", added, symbol)
+        return added
+
+
+candle_archive = CandleArchive()
+
+
+def get_candle_archive() -> CandleArchive:
+    return candle_archive
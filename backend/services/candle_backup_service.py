@@ -2,6 +2,11 @@
 Candle Backup & Restore Service
 Saves historical candles at market close and restores them at market open
 Ensures OI Momentum signals work immediately when market starts
+
+Storage is the columnar candle archive (services/candle_archive.py): every
+timeframe the feed builds (3m/5m/15m) plus a daily roll-up, appended per
+symbol and month. The per-day JSON files in data/candle_backups/ are only
+read once, as an import source for symbols the archive has not seen.
 """
 
 import json
@@ -12,15 +17,20 @@ from typing import Dict, List, Optional
 import pytz
 import logging
 
+from services.candle_archive import CACHE_KEYS, aggregate, candles_from_records, get_candle_archive, records_from_candles
+
 logger = logging.getLogger(__name__)
 
 # Indian timezone
 IST = pytz.timezone('Asia/Kolkata')
 
-# Backup directory
+# Legacy per-day JSON backups (import source only)
 BACKUP_DIR = Path(__file__).parent.parent / "data" / "candle_backups"
 BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 
+# Candles pushed back into each analysis_candles* list at warm start
+RESTORE_CANDLES = 100
+
 
 class CandleBackupService:
     """
@@ -30,7 +40,7 @@ class CandleBackupService:
 
     @staticmethod
     def get_backup_file_path(symbol: str, date: Optional[datetime] = None) -> Path:
-        """Get the file path for candle backup"""
+        """Get the file path of a legacy per-day JSON backup"""
         if date is None:
             date = datetime.now(IST)
         
@@ -41,58 +51,49 @@ class CandleBackupService:
     @staticmethod
     async def backup_candles(cache, symbol: str) -> bool:
         """
-        Backup candles from Redis to disk file
-        Called at market close (3:30 PM)
+        Archive the live 3m/5m/15m candle lists and the daily roll-up
+        Called at market close (3:30 PM); safe to repeat — unchanged candles are skipped
         
         Args:
             cache: CacheService instance
             symbol: Trading symbol (NIFTY, BANKNIFTY, SENSEX)
         
         Returns:
-            True if successful, False otherwise
+            True if 5m candles were available to archive, False otherwise
         """
         try:
             print(f"\n📦 BACKING UP CANDLES FOR {symbol}...")
-            
-            # Get all cached candles from Redis
-            candle_key = f"analysis_candles:{symbol}"
-            candles_json = await cache.lrange(candle_key, 0, 199)
-            
-            if not candles_json:
-                print(f"   ⚠️  No candles to backup for {symbol}")
-                return False
-            
-            # Parse candles (they're stored as JSON strings)
-            candles = []
-            for candle_json in reversed(candles_json):  # Reverse to get chronological order
-                try:
-                    candles.append(json.loads(candle_json))
-                except json.JSONDecodeError:
+            archive = get_candle_archive()
+            archive.ensure_imported(symbol)
+            
+            five_minute = None
+            for timeframe, prefix in CACHE_KEYS.items():
+                candles_json = await cache.lrange(f"{prefix}:{symbol}", 0, -1)
+                candles = []
+                for candle_json in reversed(candles_json):  # Reverse to get chronological order
+                    try:
+                        candles.append(json.loads(candle_json))
+                    except json.JSONDecodeError:
+                        continue
+                records = records_from_candles(candles)
+                if not len(records):
                     continue
+                
+                added = archive.append(symbol, timeframe, records)
+                print(f"   ✅ {timeframe}: {len(records)} candles ({added} new/changed)")
+                if timeframe == "5m":
+                    five_minute = records
             
-            if not candles:
-                print(f"   ⚠️  Could not parse candles for {symbol}")
+            if five_minute is None:
+                print(f"   ⚠️  No candles to backup for {symbol}")
                 return False
             
-            # Prepare backup data
-            backup_data = {
-                "symbol": symbol,
-                "backup_date": datetime.now(IST).isoformat(),
-                "candle_count": len(candles),
-                "first_candle": candles[0] if candles else None,
-                "last_candle": candles[-1] if candles else None,
-                "candles": candles
-            }
-            
-            # Write to disk
-            backup_file = CandleBackupService.get_backup_file_path(symbol)
-            with open(backup_file, 'w') as f:
-                json.dump(backup_data, f, indent=2)
-            
-            print(f"   ✅ Backed up {len(candles)} candles to {backup_file.name}")
-            print(f"      First candle: {backup_data['first_candle'].get('timestamp', 'N/A')}")
-            print(f"      Last candle:  {backup_data['last_candle'].get('timestamp', 'N/A')}")
+            # Daily bars for every session touched, rebuilt from the full archived 5m day
+            day_start = int(aggregate(five_minute[:1], "1d")["ts"][0])
+            archive.append(symbol, "1d", aggregate(archive.read(symbol, "5m", start=day_start), "1d"))
             
+            last = candles_from_records(five_minute[-1:])[0]
+            print(f"      Last candle:  {last['timestamp']}")
             return True
             
         except Exception as e:
@@ -103,66 +104,42 @@ class CandleBackupService:
     @staticmethod
     async def restore_candles(cache, symbol: str) -> bool:
         """
-        Restore candles from disk to Redis
+        Restore candles from the archive to the cache
         Called at market open (9:15 AM)
         
+        Each analysis_candles* list is rebuilt in one write from a
+        memory-mapped read of the last RESTORE_CANDLES bars.
+        
         Args:
             cache: CacheService instance
             symbol: Trading symbol (NIFTY, BANKNIFTY, SENSEX)
         
         Returns:
-            True if successful and candles were restored, False otherwise
+            True if 5m candles were restored, False otherwise
         """
         try:
             print(f"\n🔄 RESTORING CANDLES FOR {symbol}...")
+            archive = get_candle_archive()
+            archive.ensure_imported(symbol)
             
-            # Try today's backup first, then fall back to most recent
-            backup_file = CandleBackupService.get_backup_file_path(symbol)
-            
-            if not backup_file.exists():
-                # Find the most recent backup for this symbol
-                pattern = f"{symbol}_candles_*.json"
-                candidates = sorted(BACKUP_DIR.glob(pattern), reverse=True)
-                if candidates:
-                    backup_file = candidates[0]
-                    print(f"   ℹ️  Using most recent backup: {backup_file.name}")
-                else:
-                    print(f"   ⚠️  No backup file found for {symbol}")
-                    return False
-            
-            # Load backup data
-            with open(backup_file, 'r') as f:
-                backup_data = json.load(f)
-            
-            candles = backup_data.get("candles", [])
-            if not candles:
-                print(f"   ⚠️  Backup file has no candles")
-                return False
-            
-            # Clear existing candles in Redis
-            candle_key = f"analysis_candles:{symbol}"
-            await cache.delete(candle_key)
-            
-            # Restore candles to Redis (oldest-first iteration → newest ends at head after all lpushes)
-            # Backup stores candles oldest-first. By pushing oldest first with lpush, each newer push
-            # goes to the head, so the final list has newest at index 0 (lpush convention).
-            for candle in candles:
-                candle_json = json.dumps(candle)
-                await cache.lpush(candle_key, candle_json)
-            
-            # Trim to keep only 100 most recent
-            await cache.ltrim(candle_key, 0, 99)
-            
-            # Verify restoration
-            restored_candles = await cache.lrange(candle_key, 0, 199)
-            restored = len(restored_candles)
-            
-            print(f"   ✅ Restored {restored} candles from backup")
-            print(f"      Backup date: {backup_data.get('backup_date', 'N/A')}")
-            
-            if backup_data.get('last_candle'):
-                print(f"      Latest candle: {backup_data['last_candle'].get('timestamp', 'N/A')}")
-            
+            restored = 0
+            for timeframe, prefix in CACHE_KEYS.items():
+                records = archive.last(symbol, timeframe, RESTORE_CANDLES)
+                if not len(records):
+                    continue
+                
+                # Oldest first: LPUSH puts each newer candle at the head (index 0 = newest)
+                candle_key = f"{prefix}:{symbol}"
+                await cache.delete(candle_key)
+                await cache.lpush(candle_key, *(json.dumps(c) for c in candles_from_records(records)))
+                print(f"   ✅ {timeframe}: restored {len(records)} candles")
+                if timeframe == "5m":
+                    restored = len(records)
+                    latest = candles_from_records(records[-1:])[0]
+                    print(f"      Latest candle: {latest['timestamp']}")
+            
+            if not restored:
+                print(f"   ⚠️  No archived candles found for {symbol}")
             return restored > 0
             
         except Exception as e:
@@ -232,25 +209,22 @@ class CandleBackupService:
 
     @staticmethod
     def list_backup_files() -> List[Dict[str, str]]:
-        """List all available backup files"""
-        backups = []
-        for backup_file in sorted(BACKUP_DIR.glob("*_candles_*.json"), reverse=True):
-            try:
-                with open(backup_file, 'r') as f:
-                    data = json.load(f)
-                backups.append({
-                    "file": backup_file.name,
-                    "symbol": data.get("symbol", "UNKNOWN"),
-                    "backup_date": data.get("backup_date", "UNKNOWN"),
-                    "candle_count": data.get("candle_count", 0)
-                })
-            except Exception:
-                pass
-        return backups
+        """List archive partitions (read from the archive index, no partition is opened)"""
+        return [
+            {
+                "file": part["file"],
+                "symbol": part["symbol"],
+                "timeframe": part["timeframe"],
+                "month": part["month"],
+                "backup_date": part["updated"],
+                "candle_count": part["rows"],
+            }
+            for part in get_candle_archive().partitions()
+        ]
 
     @staticmethod
     def cleanup_old_backups(days: int = 7):
-        """Remove backup files older than specified days"""
+        """Remove legacy JSON backup files older than specified days (the archive keeps everything)"""
         from datetime import timedelta
         
         cutoff_time = datetime.now(IST) - timedelta(days=days)
@@ -34,13 +34,13 @@ import logging
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import WebSocket
 import pytz
 
 from services.cache import get_cache
 from services.candle_intelligence_ai import CandleIntelligenceAIEngine
+from services.ws_outbox import BroadcastManager
 
 logger = logging.getLogger(__name__)
 IST = pytz.timezone("Asia/Kolkata")
@@ -1236,50 +1236,11 @@ def _signal_to_strength(signal: str) -> float:
 # SECTION 6 — LIVE SERVICE (reads cache, broadcasts via WebSocket)
 # ──────────────────────────────────────────────────────────────────────────────
 
-class CandleIntelligenceConnectionManager:
+class CandleIntelligenceConnectionManager(BroadcastManager):
     """Isolated WebSocket manager for Candle Intelligence."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
-
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(ws.send_text(json.dumps(data, default=str)), timeout=3.0)
-        except Exception:
-            await self.disconnect(ws)
-
-    @property
-    def client_count(self) -> int:
-        return len(self._connections)
-
 
-candle_intel_manager = CandleIntelligenceConnectionManager()
+candle_intel_manager = CandleIntelligenceConnectionManager("candle_intelligence")
 
 
 class CandleIntelligenceService:
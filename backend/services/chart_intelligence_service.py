@@ -20,14 +20,16 @@ import logging
 import math
 import time as time_mod
 from datetime import datetime, time, date, timedelta
-from typing import Dict, Any, Optional, List, Set
+from typing import Dict, Any, Optional, List
 from pathlib import Path
 
-from fastapi import WebSocket
 import pytz
 
 from services.cache import CacheService, _SHARED_CACHE
+from services.cadence import get_cadence_controller
 from services.chart_intelligence_ai import ChartIntelligenceAIEngine
+from services.session_clock import session_clock
+from services.ws_outbox import BroadcastManager
 from config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -54,50 +56,11 @@ _CHART_AI_ENGINE = ChartIntelligenceAIEngine()
 
 # ── Isolated WebSocket manager ───────────────────────────────────────────────
 
-class ChartIntelConnectionManager:
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
+class ChartIntelConnectionManager(BroadcastManager):
+    """Isolated WebSocket manager for Chart Intelligence."""
 
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
 
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(
-                ws.send_text(json.dumps(data, default=str)), timeout=3.0
-            )
-        except Exception:
-            await self.disconnect(ws)
-
-    @property
-    def client_count(self) -> int:
-        return len(self._connections)
-
-
-chart_intel_manager = ChartIntelConnectionManager()
+chart_intel_manager = ChartIntelConnectionManager("chart_intelligence")
 
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
@@ -745,7 +708,8 @@ class ChartIntelligenceService:
         self._daily_cache: Dict[str, Any] = {}  # symbol -> {date, candles}
         self._last_save_time: float = 0.0
         self._last_full_fetch: float = 0.0
-        self._cadence_broadcast = 0.5   # 0.5s — TradingView-like live candle motion
+        self._cadence_broadcast = 0.5   # 0.5s base — TradingView-like live candle motion, adapted by services/cadence.py
+        self._cadence = get_cadence_controller().register("chart_intelligence", base=self._cadence_broadcast)
         self._cadence_fetch = 1.5       # Full Zerodha candle re-fetch every 1.5s (fast volume refresh)
         self._cadence_closed = 60.0
         self._heartbeat_interval = 30.0
@@ -782,9 +746,8 @@ class ChartIntelligenceService:
             return
 
         try:
-            from kiteconnect import KiteConnect
-            self._kite = KiteConnect(api_key=cfg.zerodha_api_key)
-            self._kite.set_access_token(cfg.zerodha_access_token)
+            from services.kite_gateway import get_kite_gateway
+            self._kite = get_kite_gateway().sync_client()
             try:
                 self._kite.profile()
                 self._kite_initialized = True
@@ -885,15 +848,9 @@ class ChartIntelligenceService:
     # ── Market phase ─────────────────────────────────────────────────────
 
     def _get_market_phase(self) -> str:
-        now = datetime.now(IST)
-        if now.weekday() >= 5:
-            return "CLOSED"
-        t = now.time()
-        if time(9, 15) <= t <= time(15, 30):
-            return "LIVE"
-        if time(9, 0) <= t < time(9, 15):
-            return "PRE_OPEN"
-        return "CLOSED"
+        # Session clock: O(1) lookup on the precomputed timeline (holidays included).
+        status = session_clock.status()
+        return "PRE_OPEN" if status == "FREEZE" else status
 
     # ── Fetch candle data from Zerodha ───────────────────────────────────
 
@@ -1250,6 +1207,7 @@ class ChartIntelligenceService:
         _closed_fetch_done = False
 
         while self._running:
+            started = time_mod.perf_counter()
             try:
                 phase = self._get_market_phase()
                 now_ts = time_mod.time()
@@ -1317,7 +1275,8 @@ class ChartIntelligenceService:
                             self._last_save_time = now_ts
                             await asyncio.to_thread(_save_persistent, self._last_snapshot)
 
-                    await asyncio.sleep(self._cadence_broadcast)
+                    self._cadence.record(time_mod.perf_counter() - started)
+                    await asyncio.sleep(self._cadence.interval)
 
                 else:
                     # CLOSED with data
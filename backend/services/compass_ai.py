@@ -1,26 +1,34 @@
 from __future__ import annotations
 
-from collections import deque
-from typing import Any, Deque, Dict
+from typing import Any, Dict
 
 import numpy as np
 
+from services.rolling_stats import RollingStats
+
 tf = None  # TensorFlow disabled - numpy softmax fallback used (faster startup)
 
 
 class CompassAIEngine:
     """Low-latency TensorFlow-ready AI augmentation for Institutional Market Compass."""
 
-    def __init__(self, seq_len: int = 200):
-        self._seq_len = seq_len
-        self._score_buffers: Dict[str, Deque[float]] = {}
-        self._premium_buffers: Dict[str, Deque[float]] = {}
+    DRIFT_WINDOW = 10   # mean step over the last 10 readings
+    STD_WINDOW = 20     # dispersion over the last 20
+
+    def __init__(self):
+        self._score_buffers: Dict[str, RollingStats] = {}
+        self._premium_buffers: Dict[str, RollingStats] = {}
 
-    def _buf(self, store: Dict[str, Deque[float]], symbol: str) -> Deque[float]:
+    def _buf(self, store: Dict[str, RollingStats], symbol: str) -> RollingStats:
         if symbol not in store:
-            store[symbol] = deque(maxlen=self._seq_len)
+            store[symbol] = RollingStats(self.STD_WINDOW)
         return store[symbol]
 
+    def _drift(self, buf: RollingStats) -> float:
+        """Mean of the step-to-step differences over the last DRIFT_WINDOW values."""
+        n = min(len(buf), self.DRIFT_WINDOW)
+        return (buf[-1] - buf[-n]) / (n - 1)
+
     def _softmax(self, logits: np.ndarray) -> np.ndarray:
         shifted = logits - np.max(logits)
         exp_v = np.exp(shifted)
@@ -59,21 +67,19 @@ class CompassAIEngine:
         score_buf = self._buf(self._score_buffers, symbol)
         prem_buf = self._buf(self._premium_buffers, symbol)
 
-        score_buf.append(float(raw_score))
-        prem_buf.append(float(near_premium_pct))
+        score_buf.push(raw_score)
+        prem_buf.push(near_premium_pct)
 
         if len(score_buf) >= 8:
-            sarr = np.asarray(score_buf, dtype=np.float64)
-            score_drift = float(np.mean(np.diff(sarr[-10:]))) if len(sarr) >= 10 else float(np.mean(np.diff(sarr)))
-            score_std = float(np.std(sarr[-20:])) if len(sarr) >= 20 else float(np.std(sarr))
+            score_drift = self._drift(score_buf)
+            score_std = score_buf.std
         else:
             score_drift = 0.0
             score_std = abs(raw_score) * 0.24
 
         if len(prem_buf) >= 8:
-            parr = np.asarray(prem_buf, dtype=np.float64)
-            premium_drift = float(np.mean(np.diff(parr[-10:]))) if len(parr) >= 10 else float(np.mean(np.diff(parr)))
-            premium_std = float(np.std(parr[-20:])) if len(parr) >= 20 else float(np.std(parr))
+            premium_drift = self._drift(prem_buf)
+            premium_std = prem_buf.std
         else:
             premium_drift = 0.0
             premium_std = abs(near_premium_pct) * 0.35
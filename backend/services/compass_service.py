@@ -36,16 +36,19 @@ import math
 import time
 import logging
 from datetime import datetime, time as dtime
-from typing import Dict, Any, Optional, List, Tuple, Deque, Set
-from fastapi import WebSocket
+from typing import Dict, Any, Optional, List, Tuple, Deque
 
 import pytz
 
 from config import get_settings
 from services.cache import CacheService
+from services.cadence import get_cadence_controller
 from services.auth_state_machine import auth_state_manager
 from services.contract_manager import ContractManager
 from services.institutional_pressure_service import compute_institutional_pressure
+from services.quote_scheduler import Priority, get_quote_scheduler
+from services.snapshot_bus import COMPASS, snapshot_bus
+from services.ws_outbox import BroadcastManager
 
 logger = logging.getLogger(__name__)
 IST = pytz.timezone("Asia/Kolkata")
@@ -68,54 +71,16 @@ WEIGHTS: Dict[str, float] = {
 
 BULL_THRESHOLD =  0.18   # score above this → BULLISH
 BEAR_THRESHOLD = -0.18   # score below this → BEARISH
+FUTURES_LEAD_MIN_CORR = 0.3   # lagged futures→spot correlation that counts as leading
 
 
 # ─── Isolated WebSocket manager ───────────────────────────────────────────────
 
-class CompassConnectionManager:
+class CompassConnectionManager(BroadcastManager):
     """Lightweight WebSocket manager — completely isolated from main manager."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
-
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(ws.send_text(json.dumps(data, default=str)), timeout=3.0)
-        except Exception:
-            await self.disconnect(ws)
 
-    @property
-    def client_count(self) -> int:
-        return len(self._connections)
-
-
-compass_manager = CompassConnectionManager()
+compass_manager = CompassConnectionManager("compass")
 
 
 # ─── Pure technical analysis functions ────────────────────────────────────────
@@ -315,6 +280,28 @@ def _parse_candle(item) -> Optional[Dict]:
 
 # ─── Signal computation ────────────────────────────────────────────────────────
 
+def _futures_leading(symbol: str, lead: Optional[Dict], near_fut_candles: List[Dict],
+                     near_ltp: float, spot_change_pct: float) -> bool:
+    """
+    Whether near futures lead spot: the correlation matrix's lead-lag when it
+    resolves a leader (a lag of at least one bar), else futures %chg from
+    today's open outrunning spot %chg. Futures usually lead spot by well under
+    a correlation bar, so a same-bar reading says nothing either way.
+    """
+    if lead is not None and lead["leader"] is not None:
+        return lead["leader"] == f"{symbol}-FUT" and lead["correlation"] >= FUTURES_LEAD_MIN_CORR
+    if not near_fut_candles or not near_fut_candles[0].get("open"):
+        return False
+    fut_open = near_fut_candles[0]["open"]
+    if fut_open <= 0 or near_ltp <= 0:
+        return False
+    fut_today_chg_pct = (near_ltp - fut_open) / fut_open * 100
+    return (
+        abs(fut_today_chg_pct) > abs(spot_change_pct) + 0.08
+        and math.copysign(1, fut_today_chg_pct) == math.copysign(1, spot_change_pct)
+    )
+
+
 def _compute_all_signals(
     spot_candles: List[Dict],
     spot_price: float,
@@ -807,7 +794,7 @@ class CompassService:
     """
 
     INDICES              = ["NIFTY", "BANKNIFTY", "SENSEX"]
-    TICK_INTERVAL        = 2.0      # broadcast cadence (seconds)
+    TICK_INTERVAL        = 2.0      # base broadcast cadence (seconds), adapted by services/cadence.py
     INSTRUMENT_REFRESH   = 3600     # re-discover contract tokens (seconds)
     FUTURES_CANDLE_REFRESH = 300    # re-fetch futures 5-min candles (seconds)
 
@@ -827,6 +814,7 @@ class CompassService:
         self._task:   Optional[asyncio.Task] = None
         self._candle_task: Optional[asyncio.Task] = None
         self._running = False
+        self._cadence = get_cadence_controller().register("compass", base=self.TICK_INTERVAL)
 
     # ── Kite client ──────────────────────────────────────────────────────────
 
@@ -836,9 +824,8 @@ class CompassService:
         s = get_settings()
         if not s.zerodha_api_key or not s.zerodha_access_token:
             return None
-        from kiteconnect import KiteConnect
-        kite = KiteConnect(api_key=s.zerodha_api_key)
-        kite.set_access_token(s.zerodha_access_token)
+        from services.kite_gateway import get_kite_gateway
+        kite = get_kite_gateway().sync_client(s.zerodha_access_token)
         return kite
 
     # ── One-time startup spot-price fetch (works even when market is closed) ─
@@ -859,7 +846,7 @@ class CompassService:
             "BSE:SENSEX":     "SENSEX",
         }
         try:
-            quotes = kite.quote(list(QUOTE_MAP.keys()))
+            quotes = get_quote_scheduler().quote_sync(QUOTE_MAP, Priority.ANALYTICS)
             for q_key, sym in QUOTE_MAP.items():
                 q = quotes.get(q_key, {})
                 if not q:
@@ -977,9 +964,8 @@ class CompassService:
             return
 
         try:
-            loop = asyncio.get_event_loop()
             # quote() returns full OHLC including prev-day close; ltp() does not
-            quote_data = await loop.run_in_executor(None, lambda: kite.quote(ltp_keys))
+            quote_data = await get_quote_scheduler().quote(ltp_keys, Priority.ANALYTICS)
             for name, key in name_map.items():
                 entry = quote_data.get(key, {})
                 if not entry:
@@ -1211,21 +1197,15 @@ class CompassService:
         near_fut_candles = self._futures_candles.get(symbol, [])
         near_fut_rsi  = None
         near_fut_vwap = None
-        futures_leading = False
         if near_fut_candles:
             fc_closes = [c.get("close", 0) for c in near_fut_candles]
             near_fut_rsi  = _rsi(fc_closes, 14)
             near_fut_vwap = _vwap(near_fut_candles)
-            # Futures leading if %chg from today's open > spot %chg
-            if len(near_fut_candles) >= 1 and near_fut_candles[0].get("open"):
-                fut_open = near_fut_candles[0]["open"]
-                near_ltp = futures_info["near"]["price"] if futures_info["near"] else 0
-                if fut_open > 0 and near_ltp > 0:
-                    fut_today_chg_pct = (near_ltp - fut_open) / fut_open * 100
-                    futures_leading = (
-                        abs(fut_today_chg_pct) > abs(spot_change_pct) + 0.08
-                        and math.copysign(1, fut_today_chg_pct) == math.copysign(1, spot_change_pct)
-                    )
+        from services.correlation_matrix import get_correlation_service
+        futures_leading = _futures_leading(
+            symbol, get_correlation_service().futures_lead(symbol), near_fut_candles,
+            futures_info["near"]["price"] if futures_info["near"] else 0, spot_change_pct,
+        )
 
         # ── 5-minute short-term predictions ──────────────────────────────────
         pred_5m, pred_5m_conf = _predict_5m(signals, prem_slope, near_fut_rsi)
@@ -1341,6 +1321,7 @@ class CompassService:
         logger.info("🧭 Compass broadcast loop started (v2 — 6-factor candle intelligence)")
 
         while self._running:
+            started = time.perf_counter()
             try:
                 # Periodically refresh contract tokens
                 if time.time() - self._last_instrument_refresh > self.INSTRUMENT_REFRESH:
@@ -1357,6 +1338,7 @@ class CompassService:
                     if data:
                         payload[sym] = data
                         self._latest[sym] = data
+                        snapshot_bus.publish(COMPASS, sym, data)
 
                 if payload:
                     await compass_manager.broadcast({
@@ -1376,7 +1358,8 @@ class CompassService:
                 _status = get_market_status()
             except Exception:
                 _status = "CLOSED"
-            await asyncio.sleep(self.TICK_INTERVAL if _status == "LIVE" else 30)
+            self._cadence.record(time.perf_counter() - started)
+            await asyncio.sleep(self._cadence.interval if _status == "LIVE" else 30)
 
         logger.info("🧭 Compass broadcast loop stopped")
 
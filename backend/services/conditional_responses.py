@@ -0,0 +1,200 @@
+"""Conditional GET + compression for the polled REST endpoints.
+
+The dashboard polls `/api/advanced/*`, `/api/analysis/*` and the outlook
+endpoints every few seconds and mostly gets the same JSON back. This ASGI
+middleware sits in front of the routers and, for 200 JSON responses to
+GET/HEAD under the configured prefixes:
+
+    • tags the body with a weak ETag (blake2b of the serialized bytes), or
+      keeps an ETag the endpoint already set (e.g. a service snapshot version)
+    • answers a matching `If-None-Match` with an empty 304
+    • negotiates `br` (when the optional `brotli` package is installed) or
+      `gzip` for bodies of at least `_MIN_COMPRESS_BYTES`
+    • leaves non-JSON, non-200 and very large streamed bodies untouched
+    • keeps the encoded bytes in a small LRU keyed by (ETag, encoding), so
+      identical bodies polled by many clients are compressed once
+
+Public surface:
+    app.add_middleware(ConditionalResponseMiddleware, prefixes=("/api/",))
+    conditional_metrics() -> dict
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Brotli needs the optional `brotli` package — gzip is always available.
+try:
+    import brotli as _BROTLI
+except ImportError:
+    _BROTLI = None
+
+_MIN_COMPRESS_BYTES = 1024
+_GZIP_LEVEL = 5
+_BROTLI_QUALITY = 5
+_MAX_BUFFER = 4 * 1024 * 1024  # larger streamed bodies pass through untouched
+_MAX_ENCODED = 256             # (etag, encoding) → bytes entries kept for reuse
+_DROP_ON_304 = ("content-length", "content-type", "content-encoding")
+
+_metrics: Dict[str, Any] = {
+    "responses": 0,
+    "not_modified": 0,
+    "compressed": {"br": 0, "gzip": 0},
+    "encode_reused": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+}
+_encoded: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+
+def body_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110 §13.1.2) against an If-None-Match list."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """'br' or 'gzip' from an Accept-Encoding header (q=0 excludes)."""
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    wildcard = accepted.get("*", 0.0)
+    if _BROTLI is not None and accepted.get("br", wildcard) > 0:
+        return "br"
+    if accepted.get("gzip", wildcard) > 0:
+        return "gzip"
+    return None
+
+
+def encode(body: bytes, encoding: str, etag: str) -> bytes:
+    key = (etag, encoding)
+    cached = _encoded.get(key)
+    if cached is not None:
+        _encoded.move_to_end(key)
+        _metrics["encode_reused"] += 1
+        return cached
+    if encoding == "br":
+        data = _BROTLI.compress(body, quality=_BROTLI_QUALITY)
+    else:
+        data = gzip.compress(body, compresslevel=_GZIP_LEVEL, mtime=0)
+    _encoded[key] = data
+    if len(_encoded) > _MAX_ENCODED:
+        _encoded.popitem(last=False)
+    return data
+
+
+def conditional_metrics() -> Dict[str, Any]:
+    return {
+        **_metrics,
+        "compressed": dict(_metrics["compressed"]),
+        "encoded_cache_entries": len(_encoded),
+        "brotli_available": _BROTLI is not None,
+    }
+
+
+class ConditionalResponseMiddleware:
+    """ETag / 304 / gzip-br for buffered JSON responses under ``prefixes``."""
+
+    def __init__(self, app: ASGIApp, prefixes: Sequence[str] = ("/api/",),
+                 min_size: int = _MIN_COMPRESS_BYTES) -> None:
+        self.app = app
+        self.prefixes = tuple(prefixes)
+        self.min_size = min_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (scope["type"] != "http" or scope["method"] not in ("GET", "HEAD")
+                or not scope["path"].startswith(self.prefixes)):
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        start: Optional[Message] = None
+        chunks = []
+        buffered = 0
+        passthrough = False
+
+        async def buffered_send(message: Message) -> None:
+            nonlocal start, passthrough, buffered
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if (message["status"] != 200 or "content-encoding" in headers
+                        or not headers.get("content-type", "").startswith("application/json")):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body"):
+                # BaseHTTPMiddleware re-streams every body in chunks; keep buffering
+                # unless this is a genuinely large stream.
+                buffered += len(chunks[-1])
+                if buffered > _MAX_BUFFER:
+                    passthrough = True
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+                return
+            await self._finish(start, b"".join(chunks), request_headers, send)
+
+        await self.app(scope, receive, buffered_send)
+
+    async def _finish(self, start: Message, body: bytes, request_headers: Headers, send: Send) -> None:
+        headers = MutableHeaders(raw=list(start.get("headers", [])))
+        etag = headers.get("etag") or body_etag(body)
+        headers["etag"] = etag
+        headers.add_vary_header("Accept-Encoding")
+        if "cache-control" not in headers:
+            headers["cache-control"] = "no-cache"   # always revalidate; 304 keeps polls cheap
+        _metrics["responses"] += 1
+        _metrics["bytes_in"] += len(body)
+
+        if etag_matches(request_headers.get("if-none-match"), etag):
+            _metrics["not_modified"] += 1
+            for name in _DROP_ON_304:
+                if name in headers:
+                    del headers[name]
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        encoding = negotiate_encoding(request_headers.get("accept-encoding")) if len(body) >= self.min_size else None
+        if encoding:
+            body = encode(body, encoding, etag)
+            headers["content-encoding"] = encoding
+            _metrics["compressed"][encoding] += 1
+        headers["content-length"] = str(len(body))
+        _metrics["bytes_out"] += len(body)
+        await send({"type": "http.response.start", "status": 200, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
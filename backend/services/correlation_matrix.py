@@ -0,0 +1,337 @@
+"""Cross-asset correlation matrix — incremental co-moments with lead-lag.
+
+Correlations were recomputed from scratch wherever they were needed: market
+compass ran pairwise Pearson over whole price series per tick, compass
+decided "futures leading" by comparing today's % change of futures and spot,
+and the global impact analyzer used a hard-coded 0.65 for VIX. The matrix
+keeps one aligned return series per asset (indices, their current-month
+futures, INDIA VIX and the global indices) and, for every lag k = 0..L, the
+windowed co-moments of the pairs (r[t−k], r[t]):
+
+    C[k]           Σ x yᵀ                      (L+1, n, n)
+    Sx[k], Sy[k]   Σ x, Σ y                    (L+1, n)
+    Qx[k], Qy[k]   Σ x², Σ y²                  (L+1, n)
+
+A bar adds one outer product per lag and removes the one leaving the window,
+O(L·n²) with no re-scan; the sums are rebuilt exactly from the history ring
+once per window, as the rolling_stats accumulators do. Lag 0 is the ordinary
+covariance / correlation matrix; lag k > 0 says how well asset i's return k
+bars ago tracks asset j's return now, i.e. whether i leads j:
+
+    service = get_correlation_service()
+    service.matrix.correlation_of("NIFTY", "INDIAVIX")      # −0.71
+    service.matrix.lead_lag("NIFTY-FUT", "NIFTY")           # {"leader": "NIFTY-FUT", "lag": 1, ...}
+
+The service samples a bar every CORRELATION_BAR_SECONDS from the instrument
+universe's last prices and the global indices snapshot, so every series is
+aligned to the same clock. An asset without a fresh price contributes a zero
+return for that bar; pairs are only reported once both assets have had
+MIN_SAMPLES real returns in the window. Bars are skipped while no local
+instrument ticks (market closed).
+
+Single writer (the sampler on the event loop); readers run on the same loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from config import get_settings
+from services.instrument_universe import INDEX_SYMBOLS, InstrumentUniverse, get_instrument_universe
+
+logger = logging.getLogger(__name__)
+
+LOCAL_ASSETS = (*INDEX_SYMBOLS, *(f"{s}-FUT" for s in INDEX_SYMBOLS), "INDIAVIX")
+MIN_SAMPLES = 20            # real returns both assets need before a pair is reported
+_VAR_FLOOR = 1e-16          # return variance below this (≈ 0.0001 bp std) counts as flat
+
+
+class CorrelationMatrix:
+    """Windowed correlation and lagged cross-correlation of aligned return series."""
+
+    def __init__(self, assets: Sequence[str], window: int = 120, max_lag: int = 3,
+                 min_samples: int = MIN_SAMPLES) -> None:
+        if window < 2:
+            raise ValueError("window must hold at least two bars")
+        if max_lag < 0:
+            raise ValueError("max_lag must be >= 0")
+        self.assets = tuple(assets)
+        self.index = {asset: i for i, asset in enumerate(self.assets)}
+        self.window = int(window)
+        self.max_lag = int(max_lag)
+        self.min_samples = int(min_samples)
+        n, lags = len(self.assets), self.max_lag + 1
+        self._cap = self.window + self.max_lag + 1      # oldest row a removal still needs
+        self._rows = np.zeros((self._cap, n), dtype=np.float64)
+        self._valid = np.zeros((self._cap, n), dtype=bool)
+        self._cross = np.zeros((lags, n, n), dtype=np.float64)
+        self._sx = np.zeros((lags, n), dtype=np.float64)
+        self._sy = np.zeros((lags, n), dtype=np.float64)
+        self._qx = np.zeros((lags, n), dtype=np.float64)
+        self._qy = np.zeros((lags, n), dtype=np.float64)
+        self._pairs = np.zeros(lags, dtype=np.int64)
+        self._observed = np.zeros(n, dtype=np.int64)     # real returns per asset in the window
+        self._last_price = np.zeros(n, dtype=np.float64)
+        self._t = 0                                      # bars pushed
+
+    # ── Updates ─────────────────────────────────────────────────────────
+
+    def push(self, returns: Sequence[float], valid: Optional[Sequence[bool]] = None) -> None:
+        """Fold in one bar of returns, aligned to ``assets``."""
+        y = np.asarray(returns, dtype=np.float64)
+        mask = np.ones(len(self.assets), dtype=bool) if valid is None else np.asarray(valid, dtype=bool)
+        y = np.where(mask, y, 0.0)
+        t, cap = self._t, self._cap
+        self._rows[t % cap] = y
+        self._valid[t % cap] = mask
+        for k in range(min(t, self.max_lag) + 1):
+            self._add(k, self._rows[(t - k) % cap], y, 1.0)
+            self._pairs[k] += 1
+            if self._pairs[k] > self.window:
+                old = t - self.window
+                self._add(k, self._rows[(old - k) % cap], self._rows[old % cap], -1.0)
+                self._pairs[k] -= 1
+        self._observed += mask
+        if t >= self.window:
+            self._observed -= self._valid[(t - self.window) % cap]
+        self._t = t + 1
+        if self._t % self.window == 0:
+            self._resync()
+
+    def push_prices(self, prices: Mapping[str, float]) -> None:
+        """Fold in one bar of prices; returns are log changes from the previous bar."""
+        current = np.array([float(prices.get(asset) or 0.0) for asset in self.assets])
+        valid = (current > 0) & (self._last_price > 0)
+        returns = np.zeros_like(current)
+        np.log(current, out=returns, where=valid)
+        returns[valid] -= np.log(self._last_price[valid])
+        self._last_price = np.where(current > 0, current, self._last_price)
+        self.push(returns, valid)
+
+    def _add(self, k: int, x: np.ndarray, y: np.ndarray, sign: float) -> None:
+        self._cross[k] += sign * np.outer(x, y)
+        self._sx[k] += sign * x
+        self._sy[k] += sign * y
+        self._qx[k] += sign * x * x
+        self._qy[k] += sign * y * y
+
+    def _resync(self) -> None:
+        last, cap = self._t - 1, self._cap
+        for k in range(self.max_lag + 1):
+            ts = np.arange(max(k, last - self.window + 1), last + 1)
+            x, y = self._rows[(ts - k) % cap], self._rows[ts % cap]
+            self._cross[k] = x.T @ y
+            self._sx[k], self._sy[k] = x.sum(axis=0), y.sum(axis=0)
+            self._qx[k], self._qy[k] = (x * x).sum(axis=0), (y * y).sum(axis=0)
+            self._pairs[k] = len(ts)
+
+    # ── Queries ─────────────────────────────────────────────────────────
+
+    @property
+    def samples(self) -> int:
+        """Bars in the current window."""
+        return int(self._pairs[0])
+
+    def __len__(self) -> int:
+        return self.samples
+
+    def covariance(self, lag: int = 0) -> np.ndarray:
+        """Population covariance of (asset i at t−lag, asset j at t); negative lags transpose."""
+        k = abs(lag)
+        self._check_lag(k)
+        n = self._pairs[k]
+        if n == 0:
+            return np.zeros((len(self.assets),) * 2)
+        cov = self._cross[k] / n - np.outer(self._sx[k] / n, self._sy[k] / n)
+        return cov if lag >= 0 else cov.T
+
+    def correlation(self, lag: int = 0) -> np.ndarray:
+        """Correlation matrix at ``lag`` (0 where either side has no variance)."""
+        k = abs(lag)
+        self._check_lag(k)
+        n = self._pairs[k]
+        if n < 2:
+            return np.zeros((len(self.assets),) * 2)
+        var_x = self._qx[k] / n - (self._sx[k] / n) ** 2
+        var_y = self._qy[k] / n - (self._sy[k] / n) ** 2
+        var_x[var_x < _VAR_FLOOR] = 0.0
+        var_y[var_y < _VAR_FLOOR] = 0.0
+        denom = np.sqrt(np.outer(var_x, var_y))
+        cov = self._cross[k] / n - np.outer(self._sx[k] / n, self._sy[k] / n)
+        corr = np.divide(cov, denom, out=np.zeros_like(cov), where=denom > 0)
+        np.clip(corr, -1.0, 1.0, out=corr)
+        return corr if lag >= 0 else corr.T
+
+    def ready(self, *assets: str) -> bool:
+        """True once every asset is known and has MIN_SAMPLES real returns in the window."""
+        for asset in assets:
+            i = self.index.get(asset)
+            if i is None or self._observed[i] < self.min_samples:
+                return False
+        return True
+
+    def correlation_of(self, a: str, b: str, lag: int = 0) -> Optional[float]:
+        """corr(a[t−lag], b[t]), or None until both assets are ready."""
+        if not self.ready(a, b):
+            return None
+        return float(self.correlation(lag)[self.index[a], self.index[b]])
+
+    def beta(self, a: str, b: str) -> Optional[float]:
+        """Slope of ``a``'s returns regressed on ``b``'s, or None until both are ready."""
+        if not self.ready(a, b):
+            return None
+        i, j = self.index[a], self.index[b]
+        cov = self.covariance()
+        return float(cov[i, j] / cov[j, j]) if cov[j, j] > _VAR_FLOOR else 0.0
+
+    def lead_lag(self, a: str, b: str) -> Optional[Dict[str, Any]]:
+        """Strongest cross-correlation between ``a`` and ``b`` over lags −L..L.
+
+        A positive lag means ``a`` leads ``b`` by that many bars; the leader is
+        None when the same-bar correlation is the strongest.
+        """
+        if not self.ready(a, b) or a == b:
+            return None
+        i, j = self.index[a], self.index[b]
+        by_lag = {0: float(self.correlation(0)[i, j])}
+        for k in range(1, min(self.max_lag, self.samples - 2) + 1):
+            corr = self.correlation(k)
+            by_lag[k] = float(corr[i, j])        # a[t−k] vs b[t]
+            by_lag[-k] = float(corr[j, i])       # b[t−k] vs a[t]
+        lag = max(by_lag, key=lambda key: (abs(by_lag[key]), -abs(key)))
+        return {
+            "leader": a if lag > 0 else b if lag < 0 else None,
+            "lag": lag,
+            "correlation": round(by_lag[lag], 4),
+            "contemporaneous": round(by_lag[0], 4),
+            "byLag": {str(key): round(value, 4) for key, value in sorted(by_lag.items())},
+        }
+
+    def strongest(self, asset: str, among: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Ready partners of ``asset`` ordered by |same-bar correlation|."""
+        if not self.ready(asset):
+            return []
+        row = self.correlation()[self.index[asset]]
+        partners = [p for p in (among or self.assets) if p != asset and self.ready(p)]
+        ranked = sorted(partners, key=lambda p: -abs(row[self.index[p]]))
+        return [{"symbol": p, "correlation": round(float(row[self.index[p]]), 4)} for p in ranked]
+
+    def _check_lag(self, k: int) -> None:
+        if k > self.max_lag:
+            raise ValueError(f"lag {k} beyond max_lag {self.max_lag}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        ready = [a for a in self.assets if self.ready(a)]
+        corr = self.correlation()
+        idx = [self.index[a] for a in ready]
+        return {
+            "assets": ready,
+            "samples": self.samples,
+            "correlation": np.round(corr[np.ix_(idx, idx)], 4).tolist(),
+        }
+
+
+class CorrelationService:
+    """Samples aligned bars for the correlation matrix and serves its readers."""
+
+    def __init__(self, universe: Optional[InstrumentUniverse] = None, bar_seconds: Optional[float] = None,
+                 window: Optional[int] = None, max_lag: Optional[int] = None) -> None:
+        from services.global_indices_service import GlobalIndicesService
+
+        settings = get_settings()
+        self.universe = universe or get_instrument_universe()
+        self.bar_seconds = bar_seconds or settings.correlation_bar_seconds
+        self.global_assets = tuple(GlobalIndicesService.INDICES)
+        self.matrix = CorrelationMatrix(
+            LOCAL_ASSETS + self.global_assets,
+            window=window or settings.correlation_window,
+            max_lag=settings.correlation_max_lag if max_lag is None else max_lag,
+        )
+        self.bars = 0
+        self.skipped = 0
+        self._last_bar = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    def sample(self, now: Optional[float] = None, global_snapshot: Optional[Mapping[str, Dict[str, Any]]] = None) -> bool:
+        """Take one bar of prices; False (and nothing pushed) while no local instrument ticked."""
+        now = now or time.time()
+        universe = self.universe
+        prices: Dict[str, float] = {}
+        fresh = False
+        for asset in LOCAL_ASSETS:
+            iid = universe.id_of(asset)
+            if iid is None:
+                continue
+            prices[asset] = float(universe.state.last_price[iid])
+            fresh = fresh or universe.state.last_update[iid] > self._last_bar
+        if not fresh:
+            self.skipped += 1
+            return False
+        if global_snapshot is None:
+            from services.global_indices_service import get_global_indices_service
+            global_snapshot = get_global_indices_service().get_snapshot()
+        for asset in self.global_assets:
+            entry = global_snapshot.get(asset) or {}
+            if entry.get("status") in ("LIVE", "STALE"):
+                prices[asset] = float(entry.get("price") or 0.0)
+        self.matrix.push_prices(prices)
+        self._last_bar = now
+        self.bars += 1
+        return True
+
+    async def _loop(self) -> None:
+        while self._running:
+            try:
+                self.sample()
+            except Exception as exc:
+                logger.error("Correlation sampler error: %s", exc)
+            await asyncio.sleep(self.bar_seconds)
+
+    async def start(self) -> None:
+        if self._running or not get_settings().correlation_enabled:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def futures_lead(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Lead-lag of ``symbol``'s current-month future against the index."""
+        return self.matrix.lead_lag(f"{symbol}-FUT", symbol)
+
+    def report(self) -> Dict[str, Any]:
+        matrix = self.matrix
+        return {
+            "running": self._running,
+            "barSeconds": self.bar_seconds,
+            "window": matrix.window,
+            "maxLag": matrix.max_lag,
+            "bars": self.bars,
+            "skipped": self.skipped,
+            "lastBar": self._last_bar or None,
+            "futuresLead": {s: self.futures_lead(s) for s in INDEX_SYMBOLS},
+            **matrix.snapshot(),
+        }
+
+
+_service: Optional[CorrelationService] = None
+
+
+def get_correlation_service() -> CorrelationService:
+    global _service
+    if _service is None:
+        _service = CorrelationService()
+    return _service
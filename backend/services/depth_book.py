@@ -0,0 +1,367 @@
+"""Depth book: market-depth history as NumPy rings plus microstructure features.
+
+Order flow used to keep KiteTicker's 5-level `depth` as lists of dicts, copied
+into every OrderFlowMetrics. A DepthBook stores each snapshot as one row of
+fixed-shape arrays in a per-instrument ring buffer:
+
+    price    int32  (n, 2, 5)   side × level, in tick units (0.05)
+    qty      int32  (n, 2, 5)
+    orders   uint16 (n, 2, 5)
+    features float32 (n, F)     one row of FEATURES per snapshot
+    epoch    float64 (n,)
+
+That is ~170 bytes per snapshot, so the default DEPTH_HISTORY_TICKS=32768
+rows (9h at KiteTicker's ~1 full-mode tick/s) is ~5.5 MB per instrument,
+allocated once. Features are computed per snapshot against the previous one,
+vectorized across the levels:
+
+    microprice       size-weighted best bid/ask (leans towards the thin side)
+    weighted_mid     mean of the depth-weighted bid and ask prices
+    imbalance        (Σbid − Σask) / (Σbid + Σask), all levels; l1_imbalance best level
+    ofi / ofi_depth  order-flow imbalance (Cont–Kukanov–Stoikov), best level / summed over levels
+    *_depleted       quantity that left a side: shrunk queues at unchanged prices
+                     plus levels the touch moved through
+    *_added          replenishment: grown queues plus new levels inside the touch
+    *_cancelled      depleted minus the traded volume attributed to that side
+    traded           volume_traded delta
+
+`rolling()` aggregates the features over several horizons (sums, per-second
+rates and means) from the ring itself, so any horizon inside the history
+is available without extra state.
+
+    books = get_depth_books()
+    book = books.for_symbol("NIFTY")             # NIFTY-FUT's book, when it is live
+    book.latest()                                 # features of the last snapshot
+    book.rolling((10, 60, 300))
+
+The KiteTicker thread writes (market_feed._on_instrument_tick for the index
+futures, full mode); readers take the book's lock.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from services.instrument_universe import INDEX_SYMBOLS, InstrumentUniverse, get_instrument_universe
+
+LEVELS = 5
+TICK_SIZE = 0.05
+BID, ASK = 0, 1
+FEATURES = (
+    "mid", "spread", "microprice", "weighted_mid", "imbalance", "l1_imbalance",
+    "ofi", "ofi_depth", "bid_depleted", "ask_depleted", "bid_added", "ask_added",
+    "bid_cancelled", "ask_cancelled", "traded",
+)
+_F = {name: i for i, name in enumerate(FEATURES)}
+_SUMMED = ("ofi", "ofi_depth", "bid_depleted", "ask_depleted", "bid_added", "ask_added",
+           "bid_cancelled", "ask_cancelled", "traded")
+_AVERAGED = ("spread", "imbalance", "l1_imbalance")
+HORIZONS = (10, 60, 300)
+LIVE_AFTER_S = 5.0          # a futures book stands in for its index only while this fresh
+
+
+_BETTER = np.array([[1], [-1]], dtype=np.int32)    # bids: higher is better; asks: lower
+
+
+def _queue_flow(price: np.ndarray, qty: np.ndarray, prev_price: np.ndarray, prev_qty: np.ndarray) -> tuple:
+    """(depleted, added) per side, both sides at once (arrays of shape (2,))."""
+    valid, prev_valid = price > 0, prev_price > 0
+    # Queues at prices quoted in both snapshots: shrinkage depletes, growth replenishes
+    same = (price[:, :, None] == prev_price[:, None, :]) & valid[:, :, None] & prev_valid[:, None, :]
+    change = np.where(same, qty[:, :, None] - prev_qty[:, None, :], 0.0).reshape(2, -1)
+    depleted = np.maximum(-change, 0.0).sum(axis=1)
+    added = np.maximum(change, 0.0).sum(axis=1)
+    # Levels the touch moved through were consumed; new levels inside the old touch were added
+    ranked, prev_ranked = price * _BETTER, prev_price * _BETTER
+    touched = valid[:, :1] & prev_valid[:, :1]
+    depleted += (prev_qty * (prev_valid & (prev_ranked > ranked[:, :1]) & touched)).sum(axis=1)
+    added += (qty * (valid & (ranked > prev_ranked[:, :1]) & touched)).sum(axis=1)
+    return depleted, added
+
+
+def _ofi(price: np.ndarray, qty: np.ndarray, prev_price: np.ndarray, prev_qty: np.ndarray) -> np.ndarray:
+    """Per-level order-flow imbalance e_i (bid contribution − ask contribution)."""
+    bp, ap, pbp, pap = price[BID], price[ASK], prev_price[BID], prev_price[ASK]
+    bq, aq, pbq, paq = qty[BID], qty[ASK], prev_qty[BID], prev_qty[ASK]
+    bid = np.where(bp >= pbp, bq, 0) - np.where(bp <= pbp, pbq, 0)
+    ask = np.where(ap <= pap, aq, 0) - np.where(ap >= pap, paq, 0)
+    valid = (bp > 0) & (pbp > 0) & (ap > 0) & (pap > 0)
+    return np.where(valid, bid - ask, 0)
+
+
+class DepthBook:
+    """Ring buffer of depth snapshots and their microstructure features for one instrument."""
+
+    def __init__(self, symbol: str, capacity: Optional[int] = None, levels: int = LEVELS,
+                 tick_size: float = TICK_SIZE) -> None:
+        if capacity is None:
+            from config import get_settings
+            capacity = get_settings().depth_history_ticks
+        self.symbol = symbol
+        self.capacity = capacity
+        self.n_levels = levels
+        self.tick_size = tick_size
+        self.epoch = np.zeros(capacity, dtype=np.float64)
+        self.price = np.zeros((capacity, 2, levels), dtype=np.int32)
+        self.qty = np.zeros((capacity, 2, levels), dtype=np.int32)
+        self.orders = np.zeros((capacity, 2, levels), dtype=np.uint16)
+        self.features = np.zeros((capacity, len(FEATURES)), dtype=np.float32)
+        self.seq = 0                            # snapshots written so far; row = seq % capacity
+        self._last_volume: Optional[int] = None
+        self._last_price = 0.0
+        self._rolling: Optional[tuple] = None   # (seq, horizons, result) of the last rolling() call
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(a.nbytes for a in (self.epoch, self.price, self.qty, self.orders, self.features))
+
+    @property
+    def count(self) -> int:
+        return min(self.seq, self.capacity)
+
+    @property
+    def last_epoch(self) -> Optional[float]:
+        return float(self.epoch[(self.seq - 1) % self.capacity]) if self.seq else None
+
+    def live(self, max_age: float = LIVE_AFTER_S) -> bool:
+        return self.seq > 0 and time.time() - self.last_epoch < max_age
+
+    # ── writes ───────────────────────────────────────────────────────────────
+
+    def update(self, buy: Sequence[Dict[str, Any]], sell: Sequence[Dict[str, Any]],
+               epoch: Optional[float] = None, last_price: float = 0.0,
+               volume_traded: Optional[int] = None) -> int:
+        """Append one KiteTicker depth snapshot; returns its sequence number."""
+        epoch = epoch if epoch is not None else time.time()
+        with self._lock:
+            row = self.seq % self.capacity
+            n = self.n_levels
+            price, qty, orders = [[0] * n, [0] * n], [[0] * n, [0] * n], [[0] * n, [0] * n]
+            for side, ladder in ((BID, buy), (ASK, sell)):
+                for level, entry in enumerate(ladder[:n]):
+                    price[side][level] = round(entry.get("price", 0) / self.tick_size)
+                    qty[side][level] = entry.get("quantity", 0)
+                    orders[side][level] = min(entry.get("orders", 0), 65535)
+            self.price[row] = price
+            self.qty[row] = qty
+            self.orders[row] = orders
+            self.epoch[row] = epoch
+            self._compute(row, price, qty, last_price, volume_traded)
+            self.seq += 1
+            return self.seq - 1
+
+    def _compute(self, row: int, price: List[List[int]], qty: List[List[int]],
+                 last_price: float, volume_traded: Optional[int]) -> None:
+        """Feature row for snapshot ``row``; ``price`` / ``qty`` are the same snapshot as lists.
+
+        Touch-level features use the lists (five numbers a side, cheaper than
+        array calls); everything diffed against the previous snapshot (OFI,
+        queue depletion / replenishment) runs on the ring rows, all levels and
+        both sides at once.
+        """
+        tick = self.tick_size
+        f = [0.0] * len(FEATURES)
+        bid_qty, ask_qty = sum(qty[BID]), sum(qty[ASK])
+        best_bid, best_ask = price[BID][0] * tick, price[ASK][0] * tick
+        if best_bid > 0 and best_ask > 0:
+            f[_F["mid"]] = (best_bid + best_ask) / 2
+            f[_F["spread"]] = best_ask - best_bid
+            l1 = qty[BID][0] + qty[ASK][0]
+            if l1 > 0:
+                f[_F["microprice"]] = (best_ask * qty[BID][0] + best_bid * qty[ASK][0]) / l1
+                f[_F["l1_imbalance"]] = (qty[BID][0] - qty[ASK][0]) / l1
+            else:
+                f[_F["microprice"]] = f[_F["mid"]]
+            if bid_qty > 0 and ask_qty > 0:
+                f[_F["weighted_mid"]] = (sum(p * q for p, q in zip(price[BID], qty[BID])) / bid_qty
+                                         + sum(p * q for p, q in zip(price[ASK], qty[ASK])) / ask_qty) * tick / 2
+        if bid_qty + ask_qty > 0:
+            f[_F["imbalance"]] = (bid_qty - ask_qty) / (bid_qty + ask_qty)
+
+        traded = 0
+        if volume_traded is not None:
+            if self._last_volume is not None and volume_traded > self._last_volume:
+                traded = volume_traded - self._last_volume
+            self._last_volume = volume_traded
+        f[_F["traded"]] = traded
+
+        if self.seq > 0:
+            prev = (row - 1) % self.capacity
+            ring_price, ring_qty = self.price[row], self.qty[row].astype(np.float64)
+            prev_price, prev_qty = self.price[prev], self.qty[prev].astype(np.float64)
+            ofi = _ofi(ring_price, ring_qty, prev_price, prev_qty)
+            f[_F["ofi"]] = ofi[0]
+            f[_F["ofi_depth"]] = ofi.sum()
+            (bid_depleted, ask_depleted), (bid_added, ask_added) = _queue_flow(
+                ring_price, ring_qty, prev_price, prev_qty)
+            # Trades at or through the previous touch consumed that side's queue
+            prev_bid, prev_ask = prev_price[BID, 0], prev_price[ASK, 0]          # tick units
+            price_now = round((last_price or self._last_price) / tick)
+            if prev_bid > 0 and price_now <= prev_bid:
+                bid_traded, ask_traded = traded, 0
+            elif prev_ask > 0 and price_now >= prev_ask:
+                bid_traded, ask_traded = 0, traded
+            else:
+                bid_traded = ask_traded = traded / 2
+            f[_F["bid_depleted"]] = bid_depleted
+            f[_F["ask_depleted"]] = ask_depleted
+            f[_F["bid_added"]] = bid_added
+            f[_F["ask_added"]] = ask_added
+            f[_F["bid_cancelled"]] = max(0.0, bid_depleted - bid_traded)
+            f[_F["ask_cancelled"]] = max(0.0, ask_depleted - ask_traded)
+        self.features[row] = f
+        if last_price:
+            self._last_price = last_price
+
+    # ── reads ────────────────────────────────────────────────────────────────
+
+    def _rows(self, seconds: Optional[float] = None, now: Optional[float] = None) -> np.ndarray:
+        """Physical row indices of the history (oldest first), limited to the last ``seconds``."""
+        count = self.count
+        rows = (np.arange(self.seq - count, self.seq) % self.capacity) if count else np.zeros(0, dtype=np.int64)
+        if seconds is not None and count:
+            now = now if now is not None else self.epoch[rows[-1]]
+            rows = rows[np.searchsorted(self.epoch[rows], now - seconds, side="right"):]
+        return rows
+
+    def levels(self, seq: Optional[int] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """{"buy": [...], "sell": [...]} in KiteTicker's shape for snapshot ``seq`` (default latest)."""
+        with self._lock:
+            seq = self.seq - 1 if seq is None else seq
+            if seq < 0 or seq < self.seq - self.capacity or seq >= self.seq:
+                return {"buy": [], "sell": []}
+            row = seq % self.capacity
+            price = (self.price[row] * self.tick_size).round(2).tolist()
+            qty, orders = self.qty[row].tolist(), self.orders[row].tolist()
+        return {
+            side: [{"price": price[s][i], "quantity": qty[s][i], "orders": orders[s][i]}
+                   for i in range(self.n_levels) if price[s][i] > 0]
+            for s, side in ((BID, "buy"), (ASK, "sell"))
+        }
+
+    def totals(self, seq: Optional[int] = None) -> Dict[str, float]:
+        """Best bid/ask and per-side quantity / order totals of snapshot ``seq`` (default latest)."""
+        with self._lock:
+            seq = self.seq - 1 if seq is None else seq
+            if seq < 0 or seq < self.seq - self.capacity or seq >= self.seq:
+                return {}
+            row = seq % self.capacity
+            qty, orders = self.qty[row].sum(axis=1), self.orders[row].sum(axis=1)
+            return {
+                "bid": round(float(self.price[row, BID, 0]) * self.tick_size, 2),
+                "ask": round(float(self.price[row, ASK, 0]) * self.tick_size, 2),
+                "bid_qty": int(qty[BID]), "ask_qty": int(qty[ASK]),
+                "bid_orders": int(orders[BID]), "ask_orders": int(orders[ASK]),
+            }
+
+    def latest(self, seq: Optional[int] = None) -> Dict[str, float]:
+        with self._lock:
+            seq = self.seq - 1 if seq is None else seq
+            if seq < 0 or seq < self.seq - self.capacity or seq >= self.seq:
+                return {}
+            row = self.features[seq % self.capacity]
+            return {name: round(float(row[i]), 4) for i, name in enumerate(FEATURES)}
+
+    def rolling(self, horizons: Iterable[float] = HORIZONS, now: Optional[float] = None) -> Dict[str, Any]:
+        """Feature aggregates over each horizon (seconds): sums, per-second rates, means."""
+        horizons = tuple(horizons)
+        out: Dict[str, Any] = {}
+        with self._lock:
+            if now is None and self._rolling is not None and self._rolling[:2] == (self.seq, horizons):
+                return self._rolling[2]
+            for horizon in horizons:
+                rows = self._rows(horizon, now)
+                window = self.features[rows].astype(np.float64)
+                sums = window.sum(axis=0) if len(rows) else np.zeros(len(FEATURES))
+                stats: Dict[str, Any] = {"ticks": int(len(rows))}
+                for name in _SUMMED:
+                    stats[name] = round(float(sums[_F[name]]), 2)
+                for name in ("bid_depleted", "ask_depleted", "bid_added", "ask_added",
+                             "bid_cancelled", "ask_cancelled"):
+                    stats[f"{name}_per_s"] = round(float(sums[_F[name]]) / horizon, 2)
+                for name in _AVERAGED:
+                    stats[f"{name}_mean"] = round(float(sums[_F[name]]) / len(rows), 4) if len(rows) else 0.0
+                micro = window[:, _F["microprice"]]
+                stats["microprice_change"] = round(float(micro[-1] - micro[0]), 2) if len(rows) > 1 else 0.0
+                out[f"{int(horizon)}s"] = stats
+            if now is None:
+                self._rolling = (self.seq, horizons, out)
+        return out
+
+    def history(self, seconds: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """Copies of the stored arrays (oldest first), limited to the last ``seconds``."""
+        with self._lock:
+            rows = self._rows(seconds)
+            return {
+                "epoch": self.epoch[rows],
+                "price": self.price[rows] * self.tick_size,
+                "qty": self.qty[rows],
+                "orders": self.orders[rows],
+                "features": self.features[rows],
+            }
+
+    def report(self) -> Dict[str, Any]:
+        count = self.count
+        span = float(self.epoch[(self.seq - 1) % self.capacity] - self.epoch[(self.seq - count) % self.capacity]) \
+            if count else 0.0
+        return {"snapshots": self.seq, "stored": count, "capacity": self.capacity,
+                "history_s": round(span, 1), "mb": round(self.nbytes / 1e6, 2), "live": self.live()}
+
+
+class DepthBooks:
+    """Depth books by symbol; index futures are fed straight from the KiteTicker thread."""
+
+    def __init__(self, universe: Optional[InstrumentUniverse] = None, capacity: Optional[int] = None) -> None:
+        self.universe = universe or get_instrument_universe()
+        self.capacity = capacity
+        self._books: Dict[str, DepthBook] = {}
+        self._lock = threading.Lock()
+        self.slice = self.universe.declare(
+            "depth", symbols=tuple(f"{s}-FUT" for s in INDEX_SYMBOLS), mode="full",
+        )
+
+    def book(self, symbol: str) -> DepthBook:
+        book = self._books.get(symbol)
+        if book is None:
+            with self._lock:
+                book = self._books.get(symbol)
+                if book is None:
+                    book = self._books[symbol] = DepthBook(symbol, self.capacity)
+        return book
+
+    def get(self, symbol: str) -> Optional[DepthBook]:
+        return self._books.get(symbol)
+
+    def for_symbol(self, symbol: str, max_age: float = LIVE_AFTER_S) -> Optional[DepthBook]:
+        """Live book of ``symbol``'s future (NIFTY → NIFTY-FUT), else of ``symbol`` itself."""
+        for name in (f"{symbol}-FUT", symbol):
+            book = self._books.get(name)
+            if book is not None and book.live(max_age):
+                return book
+        return None
+
+    def on_tick(self, iid: int, tick: Dict[str, Any], epoch: float) -> Optional[int]:
+        """Full-mode tick for a universe instrument; only members of the "depth" slice are kept."""
+        depth = tick.get("depth")
+        if not depth or iid not in self.slice:
+            return None
+        return self.book(self.universe[iid].symbol).update(
+            depth.get("buy", ()), depth.get("sell", ()), epoch,
+            tick.get("last_price", 0.0), tick.get("volume_traded"),
+        )
+
+    def report(self) -> Dict[str, Any]:
+        return {symbol: {**book.report(), "latest": book.latest(), "rolling": book.rolling()}
+                for symbol, book in list(self._books.items())}
+
+
+depth_books = DepthBooks()
+
+
+def get_depth_books() -> DepthBooks:
+    return depth_books
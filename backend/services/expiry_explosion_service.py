@@ -37,18 +37,20 @@ Isolation: Own ConnectionManager, own asyncio task, own CacheService instance.
 
 import asyncio
 import calendar
-import collections
 import json
 import math
 import time
 import logging
 from datetime import datetime, date, timedelta
-from typing import Dict, Any, Optional, List, Tuple, Deque, Set
+from typing import Dict, Any, Optional, List, Tuple
 
-from fastapi import WebSocket
 import pytz
 
 from services.cache import CacheService, _SHARED_CACHE
+from services.cadence import get_cadence_controller
+from services.quote_scheduler import Priority, get_quote_scheduler
+from services.rolling_stats import RollingSlope, linear_slope
+from services.ws_outbox import BroadcastManager
 from config.nse_holidays import is_trading_day, shift_to_prev_trading_day
 
 logger = logging.getLogger(__name__)
@@ -91,51 +93,11 @@ EXPIRY_WEEKDAY_MAP = {
 
 # ── Isolated WebSocket manager ───────────────────────────────────────────────
 
-class ExpiryConnectionManager:
+class ExpiryConnectionManager(BroadcastManager):
     """Completely isolated WebSocket manager — no shared state."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
 
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        # Send OUTSIDE lock — per-client 3s timeout to prevent blocking
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(ws.send_text(json.dumps(data, default=str)), timeout=3.0)
-        except Exception:
-            await self.disconnect(ws)
-
-    @property
-    def client_count(self) -> int:
-        return len(self._connections)
-
-
-expiry_manager = ExpiryConnectionManager()
+expiry_manager = ExpiryConnectionManager("expiry_explosion")
 
 
 # ── Utility functions ─────────────────────────────────────────────────────────
@@ -144,17 +106,6 @@ def _clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
 
-def _linear_slope(values: List[float]) -> float:
-    n = len(values)
-    if n < 3:
-        return 0.0
-    x_mean = (n - 1) / 2.0
-    y_mean = sum(values) / n
-    num = sum((i - x_mean) * (v - y_mean) for i, v in enumerate(values))
-    den = sum((i - x_mean) ** 2 for i in range(n))
-    return num / den if den != 0 else 0.0
-
-
 def _parse_candle(item) -> Optional[Dict]:
     if isinstance(item, dict):
         return item
@@ -385,7 +336,7 @@ def _fetch_real_option_premiums(
             return {}
 
         # Fetch quotes (limit to 50 per Zerodha best practice)
-        quotes = kite.quote([str(t) for t in list(token_to_strike.keys())[:50]])
+        quotes = get_quote_scheduler().quote_sync(list(token_to_strike)[:50], Priority.ANALYTICS)
 
         result: Dict[int, Dict[str, Any]] = {}
         for token, strike_val in token_to_strike.items():
@@ -443,55 +394,55 @@ def _expiry_phase(hours_left: float) -> str:
 # ── OI ring buffer for tracking momentum ─────────────────────────────────────
 
 class OIHistory:
-    """Tracks OI values for momentum detection."""
+    """Tracks OI values for momentum detection (slopes kept incrementally)."""
     MAXLEN = 40
 
     def __init__(self):
-        self._oi_buf: Deque[float] = collections.deque(maxlen=self.MAXLEN)
-        self._price_buf: Deque[float] = collections.deque(maxlen=self.MAXLEN)
-        self._vol_buf: Deque[float] = collections.deque(maxlen=self.MAXLEN)
-        self._pcr_buf: Deque[float] = collections.deque(maxlen=self.MAXLEN)
-        self._call_oi_buf: Deque[float] = collections.deque(maxlen=self.MAXLEN)
-        self._put_oi_buf: Deque[float] = collections.deque(maxlen=self.MAXLEN)
+        self._oi_buf = RollingSlope(self.MAXLEN)
+        self._price_buf = RollingSlope(self.MAXLEN)
+        self._vol_buf = RollingSlope(self.MAXLEN)
+        self._pcr_buf = RollingSlope(self.MAXLEN)
+        self._call_oi_buf = RollingSlope(self.MAXLEN)
+        self._put_oi_buf = RollingSlope(self.MAXLEN)
 
     def push(self, oi: float, price: float, volume: float, pcr: float,
              call_oi: float, put_oi: float):
         if oi > 0:
-            self._oi_buf.append(oi)
+            self._oi_buf.push(oi)
         if price > 0:
-            self._price_buf.append(price)
+            self._price_buf.push(price)
         if volume >= 0:
-            self._vol_buf.append(volume)
+            self._vol_buf.push(volume)
         if pcr > 0:
-            self._pcr_buf.append(pcr)
+            self._pcr_buf.push(pcr)
         if call_oi > 0:
-            self._call_oi_buf.append(call_oi)
+            self._call_oi_buf.push(call_oi)
         if put_oi > 0:
-            self._put_oi_buf.append(put_oi)
+            self._put_oi_buf.push(put_oi)
 
     @property
     def oi_slope(self) -> float:
-        return _linear_slope(list(self._oi_buf))
+        return self._oi_buf.slope
 
     @property
     def price_slope(self) -> float:
-        return _linear_slope(list(self._price_buf))
+        return self._price_buf.slope
 
     @property
     def volume_slope(self) -> float:
-        return _linear_slope(list(self._vol_buf))
+        return self._vol_buf.slope
 
     @property
     def pcr_slope(self) -> float:
-        return _linear_slope(list(self._pcr_buf))
+        return self._pcr_buf.slope
 
     @property
     def call_oi_trend(self) -> float:
-        return _linear_slope(list(self._call_oi_buf))
+        return self._call_oi_buf.slope
 
     @property
     def put_oi_trend(self) -> float:
-        return _linear_slope(list(self._put_oi_buf))
+        return self._put_oi_buf.slope
 
     @property
     def oi_velocity(self) -> float:
@@ -510,19 +461,18 @@ class OIHistory:
     @property
     def volume_surge_ratio(self) -> float:
         """Current volume vs average — >2.0 = surge."""
-        vals = list(self._vol_buf)
-        if len(vals) < 5:
+        buf = self._vol_buf
+        if len(buf) < 5:
             return 1.0
-        avg = sum(vals[:-1]) / len(vals[:-1])
-        return vals[-1] / avg if avg > 0 else 1.0
+        avg = (buf.sum - buf.last) / (len(buf) - 1)
+        return buf.last / avg if avg > 0 else 1.0
 
     @property
     def pcr_extremity(self) -> float:
         """How extreme the current PCR is. >0 = bullish extreme, <0 = bearish extreme."""
-        vals = list(self._pcr_buf)
-        if len(vals) < 3:
+        if len(self._pcr_buf) < 3:
             return 0.0
-        current = vals[-1]
+        current = self._pcr_buf.last
         if current >= 1.5:
             return min(1.0, (current - 1.2) / 0.8)
         if current <= 0.5:
@@ -595,7 +545,7 @@ def _gamma_exposure_signal(
     if candles and len(candles) >= 3:
         recent_closes = [float(c.get("close") or 0) for c in candles[-5:] if float(c.get("close") or 0) > 0]
         if len(recent_closes) >= 3:
-            price_direction = _linear_slope(recent_closes)
+            price_direction = linear_slope(recent_closes)
 
     # Gamma explosion setup detection:
     # 1. PCR extreme + OI buildup + price moving toward OI concentration = explosion
@@ -892,7 +842,7 @@ def _pcr_extreme_signal(pcr: float, history: OIHistory, candles: List[Dict] = No
     elif len(history._price_buf) >= 5:
         recent_px = list(history._price_buf)[-10:]
         if len(recent_px) >= 3:
-            px_slope = _linear_slope(recent_px)
+            px_slope = linear_slope(recent_px)
             if px_slope > 1.0 and score < -0.1:
                 damp = min(abs(score) * 0.45, 0.25)
                 score += damp
@@ -935,15 +885,15 @@ def _delta_acceleration_signal(
         return {"score": 0.0, "signal": "NEUTRAL", "label": "Insufficient data",
                 "weight": EXPIRY_WEIGHTS["delta_acceleration"], "extra": extras}
 
-    price_vel = _linear_slope(closes)
+    price_vel = linear_slope(closes)
     extras["priceVelocity"] = round(price_vel, 4)
 
     # Price acceleration (change in velocity)
     if len(closes) >= 6:
         first_half = closes[:len(closes) // 2]
         second_half = closes[len(closes) // 2:]
-        vel_1 = _linear_slope(first_half)
-        vel_2 = _linear_slope(second_half)
+        vel_1 = linear_slope(first_half)
+        vel_2 = linear_slope(second_half)
         acceleration = vel_2 - vel_1
         extras["acceleration"] = round(acceleration, 4)
     else:
@@ -1565,7 +1515,7 @@ class ExpiryExplosionService:
     """
 
     INDICES = ["NIFTY", "BANKNIFTY", "SENSEX"]
-    TICK_INTERVAL = 2.0   # 2-second broadcast cadence
+    TICK_INTERVAL = 2.0   # 2-second base broadcast cadence, adapted by services/cadence.py
     PREMIUM_CACHE_TTL_SEC = 8.0
     PREMIUM_RETRY_MAX_SEC = 30.0
 
@@ -1578,6 +1528,7 @@ class ExpiryExplosionService:
         self._latest: Dict[str, Any] = {}
         self._task: Optional[asyncio.Task] = None
         self._running = False
+        self._cadence = get_cadence_controller().register("expiry_explosion", base=self.TICK_INTERVAL)
         self._premium_cache: Dict[str, Tuple[float, Dict[int, Dict[str, Any]]]] = {}
         self._premium_failures: Dict[str, int] = {}
         self._premium_next_retry_at: Dict[str, float] = {}
@@ -1894,9 +1845,10 @@ class ExpiryExplosionService:
         }
 
     async def _loop(self):
-        """Main background loop — compute and broadcast every TICK_INTERVAL seconds."""
-        heartbeat_counter = 0
+        """Main background loop — compute and broadcast at the adaptive cadence (base TICK_INTERVAL)."""
+        last_heartbeat = time.monotonic()
         while self._running:
+            started = time.perf_counter()
             try:
                 payload: Dict[str, Any] = {}
                 results = await asyncio.gather(
@@ -1919,9 +1871,8 @@ class ExpiryExplosionService:
                     })
 
                 # Heartbeat every 30s
-                heartbeat_counter += 1
-                if heartbeat_counter >= int(30 / self.TICK_INTERVAL):
-                    heartbeat_counter = 0
+                if time.monotonic() - last_heartbeat >= 30:
+                    last_heartbeat = time.monotonic()
                     await expiry_manager.broadcast({
                         "type": "expiry_heartbeat",
                         "timestamp": datetime.now(IST).isoformat(),
@@ -1930,7 +1881,8 @@ class ExpiryExplosionService:
             except Exception as e:
                 logger.error(f"💥 Expiry loop error: {e}")
 
-            await asyncio.sleep(self.TICK_INTERVAL)
+            self._cadence.record(time.perf_counter() - started)
+            await asyncio.sleep(self._cadence.interval)
 
     async def start(self):
         if self._running:
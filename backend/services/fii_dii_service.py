@@ -36,9 +36,8 @@ from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
-import httpx
-
 from services.cache import get_cache
+from services.http_client import get_http_pool
 
 logger = logging.getLogger(__name__)
 
@@ -117,14 +116,14 @@ class FIIDIIService:
         comma-formatted signed string), diiCM, plus F&O sub-segments which
         we don't expose.
         """
-        async with httpx.AsyncClient(
+        resp = await get_http_pool().get(
+            _MC_FII_DII_PAGE,
+            provider="moneycontrol",
             headers=_DEFAULT_HEADERS,
-            follow_redirects=True,
             timeout=12.0,
-        ) as client:
-            resp = await client.get(_MC_FII_DII_PAGE)
-            resp.raise_for_status()
-            html = resp.text
+        )
+        resp.raise_for_status()
+        html = resp.text
 
         m = _NEXT_DATA_RE.search(html)
         if not m:
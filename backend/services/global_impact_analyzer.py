@@ -14,6 +14,9 @@ from typing import Dict, List, Optional
 from datetime import datetime
 import statistics
 
+from services.correlation_matrix import get_correlation_service
+from services.instrument_universe import INDEX_SYMBOLS
+
 logger = logging.getLogger(__name__)
 
 
@@ -329,13 +332,23 @@ class GlobalImpactAnalyzer:
             return ["METALS", "ENERGY", "FMCG"]
 
     def _calculate_confidence(self, sp500_mag: float, dax_mag: float) -> float:
-        """Calculate confidence in global impact."""
+        """Calculate confidence in global impact.
+
+        Not scaled by the correlation matrix: its bars are sampled while Indian
+        indices trade, when S&P 500 / DAX prices barely overlap, so intraday
+        links to NIFTY never become meaningful.
+        """
         avg_magnitude = (abs(sp500_mag) + abs(dax_mag)) / 2
         return min(1.0, avg_magnitude / 2.0)
 
     def _calculate_correlation_to_vix(self) -> float:
-        """Calculate correlation strength to VIX."""
-        return 0.65  # Average correlation
+        """Calculate correlation strength to VIX (mean |corr| of INDIA VIX with the indices)."""
+        matrix = get_correlation_service().matrix
+        corrs = [matrix.correlation_of("INDIAVIX", index) for index in INDEX_SYMBOLS]
+        corrs = [abs(c) for c in corrs if c is not None]
+        if not corrs:
+            return 0.65  # Average correlation until the matrix has enough bars
+        return round(sum(corrs) / len(corrs), 4)
 
 
 # Global instance
@@ -3,67 +3,45 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 from datetime import datetime
 from time import monotonic as _monotonic
-from typing import Any, Dict, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from urllib.parse import quote_plus
 
-import requests
-from fastapi import WebSocket
 import pytz
 
+from services.http_client import HttpClientPool, get_http_pool, hedged
+from services.ws_outbox import BroadcastManager
+
 logger = logging.getLogger(__name__)
 IST = pytz.timezone("Asia/Kolkata")
 
 
-class GlobalIndicesConnectionManager:
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
-
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, payload: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(payload, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, payload: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(ws.send_text(json.dumps(payload, default=str)), timeout=3.0)
-        except Exception:
-            await self.disconnect(ws)
+class GlobalIndicesConnectionManager(BroadcastManager):
+    """WebSocket clients of the global indices stream."""
 
 
-manager = GlobalIndicesConnectionManager()
+manager = GlobalIndicesConnectionManager("global_indices")
 
 
 class _Provider:
     name = "base"
+    # True when fetch_quotes() answers many symbols with a single request.
+    BATCHED = False
+    _MAP: Dict[str, str] = {}
+
+    def supports(self, symbol: str) -> bool:
+        return symbol in self._MAP
 
-    def fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+    async def fetch_quote(self, pool: HttpClientPool, symbol: str) -> Optional[Dict[str, Any]]:
         raise NotImplementedError
 
+    async def fetch_quotes(self, pool: HttpClientPool, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        wanted = [s for s in symbols if self.supports(s)]
+        results = await asyncio.gather(*(self.fetch_quote(pool, s) for s in wanted), return_exceptions=True)
+        return {s: q for s, q in zip(wanted, results) if isinstance(q, dict)}
+
 
 class YahooProvider(_Provider):
     name = "yahoo"
@@ -88,7 +66,7 @@ class YahooProvider(_Provider):
     def __init__(self) -> None:
         self._cooldown_until: float = 0.0
 
-    def fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+    async def fetch_quote(self, pool: HttpClientPool, symbol: str) -> Optional[Dict[str, Any]]:
         ticker = self._MAP.get(symbol)
         if not ticker:
             return None
@@ -97,10 +75,13 @@ class YahooProvider(_Provider):
         if now_mono < self._cooldown_until:
             return None
         url = f"https://query2.finance.yahoo.com/v8/finance/chart/{ticker}"
-        try:
-            resp = requests.get(url, params={"interval": "1d", "range": "2d"}, headers=self._HEADERS, timeout=5)
-        except requests.RequestException:
-            raise
+        resp = await pool.get(
+            url,
+            provider=self.name,
+            params={"interval": "1d", "range": "2d"},
+            headers=self._HEADERS,
+            timeout=5,
+        )
         if resp.status_code == 429:
             # Back off Yahoo for 60s; let other providers / cache cover the gap
             self._cooldown_until = now_mono + 60
@@ -159,18 +140,34 @@ class StooqProvider(_Provider):
         "SPX": "^spx",
     }
 
-    def fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
-        stooq_symbol = self._MAP.get(symbol)
-        if not stooq_symbol:
-            return None
-        url = f"https://stooq.com/q/l/?s={quote_plus(stooq_symbol)}&f=sd2t2ohlcv&h&e=json"
-        resp = requests.get(url, timeout=3)
+    BATCHED = True
+
+    async def fetch_quote(self, pool: HttpClientPool, symbol: str) -> Optional[Dict[str, Any]]:
+        return (await self.fetch_quotes(pool, [symbol])).get(symbol)
+
+    async def fetch_quotes(self, pool: HttpClientPool, symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+        """One request for every supported symbol — Stooq accepts ``s=a+b+c``."""
+        by_stooq = {self._MAP[s]: s for s in symbols if self.supports(s)}
+        if not by_stooq:
+            return {}
+        joined = "+".join(quote_plus(sym) for sym in by_stooq)
+        url = f"https://stooq.com/q/l/?s={joined}&f=sd2t2ohlcv&h&e=json"
+        resp = await pool.get(url, provider=self.name, timeout=3)
         resp.raise_for_status()
         payload = resp.json() or {}
-        rows = payload.get("symbols") or []
-        if not rows:
-            return None
-        row = rows[0]
+        quotes: Dict[str, Dict[str, Any]] = {}
+        for row in payload.get("symbols") or []:
+            symbol = by_stooq.get(str(row.get("symbol") or "").lower())
+            if symbol is None and len(by_stooq) == 1:
+                symbol = next(iter(by_stooq.values()))
+            if symbol is None:
+                continue
+            quote = self._parse_row(row)
+            if quote:
+                quotes[symbol] = quote
+        return quotes
+
+    def _parse_row(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         close = float(row.get("close") or 0)
         open_ = float(row.get("open") or 0)
         if close <= 0 or open_ <= 0:
@@ -225,6 +222,8 @@ class GlobalIndicesService:
     }
 
     POLL_INTERVAL = 8
+    # Start the next provider for a symbol if the previous one hasn't answered by then.
+    HEDGE_DELAY = 1.5
 
     def __init__(self):
         self._providers = [YahooProvider(), StooqProvider()]
@@ -232,31 +231,65 @@ class GlobalIndicesService:
         self._task: Optional[asyncio.Task] = None
         self._running = False
 
-    def _fetch_one(self, symbol: str) -> Dict[str, Any]:
+    async def _fetch_quotes(self) -> Dict[str, Dict[str, Any]]:
+        """Hedged, batched fetch of every index across all providers.
+
+        Each symbol races its providers in priority order (``HEDGE_DELAY``
+        apart). Batched providers issue a single request on first use and
+        every symbol awaits that same shared result.
+        """
+        pool = get_http_pool()
+        batches: Dict[str, asyncio.Future] = {}
+
+        def _call(provider: _Provider, symbol: str) -> Callable[[], Awaitable[Optional[Dict[str, Any]]]]:
+            async def _run() -> Optional[Dict[str, Any]]:
+                if not provider.BATCHED:
+                    return await provider.fetch_quote(pool, symbol)
+                batch = batches.get(provider.name)
+                if batch is None:
+                    wanted = [s for s in self.INDICES if provider.supports(s)]
+                    batch = batches[provider.name] = asyncio.ensure_future(provider.fetch_quotes(pool, wanted))
+                    batch.add_done_callback(lambda f: f.cancelled() or f.exception())
+                # Shield: a hedged loser being cancelled must not cancel the shared batch.
+                return (await asyncio.shield(batch)).get(symbol)
+            return _run
+
+        symbols = list(self.INDICES)
+        results = await asyncio.gather(
+            *(
+                hedged([_call(p, sym) for p in self._providers if p.supports(sym)], self.HEDGE_DELAY)
+                for sym in symbols
+            ),
+            return_exceptions=True,
+        )
+        quotes: Dict[str, Dict[str, Any]] = {}
+        for sym, result in zip(symbols, results):
+            if isinstance(result, Exception):
+                logger.debug("Global index fetch failed for %s: %s", sym, result)
+            elif result:
+                quotes[sym] = result
+        return quotes
+
+    def _build_entry(self, symbol: str, q: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         meta = self.INDICES[symbol]
         now_iso = datetime.now(IST).isoformat()
-        for provider in self._providers:
-            try:
-                q = provider.fetch_quote(symbol)
-                if q:
-                    source_ts = q.get("sourceTimestamp") or now_iso
-                    return {
-                        "symbol": symbol,
-                        "name": meta["name"],
-                        "region": meta["region"],
-                        "price": q["price"],
-                        "change": q["change"],
-                        "changePct": q["changePct"],
-                        "source": q["source"],
-                        "status": "LIVE",
-                        "timestamp": source_ts,
-                        "fetchedAt": now_iso,
-                        "marketState": q.get("marketState", "UNKNOWN"),
-                        "quoteAgeSec": q.get("quoteAgeSec"),
-                        "liveQuality": q.get("liveQuality", "REALTIME"),
-                    }
-            except Exception as exc:
-                logger.debug("Global index provider %s failed for %s: %s", provider.name, symbol, exc)
+        if q:
+            source_ts = q.get("sourceTimestamp") or now_iso
+            return {
+                "symbol": symbol,
+                "name": meta["name"],
+                "region": meta["region"],
+                "price": q["price"],
+                "change": q["change"],
+                "changePct": q["changePct"],
+                "source": q["source"],
+                "status": "LIVE",
+                "timestamp": source_ts,
+                "fetchedAt": now_iso,
+                "marketState": q.get("marketState", "UNKNOWN"),
+                "quoteAgeSec": q.get("quoteAgeSec"),
+                "liveQuality": q.get("liveQuality", "REALTIME"),
+            }
 
         fallback = self._latest.get(symbol)
         if fallback:
@@ -299,26 +332,8 @@ class GlobalIndicesService:
     async def _loop(self):
         while self._running:
             try:
-                loop = asyncio.get_event_loop()
-                tasks = [loop.run_in_executor(None, self._fetch_one, sym) for sym in self.INDICES.keys()]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                payload: Dict[str, Dict[str, Any]] = {}
-                for sym, result in zip(self.INDICES.keys(), results):
-                    if isinstance(result, Exception):
-                        logger.debug("Global index fetch failed for %s: %s", sym, result)
-                        payload[sym] = self._latest.get(sym) or {
-                            "symbol": sym,
-                            "name": self.INDICES[sym]["name"],
-                            "region": self.INDICES[sym]["region"],
-                            "price": 0,
-                            "change": 0,
-                            "changePct": 0,
-                            "source": "none",
-                            "status": "UNAVAILABLE",
-                            "timestamp": datetime.now(IST).isoformat(),
-                        }
-                    else:
-                        payload[sym] = result
+                quotes = await self._fetch_quotes()
+                payload = {sym: self._build_entry(sym, quotes.get(sym)) for sym in self.INDICES}
                 self._latest = payload
                 await manager.broadcast({
                     "type": "global_indices_update",
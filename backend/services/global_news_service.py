@@ -9,12 +9,15 @@ import html
 import re
 import time
 import xml.etree.ElementTree as ET
+from collections import OrderedDict
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
-import httpx
 import pytz
 
+from services.http_client import HttpClientPool, get_http_pool
+from services.ws_hub import get_stream_hub
+
 tf = None  # TensorFlow disabled - numpy softmax fallback used (faster startup)
 
 logger = logging.getLogger(__name__)
@@ -218,6 +221,8 @@ _CACHE_TTL_SECS = 120          # 2 minutes — push cadence for WS clients
 _MAX_ITEMS_PER_FEED = 8
 _MAX_PULSE_ITEMS = 40          # Pulse aggregates many publishers — allow more
 _MAX_TOTAL_ITEMS = 64
+_MAX_INDEX_ENTRIES = 4096      # content-hash → analysis LRU (≈1 MB worst case)
+_XML_CHUNK = 16 * 1024         # incremental parser feed size
 
 _SOURCE_PRIORITY: Dict[str, int] = {
     "Moneycontrol Markets": 12,
@@ -323,74 +328,133 @@ def _classify(title: str, description: str) -> Dict[str, Any]:
     }
 
 
-def _parse_rss(xml_text: str, source_name: str) -> List[Dict[str, Any]]:
-    """Parse RSS XML and return list of items."""
-    items: List[Dict[str, Any]] = []
-    try:
-        root = ET.fromstring(xml_text)
-    except ET.ParseError:
-        return items
-
-    # Handle both RSS 2.0 and Atom
-    ns = {"atom": "http://www.w3.org/2005/Atom"}
-    channel = root.find("channel")
-    if channel is not None:
-        raw_items = channel.findall("item")
-    else:
-        raw_items = root.findall("atom:entry", ns) or root.findall("entry")
-
-    for item in raw_items[:_MAX_ITEMS_PER_FEED]:
-        title_el = item.find("title")
-        link_el = item.find("link")
-        desc_el = item.find("description") or item.find("summary")
-        pub_el = item.find("pubDate") or item.find("published") or item.find("updated")
-
-        title = (title_el.text or "").strip() if title_el is not None else ""
-        link = (link_el.text or "").strip() if link_el is not None else ""
-        desc = (desc_el.text or "").strip() if desc_el is not None else ""
-        pub = (pub_el.text or "").strip() if pub_el is not None else ""
-
-        # Atom <link href="...">
-        if not link and link_el is not None:
-            link = link_el.get("href", "")
-
-        if not title:
-            continue
+class _AnalysisIndex:
+    """Bounded content-hash → classification cache.
 
-        # Strip HTML tags and decode entities for clean display
-        desc_clean = html.unescape(re.sub(r'<[^>]+>', '', desc)).strip()
+    Headlines repeat across refreshes (and across feeds), so ``_classify`` and
+    ``_tensorflow_refine_score`` run once per distinct title+description; the
+    least recently seen entries are evicted past ``max_entries``.
+    """
 
-        uid = hashlib.md5(title.encode()).hexdigest()[:12]
-        analysis = _classify(title, desc)
-        analysis["score"] = _tensorflow_refine_score(title, desc_clean, analysis["score"])
+    def __init__(self, max_entries: int = _MAX_INDEX_ENTRIES) -> None:
+        self._max = max_entries
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_hash(title: str, description: str) -> str:
+        return hashlib.sha1(f"{title}\x00{description}".encode()).hexdigest()
+
+    def analyze(self, title: str, description: str) -> Dict[str, Any]:
+        key = self.content_hash(title, description)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return dict(cached)
+
+        self.misses += 1
+        analysis = _classify(title, description)
+        analysis["score"] = _tensorflow_refine_score(title, description, analysis["score"])
         analysis["confidence"] = min(98, max(30, int(abs(analysis["score"] - 50) * 1.8 + 30)))
-        tier = _impact_tier(analysis["signal"], analysis["score"])
-        items.append({
-            "id": uid,
-            "title": title,
-            "description": desc_clean[:200] if desc_clean else "",
-            "link": link,
-            "published": pub,
-            "source": source_name,
-            "impact_tier": tier,
-            **analysis,
-        })
+        analysis["impact_tier"] = _impact_tier(analysis["signal"], analysis["score"])
+        self._entries[key] = analysis
+        if len(self._entries) > self._max:
+            self._entries.popitem(last=False)
+        return dict(analysis)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_default_index = _AnalysisIndex()
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _child_text(elem: ET.Element, *names: str) -> str:
+    for child in elem:
+        if _local(child.tag) in names and child.text:
+            return child.text.strip()
+    return ""
+
+
+def _child_link(elem: ET.Element) -> str:
+    for child in elem:
+        if _local(child.tag) == "link":
+            # RSS <link>url</link>, Atom <link href="url"/>
+            return (child.text or "").strip() or child.get("href", "")
+    return ""
+
+
+def _parse_rss(xml_text: str, source_name: str, index: Optional[_AnalysisIndex] = None) -> List[Dict[str, Any]]:
+    """Incrementally parse RSS 2.0 / Atom XML into analysed items.
+
+    The document is fed to ``XMLPullParser`` in chunks and parsing stops as
+    soon as ``_MAX_ITEMS_PER_FEED`` items are collected, so large feeds are
+    never fully materialised. Classification goes through ``index``.
+    """
+    index = index or _default_index
+    items: List[Dict[str, Any]] = []
+    parser = ET.XMLPullParser(events=("end",))
+    try:
+        for offset in range(0, len(xml_text), _XML_CHUNK):
+            parser.feed(xml_text[offset:offset + _XML_CHUNK])
+            for _event, elem in parser.read_events():
+                if _local(elem.tag) not in ("item", "entry"):
+                    continue
+                title = _child_text(elem, "title")
+                link = _child_link(elem)
+                desc = _child_text(elem, "description", "summary")
+                pub = _child_text(elem, "pubDate", "published", "updated")
+                elem.clear()
+                if not title:
+                    continue
+
+                # Strip HTML tags and decode entities for clean display
+                desc_clean = html.unescape(re.sub(r'<[^>]+>', '', desc)).strip()
+
+                analysis = index.analyze(title, desc_clean)
+                items.append({
+                    "id": hashlib.md5(title.encode()).hexdigest()[:12],
+                    "title": title,
+                    "description": desc_clean[:200] if desc_clean else "",
+                    "link": link,
+                    "published": pub,
+                    "source": source_name,
+                    **analysis,
+                })
+                if len(items) >= _MAX_ITEMS_PER_FEED:
+                    return items
+    except ET.ParseError:
+        pass
     return items
 
 
-async def _fetch_feed(client: httpx.AsyncClient, feed: Dict[str, str]) -> List[Dict[str, Any]]:
+async def _fetch_feed(
+    pool: HttpClientPool,
+    feed: Dict[str, str],
+    index: _AnalysisIndex,
+    previous: Optional[List[Dict[str, Any]]] = None,
+) -> List[Dict[str, Any]]:
+    """Conditional GET of one feed; a 304 reuses ``previous`` without re-parsing."""
     try:
-        resp = await client.get(
+        resp = await pool.get_conditional(
             feed["url"],
+            provider=feed["name"],
             timeout=_FETCH_TIMEOUT,
             headers={"User-Agent": "Mozilla/5.0 (compatible; TradingBot/1.0)"},
-            follow_redirects=True,
         )
-        if resp.status_code == 200:
+        if resp.not_modified and previous is not None:
+            return previous
+        if resp.status_code in (200, 304):
             parser = feed.get("parser", "rss")
             if parser == "pulse":
-                return _parse_pulse_html(resp.text)
-            return _parse_rss(resp.text, feed["name"])
+                return _parse_pulse_html(resp.text, index)
+            return _parse_rss(resp.text, feed["name"], index)
     except Exception as exc:
         logger.debug("Feed fetch failed [%s]: %s", feed["name"], exc)
     return []
@@ -430,8 +494,9 @@ def _clean_html(snippet: str) -> str:
     return html.unescape(re.sub(r"<[^>]+>", "", snippet or "")).strip()
 
 
-def _parse_pulse_html(html_text: str) -> List[Dict[str, Any]]:
+def _parse_pulse_html(html_text: str, index: Optional[_AnalysisIndex] = None) -> List[Dict[str, Any]]:
     """Parse Pulse by Zerodha homepage HTML into normalized news items."""
+    index = index or _default_index
     items: List[Dict[str, Any]] = []
     for raw in _PULSE_ITEM_RE.findall(html_text):
         title_m = _PULSE_TITLE_RE.search(raw)
@@ -457,10 +522,7 @@ def _parse_pulse_html(html_text: str) -> List[Dict[str, Any]]:
         source_name = f"Pulse · {publisher}"
 
         uid = hashlib.md5(f"pulse::{title}".encode()).hexdigest()[:12]
-        analysis = _classify(title, desc_clean)
-        analysis["score"] = _tensorflow_refine_score(title, desc_clean, analysis["score"])
-        analysis["confidence"] = min(98, max(30, int(abs(analysis["score"] - 50) * 1.8 + 30)))
-        tier = _impact_tier(analysis["signal"], analysis["score"])
+        analysis = index.analyze(title, desc_clean)
 
         items.append({
             "id": uid,
@@ -469,7 +531,6 @@ def _parse_pulse_html(html_text: str) -> List[Dict[str, Any]]:
             "link": link,
             "published": published,
             "source": source_name,
-            "impact_tier": tier,
             **analysis,
         })
         if len(items) >= _MAX_PULSE_ITEMS:
@@ -491,6 +552,10 @@ class GlobalNewsService:
         self._ws_clients: set = set()  # active WebSocket connections
         self._feed_failures: Dict[str, int] = {}
         self._feed_retry_until: Dict[str, float] = {}
+        self._index = _AnalysisIndex()
+        get_stream_hub().register("global_news", snapshot=self.get_snapshot)
+        self._feed_items: Dict[str, List[Dict[str, Any]]] = {}  # last parse per feed (304 reuse)
+        self._last_delta_view: Optional[Dict[str, Any]] = None  # ranking + summary clients last received
 
     def _feed_is_cooled_down(self, feed_name: str) -> bool:
         retry_until = self._feed_retry_until.get(feed_name)
@@ -536,19 +601,33 @@ class GlobalNewsService:
             except asyncio.CancelledError:
                 pass
 
-    async def broadcast(self) -> None:
-        """Push the current snapshot to every connected WebSocket client."""
+    async def broadcast(self, payload: Optional[Dict[str, Any]] = None) -> None:
+        """Push ``payload`` (default: the full snapshot) to every connected WebSocket client and /ws/stream subscriber."""
+        msg = payload if payload is not None else self.get_snapshot()
+        get_stream_hub().publish("global_news", msg)
         if not self._ws_clients:
             return
-        snap = self.get_snapshot()
         dead: set = set()
         for ws in list(self._ws_clients):
             try:
-                await ws.send_json(snap)
+                await ws.send_json(msg)
             except Exception:
                 dead.add(ws)
         self._ws_clients -= dead
 
+    def build_delta(self, added: List[Dict[str, Any]], removed: List[str]) -> Dict[str, Any]:
+        """Only newly arrived headlines + ids that dropped out; ``order`` is the new ranking."""
+        snap = self.get_snapshot()
+        snap.pop("signal_meta", None)
+        items = snap.pop("items")
+        return {
+            "type": "global_news_delta",
+            "added": added,
+            "removed": removed,
+            "order": [i["id"] for i in items],
+            **snap,
+        }
+
     async def _loop(self):
         while True:
             await asyncio.sleep(_CACHE_TTL_SECS)
@@ -565,15 +644,20 @@ class GlobalNewsService:
                 logger.debug("GlobalNews refresh skipped: all feeds are in cooldown")
                 return
 
-            async with httpx.AsyncClient() as client:
-                tasks = [_fetch_feed(client, f) for f in eligible_feeds]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                for feed, result in zip(eligible_feeds, results):
-                    if isinstance(result, list):
-                        all_items.extend(result)
-                        self._register_feed_result(feed["name"], ok=True)
-                    else:
-                        self._register_feed_result(feed["name"], ok=False, error_text=str(result))
+            pool = get_http_pool()
+            tasks = [
+                _fetch_feed(pool, f, self._index, self._feed_items.get(f["name"]))
+                for f in eligible_feeds
+            ]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for feed, result in zip(eligible_feeds, results):
+                if isinstance(result, list):
+                    all_items.extend(result)
+                    if result:
+                        self._feed_items[feed["name"]] = result
+                    self._register_feed_result(feed["name"], ok=True)
+                else:
+                    self._register_feed_result(feed["name"], ok=False, error_text=str(result))
 
             # Deduplicate by id, limit total
             seen: set[str] = set()
@@ -597,7 +681,11 @@ class GlobalNewsService:
                 ),
                 reverse=True,
             )
+            previous_ids = {i["id"] for i in (self._cache or [])}
             self._cache = unique[:_MAX_TOTAL_ITEMS]
+            current_ids = {i["id"] for i in self._cache}
+            added = [i for i in self._cache if i["id"] not in previous_ids]
+            removed = sorted(previous_ids - current_ids)
             self._last_fetch = asyncio.get_running_loop().time()
 
             # Compute heat score (avg extremity across top items)
@@ -614,10 +702,18 @@ class GlobalNewsService:
                     "RSS feeds may be unreachable or blocked.", len(_RSS_FEEDS)
                 )
             else:
-                logger.info("GlobalNews refreshed: %d items, heat=%d", n, self._heat_score)
-        # Broadcast outside the lock so get_snapshot() is not blocked
-        if self._ws_clients:
-            asyncio.create_task(self.broadcast())
+                logger.info(
+                    "GlobalNews refreshed: %d items (%d new), heat=%d, index=%s",
+                    n, len(added), self._heat_score, self._index.stats(),
+                )
+        # Broadcast outside the lock so get_snapshot() is not blocked.
+        # Clients already hold the snapshot from connect — only push what changed:
+        # headlines in or out, or a new ranking / heat score / summary counts.
+        delta = self.build_delta(added, removed)
+        view = {k: v for k, v in delta.items() if k not in ("added", "removed", "last_updated")}
+        if added or removed or view != self._last_delta_view:
+            self._last_delta_view = view
+            asyncio.create_task(self.broadcast(delta))
 
     def get_snapshot(self) -> Dict[str, Any]:
         items = self._cache or []
@@ -6,10 +6,10 @@ Auto-detects expiry and provides global status
 from datetime import datetime, timedelta
 from typing import Optional, Dict
 import asyncio
-from kiteconnect import KiteConnect
 import pytz
 
 from config import get_settings
+from services.kite_gateway import get_kite_gateway
 
 IST = pytz.timezone('Asia/Kolkata')
 
@@ -37,16 +37,15 @@ class GlobalTokenManager:
         
         # Check token validity
         try:
+            # Current settings (the token watcher and login clear the cache on rotation)
+            self.settings = get_settings()
             if not self.settings.zerodha_access_token:
                 self._is_valid = False
                 return False
             
-            # Quick validation - try to get profile
-            kite = KiteConnect(api_key=self.settings.zerodha_api_key)
-            kite.set_access_token(self.settings.zerodha_access_token)
-            
-            # Lightweight API call
-            profile = kite.profile()
+            # Quick validation - lightweight profile call on the gateway executor,
+            # with this token only; the shared client's token is not touched
+            profile = await get_kite_gateway().profile(token=self.settings.zerodha_access_token)
             
             self._is_valid = True
             self._user_info = profile
@@ -0,0 +1,266 @@
+"""Shared async HTTP layer for external market-data providers.
+
+Every outbound call to Yahoo, Stooq, RSS feeds, Moneycontrol or OpenAI goes
+through one process-wide :class:`HttpClientPool` instead of a fresh
+``httpx.AsyncClient`` / blocking ``requests`` call per fetch:
+
+    • one keep-alive ``httpx.AsyncClient`` per host (HTTP/2 when ``h2`` is installed)
+    • conditional GET — ETag / Last-Modified validators remembered per URL,
+      a 304 hands back the cached body without re-downloading it
+    • hedged requests — race a fallback provider if the primary is slow
+    • per-provider latency / error counters for the health endpoints
+
+Public surface:
+    pool = get_http_pool()
+    resp = await pool.get(url, provider="yahoo", params=...)
+    cond = await pool.get_conditional(url, provider="cnbc")
+    best = await hedged([call_a, call_b], delay=1.5)
+    pool.metrics() -> dict
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence, Tuple, TypeVar
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP/2 needs the optional `h2` package — fall back to HTTP/1.1 keep-alive.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_DEFAULT_TIMEOUT = 8.0
+_MAX_CONNECTIONS_PER_HOST = 10
+_MAX_KEEPALIVE_PER_HOST = 5
+_KEEPALIVE_EXPIRY = 60.0
+_EWMA_ALPHA = 0.2
+_MAX_VALIDATORS = 512        # bound the conditional-GET body cache
+
+
+@dataclass
+class ProviderMetrics:
+    """Rolling request counters for one provider (Yahoo, Stooq, a feed, ...)."""
+
+    requests: int = 0
+    errors: int = 0
+    not_modified: int = 0
+    total_ms: float = 0.0
+    ewma_ms: float = 0.0
+    max_ms: float = 0.0
+    last_status: Optional[int] = None
+    last_error: str = ""
+    last_error_at: float = 0.0
+
+    def record(self, elapsed_ms: float, status: Optional[int], error: str = "") -> None:
+        self.requests += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.ewma_ms = elapsed_ms if self.requests == 1 else (
+            _EWMA_ALPHA * elapsed_ms + (1 - _EWMA_ALPHA) * self.ewma_ms
+        )
+        self.last_status = status
+        if status == 304:
+            self.not_modified += 1
+        if error or (status is not None and status >= 400):
+            self.errors += 1
+            self.last_error = error or f"HTTP {status}"
+            self.last_error_at = time.time()
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "errorRate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+            "notModified": self.not_modified,
+            "avgMs": round(self.total_ms / self.requests, 1) if self.requests else 0.0,
+            "ewmaMs": round(self.ewma_ms, 1),
+            "maxMs": round(self.max_ms, 1),
+            "lastStatus": self.last_status,
+            "lastError": self.last_error,
+            "lastErrorAt": self.last_error_at or None,
+        }
+
+
+@dataclass
+class ConditionalResponse:
+    """Result of :meth:`HttpClientPool.get_conditional`."""
+
+    status_code: int
+    text: str
+    not_modified: bool = False
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class HttpClientPool:
+    """Process-wide pool of keep-alive ``httpx.AsyncClient`` instances, one per host."""
+
+    def __init__(
+        self,
+        timeout: float = _DEFAULT_TIMEOUT,
+        max_connections: int = _MAX_CONNECTIONS_PER_HOST,
+        max_keepalive: int = _MAX_KEEPALIVE_PER_HOST,
+        http2: Optional[bool] = None,
+    ) -> None:
+        self._timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=_KEEPALIVE_EXPIRY,
+        )
+        self._http2 = _HTTP2_AVAILABLE if http2 is None else (http2 and _HTTP2_AVAILABLE)
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, ProviderMetrics] = {}
+        # url -> (etag, last_modified, body)
+        self._validators: Dict[str, Tuple[Optional[str], Optional[str], str]] = {}
+
+    # --- clients ----------------------------------------------------------
+
+    @staticmethod
+    def _origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}".lower()
+
+    def _client_for(self, url: str) -> httpx.AsyncClient:
+        origin = self._origin(url)
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self._timeout,
+                limits=self._limits,
+                http2=self._http2,
+                follow_redirects=True,
+            )
+            self._clients[origin] = client
+        return client
+
+    def _provider_metrics(self, provider: str) -> ProviderMetrics:
+        metrics = self._metrics.get(provider)
+        if metrics is None:
+            metrics = self._metrics[provider] = ProviderMetrics()
+        return metrics
+
+    # --- requests ---------------------------------------------------------
+
+    async def request(self, method: str, url: str, *, provider: Optional[str] = None, **kwargs: Any) -> httpx.Response:
+        """Send a request on the pooled client for ``url``'s host and record metrics."""
+        metrics = self._provider_metrics(provider or self._origin(url))
+        started = time.perf_counter()
+        try:
+            resp = await self._client_for(url).request(method, url, **kwargs)
+        except Exception as exc:
+            metrics.record((time.perf_counter() - started) * 1000, None, error=f"{type(exc).__name__}: {exc}")
+            raise
+        metrics.record((time.perf_counter() - started) * 1000, resp.status_code)
+        return resp
+
+    async def get(self, url: str, *, provider: Optional[str] = None, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, provider=provider, **kwargs)
+
+    async def post(self, url: str, *, provider: Optional[str] = None, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, provider=provider, **kwargs)
+
+    async def get_conditional(self, url: str, *, provider: Optional[str] = None, **kwargs: Any) -> ConditionalResponse:
+        """GET with If-None-Match / If-Modified-Since from the previous 200.
+
+        A 304 returns the body remembered from the last 200 with
+        ``not_modified=True`` so callers can skip re-parsing entirely.
+        """
+        headers = dict(kwargs.pop("headers", None) or {})
+        cached = self._validators.get(url)
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        resp = await self.get(url, provider=provider, headers=headers, **kwargs)
+        if resp.status_code == 304 and cached:
+            return ConditionalResponse(304, cached[2], not_modified=True, headers=dict(resp.headers))
+
+        text = resp.text
+        if resp.status_code == 200:
+            etag = resp.headers.get("etag")
+            last_modified = resp.headers.get("last-modified")
+            if etag or last_modified:
+                if url not in self._validators and len(self._validators) >= _MAX_VALIDATORS:
+                    self._validators.pop(next(iter(self._validators)))
+                self._validators[url] = (etag, last_modified, text)
+            else:
+                self._validators.pop(url, None)
+        return ConditionalResponse(resp.status_code, text, headers=dict(resp.headers))
+
+    # --- lifecycle / introspection ---------------------------------------
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "http2": self._http2,
+            "hosts": sorted(self._clients),
+            "conditionalUrls": len(self._validators),
+            "providers": {name: m.as_dict() for name, m in sorted(self._metrics.items())},
+        }
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception:
+                pass
+
+
+async def hedged(calls: Sequence[Callable[[], Awaitable[Optional[T]]]], delay: float) -> Optional[T]:
+    """Return the first non-``None`` result, starting the next call after ``delay``.
+
+    The first call runs alone; if it has not produced a usable result within
+    ``delay`` seconds (or it failed / returned ``None``) the next call is
+    launched alongside it, and so on. Losers are cancelled once a winner is in.
+    """
+    pending: set = set()
+    remaining = list(calls)
+    try:
+        while remaining or pending:
+            if remaining:
+                pending.add(asyncio.ensure_future(remaining.pop(0)()))
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=delay if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                if task.cancelled() or task.exception() is not None:
+                    if not task.cancelled():
+                        logger.debug("Hedged call failed: %s", task.exception())
+                    continue
+                result = task.result()
+                if result is not None:
+                    return result
+        return None
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+_pool: Optional[HttpClientPool] = None
+
+
+def get_http_pool() -> HttpClientPool:
+    global _pool
+    if _pool is None:
+        _pool = HttpClientPool()
+    return _pool
+
+
+async def close_http_pool() -> None:
+    global _pool
+    if _pool is not None:
+        await _pool.aclose()
+        _pool = None
@@ -35,12 +35,12 @@ import time
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple, Deque, Set
+from typing import Dict, Any, Optional, List, Tuple, Deque
 
-from fastapi import WebSocket
 import pytz
 
 from services.cache import CacheService, _SHARED_CACHE
+from services.ws_outbox import BroadcastManager
 
 logger = logging.getLogger(__name__)
 IST = pytz.timezone("Asia/Kolkata")
@@ -75,50 +75,11 @@ BEAR_T = -0.12
 
 # ── Isolated WebSocket manager ────────────────────────────────────────────────
 
-class ICTConnectionManager:
+class ICTConnectionManager(BroadcastManager):
     """Completely isolated WebSocket manager — no shared state."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
-
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(ws.send_text(json.dumps(data, default=str)), timeout=3.0)
-        except Exception:
-            await self.disconnect(ws)
-
-    @property
-    def client_count(self) -> int:
-        return len(self._connections)
-
 
-ict_manager = ICTConnectionManager()
+ict_manager = ICTConnectionManager("ict")
 
 
 # ── Utility functions ─────────────────────────────────────────────────────────
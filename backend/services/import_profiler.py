@@ -0,0 +1,109 @@
+"""Import-time profiler — what `import main` costs, module by module.
+
+Runs the target import in a fresh interpreter under `python -X importtime`
+and folds the trace into per-module self / cumulative milliseconds, plus a
+per-package roll-up of top-level imports (so "pandas" or "lightgbm" shows up
+as one line no matter which router pulled it in first).
+
+    python -m services.import_profiler              # profile `import main`
+    python -m services.import_profiler routers.ict --top 15
+    python -m services.import_profiler --json
+
+Also served (admin-only, it spawns a process) at
+/api/system/health/imports together with the lazy-router load timings.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_ms: float
+    cumulative_ms: float
+    depth: int
+
+
+def parse_importtime(text: str) -> List[ImportRecord]:
+    """Records from `-X importtime` stderr, in trace order (children before parents)."""
+    records = []
+    for line in text.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(ImportRecord(module, int(self_us) / 1000, int(cumulative_us) / 1000,
+                                        (len(indent) - 1) // 2))
+    return records
+
+
+def summarize(records: List[ImportRecord], top: int = 25) -> Dict[str, Any]:
+    packages: Dict[str, float] = {}
+    for record in records:
+        root = record.module.split(".")[0]
+        packages[root] = packages.get(root, 0.0) + record.self_ms
+    top_level = [r for r in records if r.depth == 0]
+    return {
+        "modules": len(records),
+        "total_ms": round(sum(r.cumulative_ms for r in top_level), 1),
+        "slowest_cumulative": [asdict(r) for r in sorted(records, key=lambda r: -r.cumulative_ms)[:top]],
+        "slowest_self": [asdict(r) for r in sorted(records, key=lambda r: -r.self_ms)[:top]],
+        "packages_ms": dict(sorted(((k, round(v, 1)) for k, v in packages.items()),
+                                   key=lambda kv: -kv[1])[:top]),
+    }
+
+
+def profile_imports(target: str = "main", top: int = 25, python: Optional[str] = None,
+                    timeout: float = 120.0) -> Dict[str, Any]:
+    """Import ``target`` in a fresh interpreter under -X importtime and summarize."""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, timeout=timeout,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    report = summarize(parse_importtime(proc.stderr), top)
+    report.update({"target": target, "wall_ms": round(wall_ms, 1), "returncode": proc.returncode})
+    if proc.returncode != 0:
+        report["error"] = proc.stderr.strip().splitlines()[-1:] or ["import failed"]
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Per-module import cost of a backend module")
+    parser.add_argument("target", nargs="?", default="main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--json", action="store_true", help="print raw JSON")
+    args = parser.parse_args(argv)
+
+    report = profile_imports(args.target, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return report["returncode"]
+
+    print(f"import {report['target']}: {report['total_ms']:.0f}ms in imports, "
+          f"{report['wall_ms']:.0f}ms wall, {report['modules']} modules")
+    print(f"\n{'cumulative':>12} {'self':>9}  module")
+    for r in report["slowest_cumulative"]:
+        print(f"{r['cumulative_ms']:10.1f}ms {r['self_ms']:7.1f}ms  {'  ' * r['depth']}{r['module']}")
+    print(f"\n{'self total':>12}  package")
+    for package, ms in report["packages_ms"].items():
+        print(f"{ms:10.1f}ms  {package}")
+    return report["returncode"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,588 @@
+"""Instrument universe — dense instrument ids and array-backed tick state.
+
+The tick pipeline was keyed by symbol string end to end (TOKEN_SYMBOL_MAP,
+per-symbol dicts of candle builders, analyzers pre-sized for the three
+indices), which is fine for four tokens and not for stock futures or a few
+hundred option strikes. The universe gives every registered instrument token
+a dense integer id (0..n-1). Per-instrument state lives in NumPy columns
+indexed by that id, so a tick costs one dict lookup (token → id) plus a few
+array writes no matter how many instruments are subscribed.
+
+    universe = get_instrument_universe()
+    iid = universe.add(12683010, "NIFTY26OCTFUT", kind="FUTURE", underlying="NIFTY")
+    universe.declare("strike_intelligence", kinds={"OPTION"}, underlyings={"NIFTY"}, mode="quote")
+    prices = universe.state.last_price[universe.slice("strike_intelligence").ids]
+
+Services declare the slice of the universe they consume (symbols, kinds,
+underlyings or a predicate) and the KiteTicker mode they need. The feed's
+subscription is the union of all slices, each token in the richest mode any
+slice asked for; `subscription_delta()` / `apply_subscriptions(ws)` turn
+declaration changes into subscribe / set_mode / unsubscribe calls. KiteTicker
+allows FEED_MAX_TOKENS (3000) per connection; tokens beyond that spill onto
+further connections, up to FEED_MAX_CONNECTIONS. Each token stays on the
+connection it was first placed on while it is wanted, so re-centring an option
+window only touches the tokens that changed; `connections_needed()` tells the
+feed when to open another ticker, and `apply_subscriptions(ws, connection=n)`
+drives it. A slice may also pass
+`on_tick=fn(iid, price, volume, oi, epoch)` to be called for its instruments'
+ticks; listeners are resolved per id ahead of time, so dispatch stays O(1).
+
+The KiteTicker thread writes `state` and the event loop folds ticks into
+`candles` (`update_candles`, or `update_candle` for one timeframe); both take `_state_lock` for the writes, and so does growing the
+arrays when registration runs past capacity, so a tick can never land in an
+array that is being copied and replaced. Listeners run after the lock is
+released. Registration and slice changes take `_lock`.
+
+`retire(tokens)` / `retire_expired(today)` unregister contracts that have
+expired: they leave every slice (so the next subscription delta unsubscribes
+them), their rows are zeroed, and their ids are handed to the next `add`, so a
+multi-day run that loads each day's option series keeps its arrays and the
+`declare` scan at the size of what is live. `len(universe)` stays the row
+count (array bound); `live_instruments()` skips the retired rows.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from services.candle_archive import IST, IST_OFFSET, TIMEFRAMES
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("INDEX", "FUTURE", "OPTION", "EQUITY")
+MODES = ("ltp", "quote", "full")                  # KiteTicker modes, cheapest first
+INDEX_SYMBOLS = ("NIFTY", "BANKNIFTY", "SENSEX")  # the dashboard indices
+INDIA_VIX_TOKEN = 256170
+LIVE_TIMEFRAMES = ("3m", "5m", "15m")
+
+# kite.instruments() instrument_type → our kind
+_KITE_KINDS = {"FUT": "FUTURE", "CE": "OPTION", "PE": "OPTION", "EQ": "EQUITY"}
+
+
+@dataclass(frozen=True)
+class Instrument:
+    iid: int
+    token: int
+    symbol: str
+    kind: str = "INDEX"
+    exchange: str = "NSE"
+    underlying: Optional[str] = None
+    expiry: Optional[str] = None
+    strike: Optional[float] = None
+    option_type: Optional[str] = None      # CE / PE
+    lot_size: int = 1
+
+
+class InstrumentState:
+    """Struct of arrays: one row per instrument id, grown by doubling."""
+
+    FIELDS = {
+        "last_price": np.float64,
+        "volume": np.int64,         # cumulative day volume (volume_traded)
+        "oi": np.int64,
+        "last_update": np.float64,  # epoch seconds of the last tick
+        "ticks": np.int64,
+    }
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def grow(self, capacity: int) -> None:
+        for name in self.FIELDS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def reset(self, ids: List[int]) -> None:
+        for name in self.FIELDS:
+            getattr(self, name)[ids] = 0
+
+
+class CandleBook:
+    """OHLCV+OI builders for one timeframe, one row per instrument id.
+
+    Buckets are aligned to IST clock time like candle_archive.aggregate, so a
+    5m candle opens at 09:15, 09:20, ... Volume is the difference of the
+    cumulative day volume between the first and last tick of the bucket.
+    """
+
+    def __init__(self, timeframe: str, capacity: int) -> None:
+        self.timeframe = timeframe
+        self.seconds = TIMEFRAMES[timeframe]
+        self.bucket = np.full(capacity, -1, dtype=np.int64)   # epoch seconds of the open candle
+        self.ohlc = np.zeros((capacity, 4), dtype=np.float64)
+        self.volume = np.zeros((capacity, 2), dtype=np.int64)  # cumulative volume at open / last tick
+        self.oi = np.zeros((capacity, 2), dtype=np.int64)      # oi at open / last tick
+
+    def grow(self, capacity: int) -> None:
+        bucket = np.full(capacity, -1, dtype=np.int64)
+        bucket[:len(self.bucket)] = self.bucket
+        self.bucket = bucket
+        for name in ("ohlc", "volume", "oi"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, old.shape[1]), dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def reset(self, ids: List[int]) -> None:
+        self.bucket[ids] = -1
+        self.ohlc[ids] = 0
+        self.volume[ids] = 0
+        self.oi[ids] = 0
+
+    def bucket_of(self, epoch: float) -> int:
+        return (int(epoch) + IST_OFFSET) // self.seconds * self.seconds - IST_OFFSET
+
+    def update(self, iid: int, price: float, volume: int, oi: int, epoch: float) -> Optional[Dict[str, Any]]:
+        """Fold one tick in; returns the finished candle when ``epoch`` opens a new bucket."""
+        bucket = self.bucket_of(epoch)
+        if self.bucket[iid] != bucket:
+            finished = self.candle(iid) if self.bucket[iid] >= 0 else None
+            self.bucket[iid] = bucket
+            self.ohlc[iid] = price
+            self.volume[iid] = volume
+            self.oi[iid] = oi
+            return finished
+        row = self.ohlc[iid]
+        if price > row[1]:
+            row[1] = price
+        if price < row[2]:
+            row[2] = price
+        row[3] = price
+        self.volume[iid, 1] = volume
+        self.oi[iid, 1] = oi
+        if self.oi[iid, 0] == 0 and oi > 0:
+            self.oi[iid, 0] = oi
+        return None
+
+    def candle(self, iid: int, live: bool = False) -> Optional[Dict[str, Any]]:
+        """The candle being built for ``iid`` in the cache's analysis_candles shape."""
+        if self.bucket[iid] < 0:
+            return None
+        o, h, l, c = (float(v) for v in self.ohlc[iid])
+        vol_open, vol_last = (int(v) for v in self.volume[iid])
+        oi_open, oi_last = (int(v) for v in self.oi[iid])
+        candle = {
+            "timestamp": datetime.fromtimestamp(int(self.bucket[iid]), IST).isoformat(),
+            "open": o,
+            "high": h,
+            "low": l,
+            "close": c,
+            "volume": max(0, vol_last - vol_open),
+            "oi": oi_last,
+            "oi_prev": oi_open,
+        }
+        if live:
+            candle["_live"] = True
+        return candle
+
+
+@dataclass
+class UniverseSlice:
+    """The instruments one consumer reads, kept current as instruments are added."""
+
+    consumer: str
+    mode: str = "quote"
+    symbols: Optional[frozenset] = None
+    kinds: Optional[frozenset] = None
+    underlyings: Optional[frozenset] = None
+    predicate: Optional[Callable[[Instrument], bool]] = None
+    on_tick: Optional[Callable[[int, float, int, int, float], None]] = None
+    members: List[int] = field(default_factory=list)
+    _member_set: set = field(default_factory=set, repr=False)
+    _ids: Optional[np.ndarray] = field(default=None, repr=False)
+
+    def accepts(self, instrument: Instrument) -> bool:
+        if self.symbols is not None and instrument.symbol not in self.symbols:
+            return False
+        if self.kinds is not None and instrument.kind not in self.kinds:
+            return False
+        if self.underlyings is not None and (instrument.underlying or instrument.symbol) not in self.underlyings:
+            return False
+        return self.predicate is None or bool(self.predicate(instrument))
+
+    def _add(self, iid: int) -> None:
+        self.members.append(iid)
+        self._member_set.add(iid)
+        self._ids = None
+
+    def _remove(self, iid: int) -> None:
+        if iid in self._member_set:
+            self.members.remove(iid)
+            self._member_set.discard(iid)
+            self._ids = None
+
+    @property
+    def ids(self) -> np.ndarray:
+        """Member ids as an index array, for vectorized reads of universe columns."""
+        if self._ids is None:
+            self._ids = np.asarray(self.members, dtype=np.int64)
+        return self._ids
+
+    def __contains__(self, iid: int) -> bool:
+        return iid in self._member_set
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+
+class InstrumentUniverse:
+    """Registry of subscribed instruments with dense ids and columnar state."""
+
+    def __init__(self, capacity: int = 64, max_tokens: int = 3000,
+                 timeframes: Sequence[str] = LIVE_TIMEFRAMES, max_connections: int = 1) -> None:
+        self._lock = threading.RLock()
+        self._state_lock = threading.Lock()      # state / candle array writes and growth
+        self.instruments: List[Instrument] = []
+        self._by_token: Dict[int, int] = {}
+        self._by_symbol: Dict[str, int] = {}
+        self._free: List[int] = []                # retired ids, reused by the next adds
+        self.capacity = capacity
+        self.max_tokens = max_tokens
+        self.max_connections = max(int(max_connections), 1)
+        self.state = InstrumentState(capacity)
+        self.candles: Dict[str, CandleBook] = {tf: CandleBook(tf, capacity) for tf in timeframes}
+        self._slices: Dict[str, UniverseSlice] = {}
+        self._listeners: List[Tuple[Callable, ...]] = []   # per id: on_tick callbacks of its slices
+        # Per ticker connection: token → mode currently subscribed on it
+        self._subscribed: List[Dict[int, str]] = [{} for _ in range(self.max_connections)]
+        self._connection_of: Dict[int, int] = {}  # token → connection it is placed on
+        self.version = 0                          # bumped on add / declare / release
+        self._applied_version = [-1] * self.max_connections
+
+    # ── Registration ────────────────────────────────────────────────────
+
+    def add(self, token: int, symbol: str, kind: str = "INDEX", **meta: Any) -> int:
+        """Register ``token`` (idempotent) and return its dense id."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown instrument kind: {kind} (expected one of {', '.join(KINDS)})")
+        token = int(token)
+        with self._lock:
+            iid = self._by_token.get(token)
+            if iid is not None:
+                return iid
+            reused = bool(self._free)
+            iid = self._free.pop() if reused else len(self.instruments)
+            if iid >= self.capacity:
+                self._grow(self.capacity * 2)
+            instrument = Instrument(iid=iid, token=token, symbol=symbol, kind=kind, **meta)
+            if reused:
+                self.instruments[iid] = instrument
+            else:
+                self.instruments.append(instrument)
+                self._listeners.append(())
+            self._by_token[token] = iid
+            self._by_symbol.setdefault(symbol, iid)
+            for universe_slice in self._slices.values():
+                if universe_slice.accepts(instrument):
+                    universe_slice._add(iid)
+            self._resolve_listeners([iid])
+            self.version += 1
+            return iid
+
+    def add_kite_instruments(self, rows: Iterable[Dict[str, Any]]) -> List[int]:
+        """Register rows from ``kite.instruments(exchange)``; returns their ids."""
+        ids = []
+        for row in rows:
+            kind = "INDEX" if row.get("segment") == "INDICES" else _KITE_KINDS.get(row.get("instrument_type"))
+            if kind is None:
+                continue
+            expiry = row.get("expiry")
+            ids.append(self.add(
+                row["instrument_token"], row["tradingsymbol"], kind=kind,
+                exchange=row.get("exchange", "NSE"),
+                underlying=row.get("name") or None,
+                expiry=expiry.isoformat() if hasattr(expiry, "isoformat") else (expiry or None),
+                strike=float(row["strike"]) if kind == "OPTION" and row.get("strike") else None,
+                option_type=row.get("instrument_type") if kind == "OPTION" else None,
+                lot_size=int(row.get("lot_size") or 1),
+            ))
+        return ids
+
+    def retire(self, tokens: Iterable[Any]) -> int:
+        """Unregister ``tokens`` (expired contracts); their ids and rows go to the next adds."""
+        retired = []
+        with self._lock:
+            for token in tokens:
+                iid = self._by_token.pop(int(token), None)
+                if iid is None:
+                    continue
+                symbol = self.instruments[iid].symbol
+                if self._by_symbol.get(symbol) == iid:
+                    del self._by_symbol[symbol]
+                for universe_slice in self._slices.values():
+                    universe_slice._remove(iid)
+                self._listeners[iid] = ()
+                retired.append(iid)
+            if retired:
+                with self._state_lock:
+                    self.state.reset(retired)
+                    for book in self.candles.values():
+                        book.reset(retired)
+                self._free.extend(retired)
+                self.version += 1
+        return len(retired)
+
+    def retire_expired(self, today: date) -> int:
+        """Retire every registered contract that expired before ``today``."""
+        cutoff = today.isoformat()
+        with self._lock:
+            return self.retire([i.token for i in self.live_instruments() if i.expiry and i.expiry[:10] < cutoff])
+
+    def live_instruments(self) -> List[Instrument]:
+        """Registered instruments, without retired rows awaiting reuse."""
+        with self._lock:
+            free = set(self._free)
+            return [i for i in self.instruments if i.iid not in free]
+
+    def _resolve_listeners(self, ids: Iterable[int]) -> None:
+        for iid in ids:
+            self._listeners[iid] = tuple(s.on_tick for s in self._slices.values()
+                                         if s.on_tick is not None and iid in s)
+
+    def _grow(self, capacity: int) -> None:
+        with self._state_lock:
+            self.state.grow(capacity)
+            for book in self.candles.values():
+                book.grow(capacity)
+            self.capacity = capacity
+
+    # ── Lookup ──────────────────────────────────────────────────────────
+
+    def id_of_token(self, token: Any) -> Optional[int]:
+        return self._by_token.get(token)
+
+    def id_of(self, symbol: str) -> Optional[int]:
+        return self._by_symbol.get(symbol)
+
+    def __getitem__(self, iid: int) -> Instrument:
+        return self.instruments[iid]
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    def __contains__(self, token: Any) -> bool:
+        return token in self._by_token
+
+    # ── Tick path (KiteTicker thread) ───────────────────────────────────
+
+    def on_tick(self, iid: int, price: float, volume: int, oi: int, epoch: Optional[float] = None) -> None:
+        epoch = epoch if epoch is not None else time.time()
+        with self._state_lock:
+            state = self.state
+            state.last_price[iid] = price
+            state.volume[iid] = volume
+            state.oi[iid] = oi
+            state.last_update[iid] = epoch
+            state.ticks[iid] += 1
+        for listener in self._listeners[iid]:
+            try:
+                listener(iid, price, volume, oi, epoch)
+            except Exception:
+                logger.exception("Tick listener failed for %s", self.instruments[iid].symbol)
+
+    def update_candles(self, iid: int, price: float, volume: int, oi: int,
+                       epoch: float) -> List[Tuple[str, Dict[str, Any]]]:
+        """Fold a tick into every timeframe; returns (timeframe, finished candle) pairs."""
+        finished = []
+        with self._state_lock:
+            for timeframe, book in self.candles.items():
+                candle = book.update(iid, price, volume, oi, epoch)
+                if candle is not None:
+                    finished.append((timeframe, candle))
+        return finished
+
+    def update_candle(self, timeframe: str, iid: int, price: float, volume: int, oi: int,
+                      epoch: float) -> Optional[Dict[str, Any]]:
+        """Fold a tick into one timeframe's book; returns the candle it finished, if any."""
+        with self._state_lock:
+            return self.candles[timeframe].update(iid, price, volume, oi, epoch)
+
+    # ── Slices and subscriptions ────────────────────────────────────────
+
+    def declare(self, consumer: str, *, symbols: Optional[Iterable[str]] = None,
+                kinds: Optional[Iterable[str]] = None, underlyings: Optional[Iterable[str]] = None,
+                predicate: Optional[Callable[[Instrument], bool]] = None,
+                mode: str = "quote",
+                on_tick: Optional[Callable[[int, float, int, int, float], None]] = None) -> UniverseSlice:
+        """Declare (or replace) the slice ``consumer`` reads and the tick mode it needs."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown tick mode: {mode} (expected one of {', '.join(MODES)})")
+        universe_slice = UniverseSlice(
+            consumer=consumer, mode=mode,
+            symbols=frozenset(symbols) if symbols is not None else None,
+            kinds=frozenset(kinds) if kinds is not None else None,
+            underlyings=frozenset(underlyings) if underlyings is not None else None,
+            predicate=predicate, on_tick=on_tick,
+        )
+        with self._lock:
+            for instrument in self.live_instruments():
+                if universe_slice.accepts(instrument):
+                    universe_slice._add(instrument.iid)
+            previous = self._slices.get(consumer)
+            self._slices[consumer] = universe_slice
+            self._resolve_listeners(set(universe_slice.members) | set(previous.members if previous else ()))
+            self.version += 1
+        return universe_slice
+
+    def release(self, consumer: str) -> None:
+        with self._lock:
+            released = self._slices.pop(consumer, None)
+            if released is not None:
+                self._resolve_listeners(released.members)
+                self.version += 1
+
+    def slice(self, consumer: str) -> Optional[UniverseSlice]:
+        return self._slices.get(consumer)
+
+    def symbols(self, consumer: str) -> List[str]:
+        universe_slice = self._slices.get(consumer)
+        return [self.instruments[i].symbol for i in universe_slice.members] if universe_slice else []
+
+    def consumers_of(self, iid: int) -> List[str]:
+        return [name for name, universe_slice in self._slices.items() if iid in universe_slice]
+
+    def desired_subscriptions(self) -> Dict[int, str]:
+        """token → richest mode any slice needs, in instrument-id order, capped at
+        ``max_tokens`` per connection × ``max_connections``."""
+        with self._lock:
+            rank: Dict[int, int] = {}
+            for universe_slice in self._slices.values():
+                level = MODES.index(universe_slice.mode)
+                for iid in universe_slice.members:
+                    if rank.get(iid, -1) < level:
+                        rank[iid] = level
+        ordered = sorted(rank)
+        cap = self.max_tokens * self.max_connections
+        if len(ordered) > cap:
+            logger.warning("Universe wants %d tokens; subscribing the first %d (FEED_MAX_TOKENS × %d)",
+                           len(ordered), cap, self.max_connections)
+            ordered = ordered[:cap]
+        return {self.instruments[iid].token: MODES[rank[iid]] for iid in ordered}
+
+    def _place(self, desired: Dict[int, str]) -> None:
+        """Keep placed tokens where they are; put new ones on the first connection with room."""
+        with self._lock:
+            placed = self._connection_of
+            for token in [t for t in placed if t not in desired]:
+                del placed[token]
+            load = [0] * self.max_connections
+            for connection in placed.values():
+                load[connection] += 1
+            for token in desired:
+                if token not in placed:
+                    connection = next(c for c in range(self.max_connections) if load[c] < self.max_tokens)
+                    placed[token] = connection
+                    load[connection] += 1
+
+    def connections_needed(self) -> int:
+        """How many ticker connections the current subscription spans (at least 1)."""
+        self._place(self.desired_subscriptions())
+        return max(self._connection_of.values(), default=0) + 1
+
+    def subscription_delta(self, connection: int = 0) -> Tuple[Dict[str, List[int]], List[int]]:
+        """({mode: tokens to subscribe or switch mode}, tokens to unsubscribe) vs one ticker."""
+        desired = self.desired_subscriptions()
+        self._place(desired)
+        subscribed = self._subscribed[connection]
+        changes: Dict[str, List[int]] = {}
+        for token, mode in desired.items():
+            if self._connection_of[token] == connection and subscribed.get(token) != mode:
+                changes.setdefault(mode, []).append(token)
+        removed = [token for token in subscribed
+                   if token not in desired or self._connection_of[token] != connection]
+        return changes, removed
+
+    @property
+    def subscriptions_pending(self) -> bool:
+        return self._applied_version[0] != self.version
+
+    def pending(self, connection: int) -> bool:
+        return self._applied_version[connection] != self.version
+
+    def apply_subscriptions(self, ws: Any, resubscribe: bool = False, connection: int = 0) -> Dict[str, int]:
+        """Send one connection's subscription delta to its KiteTicker (everything when ``resubscribe``)."""
+        version = self.version
+        subscribed = self._subscribed[connection]
+        if resubscribe:
+            subscribed.clear()
+        changes, removed = self.subscription_delta(connection)
+        if removed:
+            ws.unsubscribe(removed)
+        for mode, tokens in changes.items():
+            new = [t for t in tokens if t not in subscribed]
+            if new:
+                ws.subscribe(new)
+            ws.set_mode(getattr(ws, f"MODE_{mode.upper()}"), tokens)
+        for token in removed:
+            subscribed.pop(token, None)
+        for mode, tokens in changes.items():
+            for token in tokens:
+                subscribed[token] = mode
+        self._applied_version[connection] = version
+        return {"subscribed": sum(len(t) for t in changes.values()), "unsubscribed": len(removed),
+                "total": len(subscribed)}
+
+    def report(self) -> Dict[str, Any]:
+        kinds: Dict[str, int] = {}
+        for instrument in self.live_instruments():
+            kinds[instrument.kind] = kinds.get(instrument.kind, 0) + 1
+        now = time.time()
+        n = len(self.instruments)
+        live = int(np.count_nonzero(now - self.state.last_update[:n] < 60)) if n else 0
+        return {
+            "instruments": n - len(self._free),
+            "retired": len(self._free),
+            "capacity": self.capacity,
+            "kinds": kinds,
+            "ticking_last_60s": live,
+            "subscribed": sum(len(s) for s in self._subscribed),
+            "subscribed_per_connection": [len(s) for s in self._subscribed],
+            "max_tokens": self.max_tokens,
+            "slices": {name: {"mode": s.mode, "instruments": len(s)} for name, s in self._slices.items()},
+        }
+
+
+def _seed_indices(universe: InstrumentUniverse) -> None:
+    from config import get_settings
+
+    settings = get_settings()
+    universe.add(settings.nifty_token, "NIFTY", kind="INDEX", exchange="NSE")
+    universe.add(settings.banknifty_token, "BANKNIFTY", kind="INDEX", exchange="NSE")
+    universe.add(settings.sensex_token, "SENSEX", kind="INDEX", exchange="BSE")
+    universe.add(INDIA_VIX_TOKEN, "INDIAVIX", kind="INDEX", exchange="NSE")
+    # Current-month index futures (tokens kept current by auto_futures_updater)
+    universe.add(settings.nifty_fut_token, "NIFTY-FUT", kind="FUTURE", exchange="NFO", underlying="NIFTY")
+    universe.add(settings.banknifty_fut_token, "BANKNIFTY-FUT", kind="FUTURE", exchange="NFO",
+                 underlying="BANKNIFTY")
+    universe.add(settings.sensex_fut_token, "SENSEX-FUT", kind="FUTURE", exchange="BFO", underlying="SENSEX")
+    # REST consumers of market:{symbol} (CacheService.get_all_market_data, dashboards)
+    universe.declare("dashboard", symbols=INDEX_SYMBOLS, mode="full")
+
+
+def _create_universe() -> InstrumentUniverse:
+    from config import get_settings
+
+    settings = get_settings()
+    universe = InstrumentUniverse(max_tokens=settings.feed_max_tokens,
+                                  max_connections=settings.feed_max_connections)
+    _seed_indices(universe)
+    return universe
+
+
+instrument_universe = _create_universe()
+
+
+def get_instrument_universe() -> InstrumentUniverse:
+    return instrument_universe
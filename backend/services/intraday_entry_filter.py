@@ -1416,14 +1416,18 @@ class VWAPIntradayFilter:
             if debug:
                 print(f"\n🔄 [VWAP-5M-LIVE] {symbol}: Fetching LIVE 5m VWAP...")
             
-            calculator = VWAPLiveCalculator(kite_client)
-            vwap_result = calculator.get_live_vwap_complete(
-                symbol=symbol,
-                instrument_token=instrument_token,
-                current_price=current_price,
-                interval="5minute",
-                debug=debug
-            )
+            # Tick-built session profile first (no historical_data round trip)
+            from services.session_profile import get_session_profiles
+            vwap_result = get_session_profiles().vwap_result(symbol, current_price)
+            if vwap_result is None:
+                calculator = VWAPLiveCalculator(kite_client)
+                vwap_result = calculator.get_live_vwap_complete(
+                    symbol=symbol,
+                    instrument_token=instrument_token,
+                    current_price=current_price,
+                    interval="5minute",
+                    debug=debug
+                )
             
             if not vwap_result['success']:
                 return {
@@ -1987,42 +1991,69 @@ class IntraDayEntrySystem:
         if not candles_5m:
             return {"error": "No 5m candles provided"}
         
-        signals_generated = 0
-        winning_trades = 0
-        losing_trades = 0
+        # Evaluated column-wise: the signal is the 5m VWMA entry (15m momentum
+        # only shifts confidence in generate_intraday_signal), so candles_15m
+        # does not change which candles trade.
+        import numpy as np
+        from services.backtest_engine import (
+            BacktestParams, CandleColumns, VWMA_BUY, VWMA_SELL,
+            performance, simulate, vwma_entry_signals,
+        )
         
-        for i, candle_5m in enumerate(candles_5m):
-            # Get 15m candle if available
-            candle_15m = None
-            if candles_15m and i < len(candles_15m):
-                candle_15m = candles_15m[i]
-            
-            # Generate signal
-            signal_result = IntraDayEntrySystem.generate_intraday_signal(
-                price_5m=candle_5m.get("close", 0),
-                vwma_20_5m=candle_5m.get("vwma_20", 0),
-                ema_20_5m=candle_5m.get("ema_20", 0),
-                ema_50_5m=candle_5m.get("ema_50", 0),
-                volume_5m=candle_5m.get("volume", 0),
-                avg_volume_5m=candle_5m.get("avg_volume", 1),
-                prev_price_5m=candles_5m[i-1].get("close") if i > 0 else candle_5m.get("close"),
-                prev_vwma_20_5m=candles_5m[i-1].get("vwma_20") if i > 0 else candle_5m.get("vwma_20"),
-                rsi_15m=candle_15m.get("rsi") if candle_15m else None,
-                ema_20_15m=candle_15m.get("ema_20") if candle_15m else None,
-                ema_50_15m=candle_15m.get("ema_50") if candle_15m else None,
-                volume_15m=candle_15m.get("volume") if candle_15m else None,
-                avg_volume_15m=candle_15m.get("avg_volume") if candle_15m else None,
-                atr_5m=candle_5m.get("atr", 10),
-                symbol=candle_5m.get("symbol", "UNKNOWN"),
-            )
-            
-            if signal_result["signal"] in ["BUY", "SELL"]:
-                signals_generated += 1
+        def column(key: str, default: float) -> np.ndarray:
+            return np.array([float(c.get(key, default) or 0) for c in candles_5m], dtype=np.float64)
+        
+        close = column("close", 0)
+        vwma_20 = column("vwma_20", 0)
+        prev_close = np.concatenate((close[:1], close[:-1]))
+        prev_vwma = np.concatenate((vwma_20[:1], vwma_20[:-1]))
+        signal, _ = vwma_entry_signals(
+            price=close,
+            vwma_20=vwma_20,
+            prev_price=np.where(prev_close != 0, prev_close, close),
+            prev_vwma_20=np.where(prev_vwma != 0, prev_vwma, vwma_20),
+            volume=column("volume", 0),
+            avg_volume=column("avg_volume", 1),
+            ema_20=column("ema_20", 0),
+            ema_50=column("ema_50", 0),
+        )
+        buys, sells = signal == VWMA_BUY, signal == VWMA_SELL
+        signals_generated = int(buys.sum() + sells.sum())
+        
+        # Outcome with the live system's risk: SL 1.5 × ATR, target 3 × ATR,
+        # squared off at the last candle of each day (or of the list).
+        stamps = [c.get("timestamp") or c.get("time") for c in candles_5m]
+        try:
+            session = np.array([datetime.fromisoformat(str(t)).toordinal() for t in stamps], dtype=np.int64)
+            if np.any(np.diff(session) < 0):
+                raise ValueError("candles out of order")
+        except (TypeError, ValueError):
+            session = np.zeros(len(candles_5m), dtype=np.int64)
+        candles = CandleColumns(
+            symbol=candles_5m[0].get("symbol", "UNKNOWN"),
+            timestamp=np.arange(len(candles_5m)).astype("datetime64[s]"),
+            session=session,
+            open=close,
+            high=np.array([float(c.get("high") or c.get("close") or 0) for c in candles_5m]),
+            low=np.array([float(c.get("low") or c.get("close") or 0) for c in candles_5m]),
+            close=close,
+            volume=column("volume", 0),
+        )
+        result = performance(simulate(
+            candles, buys, sells, BacktestParams(sl_mode="atr", sl_atr_mult=1.5, rr_ratio=2.0),
+            atr_values=column("atr", 10),
+        ))
         
         return {
             "total_candles_5m": len(candles_5m),
             "signals_generated": signals_generated,
             "signal_frequency": f"{round((signals_generated / len(candles_5m)) * 100, 2)}%" if candles_5m else "0%",
+            "trades_taken": result["trades"],
+            "winning_trades": result["wins"],
+            "losing_trades": result["losses"],
+            "hit_rate": result["hit_rate"],
+            "pnl_points": result["pnl_points"],
+            "max_drawdown_points": result["max_drawdown_points"],
             "message": f"Strategy generates {signals_generated} signals from {len(candles_5m)} candles",
         }
 
@@ -0,0 +1,301 @@
+"""Process-wide gateway to the Kite Connect REST API.
+
+Every Zerodha REST call goes through one :class:`KiteGateway` instead of a
+``KiteConnect(...)`` built per request / per service:
+
+    • one ``KiteConnect`` whose ``requests`` session keeps a keep-alive pool
+      of ``kite_pool_size`` connections to api.kite.trade
+    • access-token hot-swap — the token is re-read when ``.env`` changes (or
+      pushed with :meth:`KiteGateway.set_access_token`), in place, so every
+      holder of the client picks it up without rebuilding anything. Only the
+      token watcher and the login callback swap it; validators check a
+      candidate token with ``profile(token=...)`` on a throwaway client
+    • an awaitable API — blocking SDK calls run on a dedicated executor of
+      ``kite_pool_size`` threads; at most ``kite_max_pending`` calls queue
+      before further callers wait, so a Zerodha stall cannot eat the default
+      executor or pile up unbounded work
+    • per-endpoint latency / error counters for the health endpoints
+
+Public surface:
+    kite = get_kite_gateway()
+    profile = await kite.profile()
+    profile = await kite.profile(token=candidate)    # validate without swapping
+    quotes  = await kite.quote(["NSE:NIFTY 50"])
+    candles = await kite.historical_data(token, from_dt, to_dt, "5minute")
+    rows    = await kite.call("positions")           # any KiteConnect method
+    rows    = kite.call_sync("instruments", "NFO")   # from code already off the loop
+    sync    = kite.sync_client()                     # KiteConnect-shaped, metered, blocking
+    client  = kite.client()                          # the shared KiteConnect, for SDK helpers
+    kite.metrics() -> dict
+
+Tests point ``kite_api_root`` (or ``root=``) at ``benchmarks/fake_kite.py``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+from kiteconnect import KiteConnect
+
+from config import ENV_FILE, get_settings
+from services.http_client import ProviderMetrics
+
+logger = logging.getLogger(__name__)
+
+_ENV_CHECK_INTERVAL = 1.0    # seconds between .env mtime checks
+
+
+class KiteGateway:
+    """One pooled ``KiteConnect`` with an async facade and per-endpoint metrics."""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        access_token: Optional[str] = None,
+        *,
+        root: Optional[str] = None,
+        pool_size: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        timeout: Optional[float] = None,
+        env_file: Optional[Path] = ENV_FILE,
+    ) -> None:
+        settings = get_settings()
+        self._pool_size = max(int(pool_size or settings.kite_pool_size), 1)
+        self._max_pending = max(int(max_pending or settings.kite_max_pending), 1)
+        self._timeout = timeout or settings.kite_timeout
+        self._root = root or settings.kite_api_root or None
+        # Explicit credentials pin the gateway (tests, scripts); otherwise .env owns them
+        self._env_file = env_file if api_key is None else None
+        self._env_mtime = self._stat_env()
+        self._env_checked = time.monotonic()
+        self._kite = self._build(api_key if api_key is not None else settings.zerodha_api_key)
+        self._kite.set_access_token(access_token if access_token is not None else settings.zerodha_access_token)
+
+        self._executor = ThreadPoolExecutor(max_workers=self._pool_size, thread_name_prefix="kite")
+        self._admission: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._metrics: Dict[str, ProviderMetrics] = {}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._token_swaps = 0
+
+    def _build(self, api_key: str) -> KiteConnect:
+        kite = KiteConnect(api_key=api_key, root=self._root, timeout=self._timeout)
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size)
+        kite.reqsession.mount("https://", adapter)
+        kite.reqsession.mount("http://", adapter)
+        return kite
+
+    # --- credentials --------------------------------------------------------
+
+    @property
+    def api_key(self) -> str:
+        return self._kite.api_key
+
+    @property
+    def access_token(self) -> Optional[str]:
+        return self._kite.access_token
+
+    def set_access_token(self, token: str) -> bool:
+        """Swap the token in place; returns False if it was already current."""
+        if not token or token == self._kite.access_token:
+            return False
+        self._kite.set_access_token(token)
+        self._token_swaps += 1
+        logger.info("🔑 Kite gateway: access token swapped")
+        return True
+
+    def _stat_env(self) -> Optional[float]:
+        if self._env_file is None:
+            return None
+        try:
+            return os.stat(self._env_file).st_mtime
+        except OSError:
+            return None
+
+    def reload_token(self, force: bool = False) -> bool:
+        """Re-read credentials if ``.env`` changed since the last look (or ``force``)."""
+        if self._env_file is None:
+            return False
+        mtime = self._stat_env()
+        if not force and mtime == self._env_mtime:
+            return False
+        self._env_mtime = mtime
+        get_settings.cache_clear()
+        settings = get_settings()
+        if settings.zerodha_api_key and settings.zerodha_api_key != self._kite.api_key:
+            self._kite.api_key = settings.zerodha_api_key
+        return self.set_access_token(settings.zerodha_access_token)
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if self._env_file is not None and now - self._env_checked >= _ENV_CHECK_INTERVAL:
+            self._env_checked = now
+            self.reload_token()
+
+    def client(self) -> KiteConnect:
+        """The shared ``KiteConnect`` (token current) — for SDK helpers that take one."""
+        self._maybe_reload()
+        return self._kite
+
+    def _client_for(self, token: Optional[str]) -> Optional[KiteConnect]:
+        """None for the shared client, or a throwaway ``KiteConnect`` carrying
+        ``token`` on the shared connection pool when it differs."""
+        if not token or token == self._kite.access_token:
+            return None
+        kite = KiteConnect(api_key=self._kite.api_key, access_token=token, root=self._root, timeout=self._timeout)
+        kite.reqsession = self._kite.reqsession
+        return kite
+
+    def sync_client(self, access_token: Optional[str] = None) -> "SyncKite":
+        """A drop-in for a blocking ``KiteConnect`` whose calls go through
+        :meth:`call_sync`; an ``access_token`` other than the shared one pins
+        this view to a client of its own and leaves the shared token alone."""
+        return SyncKite(self, self._client_for(access_token))
+
+    # --- calls --------------------------------------------------------------
+
+    def _endpoint_metrics(self, endpoint: str) -> ProviderMetrics:
+        metrics = self._metrics.get(endpoint)
+        if metrics is None:
+            metrics = self._metrics[endpoint] = ProviderMetrics()
+        return metrics
+
+    def call_sync(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Run ``KiteConnect.<method>`` on the calling thread and record metrics."""
+        return self._call_on(None, method, *args, **kwargs)
+
+    def _call_on(self, client: Optional[KiteConnect], method: str, *args: Any, **kwargs: Any) -> Any:
+        fn = getattr(client or self.client(), method)
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            with self._lock:
+                self._endpoint_metrics(method).record(
+                    (time.perf_counter() - started) * 1000,
+                    getattr(exc, "code", None),
+                    error=f"{type(exc).__name__}: {exc}",
+                )
+            raise
+        with self._lock:
+            self._endpoint_metrics(method).record((time.perf_counter() - started) * 1000, 200)
+        return result
+
+    def _call_counted(self, client: Optional[KiteConnect], method: str, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._in_flight += 1
+        try:
+            if client is None:
+                return self.call_sync(method, *args, **kwargs)
+            return self._call_on(client, method, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        sem = self._admission.get(loop)
+        if sem is None:
+            sem = self._admission[loop] = asyncio.Semaphore(self._max_pending)
+        return sem
+
+    async def call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Await ``KiteConnect.<method>(*args, **kwargs)`` on the gateway executor."""
+        return await self._submit(None, method, args, kwargs)
+
+    async def _submit(self, client: Optional[KiteConnect], method: str, args: tuple, kwargs: dict) -> Any:
+        async with self._semaphore():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call_counted, client, method, args, kwargs)
+
+    async def profile(self, token: Optional[str] = None) -> Dict[str, Any]:
+        """The user profile; with ``token``, fetched with that token instead of
+        the shared one, which is left untouched (token validation)."""
+        return await self._submit(self._client_for(token), "profile", (), {})
+
+    async def margins(self, segment: Optional[str] = None) -> Dict[str, Any]:
+        return await self.call("margins", segment)
+
+    async def quote(self, *instruments: Any) -> Dict[str, Any]:
+        return await self.call("quote", *instruments)
+
+    async def ltp(self, *instruments: Any) -> Dict[str, Any]:
+        return await self.call("ltp", *instruments)
+
+    async def ohlc(self, *instruments: Any) -> Dict[str, Any]:
+        return await self.call("ohlc", *instruments)
+
+    async def instruments(self, exchange: Optional[str] = None) -> Any:
+        return await self.call("instruments", exchange)
+
+    async def historical_data(self, instrument_token: int, from_date: Any, to_date: Any,
+                              interval: str, continuous: bool = False, oi: bool = False) -> Any:
+        return await self.call("historical_data", instrument_token, from_date, to_date,
+                               interval, continuous=continuous, oi=oi)
+
+    # --- lifecycle / introspection -----------------------------------------
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = {name: m.as_dict() for name, m in sorted(self._metrics.items())}
+        return {
+            "root": self._kite.root,
+            "poolSize": self._pool_size,
+            "maxPending": self._max_pending,
+            "inFlight": self._in_flight,
+            "tokenConfigured": bool(self._kite.access_token),
+            "tokenSwaps": self._token_swaps,
+            "endpoints": endpoints,
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._kite.reqsession.close()
+
+
+class SyncKite:
+    """``KiteConnect``-shaped view of a gateway for services that call it from
+    threads: methods are metered ``call_sync`` calls, constants and other
+    attributes read through to the shared client."""
+
+    def __init__(self, gateway: KiteGateway, client: Optional[KiteConnect] = None) -> None:
+        self._gateway = gateway
+        self._client = client
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._client or self._gateway.client(), name)
+        if callable(attr) and not name.startswith("_"):
+            return functools.partial(self._gateway._call_on, self._client, name)
+        return attr
+
+
+_gateway: Optional[KiteGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_kite_gateway() -> KiteGateway:
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = KiteGateway()
+    return _gateway
+
+
+def close_kite_gateway() -> None:
+    global _gateway
+    if _gateway is not None:
+        _gateway.shutdown()
+        _gateway = None
@@ -0,0 +1,185 @@
+"""Lazy router registration — import feature routers on first request.
+
+Importing every router at module load pulled pandas, scipy, kiteconnect
+(twisted) and the LightGBM warm-start into `import main`, so a worker took
+seconds to accept HTTP. A lazy router is registered as a single placeholder
+route that knows the router's paths without importing it: the paths are
+read by scanning the router module's source (`APIRouter(prefix=...)` plus
+`@router.get(...)` / `.websocket(...)` decorators). The first request to one
+of those paths imports the module in a worker thread, splices its real routes
+into the placeholder's position (route order is preserved) and re-dispatches.
+
+    add_lazy_router(app, "routers.strike_intelligence",
+                    [("ws_router", "/ws"), ("http_router", "/api")],
+                    tags=["Strike Intelligence"])
+    await preload(app)        # optional: load everything after startup
+    load_all(app)             # sync — used before generating the OpenAPI schema
+    lazy_router_report(app)   # per-module loaded / load_ms / trigger path
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import importlib.util
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from starlette.routing import BaseRoute, Match, compile_path
+from starlette.types import Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# A line scan rather than ast.parse: parsing ~25 router modules cost ~200ms,
+# which was most of what lazy loading saves. Routers here declare one
+# decorator per line; test_lazy_routers.py checks the scan against the real routes.
+_ROUTER_RE = re.compile(r"^(\w+)\s*=\s*APIRouter\((.*)\)", re.M)
+_PREFIX_RE = re.compile(r"prefix\s*=\s*[\"']([^\"']*)[\"']")
+_ROUTE_RE = re.compile(
+    r"^[ \t]*@(\w+)\.(get|post|put|patch|delete|head|options|api_route|websocket)"
+    r"\(\s*(?:path\s*=\s*)?[\"']([^\"']*)[\"']",
+    re.M,
+)
+
+Mount = Tuple[str, str]          # (router attribute, include prefix)
+
+
+def route_paths(module: str, mounts: Sequence[Mount]) -> List[Tuple[str, bool]]:
+    """(full path, is_websocket) for every route the module's routers declare, without importing it."""
+    spec = importlib.util.find_spec(module)
+    if spec is None or not spec.origin:
+        raise ImportError(f"No module named {module!r}")
+    source = Path(spec.origin).read_text(encoding="utf-8")
+
+    prefixes: Dict[str, str] = {}
+    for name, args in _ROUTER_RE.findall(source):
+        prefix = _PREFIX_RE.search(args)
+        prefixes[name] = prefix.group(1) if prefix else ""
+
+    declared: Dict[str, List[Tuple[str, bool]]] = {}
+    for name, method, path in _ROUTE_RE.findall(source):
+        declared.setdefault(name, []).append((path, method == "websocket"))
+
+    paths = []
+    for attr, include_prefix in mounts:
+        for path, is_ws in declared.get(attr, []):
+            paths.append((include_prefix + prefixes.get(attr, "") + path, is_ws))
+    return paths
+
+
+class LazyRouter(BaseRoute):
+    """Placeholder route that imports and installs a router module on first match."""
+
+    def __init__(self, app: Any, module: str, mounts: Sequence[Mount], tags: Optional[List[str]] = None) -> None:
+        self.app = app
+        self.module = module
+        self.mounts = list(mounts)
+        self.tags = list(tags or [])
+        self.paths = route_paths(module, self.mounts)
+        self._patterns = [(compile_path(path)[0], is_ws) for path, is_ws in self.paths]
+        self.loaded = False
+        self.load_ms: Optional[float] = None
+        self.trigger: Optional[str] = None
+        self._lock = asyncio.Lock()
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        if self.loaded or scope["type"] not in ("http", "websocket"):
+            return Match.NONE, {}
+        want_ws = scope["type"] == "websocket"
+        path = scope["path"]
+        for regex, is_ws in self._patterns:
+            if is_ws == want_ws and regex.match(path):
+                return Match.FULL, {}
+        return Match.NONE, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with self._lock:
+            if not self.loaded:
+                start = time.perf_counter()
+                module = await asyncio.to_thread(importlib.import_module, self.module)
+                self._install(module, start, scope["path"])
+        await self.app.router(scope, receive, send)  # real routes are in place now
+
+    def load(self, trigger: str = "load_all") -> None:
+        if not self.loaded:
+            start = time.perf_counter()
+            self._install(importlib.import_module(self.module), start, trigger)
+
+    def _install(self, module: Any, start: float, trigger: str) -> None:
+        if self.loaded:
+            return
+        routes = self.app.router.routes
+        before = len(routes)
+        for attr, prefix in self.mounts:
+            self.app.include_router(getattr(module, attr), prefix=prefix, tags=self.tags)
+        added = routes[before:]
+        del routes[before:]
+        index = routes.index(self)
+        routes[index:index + 1] = added
+        self.loaded = True
+        self.load_ms = round((time.perf_counter() - start) * 1000, 1)
+        self.trigger = trigger
+        logger.info("Lazy router %s loaded in %.0fms (%s)", self.module, self.load_ms, trigger)
+
+
+def _registry(app: Any) -> List[LazyRouter]:
+    if not hasattr(app.state, "lazy_routers"):
+        app.state.lazy_routers = []
+        openapi = app.openapi
+
+        def openapi_with_lazy_routes():
+            load_all(app)
+            return openapi()
+
+        app.openapi = openapi_with_lazy_routes
+    return app.state.lazy_routers
+
+
+def add_lazy_router(app: Any, module: str, mounts: Sequence[Mount], tags: Optional[List[str]] = None,
+                    lazy: bool = True) -> None:
+    """Register ``module``'s routers (attribute, include prefix) — eagerly when ``lazy`` is False."""
+    if not lazy:
+        imported = importlib.import_module(module)
+        for attr, prefix in mounts:
+            app.include_router(getattr(imported, attr), prefix=prefix, tags=tags)
+        return
+    placeholder = LazyRouter(app, module, mounts, tags)
+    app.router.routes.append(placeholder)
+    _registry(app).append(placeholder)
+
+
+def load_all(app: Any) -> None:
+    for placeholder in list(getattr(app.state, "lazy_routers", [])):
+        placeholder.load()
+
+
+async def preload(app: Any) -> None:
+    """Import every pending lazy router off the event loop, one at a time."""
+    for placeholder in list(getattr(app.state, "lazy_routers", [])):
+        if placeholder.loaded:
+            continue
+        async with placeholder._lock:
+            if not placeholder.loaded:
+                start = time.perf_counter()
+                try:
+                    module = await asyncio.to_thread(importlib.import_module, placeholder.module)
+                except Exception as exc:
+                    logger.error("Lazy router %s failed to preload: %s", placeholder.module, exc)
+                    continue
+                placeholder._install(module, start, "preload")
+
+
+def lazy_router_report(app: Any) -> List[Dict[str, Any]]:
+    return [
+        {
+            "module": p.module,
+            "loaded": p.loaded,
+            "load_ms": p.load_ms,
+            "trigger": p.trigger,
+            "routes": len(p.paths),
+        }
+        for p in getattr(app.state, "lazy_routers", [])
+    ]
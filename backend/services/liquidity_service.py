@@ -39,17 +39,20 @@ import math
 import time
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Tuple, Deque, Set
+from typing import Dict, Any, Optional, List, Tuple, Deque
 
-from fastapi import WebSocket
 import pytz
 
 from services.cache import CacheService, _SHARED_CACHE
+from services.cadence import get_cadence_controller
 from services.advanced_5m_predictor import (
     MicroTrendBuffer,
     calculate_advanced_5m_prediction,
 )
 from services.liquidity_ai import LiquidityAIEngine
+from services.quote_scheduler import Priority, get_quote_scheduler
+from services.snapshot_bus import LIQUIDITY, snapshot_bus
+from services.ws_outbox import BroadcastManager
 
 logger = logging.getLogger(__name__)
 IST = pytz.timezone("Asia/Kolkata")
@@ -78,50 +81,11 @@ BEAR_T = -0.12
 
 # ── Isolated WebSocket manager ────────────────────────────────────────────────
 
-class LiquidityConnectionManager:
+class LiquidityConnectionManager(BroadcastManager):
     """Completely isolated WebSocket manager — no shared state."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
-
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(ws.send_text(json.dumps(data, default=str)), timeout=3.0)
-        except Exception:
-            await self.disconnect(ws)
-
-    @property
-    def client_count(self) -> int:
-        return len(self._connections)
-
 
-liquidity_manager = LiquidityConnectionManager()
+liquidity_manager = LiquidityConnectionManager("liquidity")
 
 
 # ── Pure utility functions ────────────────────────────────────────────────────
@@ -897,10 +861,11 @@ class LiquidityService:
     """
 
     INDICES       = ["NIFTY", "BANKNIFTY", "SENSEX"]
-    TICK_INTERVAL = 1.0   # 1.0-second broadcast cadence — faster regime detection
+    TICK_INTERVAL = 1.0   # 1.0-second base broadcast cadence, adapted by services/cadence.py
 
     def __init__(self, cache: CacheService):
         self._cache = cache
+        self._cadence = get_cadence_controller().register("liquidity", base=self.TICK_INTERVAL)
         self._pcr_buffers: Dict[str, PCRHistory] = {
             sym: PCRHistory() for sym in self.INDICES
         }
@@ -973,7 +938,7 @@ class LiquidityService:
             "BSE:SENSEX":     "SENSEX",
         }
         try:
-            quotes = kite.quote(list(QUOTE_MAP.keys()))
+            quotes = get_quote_scheduler().quote_sync(QUOTE_MAP, Priority.ANALYTICS)
             for q_key, sym in QUOTE_MAP.items():
                 q = quotes.get(q_key, {})
                 if not q:
@@ -1264,6 +1229,7 @@ class LiquidityService:
     async def _broadcast_loop(self):
         logger.info("⚡ LiquidityService broadcast loop started")
         while self._running:
+            started = time.perf_counter()
             try:
                 payload: Dict[str, Any] = {}
                 results = await asyncio.gather(
@@ -1280,6 +1246,7 @@ class LiquidityService:
                             payload[sym] = data
                             self._last_broadcast_view[sym] = view
                         self._latest[sym] = data
+                        snapshot_bus.publish(LIQUIDITY, sym, data)
 
                 if payload:
                     await liquidity_manager.broadcast({
@@ -1299,7 +1266,8 @@ class LiquidityService:
                 _status = get_market_status()
             except Exception:
                 _status = "CLOSED"
-            await asyncio.sleep(self.TICK_INTERVAL if _status == "LIVE" else 30)
+            self._cadence.record(time.perf_counter() - started)
+            await asyncio.sleep(self._cadence.interval if _status == "LIVE" else 30)
 
         logger.info("⚡ LiquidityService stopped")
 
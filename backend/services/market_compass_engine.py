@@ -15,6 +15,9 @@ from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import statistics
 
+from services.correlation_matrix import get_correlation_service
+from services.rolling_stats import pearson
+
 logger = logging.getLogger(__name__)
 
 
@@ -150,7 +153,30 @@ class MarketCompassEngine:
             return None
 
     async def _detect_correlations(self, primary_symbol: str) -> List[CorrelationData]:
-        """Detect correlations between symbols."""
+        """Detect correlations between symbols.
+
+        Reads the cross-asset matrix (bar returns, incremental) once it has
+        enough bars for the primary symbol; price-level Pearson over the tick
+        buffers until then.
+        """
+        matrix = get_correlation_service().matrix
+        if matrix.ready(primary_symbol):
+            correlations = []
+            for partner in matrix.strongest(primary_symbol, self.all_symbols):
+                corr = partner["correlation"]
+                if abs(corr) <= 0.3:
+                    continue
+                corr_data = CorrelationData(
+                    symbol1=primary_symbol,
+                    symbol2=partner["symbol"],
+                    correlation_coefficient=corr,
+                    strength=self._classify_correlation_strength(corr),
+                    lookback_bars=matrix.samples,
+                )
+                self.correlation_cache[f"{primary_symbol}-{partner['symbol']}"] = corr_data
+                correlations.append(corr_data)
+            return correlations
+
         if primary_symbol not in self.market_data:
             return []
         
@@ -268,25 +294,7 @@ class MarketCompassEngine:
 
     def _calculate_correlation(self, series1: List[float], series2: List[float]) -> float:
         """Calculate Pearson correlation coefficient."""
-        if len(series1) != len(series2) or len(series1) < 2:
-            return 0.0
-        
-        try:
-            mean1 = statistics.mean(series1)
-            mean2 = statistics.mean(series2)
-            
-            numerator = sum((series1[i] - mean1) * (series2[i] - mean2) for i in range(len(series1)))
-            
-            std1 = statistics.stdev(series1) if len(series1) > 1 else 0
-            std2 = statistics.stdev(series2) if len(series2) > 1 else 0
-            
-            if std1 == 0 or std2 == 0:
-                return 0.0
-            
-            correlation = numerator / (std1 * std2 * len(series1))
-            return max(-1.0, min(1.0, correlation))
-        except Exception:
-            return 0.0
+        return pearson(series1, series2)
 
     def _classify_correlation_strength(self, correlation: float) -> str:
         """Classify correlation strength."""
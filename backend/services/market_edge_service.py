@@ -35,13 +35,16 @@ import math
 import logging
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple, Deque, Set
+from typing import Dict, Any, Optional, List, Tuple, Deque
 
-from fastapi import WebSocket
 import pytz
 
 from services.cache import CacheService, _SHARED_CACHE
+from services.cadence import get_cadence_controller
+from services.correlation_matrix import get_correlation_service
 from services.market_edge_ai import MarketEdgeAIEngine
+from services.quote_scheduler import Priority, get_quote_scheduler
+from services.ws_outbox import BroadcastManager
 
 logger = logging.getLogger(__name__)
 IST = pytz.timezone("Asia/Kolkata")
@@ -62,54 +65,16 @@ STRONG_BULL_T = 0.35
 BULL_T = 0.15
 BEAR_T = -0.15
 STRONG_BEAR_T = -0.35
+FUTURES_LEAD_MIN_CORR = 0.3   # lagged correlation for a futures/spot lead to reweight the basis
 
 
 # ── Isolated WebSocket manager ───────────────────────────────────────────────
 
-class MarketEdgeConnectionManager:
+class MarketEdgeConnectionManager(BroadcastManager):
     """Completely isolated WebSocket manager — no shared state."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
-
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
 
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(ws.send_text(json.dumps(data, default=str)), timeout=3.0)
-        except Exception:
-            await self.disconnect(ws)
-
-    @property
-    def client_count(self) -> int:
-        return len(self._connections)
-
-
-edge_manager = MarketEdgeConnectionManager()
+edge_manager = MarketEdgeConnectionManager("market_edge")
 
 
 # ── Utility helpers ──────────────────────────────────────────────────────────
@@ -683,7 +648,8 @@ def _futures_oi_signal(
 
 
 def _futures_basis_signal(
-    fut_price: float, spot_price: float, history: EdgeHistory
+    fut_price: float, spot_price: float, history: EdgeHistory,
+    lead: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
     """
     Futures Basis (Premium/Discount) Analysis.
@@ -692,6 +658,8 @@ def _futures_basis_signal(
     Premium > fair value → Bullish institutional demand
     Discount → Bearish (hedging activity or selling)
     Basis trend (widening/narrowing) matters more than absolute level.
+    ``lead`` is the correlation matrix's futures/spot lead-lag: the basis
+    carries more weight while futures returns lead spot's, less when spot leads.
     """
     score = 0.0
     label = "Basis data loading"
@@ -743,6 +711,13 @@ def _futures_basis_signal(
     else:
         label = f"Flat basis {basis_pct:.2f}% — No edge"
 
+    if lead is not None and lead["leader"] is not None and abs(lead["correlation"]) >= FUTURES_LEAD_MIN_CORR:
+        futures_lead = lead["leader"].endswith("-FUT")
+        score *= 1.25 if futures_lead else 0.8
+        extras["leader"] = "FUTURES" if futures_lead else "SPOT"
+        extras["leadBars"] = abs(lead["lag"])
+        extras["leadCorr"] = lead["correlation"]
+
     score = _clamp(score, -1.0, 1.0)
 
     return {
@@ -965,7 +940,7 @@ class MarketEdgeService:
     """
 
     INDICES = ["NIFTY", "BANKNIFTY", "SENSEX"]
-    TICK_INTERVAL = 1.5    # 1.5-second broadcast cadence — faster reversal detection
+    TICK_INTERVAL = 1.5    # 1.5-second base broadcast cadence, adapted by services/cadence.py
     FUTURES_REFRESH = 5.0  # Refresh futures quote every 5s
 
     def __init__(self, cache: CacheService):
@@ -983,6 +958,7 @@ class MarketEdgeService:
         self._running = False
         self._last_futures_fetch = 0.0
         self._contracts: Dict[str, Dict] = {}
+        self._cadence = get_cadence_controller().register("market_edge", base=self.TICK_INTERVAL)
 
     def _build_broadcast_view(self, row: Dict[str, Any]) -> Tuple[str, str, float, float]:
         direction = str(row.get("direction", "NEUTRAL"))
@@ -1045,8 +1021,7 @@ class MarketEdgeService:
             return
 
         try:
-            loop = asyncio.get_event_loop()
-            quote_data = await loop.run_in_executor(None, lambda: kite.quote(ltp_keys))
+            quote_data = await get_quote_scheduler().quote(ltp_keys, Priority.ANALYTICS)
             for key, sym in key_to_sym.items():
                 entry = quote_data.get(key, {})
                 if not entry:
@@ -1155,7 +1130,8 @@ class MarketEdgeService:
         sig_iv = _iv_estimation_signal(iv_est, hist, vix)
         sig_iv_rank = _iv_rank_signal(hist)
         sig_fut_oi = _futures_oi_signal(fut_oi, fut_price, spot_price, hist, candles)
-        sig_basis = _futures_basis_signal(fut_price, spot_price, hist)
+        sig_basis = _futures_basis_signal(fut_price, spot_price, hist,
+                                          get_correlation_service().futures_lead(symbol))
         sig_live_mom = _live_price_momentum_signal(candles, spot_price)
 
         signals = {
@@ -1227,9 +1203,10 @@ class MarketEdgeService:
 
     async def _loop(self):
         """Main background loop — compute and broadcast."""
-        heartbeat_counter = 0
+        last_heartbeat = time.monotonic()
         contract_retry = 0
         while self._running:
+            started = time.perf_counter()
             try:
                 # Retry contract loading if still empty (kite may not be ready at startup)
                 if not self._contracts:
@@ -1269,9 +1246,8 @@ class MarketEdgeService:
                     })
 
                 # Heartbeat every 30s
-                heartbeat_counter += 1
-                if heartbeat_counter >= int(30 / self.TICK_INTERVAL):
-                    heartbeat_counter = 0
+                if time.monotonic() - last_heartbeat >= 30:
+                    last_heartbeat = time.monotonic()
                     await edge_manager.broadcast({
                         "type": "edge_heartbeat",
                         "timestamp": datetime.now(IST).isoformat(),
@@ -1280,7 +1256,8 @@ class MarketEdgeService:
             except Exception as e:
                 logger.error(f"📈 MarketEdge loop error: {e}")
 
-            await asyncio.sleep(self.TICK_INTERVAL)
+            self._cadence.record(time.perf_counter() - started)
+            await asyncio.sleep(self._cadence.interval)
 
     async def start(self):
         if self._running:
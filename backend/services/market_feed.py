@@ -2,6 +2,7 @@
 import asyncio
 import threading
 import time as time_module
+from collections import deque
 from datetime import datetime, time
 from typing import Dict, Any, Optional
 from queue import Queue
@@ -13,9 +14,15 @@ from services.websocket_manager import ConnectionManager
 from services.pcr_service import get_pcr_service
 from services.feed_watchdog import feed_watchdog
 from services.auth_state_machine import auth_state_manager
-from services.market_session_controller import market_session, MarketPhase
+from services.session_clock import session_clock
+from services.candle_archive import CACHE_KEYS
+from services.instrument_universe import INDEX_SYMBOLS, get_instrument_universe
+from services.session_profile import get_session_profiles
+from services.depth_book import get_depth_books
+from services.option_chain import get_option_chains
+from services.snapshot_bus import ANALYSIS, snapshot_bus
+from services.quote_scheduler import Priority, get_quote_scheduler
 from config.market_session import get_market_session
-from config.nse_holidays import is_holiday, get_holiday_name
 
 settings = get_settings()
 
@@ -51,43 +58,10 @@ def get_market_status() -> str:
     
     If Zerodha is actively sending ticks during market hours,
     this function trusts the exchange over local holiday/weekend config.
+    Phases come from the precomputed session clock timeline (O(1)).
     """
-    global _zerodha_ticks_active, _zerodha_last_tick_time
-
-    now = datetime.now(IST)
-    current_time = now.time()
-
-    # If the exchange is clearly sending fresh ticks during market hours,
-    # trust the live feed even when a holiday/weekend calendar is stale.
-    in_market_window = time(8, 55) <= current_time <= time(15, 35)
-    ticks_recent = (time_module.time() - _zerodha_last_tick_time) < 120
-    if in_market_window and _zerodha_ticks_active and ticks_recent:
-        if PRE_OPEN_START <= current_time < MARKET_OPEN:
-            return "PRE_OPEN"
-        if MARKET_OPEN <= current_time <= MARKET_CLOSE:
-            return "LIVE"
-
-    phase = market_session.get_current_phase(now)
-    if phase == MarketPhase.PRE_OPEN:
-        return "PRE_OPEN"
-    if phase == MarketPhase.AUCTION_FREEZE:
-        return "FREEZE"
-    if phase == MarketPhase.LIVE:
-        return "LIVE"
-
-    # Fallback to the configured calendar only when the session controller
-    # says the market is closed and there are no recent live ticks.
-    date_str = now.strftime("%Y-%m-%d")
-    if now.weekday() in market_config.WEEKEND_DAYS or is_holiday(date_str):
-        return "CLOSED"
-
-    if PRE_OPEN_START <= current_time < PRE_OPEN_END:
-        return "PRE_OPEN"
-    if PRE_OPEN_END <= current_time < MARKET_OPEN:
-        return "FREEZE"
-    if MARKET_OPEN <= current_time <= MARKET_CLOSE:
-        return "LIVE"
-    return "CLOSED"
+    ticks_live = _zerodha_ticks_active and (time_module.time() - _zerodha_last_tick_time) < 120
+    return session_clock.status(ticks_live=ticks_live)
 
 
 def is_market_open() -> bool:
@@ -108,13 +82,18 @@ def is_market_open() -> bool:
     return status in ("PRE_OPEN", "FREEZE", "LIVE")
 
 
-# Instrument token to symbol mapping
-TOKEN_SYMBOL_MAP = {
-    settings.nifty_token: "NIFTY",
-    settings.banknifty_token: "BANKNIFTY", 
-    settings.sensex_token: "SENSEX",
-    256170: "INDIAVIX"  # India VIX (IVIX) - NSE ticker
-}
+# Instrument universe (services/instrument_universe.py): the feed's own slice
+# is the broadcast indices; every other subscribed instrument (futures,
+# strikes, stocks declared by other services) only updates the universe's
+# array state and candle books — O(1) per tick, no broadcast.
+universe = get_instrument_universe()
+FEED_SLICE = universe.declare("market_feed", symbols=INDEX_SYMBOLS + ("INDIAVIX",), mode="full")
+
+# Instrument token to symbol mapping (broadcast indices)
+TOKEN_SYMBOL_MAP = {universe[iid].token: universe[iid].symbol for iid in FEED_SLICE.members}
+
+# Buffered non-broadcast ticks waiting for the event loop (oldest dropped if it stalls)
+_INSTRUMENT_TICK_BACKLOG = 50_000
 
 # Previous close prices - ONLY from live Zerodha tick data
 PREV_CLOSE = {}
@@ -140,14 +119,24 @@ class MarketFeedService:
         self.last_update_time: Dict[str, float] = {}  # Track last update time per symbol
         self._tick_lock = threading.Lock()  # Protects last_prices/last_update_time across threads
         self._tick_queue: Queue = Queue()
-        # ── Multi-timeframe candle builders ─────────────────────────────────
-        # Accumulates live ticks into proper OHLCV candles at 3m, 5m, 15m.
+        # ── Instrument universe ──────────────────────────────────────────────
+        # Multi-timeframe candle builders live in universe.candles (array rows per
+        # instrument id) and are flushed to the cache at 3m, 5m, 15m:
         # 5m → analysis_candles:{symbol}   (existing, used by many services)
         # 3m → analysis_candles_3m:{symbol}
         # 15m → analysis_candles_15m:{symbol}
-        self._candle_builders: Dict[str, Dict] = {}     # 5m (legacy key)
-        self._candle_builders_3m: Dict[str, Dict] = {}  # 3m
-        self._candle_builders_15m: Dict[str, Dict] = {} # 15m
+        self.universe = universe
+        # Index futures ticks build the session VWAP / volume profile (universe listener)
+        self.session_profiles = get_session_profiles()
+        # Index futures depth (full mode) → NumPy ring + microstructure features
+        self.depth_books = get_depth_books()
+        # Option strikes around ATM (full mode) → per-strike columns, PCR / max pain
+        self.option_chains = get_option_chains()
+        # Extra KiteTickers for universe tokens beyond FEED_MAX_TOKENS, by connection number
+        self._overflow_kws: Dict[int, Any] = {}
+        self._overflow_connected: set = set()
+        self._synced_version = -1
+        self._instrument_ticks: deque = deque(maxlen=_INSTRUMENT_TICK_BACKLOG)
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._consecutive_403_errors: int = 0  # Track repeated 403 errors
         self._last_connection_attempt: Optional[datetime] = None  # Track last retry
@@ -228,75 +217,33 @@ class MarketFeedService:
         volume: int,
         oi: int,
         ts: datetime,
-        interval_minutes: int,
-        builders: Dict[str, Dict],
-        cache_key_prefix: str,
+        timeframe: str,
         max_candles: int = 200,
     ) -> None:
         """
-        Generic candle builder for any timeframe.
-        `interval_minutes`: 3, 5, or 15.
-        `builders`: the per-symbol state dict for this timeframe.
-        `cache_key_prefix`: e.g. 'analysis_candles' or 'analysis_candles_3m'.
+        Fold a broadcast tick into the universe candle book for `timeframe`
+        ("3m", "5m" or "15m"). A finished candle is pushed to
+        {CACHE_KEYS[timeframe]}:{symbol}; the in-progress one is cached as
+        {CACHE_KEYS[timeframe]}_live:{symbol}.
         """
-        import json as _json
-
-        minute_bucket = (ts.minute // interval_minutes) * interval_minutes
-        candle_ts = ts.replace(minute=minute_bucket, second=0, microsecond=0).isoformat()
-
-        state = builders.get(symbol)
+        iid = self.universe.id_of(symbol)
+        if iid is None:
+            return
+        finished = self.universe.update_candle(timeframe, iid, price, volume, oi, ts.timestamp())
+        prefix = CACHE_KEYS[timeframe]
+        if finished is not None:
+            await self._push_candle(prefix, symbol, finished, max_candles)
 
-        if state is None or state["ts"] != candle_ts:
-            # New candle window — flush old one
-            if state is not None:
-                finished = {
-                    "timestamp":  state["ts"],
-                    "open":       state["open"],
-                    "high":       state["high"],
-                    "low":        state["low"],
-                    "close":      state["close"],
-                    "volume":     max(0, state["vol_close"] - state["vol_open"]),
-                    "oi":         state["oi"],
-                    "oi_prev":    state["oi_open"],
-                }
-                candle_key = f"{cache_key_prefix}:{symbol}"
-                await self.cache.lpush(candle_key, _json.dumps(finished))
-                await self.cache.ltrim(candle_key, 0, max_candles - 1)
+        # Push live (in-progress) candle to cache
+        live = self.universe.candles[timeframe].candle(iid, live=True)
+        await self.cache.set(f"{prefix}_live:{symbol}", live, expire=30)
 
-            builders[symbol] = {
-                "ts":       candle_ts,
-                "open":     price,
-                "high":     price,
-                "low":      price,
-                "close":    price,
-                "oi":       oi,
-                "oi_open":  oi,
-                "vol_open": volume,
-                "vol_close": volume,
-            }
-        else:
-            state["high"]      = max(state["high"], price)
-            state["low"]       = min(state["low"],  price)
-            state["close"]     = price
-            state["oi"]        = oi
-            state["vol_close"] = volume
-            if state["oi_open"] == 0 and oi > 0:
-                state["oi_open"] = oi
+    async def _push_candle(self, prefix: str, symbol: str, candle: Dict[str, Any], max_candles: int = 200) -> None:
+        import json as _json
 
-        # Push live (in-progress) candle to cache
-        state = builders[symbol]
-        live_candle = {
-            "timestamp":  state["ts"],
-            "open":       state["open"],
-            "high":       state["high"],
-            "low":        state["low"],
-            "close":      state["close"],
-            "volume":     max(0, state["vol_close"] - state["vol_open"]),
-            "oi":         state["oi"],
-            "oi_prev":    state["oi_open"],
-            "_live":      True,
-        }
-        await self.cache.set(f"{cache_key_prefix}_live:{symbol}", live_candle, expire=30)
+        candle_key = f"{prefix}:{symbol}"
+        await self.cache.lpush(candle_key, _json.dumps(candle))
+        await self.cache.ltrim(candle_key, 0, max_candles - 1)
 
     async def _update_5min_candle(self, symbol: str, price: float, volume: int, oi: int, ts: datetime) -> None:
         """
@@ -304,32 +251,91 @@ class MarketFeedService:
         When the current 5-minute slot closes, push the finished candle to
         analysis_candles:{symbol} (newest-first list, max 200 candles).
         """
-        await self._update_candle_generic(
-            symbol, price, volume, oi, ts,
-            interval_minutes=5,
-            builders=self._candle_builders,
-            cache_key_prefix="analysis_candles",
-        )
+        await self._update_candle_generic(symbol, price, volume, oi, ts, timeframe="5m")
 
     async def _update_all_timeframe_candles(self, symbol: str, price: float, volume: int, oi: int, ts: datetime) -> None:
         """Build 3m + 15m candles alongside the existing 5m."""
-        await self._update_candle_generic(
-            symbol, price, volume, oi, ts,
-            interval_minutes=3,
-            builders=self._candle_builders_3m,
-            cache_key_prefix="analysis_candles_3m",
-        )
-        await self._update_candle_generic(
-            symbol, price, volume, oi, ts,
-            interval_minutes=15,
-            builders=self._candle_builders_15m,
-            cache_key_prefix="analysis_candles_15m",
-        )
+        await self._update_candle_generic(symbol, price, volume, oi, ts, timeframe="3m")
+        await self._update_candle_generic(symbol, price, volume, oi, ts, timeframe="15m")
+
+    def _on_instrument_tick(self, iid: int, tick: Dict[str, Any], now: float) -> None:
+        """Non-broadcast instrument (KiteTicker thread): array state now, candles on the loop."""
+        price = tick.get("last_price", 0)
+        volume = tick.get("volume_traded", 0)
+        oi = tick.get("oi", 0)
+        self.universe.on_tick(iid, price, volume, oi, now)
+        if "depth" in tick:
+            self.depth_books.on_tick(iid, tick, now)
+        self.option_chains.on_tick(iid, tick, now)
+        self._instrument_ticks.append((iid, price, volume, oi, now))
+
+    async def _drain_instrument_ticks(self) -> int:
+        """Fold buffered non-broadcast ticks into the candle books; push finished candles."""
+        processed = 0
+        ticks = self._instrument_ticks
+        while ticks:
+            iid, price, volume, oi, epoch = ticks.popleft()
+            for timeframe, candle in self.universe.update_candles(iid, price, volume, oi, epoch):
+                await self._push_candle(CACHE_KEYS[timeframe], self.universe[iid].symbol, candle)
+            processed += 1
+        return processed
+
+    def _sync_subscriptions(self) -> None:
+        """Apply slice declarations made since connect to the live KiteTicker(s)."""
+        if not (self.kws and self._is_connected) or self._synced_version == self.universe.version:
+            return
+        try:
+            from twisted.internet import reactor
+            if self.universe.subscriptions_pending:
+                reactor.callFromThread(self.universe.apply_subscriptions, self.kws)
+            for connection in range(1, self.universe.connections_needed()):
+                ws = self._overflow_kws.get(connection)
+                if ws is None:
+                    self._open_overflow_ticker(connection)
+                elif connection in self._overflow_connected and self.universe.pending(connection):
+                    reactor.callFromThread(self.universe.apply_subscriptions, ws, False, connection)
+            self._synced_version = self.universe.version
+        except Exception as e:
+            print(f"⚠️ Subscription sync failed: {e}")
+
+    def _open_overflow_ticker(self, connection: int) -> None:
+        """Open KiteTicker connection ``connection`` for the universe's overflow tokens."""
+        from kiteconnect import KiteTicker
+        from twisted.internet import reactor
+        from config import get_settings
+
+        fresh = get_settings()
+        ws = KiteTicker(fresh.zerodha_api_key, fresh.zerodha_access_token)
+
+        def on_connect(ws, response):
+            self._overflow_connected.add(connection)
+            result = self.universe.apply_subscriptions(ws, resubscribe=True, connection=connection)
+            print(f"📡 Overflow ticker #{connection} connected: {result['total']} tokens")
+
+        def on_close(ws, code, reason):
+            self._overflow_connected.discard(connection)
+
+        ws.on_ticks = self._on_ticks
+        ws.on_connect = on_connect
+        ws.on_close = on_close
+        self._overflow_kws[connection] = ws
+        reactor.callFromThread(ws.connect, threaded=True)
+
+    def _close_overflow_tickers(self) -> None:
+        for ws in self._overflow_kws.values():
+            try:
+                ws.close()
+            except Exception:
+                pass
+        self._overflow_kws.clear()
+        self._overflow_connected.clear()
+        self._synced_version = -1
 
     def _normalize_tick(self, tick: Dict[str, Any]) -> Dict[str, Any]:
         """Normalize Zerodha tick data to our format."""
         token = tick.get("instrument_token")
-        symbol = TOKEN_SYMBOL_MAP.get(token, "UNKNOWN")
+        iid = self.universe.id_of_token(token)
+        symbol = self.universe[iid].symbol if iid is not None else "UNKNOWN"
         ltp = tick.get("last_price", 0)
         # Use ohlc.close from tick data (actual previous day close) instead of hardcoded values
         prev_close = tick.get("ohlc", {}).get("close") or PREV_CLOSE.get(symbol, ltp)
@@ -349,7 +355,7 @@ class MarketFeedService:
         
         # 🔥 FIX: For indices, use preserved quote volume if tick volume is 0
         volume = tick_volume
-        if tick_volume == 0 and symbol in ["NIFTY", "BANKNIFTY", "SENSEX"]:
+        if tick_volume == 0 and symbol in INDEX_SYMBOLS:
             # Use quote volume from cache (set during startup/refresh)
             volume = QUOTE_VOLUMES.get(symbol, 0)
         
@@ -384,7 +390,6 @@ class MarketFeedService:
             "prev_day_close": round(prev_day_close, 2) if prev_day_close else None,
             # 🔥 Preserve raw depth for order flow analysis (stripped before broadcast)
             "_raw_depth": tick.get("depth", {}),
-            "_raw_bid": tick.get("last_price", 0) - (tick.get("depth", {}).get("buy", [{}])[0].get("price", 0) if tick.get("depth", {}).get("buy") else 0),
         }
     
     def _on_ticks(self, ws, ticks):
@@ -396,6 +401,14 @@ class MarketFeedService:
         
         for tick in ticks:
             try:
+                iid = self.universe.id_of_token(tick.get("instrument_token"))
+                if iid is not None and iid not in FEED_SLICE:
+                    self._on_instrument_tick(iid, tick, _zerodha_last_tick_time)
+                    continue
+                if iid is not None:
+                    self.universe.on_tick(iid, tick.get("last_price", 0), tick.get("volume_traded", 0),
+                                          tick.get("oi", 0), _zerodha_last_tick_time)
+
                 data = self._normalize_tick(tick)
                 symbol = data["symbol"]
                 
@@ -505,21 +518,14 @@ class MarketFeedService:
         except Exception:
             pass
         
-        # Analysis: Use cached analysis (fast, no computation)
-        try:
-            cache_key = f"ws_analysis:{symbol}"
-            cached_json = await self.cache.get(cache_key)
-            if cached_json:
-                import json
-                data["analysis"] = json.loads(cached_json)
-            else:
-                data["analysis"] = None
-        except Exception:
-            data["analysis"] = None
+        # Analysis: latest background result from the snapshot bus (no JSON decode);
+        # same freshness window as the ws_analysis cache TTL below
+        data["analysis"] = snapshot_bus.value(
+            ANALYSIS, symbol, max_age=2 if data.get("status") == "LIVE" else 60
+        )
         
         # Order flow: strip raw depth before broadcast
         raw_depth = data.pop("_raw_depth", {})
-        data.pop("_raw_bid", None)
         
         # Order flow: process on EVERY tick (lightweight, no HTTP)
         try:
@@ -575,11 +581,9 @@ class MarketFeedService:
                 cache_ttl = 2 if is_trading else 60
                 cache_key = f"ws_analysis:{symbol}"
 
-                # Check if analysis cache is still valid
-                if is_trading:
-                    cached_json = await self.cache.get(cache_key)
-                    if cached_json:
-                        return
+                # Check if the last published analysis is still fresh
+                if is_trading and snapshot_bus.value(ANALYSIS, symbol, max_age=cache_ttl) is not None:
+                    return
                 
                 # PCR fetch (HTTP) — stagger across symbols within a 15s window
                 try:
@@ -609,6 +613,7 @@ class MarketFeedService:
                     await asyncio.sleep(0)
                     
                     if analysis_result:
+                        snapshot_bus.publish(ANALYSIS, symbol, analysis_result)
                         try:
                             import json
                             await self.cache.set(cache_key, json.dumps(analysis_result), expire=cache_ttl)
@@ -631,7 +636,7 @@ class MarketFeedService:
     async def _fetch_and_cache_last_data(self):
         """Fetch last traded data from Zerodha and cache it - works even when market is closed."""
         try:
-            from kiteconnect import KiteConnect
+            from services.kite_gateway import get_kite_gateway
             from kiteconnect.exceptions import TokenException
             print("📊 Fetching last traded data from Zerodha...")
             
@@ -639,8 +644,7 @@ class MarketFeedService:
             from config import get_settings
             fresh = get_settings()
             
-            kite = KiteConnect(api_key=fresh.zerodha_api_key)
-            kite.set_access_token(fresh.zerodha_access_token)
+            kite = get_kite_gateway().sync_client(fresh.zerodha_access_token)
             
             # 🔥 Fetch prev day OHLC if not already loaded (needed for CRT)
             if not PREV_DAY_OHLC:
@@ -662,7 +666,7 @@ class MarketFeedService:
             }
             
             # Fetch quotes for spot prices (works even when market is closed)
-            quotes = kite.quote(list(index_symbols.values()))
+            quotes = get_quote_scheduler().quote_sync(index_symbols.values(), Priority.LIVE)
             
             # 🔥 Fetch futures quotes for volume data
             # Need to get trading symbols from instruments first, then fetch quotes
@@ -692,7 +696,7 @@ class MarketFeedService:
                 
                 # Fetch quotes
                 if quote_keys:
-                    futures_quotes = kite.quote(quote_keys)
+                    futures_quotes = get_quote_scheduler().quote_sync(quote_keys, Priority.LIVE)
                     print(f"📊 Fetched futures quotes: {list(futures_quotes.keys())}")
                 else:
                     print("⚠️ No valid futures trading symbols found")
@@ -875,13 +879,11 @@ class MarketFeedService:
         # Fetch real previous close prices using KiteConnect
         kite = None
         try:
-            from kiteconnect import KiteConnect
+            from services.kite_gateway import get_kite_gateway
             # 🔥 FIX: Use fresh settings to pick up token refreshed in .env
             from config import get_settings
             fresh = get_settings()
-            kite = KiteConnect(api_key=fresh.zerodha_api_key)
-            kite.set_access_token(fresh.zerodha_access_token)
-            tokens = list(TOKEN_SYMBOL_MAP.keys())
+            kite = get_kite_gateway().sync_client(fresh.zerodha_access_token)
             # Map tokens to tradingsymbols for quote API
             token_to_symbol = TOKEN_SYMBOL_MAP
             # Zerodha quote API expects tradingsymbols with exchange, but for indices, use index names
@@ -891,7 +893,7 @@ class MarketFeedService:
                 settings.sensex_token: "BSE:SENSEX"
             }
             print(f"📊 Fetching quotes for: {list(index_symbols.values())}")
-            quotes = kite.quote(list(index_symbols.values()))
+            quotes = get_quote_scheduler().quote_sync(index_symbols.values(), Priority.LIVE)
             # Update PREV_CLOSE with real values
             for token, symbol in token_to_symbol.items():
                 idx_symbol = index_symbols.get(token)
@@ -909,12 +911,9 @@ class MarketFeedService:
         except Exception as e:
             print(f"⚠️ Failed to fetch prev day OHLC: {e}")
 
-        # Subscribe to instrument tokens
-        tokens = list(TOKEN_SYMBOL_MAP.keys())
-        print(f"📊 Subscribing to tokens: {tokens}")
-        ws.subscribe(tokens)
-        ws.set_mode(ws.MODE_FULL, tokens)
-        print(f"📊 Subscribed to: {list(TOKEN_SYMBOL_MAP.values())}")
+        # Subscribe to every instrument the universe slices declare (indices in FULL mode)
+        result = self.universe.apply_subscriptions(ws, resubscribe=True)
+        print(f"📊 Subscribed to {result['total']} tokens (indices: {list(TOKEN_SYMBOL_MAP.values())})")
         print("✅ Market feed is now LIVE - Waiting for ticks...")
     
     def _fetch_prev_day_ohlc(self, kite=None):
@@ -922,12 +921,11 @@ class MarketFeedService:
         global PREV_DAY_OHLC
         try:
             if not kite:
-                from kiteconnect import KiteConnect
+                from services.kite_gateway import get_kite_gateway
                 # 🔥 FIX: Use fresh settings to pick up token refreshed in .env
                 from config import get_settings
                 fresh = get_settings()
-                kite = KiteConnect(api_key=fresh.zerodha_api_key)
-                kite.set_access_token(fresh.zerodha_access_token)
+                kite = get_kite_gateway().sync_client(fresh.zerodha_access_token)
 
             from datetime import timedelta
             today = datetime.now(IST).date()
@@ -1044,10 +1042,8 @@ class MarketFeedService:
         # but we must re-subscribe to get ticks again
         try:
             if ws and hasattr(ws, 'subscribe'):
-                tokens = list(TOKEN_SYMBOL_MAP.keys())
-                print(f"   📡 Re-subscribing to {len(tokens)} tokens: {list(TOKEN_SYMBOL_MAP.values())}")
-                ws.subscribe(tokens)
-                ws.set_mode(ws.MODE_FULL, tokens)
+                result = self.universe.apply_subscriptions(ws, resubscribe=True)
+                print(f"   📡 Re-subscribed to {result['total']} tokens: {list(TOKEN_SYMBOL_MAP.values())}")
                 print("   ✅ Re-subscription sent")
             else:
                 print("   ⚠️  WebSocket object not ready for re-subscription")
@@ -1087,7 +1083,7 @@ class MarketFeedService:
         Returns True if token is valid, False otherwise.
         """
         try:
-            from kiteconnect import KiteConnect
+            from services.kite_gateway import get_kite_gateway
             from kiteconnect.exceptions import TokenException
             
             # 🔥 FIX: Use fresh settings to pick up token refreshed in .env
@@ -1095,8 +1091,7 @@ class MarketFeedService:
             fresh = get_settings()
             
             print("🔍 Pre-flight token validation...")
-            kite = KiteConnect(api_key=fresh.zerodha_api_key)
-            kite.set_access_token(fresh.zerodha_access_token)
+            kite = get_kite_gateway().sync_client(fresh.zerodha_access_token)
             
             # Simple profile check - if this works, token is valid
             profile = kite.profile()
@@ -1336,6 +1331,10 @@ class MarketFeedService:
                         await self._fetch_and_cache_last_data()
                     last_refresh_time = current_time
                 
+                # Non-broadcast instruments: cheap O(1) candle folds, drained in full each cycle
+                await self._drain_instrument_ticks()
+                self._sync_subscriptions()
+
                 # Process any pending ticks from the queue (only when WebSocket is active)
                 # 🔥 FIX: Limit ticks per cycle to prevent event loop starvation
                 ticks_processed = 0
@@ -1442,6 +1441,8 @@ class MarketFeedService:
                 
                 # Process tick queue
                 while self.running:
+                    await self._drain_instrument_ticks()
+                    self._sync_subscriptions()
                     ticks_processed = 0
                     while not self._tick_queue.empty() and ticks_processed < 3:
                         try:
@@ -1463,6 +1464,7 @@ class MarketFeedService:
         self.running = False
         if self.kws:
             self.kws.close()
+        self._close_overflow_tickers()
         print("🛑 Market feed stopped")
     
     async def reconnect_with_new_token(self, new_access_token: str):
@@ -1479,6 +1481,7 @@ class MarketFeedService:
                 self.kws.close()
             except Exception as e:
                 print(f"⚠️ Error closing old connection: {e}")
+        self._close_overflow_tickers()
         
         self.running = False
         await asyncio.sleep(1)  # Quick cleanup (reduced from 3s)
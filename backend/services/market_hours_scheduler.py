@@ -20,6 +20,7 @@ IST = ZoneInfo("Asia/Kolkata")
 # Import candle backup service
 from services.candle_backup_service import CandleBackupService
 from services.auth_state_machine import auth_state_manager
+from services.session_clock import session_clock
 
 
 class MarketHoursScheduler:
@@ -205,16 +206,18 @@ class MarketHoursScheduler:
         critical_end = time(9, 20, 0)
         return critical_start <= current_time <= critical_end
     
-    def _get_market_phase(self, current_time: time) -> str:
-        """Get current market phase with emoji"""
-        if current_time < self.PRE_OPEN_START:
-            return "🔵 PREPARING (waiting for pre-open)"
-        elif self.PRE_OPEN_START <= current_time < self.PRE_OPEN_END:
+    def _get_market_phase(self, dt: datetime) -> str:
+        """Get market phase at ``dt`` with emoji"""
+        status = session_clock.status_at(dt)
+        current_time = dt.time()
+        if status == "PRE_OPEN":
             return "🟡 PRE-OPEN (auction matching 9:00-9:07)"
-        elif self.PRE_OPEN_END <= current_time < self.MARKET_OPEN:
+        elif status == "FREEZE":
             return "🟡 FREEZE (order matching 9:07-9:15)"
-        elif self.MARKET_OPEN <= current_time < self.MARKET_CLOSE:
+        elif status == "LIVE":
             return "🟢 LIVE TRADING"
+        elif current_time < self.PRE_OPEN_START:
+            return "🔵 PREPARING (waiting for pre-open)"
         elif current_time <= self.AUTO_STOP_TIME:
             return "🔴 POST-MARKET (cooling down)"
         else:
@@ -292,7 +295,7 @@ class MarketHoursScheduler:
                 # Determine if market feed should be running
                 should_run = self._is_market_time(now)
                 is_connected = self._is_feed_connected()
-                phase = self._get_market_phase(current_time)
+                phase = self._get_market_phase(now)
                 
                 # Use aggressive interval during critical window
                 check_interval = (
@@ -40,17 +40,20 @@ import asyncio
 import collections
 import json
 import logging
-import math
 import time as time_mod
 from datetime import datetime, time
-from typing import Dict, Any, Optional, List, Set, Deque
+from typing import Dict, Any, Optional, List, Deque
 
-from fastapi import WebSocket
 import pytz
 
 from services.cache import CacheService, _SHARED_CACHE
+from services.cadence import get_cadence_controller
 from services.persistent_market_state import PersistentMarketState
+from services.session_clock import session_clock
 from services.market_regime_ai import MarketRegimeAIEngine
+from services.rolling_stats import RollingStats, linear_slope
+from services.snapshot_bus import REGIME, snapshot_bus
+from services.ws_outbox import BroadcastManager
 
 logger = logging.getLogger(__name__)
 IST = pytz.timezone("Asia/Kolkata")
@@ -81,52 +84,11 @@ SYMBOLS = ["NIFTY", "BANKNIFTY", "SENSEX"]
 
 # ── Isolated WebSocket manager ───────────────────────────────────────────────
 
-class RegimeConnectionManager:
+class RegimeConnectionManager(BroadcastManager):
     """Completely isolated WebSocket manager for Market Regime."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
 
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(
-                ws.send_text(json.dumps(data, default=str)), timeout=3.0
-            )
-        except Exception:
-            await self.disconnect(ws)
-
-    @property
-    def client_count(self) -> int:
-        return len(self._connections)
-
-
-regime_manager = RegimeConnectionManager()
+regime_manager = RegimeConnectionManager("market_regime")
 
 
 # ── Utility helpers ──────────────────────────────────────────────────────────
@@ -153,26 +115,6 @@ def _parse_candle(item) -> Optional[Dict]:
     return None
 
 
-def _linear_slope(values: List[float]) -> float:
-    """Linear regression slope over a list of values."""
-    n = len(values)
-    if n < 3:
-        return 0.0
-    x_mean = (n - 1) / 2.0
-    y_mean = sum(values) / n
-    num = sum((i - x_mean) * (v - y_mean) for i, v in enumerate(values))
-    den = sum((i - x_mean) ** 2 for i in range(n))
-    return num / den if den != 0 else 0.0
-
-
-def _std_dev(values: List[float]) -> float:
-    if len(values) < 2:
-        return 0.0
-    mean = sum(values) / len(values)
-    variance = sum((v - mean) ** 2 for v in values) / len(values)
-    return math.sqrt(variance)
-
-
 # ── Per-index regime history ─────────────────────────────────────────────────
 
 class RegimeHistory:
@@ -181,7 +123,7 @@ class RegimeHistory:
 
     def __init__(self):
         self._prices: Deque[float] = collections.deque(maxlen=self.MAXLEN)
-        self._regime_scores: Deque[float] = collections.deque(maxlen=30)
+        self._regime_scores = RollingStats(30)
         self._opening_range_high: Optional[float] = None
         self._opening_range_low: Optional[float] = None
         self._opening_range_set: bool = False
@@ -211,7 +153,7 @@ class RegimeHistory:
             self._opening_range_set = True
 
     def push_regime_score(self, score: float):
-        self._regime_scores.append(score)
+        self._regime_scores.push(score)
 
 
 # ── The Core Engine ──────────────────────────────────────────────────────────
@@ -232,9 +174,10 @@ class MarketRegimeService:
         }
         self._last_snapshot: Dict[str, Any] = {}
         self._last_market: Dict[str, Dict] = {}  # Fallback cache per symbol
-        self._cadence_live = 1.0      # Broadcast every 1s during LIVE (fast regime updates)
+        self._cadence_live = 1.0      # Base LIVE broadcast cadence, adapted by services/cadence.py
         self._cadence_closed = 30.0   # Every 30s when CLOSED
         self._heartbeat_interval = 30.0
+        self._cadence = get_cadence_controller().register("market_regime", base=self._cadence_live)
 
     # ── Lifecycle ─────────────────────────────────────────────────────────
 
@@ -263,13 +206,16 @@ class MarketRegimeService:
     async def _run_loop(self):
         last_heartbeat = 0.0
         while self._running:
+            started = time_mod.perf_counter()
             try:
                 now = datetime.now(IST)
                 is_live = self._is_market_live(now)
-                cadence = self._cadence_live if is_live else self._cadence_closed
 
                 snapshot = await self._compute_all_regimes()
                 self._last_snapshot = snapshot
+                for sym, result in snapshot.items():
+                    if result:
+                        snapshot_bus.publish(REGIME, sym, result)
 
                 if regime_manager.client_count > 0:
                     await regime_manager.broadcast({
@@ -284,7 +230,9 @@ class MarketRegimeService:
                         })
                         last_heartbeat = time_mod.time()
 
-                await asyncio.sleep(cadence)
+                if is_live:
+                    self._cadence.record(time_mod.perf_counter() - started)
+                await asyncio.sleep(self._cadence.interval if is_live else self._cadence_closed)
 
             except asyncio.CancelledError:
                 break
@@ -296,10 +244,8 @@ class MarketRegimeService:
 
     @staticmethod
     def _is_market_live(now: datetime) -> bool:
-        if now.weekday() >= 5:
-            return False
-        t = now.time()
-        return time(9, 15) <= t <= time(15, 30)
+        # Session timeline at ``now`` (holidays included, 15:30 inclusive)
+        return session_clock.status_at(now) == "LIVE"
 
     # ── Compute regime for all symbols ────────────────────────────────────
 
@@ -499,9 +445,9 @@ class MarketRegimeService:
 
         # ── Score stability (smoothed over last readings) ─────────────
 
-        recent_scores = list(hist._regime_scores)
-        avg_score = sum(recent_scores) / len(recent_scores) if recent_scores else total_score
-        score_volatility = _std_dev(recent_scores) if len(recent_scores) >= 3 else 0
+        scores = hist._regime_scores
+        avg_score = scores.mean if len(scores) else total_score
+        score_volatility = scores.std if len(scores) >= 3 else 0
 
         ai_insights = self._ai_engine.infer(
             symbol=symbol,
@@ -663,7 +609,7 @@ class MarketRegimeService:
             subset = closes[: i + 1]
             if len(subset) >= 20:
                 ema_20_recent.append(self._compute_ema(subset, 20))
-        ema_slope = _linear_slope(ema_20_recent) if len(ema_20_recent) >= 3 else 0
+        ema_slope = linear_slope(ema_20_recent) if len(ema_20_recent) >= 3 else 0
 
         # Score
         score = 0.0
@@ -997,7 +943,7 @@ class MarketRegimeService:
             }
 
         # Volume slope
-        vol_slope = _linear_slope(volumes)
+        vol_slope = linear_slope(volumes)
         avg_vol = sum(volumes) / len(volumes) if volumes else 1
         normalized_slope = vol_slope / avg_vol if avg_vol > 0 else 0
 
@@ -1225,7 +1171,7 @@ class MarketRegimeService:
         ]
 
         if len(oi_values) >= 3:
-            oi_slope = _linear_slope(oi_values)
+            oi_slope = linear_slope(oi_values)
             avg_oi = sum(oi_values) / len(oi_values)
             oi_change_pct = (oi_slope / avg_oi) * 100 if avg_oi > 0 else 0
         else:
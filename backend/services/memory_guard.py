@@ -0,0 +1,301 @@
+"""
+Memory Guard — accounting and bounded-memory housekeeping.
+
+Long sessions accumulate state in many places: the shared in-memory cache
+(expired only lazily, on read), per-symbol histories in the order-flow and
+ML services, and per-service `_latest` / `_last_good` snapshots. This module:
+
+    • reports approximate bytes per subsystem and per shared-cache key prefix
+    • sweeps expired `_SHARED_CACHE` entries on a fixed interval
+    • enforces hard caps on the shared cache (keys / MB, eviction policy)
+    • runs registered trimmers (e.g. the order-flow optimizer's TTL cache)
+    • samples process RSS each sweep so a flat line can be verified
+
+Limits come from Settings (MEMORY_SWEEP_INTERVAL, SHARED_CACHE_MAX_KEYS,
+SHARED_CACHE_MAX_MB, SHARED_CACHE_EVICTION). Per-structure caps live with
+the structure (ORDERFLOW_HISTORY_MAXLEN, ORDERFLOW_OPTIMIZER_CACHE_MAX,
+QUANTEDGE_ML_BUFFER_SIZE, DEPTH_HISTORY_TICKS).
+
+Sizes are estimates: containers larger than `_SAMPLE` items are sampled and
+extrapolated so a report never walks a full tick history.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import os
+import sys
+import time
+import types
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from config import get_settings
+from services import cache as cache_module
+
+logger = logging.getLogger(__name__)
+
+_SAMPLE = 64        # items measured per container before extrapolating
+_MAX_DEPTH = 8
+
+_ATOMIC = (str, bytes, bytearray, int, float, bool, complex, type(None), datetime)
+_SKIP = (types.ModuleType, type, types.FunctionType, types.BuiltinFunctionType,
+         types.MethodType, asyncio.Task, asyncio.Future)
+
+
+def approx_size(obj: Any, _seen: Optional[set] = None, _depth: int = 0) -> int:
+    """Approximate deep size of ``obj`` in bytes (shared objects counted once)."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen or isinstance(obj, _SKIP):
+        return 0
+    _seen.add(id(obj))
+
+    if hasattr(obj, "memory_usage") and hasattr(obj, "columns"):   # pandas DataFrame
+        try:
+            return int(obj.memory_usage(deep=False).sum())
+        except Exception:
+            pass
+    size = sys.getsizeof(obj, 64)
+    if isinstance(obj, _ATOMIC) or _depth >= _MAX_DEPTH:
+        return size
+
+    if isinstance(obj, dict):
+        children = itertools.chain.from_iterable(itertools.islice(obj.items(), _SAMPLE))
+        count, sampled = len(obj), min(len(obj), _SAMPLE)
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        children = itertools.islice(obj, _SAMPLE)
+        count, sampled = len(obj), min(len(obj), _SAMPLE)
+    elif hasattr(obj, "__dict__"):
+        return size + approx_size(vars(obj), _seen, _depth + 1)
+    elif hasattr(obj, "__slots__"):
+        children = (getattr(obj, s) for s in obj.__slots__ if hasattr(obj, s))
+        count = sampled = 1
+    else:
+        return size
+
+    child_bytes = sum(approx_size(c, _seen, _depth + 1) for c in children)
+    if sampled and count > sampled:
+        child_bytes = child_bytes * count // sampled
+    return size + child_bytes
+
+
+def process_rss() -> Dict[str, Optional[int]]:
+    """Current and peak resident set size in bytes (None where unavailable)."""
+    rss = peak = None
+    try:
+        with open("/proc/self/statm") as fh:
+            rss = int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak *= 1 if sys.platform == "darwin" else 1024
+    except Exception:
+        pass
+    return {"rss": rss, "peakRss": peak}
+
+
+# ---------------------------------------------------------------------------
+# Subsystem registry
+# ---------------------------------------------------------------------------
+
+# (subsystem, module, dotted path to the instance, attributes to measure).
+# Only measured when the module is already imported and the instance exists —
+# the report never constructs a service just to size it.
+_TRACKED: Tuple[Tuple[str, str, str, Tuple[str, ...]], ...] = (
+    ("order_flow_analyzer", "services.order_flow_analyzer", "order_flow_analyzer",
+     ("symbol_history", "windows", "current_metrics", "_price_history", "_volume_history")),
+    ("depth_books", "services.depth_book", "depth_books", ("_books",)),
+    ("order_flow_optimizer", "services.order_flow_optimizer", "order_flow_optimizer",
+     ("analysis_cache", "cache_timestamps", "tick_batches", "latency_window")),
+    ("quantedge_ml", "services.smart_ai_algo_service", "_ALGO_SERVICE._ml_predictor", ("_states",)),
+    ("candle_intelligence", "services.candle_intelligence_engine", "_candle_intel_service",
+     ("_last_good", "_last_snapshot", "_last_broadcast_view")),
+    ("candle_intelligence_ai", "services.candle_intelligence_engine", "_CANDLE_AI_ENGINE",
+     ("_confidence_buffers", "_price_buffers")),
+    ("volume_pulse", "services.volume_pulse_engine", "volume_pulse_engine", ("symbol_data",)),
+    ("compass", "services.compass_service", "_compass_service_instance", ("_latest",)),
+    ("market_edge", "services.market_edge_service", "_edge_service", ("_latest",)),
+    ("expiry_explosion", "services.expiry_explosion_service", "_expiry_service", ("_latest",)),
+    ("liquidity", "services.liquidity_service", "_instance", ("_latest",)),
+    ("global_indices", "services.global_indices_service", "_service", ("_latest",)),
+    ("ict", "services.ict_engine", "_ict_service", ("_last_good", "_last_snapshot")),
+)
+
+Sizer = Callable[[], Dict[str, int]]
+Trimmer = Callable[[], int]
+
+_extra_sizers: Dict[str, Sizer] = {}
+
+
+def register_sizer(name: str, sizer: Sizer) -> None:
+    """Add a subsystem to the report; ``sizer`` returns {label: bytes}."""
+    _extra_sizers[name] = sizer
+
+
+def _resolve(module_name: str, path: str) -> Any:
+    obj: Any = sys.modules.get(module_name)
+    for part in path.split("."):
+        if obj is None:
+            return None
+        obj = getattr(obj, part, None)
+    return obj
+
+
+def _measure_attrs(instance: Any, attrs: Tuple[str, ...]) -> Dict[str, int]:
+    out: Dict[str, int] = {}
+    for attr in attrs:
+        value = getattr(instance, attr, None)
+        if value is None:
+            continue
+        try:
+            out[attr] = approx_size(value)
+        except RuntimeError:     # mutated mid-walk by the feed thread; skip this round
+            out[attr] = -1
+    return out
+
+
+def subsystem_sizes() -> Dict[str, Dict[str, Any]]:
+    report: Dict[str, Dict[str, Any]] = {}
+    for name, module_name, path, attrs in _TRACKED:
+        instance = _resolve(module_name, path)
+        if instance is None:
+            continue
+        detail = _measure_attrs(instance, attrs)
+        report[name] = {"bytes": sum(v for v in detail.values() if v > 0), "detail": detail}
+    for name, sizer in _extra_sizers.items():
+        try:
+            detail = sizer()
+        except Exception as exc:
+            report[name] = {"bytes": 0, "error": str(exc)}
+            continue
+        report[name] = {"bytes": sum(detail.values()), "detail": detail}
+    return dict(sorted(report.items(), key=lambda kv: kv[1]["bytes"], reverse=True))
+
+
+# ---------------------------------------------------------------------------
+# Guard
+# ---------------------------------------------------------------------------
+
+class MemoryGuard:
+    """Periodic TTL sweep + hard caps for the shared cache and registered trimmers."""
+
+    def __init__(self, interval: Optional[float] = None, max_keys: Optional[int] = None,
+                 max_mb: Optional[int] = None, policy: Optional[str] = None):
+        settings = get_settings()
+        self.interval = float(interval or settings.memory_sweep_interval)
+        self.max_keys = settings.shared_cache_max_keys if max_keys is None else max_keys
+        self.max_bytes = (settings.shared_cache_max_mb if max_mb is None else max_mb) * 1024 * 1024
+        self.policy = policy or settings.shared_cache_eviction
+        self._trimmers: Dict[str, Trimmer] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.runs = 0
+        self.expired_total = 0
+        self.evicted_total = 0
+        self.trimmed_total: Dict[str, int] = {}
+        self.last_run: Optional[float] = None
+        self.last_duration_ms = 0.0
+        self.rss_samples: Deque[Tuple[float, Optional[int]]] = deque(maxlen=240)
+
+    def register_trimmer(self, name: str, trimmer: Trimmer) -> None:
+        """``trimmer()`` drops stale entries from some structure and returns how many."""
+        self._trimmers[name] = trimmer
+
+    def _default_trimmers(self) -> Dict[str, Trimmer]:
+        trimmers = dict(self._trimmers)
+        optimizer = _resolve("services.order_flow_optimizer", "order_flow_optimizer")
+        if optimizer is not None and "order_flow_optimizer" not in trimmers:
+            trimmers["order_flow_optimizer"] = optimizer.sweep_expired
+        responses = _resolve("services.response_cache", "response_cache")
+        if responses is not None and "response_cache" not in trimmers:
+            trimmers["response_cache"] = responses.sweep_expired
+        return trimmers
+
+    def sweep_once(self) -> Dict[str, Any]:
+        start = time.perf_counter()
+        expired = cache_module.sweep_expired()
+        evicted = cache_module.enforce_limits(self.max_keys, self.max_bytes, self.policy)
+        trimmed: Dict[str, int] = {}
+        for name, trimmer in self._default_trimmers().items():
+            try:
+                trimmed[name] = int(trimmer() or 0)
+            except Exception as exc:
+                logger.warning("Memory trimmer %s failed: %s", name, exc)
+        self.runs += 1
+        self.expired_total += expired
+        self.evicted_total += evicted
+        for name, n in trimmed.items():
+            self.trimmed_total[name] = self.trimmed_total.get(name, 0) + n
+        self.last_run = time.time()
+        self.last_duration_ms = (time.perf_counter() - start) * 1000
+        self.rss_samples.append((self.last_run, process_rss()["rss"]))
+        if evicted:
+            logger.warning("Shared cache over limit: evicted %d entries (%s)", evicted, self.policy)
+        return {"expired": expired, "evicted": evicted, "trimmed": trimmed}
+
+    async def _loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.sleep(self.interval)
+                self.sweep_once()
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                logger.error("Memory guard sweep failed: %s", exc)
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "intervalSec": self.interval,
+            "limits": {"maxKeys": self.max_keys, "maxBytes": self.max_bytes, "policy": self.policy},
+            "runs": self.runs,
+            "lastRun": datetime.fromtimestamp(self.last_run).isoformat() if self.last_run else None,
+            "lastDurationMs": round(self.last_duration_ms, 2),
+            "expiredTotal": self.expired_total,
+            "evictedTotal": self.evicted_total,
+            "trimmedTotal": dict(self.trimmed_total),
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Full memory picture for the /health/memory endpoint."""
+        rss = [r for _, r in self.rss_samples if r]
+        return {
+            "process": {
+                **process_rss(),
+                "rssMinSampled": min(rss) if rss else None,
+                "rssMaxSampled": max(rss) if rss else None,
+                "samples": len(rss),
+            },
+            "sharedCache": cache_module.shared_cache_stats(),
+            "subsystems": subsystem_sizes(),
+            "guard": self.stats(),
+            "timestamp": datetime.now().isoformat(),
+        }
+
+
+memory_guard = MemoryGuard()
+
+
+def get_memory_guard() -> MemoryGuard:
+    return memory_guard
@@ -23,6 +23,7 @@ Architecture:
 Storage: backend/data/observatory/
   YYYY-MM-DD.json       — Complete daily snapshot (all metrics, strategies, system)
   YYYY-MM-DD.md         — Executive summary with analytics
+  observatory.db        — Indexed prediction/outcome log + daily rollups (rankings)
   YYYY-MM-DD.analytics  — Detailed correlation + performance analysis
   WEEKLY_SUMMARY.md     — 7-day rankings (multiple dimensions)
   SYSTEM_HEALTH.md      — Current system status, anomalies, alerts
@@ -33,11 +34,13 @@ import asyncio
 import json
 import logging
 import os
-import statistics
 from datetime import datetime, date, timezone, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
+from services.observatory_store import DB_NAME, ObservatoryStore
+from services.snapshot_bus import ANALYSIS, COMPASS, LIQUIDITY, MARKET, REGIME, snapshot_bus
+
 logger = logging.getLogger(__name__)
 
 # ── Constants ─────────────────────────────────────────────────────────────────
@@ -195,6 +198,11 @@ class ObservatoryService:
         self._lock = asyncio.Lock()
         # symbol → list of {time, timestamp, strategies}
         self._today_snapshots: Dict[str, List[Dict[str, Any]]] = {}
+        # Every snapshot today in capture order; snapshot ids are 1-based
+        # positions in it, so a delta read is a slice from the cursor.
+        self._snapshot_log: List[Tuple[str, Dict[str, Any]]] = []
+        self._store: Optional[ObservatoryStore] = None
+        self._store_failed = False
         self._open_prices: Dict[str, float] = {}
         self._high_prices: Dict[str, float] = {}
         self._low_prices:  Dict[str, float] = {}
@@ -260,6 +268,7 @@ class ObservatoryService:
                 if now.hour == 0 and now.minute < 5:
                     async with self._lock:
                         self._today_snapshots.clear()
+                        self._snapshot_log.clear()
                         self._open_prices.clear()
                         self._high_prices.clear()
                         self._low_prices.clear()
@@ -340,6 +349,8 @@ class ObservatoryService:
                 )
                 snap = {"time": snap_time, "timestamp": now.isoformat(), "strategies": strategies}
                 async with self._lock:
+                    snap["id"] = len(self._snapshot_log) + 1
+                    self._snapshot_log.append((symbol, snap))
                     self._today_snapshots.setdefault(symbol, []).append(snap)
 
                 logger.debug(
@@ -355,20 +366,10 @@ class ObservatoryService:
                 logger.warning("🔭 Observatory: snapshot error for %s — %s", symbol, exc)
 
     async def _fetch_market_data(self, symbol: str) -> Optional[Dict[str, Any]]:
-        try:
-            from services.cache import get_cache
-            raw = await get_cache().get(f"market:{symbol}")
-            return raw if isinstance(raw, dict) else None
-        except Exception:
-            return None
+        return snapshot_bus.value(MARKET, symbol)
 
     async def _fetch_analysis(self, symbol: str) -> Optional[Dict[str, Any]]:
-        try:
-            from services.cache import get_cache
-            raw = await get_cache().get(f"ws_analysis:{symbol}")
-            return raw if isinstance(raw, dict) else None
-        except Exception:
-            return None
+        return snapshot_bus.value(ANALYSIS, symbol)
 
     # ── Strategy extraction ───────────────────────────────────────────────────
 
@@ -480,10 +481,7 @@ class ObservatoryService:
 
         # 4. Market Regime ─────────────────────────────────────────────────────
         try:
-            from services.market_regime_service import get_market_regime_service  # type: ignore
-            svc = get_market_regime_service()
-            snap = svc.get_snapshot() if svc else {}
-            sym_data = (snap or {}).get(symbol, {})
+            sym_data = snapshot_bus.value(REGIME, symbol)
             if sym_data:
                 # Use directionStrength (0-100) as confidence proxy; fall back to trendStrength
                 conf = _safe_confidence(
@@ -506,10 +504,7 @@ class ObservatoryService:
 
         # 5. Liquidity Intelligence ────────────────────────────────────────────
         try:
-            from services.liquidity_service import get_liquidity_service  # type: ignore
-            liq = get_liquidity_service()
-            snap = liq.get_snapshot() if liq else {}
-            sym_data = (snap or {}).get(symbol, {})
+            sym_data = snapshot_bus.value(LIQUIDITY, symbol)
             if sym_data:
                 strategies["liquidity_score"] = entry(
                     sym_data.get("direction", "NEUTRAL"),
@@ -593,10 +588,7 @@ class ObservatoryService:
 
         # 9. Institutional Compass ─────────────────────────────────────────────
         try:
-            from services.compass_service import get_compass_service  # type: ignore
-            cp = get_compass_service()
-            snap = cp.get_snapshot() if cp else {}
-            sym_data = (snap or {}).get(symbol, {})
+            sym_data = snapshot_bus.value(COMPASS, symbol)
             if sym_data:
                 strategies["institutional_compass"] = entry(
                     sym_data.get("direction", "NEUTRAL"),
@@ -1074,6 +1066,28 @@ class ObservatoryService:
         stem = report_date.isoformat()
         _atomic_write_text(DATA_DIR / f"{stem}.json", json.dumps(report, indent=2))
         _atomic_write_text(DATA_DIR / f"{stem}.md",   self._render_markdown(report_date, report))
+        store = self._get_store()
+        if store is not None:
+            try:
+                store.record_report(report)
+            except Exception as exc:
+                logger.warning("🔭 Observatory: store write failed for %s — %s", stem, exc)
+
+    def _get_store(self) -> Optional[ObservatoryStore]:
+        """Open the outcome store on first use, importing JSON reports it lacks.
+
+        Returns None (and rankings fall back to scanning the JSON reports) if
+        the database cannot be opened.
+        """
+        if self._store is None and not self._store_failed:
+            try:
+                store = ObservatoryStore(DATA_DIR / DB_NAME, symbols=SYMBOLS)
+                store.import_reports(DATA_DIR)
+                self._store = store
+            except Exception as exc:
+                self._store_failed = True
+                logger.warning("🔭 Observatory: outcome store unavailable — %s", exc)
+        return self._store
 
     def _render_markdown(self, report_date: date, report: Dict[str, Any]) -> str:
         lines: List[str] = [
@@ -1137,7 +1151,7 @@ class ObservatoryService:
             reports  = self.get_historical_reports(7)
             if not reports:
                 return
-            rankings = self._compute_rankings(reports)
+            rankings = self.get_strategy_rankings(7)["rankings"]
             rec      = self._generate_recommendation(rankings)
 
             lines: List[str] = [
@@ -1184,20 +1198,35 @@ class ObservatoryService:
 
     # ── Public API ────────────────────────────────────────────────────────────
 
-    def get_today_snapshot(self) -> Dict[str, Any]:
+    def get_today_snapshot(self, since: int = 0, limit: int = 20) -> Dict[str, Any]:
+        """
+        Latest strategy readings plus today's snapshots taken after `since`.
+
+        `snapshots` holds at most `limit` snapshots with id > since, grouped by
+        symbol; pass the returned `cursor` back as `since` to get only what was
+        captured after this read. `has_more` means another page is waiting.
+        """
         now   = _now_ist()
         mins  = _mins(now)
         current_strategies: Dict[str, Dict[str, Any]] = {}
         for symbol, snaps in self._today_snapshots.items():
             if snaps:
                 current_strategies[symbol] = snaps[-1].get("strategies", {})
+        since = max(int(since), 0)
+        page  = self._snapshot_log[since:since + max(int(limit), 0)]
+        snapshots: Dict[str, List[Dict[str, Any]]] = {}
+        for symbol, snap in page:
+            snapshots.setdefault(symbol, []).append(snap)
+        cursor = page[-1][1]["id"] if page else min(since, len(self._snapshot_log))
         return {
             "date":               now.date().isoformat(),
             "market_open":        MARKET_OPEN_MIN <= mins <= MARKET_CLOSE_MIN,
             "open_prices":        dict(self._open_prices),
             "snapshot_count":     {sym: len(snaps) for sym, snaps in self._today_snapshots.items()},
             "current_strategies": current_strategies,
-            "all_snapshots":      self._today_snapshots,
+            "snapshots":          snapshots,
+            "cursor":             cursor,
+            "has_more":           cursor < len(self._snapshot_log),
         }
 
     def get_historical_reports(self, days: int = 7) -> List[Dict[str, Any]]:
@@ -1214,10 +1243,18 @@ class ObservatoryService:
         return reports
 
     def get_strategy_rankings(self, days: int = 10) -> Dict[str, Any]:
-        reports  = self.get_historical_reports(days)
-        rankings = self._compute_rankings(reports)
+        """Rankings over the last `days` calendar days, from the store's rollups."""
+        store = self._get_store()
+        if store is not None:
+            since    = (_now_ist().date() - timedelta(days=days - 1)).isoformat()
+            analyzed = len(store.report_dates(since))
+            rankings = self._rank(store.window(since))
+        else:
+            reports  = self.get_historical_reports(days)
+            analyzed = len(reports)
+            rankings = self._compute_rankings(reports)
         return {
-            "days_analyzed":  len(reports),
+            "days_analyzed":  analyzed,
             "rankings":       rankings,
             "best_strategy":  rankings[0] if rankings else None,
             "recommendation": self._generate_recommendation(rankings),
@@ -1230,7 +1267,7 @@ class ObservatoryService:
         weighted_accuracy = sum(conf_i * correct_i) / sum(conf_i) * 100
         streak            = consecutive correct predictions ending at the most recent day.
         """
-        # key → {correct, total, w_correct, w_total, confidences, per_day}
+        # key → {correct, total, w_correct, w_total, per_day}
         acc_map: Dict[str, Dict[str, Any]] = {}
 
         for rep in sorted(reports, key=lambda r: r.get("date", "")):
@@ -1240,7 +1277,6 @@ class ObservatoryService:
                         acc_map[strat_key] = {
                             "correct": 0, "total": 0,
                             "w_correct": 0.0, "w_total": 0.0,
-                            "confidences": [],
                             "per_day": [],
                         }
                     b       = acc_map[strat_key]
@@ -1252,22 +1288,13 @@ class ObservatoryService:
                         b["total"]     += 1
                         b["w_correct"] += conf
                         b["w_total"]   += conf
-                        b["confidences"].append(conf)
                         b["per_day"].append(True)
                     elif correct is False:
                         b["total"]    += 1
                         b["w_total"]  += conf
-                        b["confidences"].append(conf)
                         b["per_day"].append(False)
 
-        results: List[Dict[str, Any]] = []
-        for strat_key, b in acc_map.items():
-            if b["total"] == 0:
-                continue
-            simple_acc = b["correct"] / b["total"] * 100
-            w_acc      = (b["w_correct"] / b["w_total"] * 100) if b["w_total"] > 0 else simple_acc
-            avg_conf   = statistics.mean(b["confidences"]) if b["confidences"] else 50.0
-
+        for b in acc_map.values():
             # Streak: consecutive correct from end of per_day list
             streak = 0
             for v in reversed(b["per_day"]):
@@ -1275,6 +1302,21 @@ class ObservatoryService:
                     streak += 1
                 else:
                     break
+            b["streak"] = streak
+        return self._rank(acc_map)
+
+    @staticmethod
+    def _rank(acc_map: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Turn per-strategy sums {correct, total, w_correct, w_total, streak} into sorted rankings."""
+        results: List[Dict[str, Any]] = []
+        for strat_key, b in acc_map.items():
+            if b["total"] == 0:
+                continue
+            simple_acc = b["correct"] / b["total"] * 100
+            w_acc      = (b["w_correct"] / b["w_total"] * 100) if b["w_total"] > 0 else simple_acc
+            # Every decided outcome adds its confidence to w_total, so this is their mean
+            avg_conf   = b["w_total"] / b["total"]
+            streak     = b["streak"]
 
             meta = STRATEGY_META.get(strat_key, (strat_key, "other", "📌", 50))
             priority_weight = meta[3] if len(meta) > 3 else 50
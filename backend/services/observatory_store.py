@@ -0,0 +1,252 @@
+"""
+Observatory Store — indexed, append-only record of strategy predictions and
+their end-of-day outcomes, with per-day rollups for window rankings.
+
+Layout: data/observatory/observatory.db (SQLite, WAL journal)
+
+    reports     one row per report date                       (date)
+    outcomes    one row per morning prediction and outcome     (date, symbol, strategy_key)
+    rollups     per-strategy, per-day sums + running totals    (strategy_key, date)
+    strategies  all-time totals and current streak             (strategy_key)
+
+A report is recorded once: its outcomes are upserted, and the touched
+strategies' rollups, running totals and streaks are rebuilt in the same
+transaction, so re-recording a regenerated report replaces rather than
+double-counts. Any window then costs two index seeks per strategy — all-time
+totals minus the running totals as of the day before the window — however
+many days it spans. A window's streak is the all-time streak capped at the
+window's correct count: when the last miss falls inside the window they are
+equal, and when it falls before, every decided outcome in the window is a hit.
+
+The per-day JSON reports stay the human-readable archive (and what
+/daily/{date} serves); any not yet in the store are imported on open.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = "observatory.db"
+
+_SUMS = ("correct", "total", "w_correct", "w_total")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    date         TEXT PRIMARY KEY,
+    generated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    date             TEXT    NOT NULL,
+    symbol           TEXT    NOT NULL,
+    strategy_key     TEXT    NOT NULL,
+    ord              INTEGER NOT NULL,
+    signal           TEXT,
+    confidence       INTEGER NOT NULL,
+    actual_direction TEXT,
+    was_correct      INTEGER,
+    PRIMARY KEY (date, symbol, strategy_key)
+);
+CREATE INDEX IF NOT EXISTS outcomes_strategy ON outcomes (strategy_key, was_correct, ord);
+CREATE TABLE IF NOT EXISTS rollups (
+    strategy_key  TEXT    NOT NULL,
+    date          TEXT    NOT NULL,
+    correct       INTEGER NOT NULL,
+    total         INTEGER NOT NULL,
+    w_correct     INTEGER NOT NULL,
+    w_total       INTEGER NOT NULL,
+    cum_correct   INTEGER NOT NULL DEFAULT 0,
+    cum_total     INTEGER NOT NULL DEFAULT 0,
+    cum_w_correct INTEGER NOT NULL DEFAULT 0,
+    cum_w_total   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (strategy_key, date)
+);
+CREATE INDEX IF NOT EXISTS rollups_date ON rollups (date);
+CREATE TABLE IF NOT EXISTS strategies (
+    strategy_key TEXT PRIMARY KEY,
+    correct      INTEGER NOT NULL,
+    total        INTEGER NOT NULL,
+    w_correct    INTEGER NOT NULL,
+    w_total      INTEGER NOT NULL,
+    streak       INTEGER NOT NULL
+);
+"""
+
+# Only decided outcomes (was_correct true/false) count; NEUTRAL calls and FLAT
+# days are stored with was_correct NULL and drop out of every sum.
+_ROLLUP_DAY = """
+INSERT INTO rollups (strategy_key, date, correct, total, w_correct, w_total)
+SELECT strategy_key, date,
+       COUNT(CASE WHEN was_correct = 1 THEN 1 END), COUNT(was_correct),
+       COALESCE(SUM(CASE WHEN was_correct = 1 THEN confidence END), 0),
+       COALESCE(SUM(CASE WHEN was_correct IS NOT NULL THEN confidence END), 0)
+  FROM outcomes WHERE date = ? GROUP BY strategy_key
+"""
+
+_RUNNING = """
+UPDATE rollups SET
+    cum_correct   = (SELECT SUM(correct)   FROM rollups p WHERE p.strategy_key = rollups.strategy_key AND p.date <= rollups.date),
+    cum_total     = (SELECT SUM(total)     FROM rollups p WHERE p.strategy_key = rollups.strategy_key AND p.date <= rollups.date),
+    cum_w_correct = (SELECT SUM(w_correct) FROM rollups p WHERE p.strategy_key = rollups.strategy_key AND p.date <= rollups.date),
+    cum_w_total   = (SELECT SUM(w_total)   FROM rollups p WHERE p.strategy_key = rollups.strategy_key AND p.date <= rollups.date)
+ WHERE strategy_key = ? AND date >= ?
+"""
+
+_STRATEGY = """
+INSERT OR REPLACE INTO strategies
+SELECT strategy_key, cum_correct, cum_total, cum_w_correct, cum_w_total,
+       (SELECT COUNT(*) FROM outcomes
+         WHERE strategy_key = :key AND was_correct = 1
+           AND ord > COALESCE((SELECT MAX(ord) FROM outcomes
+                                WHERE strategy_key = :key AND was_correct = 0), -1))
+  FROM rollups WHERE strategy_key = :key ORDER BY date DESC LIMIT 1
+"""
+
+# Running totals as of the last rolled-up day before the window opens. CROSS
+# JOIN pins strategies as the outer loop, so each lookup is one index seek.
+_BEFORE = """
+SELECT r.strategy_key, r.cum_correct, r.cum_total, r.cum_w_correct, r.cum_w_total
+  FROM strategies s
+ CROSS JOIN rollups r ON r.rowid = (SELECT rowid FROM rollups
+                                     WHERE strategy_key = s.strategy_key AND date < ?
+                                     ORDER BY date DESC LIMIT 1)
+"""
+
+
+def _confidence(v: Any, default: int = 50) -> int:
+    try:
+        return min(max(int(float(v or default)), 0), 100)
+    except (TypeError, ValueError):
+        return default
+
+
+class ObservatoryStore:
+    """SQLite-backed prediction / outcome log with daily rollups."""
+
+    def __init__(self, path: Union[str, Path], symbols: Iterable[str] = ()) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Outcomes within a day are ordered by the service's symbol order, the
+        # same order the JSON reports list them in, so streaks match.
+        self._symbol_rank = {s: i for i, s in enumerate(symbols)}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def _ord(self, day: str, symbol: str, position: int) -> int:
+        rank = self._symbol_rank.get(symbol, len(self._symbol_rank) + position)
+        return date.fromisoformat(day).toordinal() * 100 + min(rank, 99)
+
+    def record_report(self, report: Dict[str, Any]) -> int:
+        """Upsert one daily report's outcomes and rebuild that day's rollup."""
+        day = report.get("date")
+        if not day:
+            return 0
+        rows = []
+        for position, (symbol, sym_data) in enumerate((report.get("symbols") or {}).items()):
+            ord_ = self._ord(day, symbol, position)
+            for strat_key, perf in (sym_data.get("strategy_performance") or {}).items():
+                correct = perf.get("was_correct")
+                rows.append((
+                    day, symbol, strat_key, ord_,
+                    perf.get("morning_signal"),
+                    _confidence(perf.get("morning_confidence", 50)),
+                    perf.get("actual_direction"),
+                    None if correct is None else int(bool(correct)),
+                ))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                touched = {r[0] for r in self._db.execute(
+                    "SELECT strategy_key FROM rollups WHERE date = ?", (day,))}
+                touched.update(row[2] for row in rows)
+                self._db.execute("DELETE FROM outcomes WHERE date = ?", (day,))
+                self._db.execute("DELETE FROM rollups WHERE date = ?", (day,))
+                self._db.executemany("INSERT INTO outcomes VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+                self._db.execute(_ROLLUP_DAY, (day,))
+                for key in touched:
+                    self._db.execute(_RUNNING, (key, day))
+                    self._db.execute("DELETE FROM strategies WHERE strategy_key = ?", (key,))
+                    self._db.execute(_STRATEGY, {"key": key})
+                self._db.execute("INSERT OR REPLACE INTO reports VALUES (?, ?)",
+                                 (day, report.get("generated_at")))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def import_reports(self, directory: Union[str, Path]) -> int:
+        """Record every YYYY-MM-DD.json in `directory` the store has not seen."""
+        with self._lock:
+            known = {r[0] for r in self._db.execute("SELECT date FROM reports")}
+        imported = 0
+        for fp in sorted(Path(directory).glob("????-??-??.json")):
+            if fp.stem in known:
+                continue
+            try:
+                report = json.loads(fp.read_text(encoding="utf-8"))
+                report.setdefault("date", fp.stem)
+                self.record_report(report)
+                imported += 1
+            except Exception as exc:
+                logger.warning("🔭 Observatory store: skipped %s — %s", fp.name, exc)
+        if imported:
+            logger.info("🔭 Observatory store: imported %d daily report(s)", imported)
+        return imported
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def report_dates(self, since: Optional[str] = None) -> List[str]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT date FROM reports WHERE date >= ? ORDER BY date DESC", (since or "",)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def window(self, since: str) -> Dict[str, Dict[str, int]]:
+        """Per-strategy sums over outcomes dated `since` or later, with streaks."""
+        with self._lock:
+            totals = self._db.execute(
+                "SELECT strategy_key, correct, total, w_correct, w_total, streak FROM strategies"
+            ).fetchall()
+            before = {row[0]: row[1:] for row in self._db.execute(_BEFORE, (since,))}
+        out: Dict[str, Dict[str, int]] = {}
+        for key, *sums, streak in totals:
+            prior = before.get(key, (0, 0, 0, 0))
+            b = {name: v - p for name, v, p in zip(_SUMS, sums, prior)}
+            if b["total"]:
+                b["streak"] = min(streak, b["correct"])
+                out[key] = b
+        return out
+
+    def outcomes(self, strategy_key: str, limit: int = 30) -> List[Dict[str, Any]]:
+        """Most recent recorded outcomes for one strategy, newest first."""
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT date, symbol, signal, confidence, actual_direction, was_correct"
+                "  FROM outcomes WHERE strategy_key = ? ORDER BY ord DESC LIMIT ?",
+                (strategy_key, limit),
+            )
+            cols = [c[0] for c in cur.description]
+            rows = cur.fetchall()
+        out = [dict(zip(cols, row)) for row in rows]
+        for row in out:
+            if row["was_correct"] is not None:
+                row["was_correct"] = bool(row["was_correct"])
+        return out
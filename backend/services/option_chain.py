@@ -0,0 +1,479 @@
+"""Option chain mirror — near-the-money strikes streamed over KiteTicker.
+
+PCR, strike intelligence and expiry explosion rebuilt the option chain every
+few seconds from kite.instruments() plus a 200-token kite.quote(), each on its
+own clock and each drawing on the one per-second quote quota. The mirror
+subscribes the strikes around ATM of the nearest expiry to the ticker instead
+(mode OPTION_CHAIN_MODE, "full" for depth) and keeps every leg in arrays
+aligned to the expiry's sorted strikes, leg 0 = CE, 1 = PE:
+
+    ltp, volume, oi, oi_base       (2, n)        oi_base = first OI seen this session
+    ohlc                           (2, n, 4)
+    depth_price / qty / orders     (2, n, 2, 5)  side × level, as KiteTicker sends it
+    buy_qty, sell_qty, updated     (2, n)
+
+The window is ±OPTION_CHAIN_WIDTH strikes around ATM. A listener on the index
+ticks re-centres it once spot has moved more than a quarter of the width,
+which redeclares the universe's "option_chain" slice; the universe keeps
+unchanged strikes on their ticker connection and spills onto a second
+connection when FEED_MAX_TOKENS is reached, so a re-centre is a handful of
+subscribe / unsubscribe calls. PCR (OI and volume), max pain and OI change are
+computed from the arrays on demand, so they move tick by tick without a REST
+call. They cover the ±OPTION_CHAIN_WIDTH window only, not the whole chain the
+REST path summed, so PCR reads differently from the old full-chain figure
+(far OTM open interest is left out):
+
+    chains = get_option_chains()
+    chain = chains.get("NIFTY")              # None until the window has ticked
+    chain.pcr(), chain.max_pain(), chain.oi_change()
+
+`quotes(keys)` answers kite.quote()-shaped rows for live window strikes; the
+quote scheduler asks it before spending quota, so existing callers are served
+from the mirror without changes.
+
+Chains are reloaded from a fresh instruments dump once per IST trading day (a
+background check every ROLL_CHECK_SECONDS), so the day after an expiry the
+mirror rolls to the next series and redeclares its subscriptions. Expired
+chains are dropped rather than served, and their contracts are retired from
+the instrument universe first, so the new series reuses their ids instead of
+the arrays growing every day.
+
+The KiteTicker thread writes (market_feed._on_instrument_tick, and the spot
+listener); readers take the chain's lock.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from config import get_settings
+from services.candle_archive import IST
+from services.instrument_universe import INDEX_SYMBOLS, InstrumentUniverse, get_instrument_universe
+
+logger = logging.getLogger(__name__)
+
+CE, PE = 0, 1
+LEGS = ("CE", "PE")
+LEVELS = 5
+LIVE_AFTER_S = 5.0          # a chain stands in for REST only while it ticked this recently
+ROLL_CHECK_SECONDS = 300.0  # how often the roll loop looks for a new trading day
+UNDERLYINGS = {"NIFTY": "NFO", "BANKNIFTY": "NFO", "SENSEX": "BFO"}   # → F&O exchange
+
+
+class OptionChain:
+    """One expiry of one underlying, as columns aligned to the sorted strikes."""
+
+    def __init__(self, underlying: str, expiry: Optional[str], strikes: Iterable[float],
+                 tokens: np.ndarray, symbols: List[List[Optional[str]]], width: int = 20) -> None:
+        self.underlying = underlying
+        self.expiry = expiry
+        self.strikes = np.asarray(list(strikes), dtype=np.float64)
+        n = len(self.strikes)
+        self.tokens = tokens                      # (2, n) int64, 0 where a leg is not listed
+        self.symbols = symbols                    # [leg][strike] tradingsymbol
+        self.width = max(int(width), 1)
+        self.slack = max(1, self.width // 4)      # re-centre hysteresis, in strikes
+        self.ltp = np.zeros((2, n), dtype=np.float64)
+        self.volume = np.zeros((2, n), dtype=np.int64)
+        self.oi = np.zeros((2, n), dtype=np.int64)
+        self.oi_base = np.full((2, n), -1, dtype=np.int64)
+        self.avg_price = np.zeros((2, n), dtype=np.float64)
+        self.ohlc = np.zeros((2, n, 4), dtype=np.float64)
+        self.depth_price = np.zeros((2, n, 2, LEVELS), dtype=np.float64)
+        self.depth_qty = np.zeros((2, n, 2, LEVELS), dtype=np.int64)
+        self.depth_orders = np.zeros((2, n, 2, LEVELS), dtype=np.int32)
+        self.buy_qty = np.zeros((2, n), dtype=np.int64)
+        self.sell_qty = np.zeros((2, n), dtype=np.int64)
+        self.updated = np.zeros((2, n), dtype=np.float64)
+        self.spot = 0.0
+        self.center: Optional[int] = None
+        self.recenters = 0
+        self.ticks = 0
+        self._lock = threading.Lock()
+
+    # ── Window ──────────────────────────────────────────────────────────
+
+    def atm_index(self, spot: float) -> int:
+        i = int(np.searchsorted(self.strikes, spot))
+        if i > 0 and (i == len(self.strikes) or spot - self.strikes[i - 1] <= self.strikes[i] - spot):
+            i -= 1
+        return i
+
+    @property
+    def window(self) -> Tuple[int, int]:
+        """[lo, hi) strike indices currently subscribed."""
+        if self.center is None:
+            return 0, 0
+        return max(self.center - self.width, 0), min(self.center + self.width + 1, len(self.strikes))
+
+    def recenter(self, spot: float) -> bool:
+        """Move the window to ``spot``'s ATM if it drifted past the hysteresis; True if it moved."""
+        self.spot = spot
+        if spot <= 0 or not len(self.strikes):
+            return False
+        atm = self.atm_index(spot)
+        if self.center is not None and abs(atm - self.center) <= self.slack:
+            return False
+        with self._lock:
+            self.center = atm
+            self.recenters += 1
+        return True
+
+    def window_symbols(self) -> List[str]:
+        lo, hi = self.window
+        return [s for leg in self.symbols for s in leg[lo:hi] if s]
+
+    # ── Tick path (KiteTicker thread) ───────────────────────────────────
+
+    def update(self, leg: int, i: int, tick: Dict[str, Any], epoch: float) -> None:
+        with self._lock:
+            self.ltp[leg, i] = tick.get("last_price") or 0.0
+            if "volume_traded" in tick:
+                self.volume[leg, i] = tick["volume_traded"] or 0
+            if "oi" in tick:
+                oi = tick["oi"] or 0
+                self.oi[leg, i] = oi
+                if self.oi_base[leg, i] < 0 and oi:
+                    self.oi_base[leg, i] = oi
+            if "average_traded_price" in tick:
+                self.avg_price[leg, i] = tick["average_traded_price"] or 0.0
+            ohlc = tick.get("ohlc")
+            if ohlc:
+                self.ohlc[leg, i] = (ohlc.get("open", 0), ohlc.get("high", 0), ohlc.get("low", 0), ohlc.get("close", 0))
+            if "total_buy_quantity" in tick:
+                self.buy_qty[leg, i] = tick["total_buy_quantity"] or 0
+                self.sell_qty[leg, i] = tick.get("total_sell_quantity") or 0
+            depth = tick.get("depth")
+            if depth:
+                for side, levels in enumerate((depth.get("buy", ()), depth.get("sell", ()))):
+                    for level, entry in enumerate(levels[:LEVELS]):
+                        self.depth_price[leg, i, side, level] = entry.get("price", 0.0)
+                        self.depth_qty[leg, i, side, level] = entry.get("quantity", 0)
+                        self.depth_orders[leg, i, side, level] = entry.get("orders", 0)
+            self.updated[leg, i] = epoch
+            self.ticks += 1
+
+    # ── Analytics ───────────────────────────────────────────────────────
+
+    def live(self, max_age: float = LIVE_AFTER_S, now: Optional[float] = None) -> bool:
+        """Window subscribed, (almost) every listed leg in it has data, and ticks are flowing."""
+        lo, hi = self.window
+        if hi <= lo:
+            return False
+        listed = self.tokens[:, lo:hi] > 0
+        updated = self.updated[:, lo:hi][listed]
+        if not updated.size or np.count_nonzero(updated) < 0.9 * updated.size:
+            return False
+        return (now or time.time()) - float(updated.max()) < max_age
+
+    def pcr(self) -> Dict[str, float]:
+        lo, hi = self.window
+        with self._lock:
+            oi = self.oi[:, lo:hi].sum(axis=1)
+            volume = self.volume[:, lo:hi].sum(axis=1)
+        return {
+            "pcr": round(float(oi[PE] / oi[CE]), 2) if oi[CE] else 0.0,
+            "volume_pcr": round(float(volume[PE] / volume[CE]), 2) if volume[CE] else 0.0,
+            "call_oi": int(oi[CE]), "put_oi": int(oi[PE]),
+            "call_volume": int(volume[CE]), "put_volume": int(volume[PE]),
+        }
+
+    def max_pain(self) -> Optional[float]:
+        """Window strike at which option writers pay out least at expiry."""
+        lo, hi = self.window
+        if hi <= lo:
+            return None
+        strikes = self.strikes[lo:hi]
+        with self._lock:
+            ce, pe = self.oi[CE, lo:hi].astype(np.float64), self.oi[PE, lo:hi].astype(np.float64)
+        if not (ce.any() or pe.any()):
+            return None
+        moneyness = strikes[None, :] - strikes[:, None]          # [expiry k, strike i] = s_i − K_k
+        payout = np.maximum(-moneyness, 0.0) @ ce + np.maximum(moneyness, 0.0) @ pe
+        return float(strikes[int(np.argmin(payout))])
+
+    def oi_change(self, top: int = 3) -> Dict[str, Any]:
+        """OI built (+) or unwound (−) since the first tick of the session, per leg."""
+        lo, hi = self.window
+        with self._lock:
+            base = self.oi_base[:, lo:hi]
+            change = np.where(base >= 0, self.oi[:, lo:hi] - base, 0)
+        strikes = self.strikes[lo:hi]
+        out: Dict[str, Any] = {}
+        for leg, name in enumerate(LEGS):
+            order = np.argsort(-np.abs(change[leg]))[:top]
+            out[name.lower()] = {
+                "total": int(change[leg].sum()),
+                "top": [{"strike": float(strikes[i]), "change": int(change[leg, i])}
+                        for i in order if change[leg, i]],
+            }
+        return out
+
+    def strike_map(self) -> Dict[int, Dict[str, int]]:
+        """strike → {ce_oi, pe_oi, ce_vol, pe_vol} over the window (pcr_service's shape)."""
+        lo, hi = self.window
+        with self._lock:
+            oi, volume = self.oi[:, lo:hi].copy(), self.volume[:, lo:hi].copy()
+        return {int(s): {"ce_oi": int(oi[CE, j]), "pe_oi": int(oi[PE, j]),
+                         "ce_vol": int(volume[CE, j]), "pe_vol": int(volume[PE, j])}
+                for j, s in enumerate(self.strikes[lo:hi])}
+
+    def quote_row(self, leg: int, i: int) -> Dict[str, Any]:
+        """One leg in kite.quote()'s shape."""
+        with self._lock:
+            o, h, l, c = (float(x) for x in self.ohlc[leg, i])
+            depth = {side: [{"price": float(self.depth_price[leg, i, s, k]),
+                             "quantity": int(self.depth_qty[leg, i, s, k]),
+                             "orders": int(self.depth_orders[leg, i, s, k])} for k in range(LEVELS)]
+                     for s, side in enumerate(("buy", "sell"))}
+            ltp = float(self.ltp[leg, i])
+            return {
+                "instrument_token": int(self.tokens[leg, i]),
+                "timestamp": datetime.fromtimestamp(float(self.updated[leg, i])),
+                "last_price": ltp,
+                "volume": int(self.volume[leg, i]),
+                "average_price": float(self.avg_price[leg, i]),
+                "buy_quantity": int(self.buy_qty[leg, i]),
+                "sell_quantity": int(self.sell_qty[leg, i]),
+                "oi": int(self.oi[leg, i]),
+                "net_change": round(ltp - c, 2) if c else 0.0,
+                "ohlc": {"open": o, "high": h, "low": l, "close": c},
+                "depth": depth,
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        lo, hi = self.window
+        return {
+            "underlying": self.underlying,
+            "expiry": self.expiry,
+            "spot": self.spot,
+            "atm": float(self.strikes[self.center]) if self.center is not None else None,
+            "window": [float(self.strikes[lo]), float(self.strikes[hi - 1])] if hi > lo else [],
+            **self.pcr(),
+            "max_pain": self.max_pain(),
+            "oi_change": self.oi_change(),
+        }
+
+    def report(self) -> Dict[str, Any]:
+        return {**self.snapshot(), "strikes": len(self.strikes), "subscribed": len(self.window_symbols()),
+                "live": self.live(), "recenters": self.recenters, "ticks": self.ticks}
+
+
+class OptionChains:
+    """Option chains by underlying, fed from the KiteTicker thread."""
+
+    def __init__(self, universe: Optional[InstrumentUniverse] = None, width: Optional[int] = None,
+                 mode: Optional[str] = None) -> None:
+        settings = get_settings()
+        self.universe = universe or get_instrument_universe()
+        self.width = width or settings.option_chain_width
+        self.mode = mode or settings.option_chain_mode
+        self.chains: Dict[str, OptionChain] = {}
+        self._slots: Dict[int, Tuple[OptionChain, int, int]] = {}    # iid → (chain, leg, strike index)
+        self._lock = threading.Lock()
+        self.served = 0
+        self.loaded_on: Optional[date] = None     # IST day of the last complete reload
+        self.reloads = 0
+        self._gateway: Any = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+        self.universe.declare("option_chain_spot", symbols=INDEX_SYMBOLS, mode="ltp", on_tick=self._on_spot)
+
+    # ── Loading ─────────────────────────────────────────────────────────
+
+    def load(self, underlying: str, rows: Iterable[Dict[str, Any]], today: Optional[date] = None) -> Optional[OptionChain]:
+        """Build ``underlying``'s nearest-expiry chain from kite.instruments() rows."""
+        today = today or _today()
+        options = [r for r in rows if r.get("name") == underlying and r.get("instrument_type") in LEGS
+                   and r.get("expiry") and _as_date(r["expiry"]) >= today]
+        if not options:
+            return None
+        expiry = min(_as_date(r["expiry"]) for r in options)
+        options = [r for r in options if _as_date(r["expiry"]) == expiry]
+        strikes = sorted({float(r["strike"]) for r in options})
+        index = {s: i for i, s in enumerate(strikes)}
+        tokens = np.zeros((2, len(strikes)), dtype=np.int64)
+        symbols: List[List[Optional[str]]] = [[None] * len(strikes) for _ in LEGS]
+        for row in options:
+            leg, i = LEGS.index(row["instrument_type"]), index[float(row["strike"])]
+            tokens[leg, i] = row["instrument_token"]
+            symbols[leg][i] = row["tradingsymbol"]
+        chain = OptionChain(underlying, expiry.isoformat(), strikes, tokens, symbols, self.width)
+        ids = self.universe.add_kite_instruments(options)
+        with self._lock:
+            previous = self.chains.get(underlying)
+            if previous is not None:
+                for iid in [k for k, slot in self._slots.items() if slot[0] is previous]:
+                    del self._slots[iid]
+            for iid in ids:
+                instrument = self.universe[iid]
+                self._slots[iid] = (chain, LEGS.index(instrument.option_type), index[instrument.strike])
+            self.chains[underlying] = chain
+        spot_id = self.universe.id_of(underlying)
+        spot = float(self.universe.state.last_price[spot_id]) if spot_id is not None else 0.0
+        chain.recenter(spot)
+        self._declare()
+        logger.info("Option chain %s %s: %d strikes, window ±%d", underlying, chain.expiry, len(strikes), self.width)
+        return chain
+
+    async def start(self, gateway: Any = None) -> None:
+        """Load every underlying's chain, let the quote scheduler serve window
+        strikes from the mirror and start the daily roll check."""
+        if not get_settings().option_chain_enabled or self._running:
+            return
+        if gateway is None:
+            from services.kite_gateway import get_kite_gateway
+            gateway = get_kite_gateway()
+        self._gateway = gateway
+        await self.reload()
+        from services.quote_scheduler import get_quote_scheduler
+        get_quote_scheduler().add_source(self.quotes)
+        self._running = True
+        self._task = asyncio.create_task(self._roll_loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def due(self, today: Optional[date] = None) -> bool:
+        """True once the chains were last (fully) loaded on an earlier IST day."""
+        return self.loaded_on != (today or _today())
+
+    async def reload(self, today: Optional[date] = None) -> int:
+        """Reload every underlying's nearest expiry (one instruments dump per
+        exchange) after dropping chains whose expiry has passed and retiring
+        expired contracts from the universe. Returns the number of chains loaded."""
+        today = today or _today()
+        # Expired chains go first, so the new series takes over their universe ids
+        for underlying in list(self.chains):
+            self._drop_expired(underlying, today)
+        retired = self.universe.retire_expired(today)
+        if retired:
+            logger.info("Option chain: retired %d expired contracts from the universe", retired)
+        by_exchange: Dict[str, List[str]] = {}
+        for underlying, exchange in UNDERLYINGS.items():
+            by_exchange.setdefault(exchange, []).append(underlying)
+        loaded, complete = 0, True
+        for exchange, underlyings in by_exchange.items():
+            try:
+                rows = await self._gateway.instruments(exchange)
+            except Exception as exc:
+                logger.warning("Option chain: instruments(%s) failed: %s", exchange, exc)
+                complete = False
+                continue
+            for underlying in underlyings:
+                if self.load(underlying, rows, today) is not None:
+                    loaded += 1
+        if complete:
+            self.loaded_on = today
+        self.reloads += 1
+        return loaded
+
+    def _drop_expired(self, underlying: str, today: date) -> None:
+        chain = self.chains.get(underlying)
+        if chain is None or chain.expiry is None or _as_date(chain.expiry) >= today:
+            return
+        with self._lock:
+            for iid in [k for k, slot in self._slots.items() if slot[0] is chain]:
+                del self._slots[iid]
+            del self.chains[underlying]
+        self._declare()
+        logger.info("Option chain %s %s expired with no successor listed; dropped", underlying, chain.expiry)
+
+    async def _roll_loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.sleep(ROLL_CHECK_SECONDS)
+                if self.due():
+                    await self.reload()
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                logger.error("Option chain roll error: %s", exc)
+
+    def _declare(self) -> None:
+        symbols = [s for chain in list(self.chains.values()) for s in chain.window_symbols()]
+        self.universe.declare("option_chain", symbols=symbols, mode=self.mode)
+
+    # ── Tick path (KiteTicker thread) ───────────────────────────────────
+
+    def _on_spot(self, iid: int, price: float, volume: int, oi: int, epoch: float) -> None:
+        chain = self.chains.get(self.universe[iid].symbol)
+        if chain is not None and chain.recenter(price):
+            self._declare()
+
+    def on_tick(self, iid: int, tick: Dict[str, Any], epoch: float) -> None:
+        slot = self._slots.get(iid)
+        if slot is not None:
+            chain, leg, i = slot
+            chain.update(leg, i, tick, epoch)
+
+    # ── Readers ─────────────────────────────────────────────────────────
+
+    def get(self, underlying: str, max_age: float = LIVE_AFTER_S) -> Optional[OptionChain]:
+        """``underlying``'s chain while its window is live, else None (fall back to REST)."""
+        chain = self.chains.get(underlying)
+        return chain if chain is not None and chain.live(max_age) else None
+
+    def quotes(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """kite.quote()-shaped rows for the keys that are live window strikes ("123" or "NFO:SYM")."""
+        out: Dict[str, Dict[str, Any]] = {}
+        live: Dict[str, bool] = {}
+        for key in keys:
+            if key.isdigit():
+                iid = self.universe.id_of_token(int(key))
+            else:
+                exchange, _, symbol = key.partition(":")
+                iid = self.universe.id_of(symbol)
+                if iid is not None and self.universe[iid].exchange != exchange:
+                    iid = None
+            slot = self._slots.get(iid) if iid is not None else None
+            if slot is None:
+                continue
+            chain, leg, i = slot
+            lo, hi = chain.window
+            if not (lo <= i < hi and chain.updated[leg, i]):
+                continue
+            if chain.underlying not in live:
+                live[chain.underlying] = chain.live()
+            if live[chain.underlying]:
+                out[key] = chain.quote_row(leg, i)
+        self.served += len(out)
+        return out
+
+    def report(self) -> Dict[str, Any]:
+        return {"width": self.width, "mode": self.mode, "quotesServed": self.served,
+                "loadedOn": self.loaded_on.isoformat() if self.loaded_on else None, "reloads": self.reloads,
+                "chains": {name: chain.report() for name, chain in list(self.chains.items())}}
+
+
+def _today() -> date:
+    return datetime.now(IST).date()
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+option_chains = OptionChains()
+
+
+def get_option_chains() -> OptionChains:
+    return option_chains
@@ -15,11 +15,14 @@ Features:
 import asyncio
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional
 from collections import deque
 import pytz
 
+from config import get_settings
 from config.market_session import get_market_session
+from services.instrument_universe import INDEX_SYMBOLS, get_instrument_universe
+from services.depth_book import DepthBook, get_depth_books
 
 market_config = get_market_session()
 IST = pytz.timezone(market_config.TIMEZONE)
@@ -37,9 +40,11 @@ class OrderFlowMetrics:
         self.spread: float = 0.0
         self.spread_pct: float = 0.0
         
-        # Volume at price levels
+        # Volume at price levels (price-action path only; real depth stays in the DepthBook)
         self.bid_levels: List[Dict[str, Any]] = []  # [{price, quantity, orders}, ...]
         self.ask_levels: List[Dict[str, Any]] = []  # [{price, quantity, orders}, ...]
+        self.depth_symbol: Optional[str] = None  # DepthBook this metric was computed from
+        self.depth_seq: int = -1                 # ... and its snapshot sequence number
         
         # Cumulative volume
         self.total_bid_qty: float = 0.0
@@ -185,37 +190,45 @@ class OrderFlowAnalyzer:
     institutional-grade trading signals.
     """
     
-    def __init__(self):
+    def __init__(self, history_maxlen: Optional[int] = None, symbols: Optional[Iterable[str]] = None):
         self.current_metrics: Dict[str, OrderFlowMetrics] = {}
         self.windows: Dict[str, OrderFlowWindow] = {}
-        self.symbol_history: Dict[str, deque] = {
-            "NIFTY": deque(maxlen=1000),
-            "BANKNIFTY": deque(maxlen=1000),
-            "SENSEX": deque(maxlen=1000)
-        }
+        # Hard cap per symbol (ORDERFLOW_HISTORY_MAXLEN); see _retire_depth for per-entry size
+        self.history_maxlen = history_maxlen or get_settings().orderflow_history_maxlen
+        self.symbol_history: Dict[str, deque] = {}
         self.lock = threading.Lock()
         
         # 🔥 Price history for momentum-based order flow (indices have no depth)
-        self._price_history: Dict[str, deque] = {
-            s: deque(maxlen=100) for s in ["NIFTY", "BANKNIFTY", "SENSEX"]
-        }
-        self._volume_history: Dict[str, deque] = {
-            s: deque(maxlen=100) for s in ["NIFTY", "BANKNIFTY", "SENSEX"]
-        }
+        self._price_history: Dict[str, deque] = {}
+        self._volume_history: Dict[str, deque] = {}
+
+        # Depth snapshots as NumPy rings (services/depth_book.py), shared with the feed
+        self.depth_books = get_depth_books()
         
-        # Initialize windows for each symbol
-        for symbol in ["NIFTY", "BANKNIFTY", "SENSEX"]:
-            self.windows[symbol] = OrderFlowWindow(window_seconds=300)  # 5-minute window
-            self.current_metrics[symbol] = OrderFlowMetrics()
+        # Pre-create state for the declared slice; any other symbol gets it on first tick
+        if symbols is None:
+            symbols = get_instrument_universe().symbols("order_flow")
+        for symbol in symbols:
+            self._ensure_symbol(symbol)
         
         print("✅ OrderFlowAnalyzer initialized")
 
+    def _ensure_symbol(self, symbol: str) -> None:
+        if symbol not in self.windows:
+            self.symbol_history[symbol] = deque(maxlen=self.history_maxlen)
+            self._price_history[symbol] = deque(maxlen=100)
+            self._volume_history[symbol] = deque(maxlen=100)
+            self.windows[symbol] = OrderFlowWindow(window_seconds=300)  # 5-minute window
+            self.current_metrics[symbol] = OrderFlowMetrics()
+
     async def process_zerodha_tick(self, tick: Dict[str, Any], symbol: str) -> OrderFlowMetrics:
         """
         Process a Zerodha KiteTicker tick and generate order flow metrics.
         
-        For FUTURES: uses real depth data (5-level bid/ask).
-        For INDICES: derives order flow from price momentum + volume
+        For FUTURES: uses real depth data (5-level bid/ask), stored in the
+        symbol's DepthBook.
+        For INDICES: uses the live depth book of the index future when the
+        feed has one, else derives order flow from price momentum + volume
         (indices have no order book on Zerodha).
         """
         try:
@@ -240,9 +253,16 @@ class OrderFlowAnalyzer:
                 l.get('price', 0) > 0 for l in sell_levels
             )
             
+            futures_book = None if has_real_depth else self.depth_books.for_symbol(symbol)
             if has_real_depth:
                 # REAL DEPTH PATH — futures / stocks with order book
-                metrics = self._process_with_depth(metrics, buy_levels, sell_levels)
+                book = self.depth_books.book(symbol)
+                seq = book.update(buy_levels, sell_levels, None, tick.get('last_price', 0),
+                                  tick.get('volume_traded'))
+                metrics = self._process_with_depth(metrics, book, seq)
+            elif futures_book is not None:
+                # INDEX WITH LIVE FUTURES DEPTH — the future's latest snapshot
+                metrics = self._process_with_depth(metrics, futures_book, futures_book.seq - 1)
             else:
                 # PRICE-ACTION PATH — indices without order book
                 price = tick.get('last_price', 0)
@@ -255,6 +275,8 @@ class OrderFlowAnalyzer:
             
             # Store metrics
             with self.lock:
+                self._ensure_symbol(symbol)
+                self._retire_depth(self.current_metrics.get(symbol))
                 self.current_metrics[symbol] = metrics
                 self.symbol_history[symbol].append(metrics)
                 self.windows[symbol].add_metrics(metrics)
@@ -265,23 +287,34 @@ class OrderFlowAnalyzer:
             print(f"❌ Error processing tick for {symbol}: {e}")
             return OrderFlowMetrics()
 
-    def _process_with_depth(self, metrics: OrderFlowMetrics,
-                            buy_levels: List, sell_levels: List) -> OrderFlowMetrics:
-        """Process using real market depth data (futures/stocks)."""
-        metrics.bid_levels = [
-            {'price': l.get('price', 0), 'quantity': l.get('quantity', 0),
-             'orders': l.get('orders', 0)}
-            for l in buy_levels[:5]
-        ]
-        metrics.ask_levels = [
-            {'price': l.get('price', 0), 'quantity': l.get('quantity', 0),
-             'orders': l.get('orders', 0)}
-            for l in sell_levels[:5]
-        ]
-        metrics.total_bid_qty = sum(l['quantity'] for l in metrics.bid_levels)
-        metrics.total_ask_qty = sum(l['quantity'] for l in metrics.ask_levels)
-        metrics.total_bid_orders = sum(l['orders'] for l in metrics.bid_levels)
-        metrics.total_ask_orders = sum(l['orders'] for l in metrics.ask_levels)
+    @staticmethod
+    def _retire_depth(previous: Optional[OrderFlowMetrics]) -> None:
+        """Drop the depth ladders of a metric that is leaving the "current" slot.
+
+        Only the current metric's bid/ask levels are ever served; history and
+        window consumers read the scalar fields. Without this every history
+        entry kept two 5-level lists of dicts alive (~2 KB per tick).
+        """
+        if previous is not None and (previous.bid_levels or previous.ask_levels):
+            previous.bid_levels = []
+            previous.ask_levels = []
+
+    def _process_with_depth(self, metrics: OrderFlowMetrics, book: DepthBook, seq: int) -> OrderFlowMetrics:
+        """Process using real market depth data (futures/stocks) from snapshot ``seq`` of ``book``."""
+        totals = book.totals(seq)
+        if not totals:
+            return metrics
+        metrics.depth_symbol = book.symbol
+        metrics.depth_seq = seq
+        if not metrics.bid and not metrics.ask:
+            metrics.bid, metrics.ask = totals['bid'], totals['ask']
+            metrics.spread = abs(metrics.ask - metrics.bid)
+            if metrics.bid > 0:
+                metrics.spread_pct = (metrics.spread / metrics.bid) * 100
+        metrics.total_bid_qty = totals['bid_qty']
+        metrics.total_ask_qty = totals['ask_qty']
+        metrics.total_bid_orders = totals['bid_orders']
+        metrics.total_ask_orders = totals['ask_orders']
         metrics.delta = metrics.total_bid_qty - metrics.total_ask_qty
         
         total_qty = metrics.total_bid_qty + metrics.total_ask_qty
@@ -505,15 +538,18 @@ class OrderFlowAnalyzer:
         # Get 5-min prediction
         with self.lock:
             prediction = self.windows[symbol].get_5min_prediction()
+
+        book = self.depth_books.get(metrics.depth_symbol) if metrics.depth_symbol else None
+        ladders = book.levels(metrics.depth_seq) if book is not None else None
         
-        return {
+        result = {
             "timestamp": metrics.timestamp.isoformat(),
             "bid": round(metrics.bid, 2),
             "ask": round(metrics.ask, 2),
             "spread": round(metrics.spread, 2),
             "spreadPct": round(metrics.spread_pct, 4),
-            "bidLevels": metrics.bid_levels,
-            "askLevels": metrics.ask_levels,
+            "bidLevels": ladders["buy"] if ladders else metrics.bid_levels,
+            "askLevels": ladders["sell"] if ladders else metrics.ask_levels,
             "totalBidQty": round(metrics.total_bid_qty, 2),
             "totalAskQty": round(metrics.total_ask_qty, 2),
             "totalBidOrders": metrics.total_bid_orders,
@@ -532,6 +568,13 @@ class OrderFlowAnalyzer:
             "signalConfidence": round(metrics.signal_confidence, 2),
             "fiveMinPrediction": prediction
         }
+        if book is not None:
+            result["microstructure"] = {
+                "source": book.symbol,
+                **book.latest(metrics.depth_seq),
+                "rolling": book.rolling(),
+            }
+        return result
     
     def get_historical_metrics(self, symbol: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get historical order flow metrics for the symbol."""
@@ -551,5 +594,8 @@ class OrderFlowAnalyzer:
         ]
 
 
+# Order flow runs on the feed's fast path for the dashboard indices
+get_instrument_universe().declare("order_flow", symbols=INDEX_SYMBOLS, mode="full")
+
 # Global analyzer instance
 order_flow_analyzer = OrderFlowAnalyzer()
@@ -21,6 +21,7 @@ import pytz
 from dataclasses import dataclass
 import time
 
+from config import get_settings
 from config.market_session import get_market_session
 
 market_config = get_market_session()
@@ -60,6 +61,7 @@ class OrderFlowOptimizer:
         self.analysis_cache: Dict[str, Dict[str, Any]] = {}
         self.cache_timestamps: Dict[str, datetime] = {}
         self.cache_ttl_seconds = 5  # 5-second cache for analysis
+        self.cache_max_entries = get_settings().orderflow_optimizer_cache_max  # hard cap, oldest evicted
         
         # Performance metrics
         self.metrics: Dict[str, PerformanceMetrics] = {
@@ -138,11 +140,17 @@ class OrderFlowOptimizer:
         # Perform analysis and cache result
         # This would be called by the actual analysis engines
         with self.lock:
+            self.analysis_cache.pop(cache_key, None)  # re-insert at the end (newest)
             self.analysis_cache[cache_key] = {
                 'analyzed_at': datetime.now(IST).isoformat(),
                 'tick': tick
             }
             self.cache_timestamps[cache_key] = datetime.now(IST)
+            # One key per distinct price: bound it, evicting in insertion order
+            while len(self.analysis_cache) > self.cache_max_entries:
+                oldest = next(iter(self.analysis_cache))
+                self.analysis_cache.pop(oldest, None)
+                self.cache_timestamps.pop(oldest, None)
     
     def _update_metrics(self, symbol: str, latency_ms: float, batch_size: int):
         """Update performance metrics."""
@@ -222,6 +230,12 @@ class OrderFlowOptimizer:
                 self.analysis_cache.pop(key, None)
                 self.cache_timestamps.pop(key, None)
     
+    def sweep_expired(self) -> int:
+        """Drop entries past their TTL (called by the memory guard)."""
+        before = len(self.analysis_cache)
+        self.clear_cache(older_than_seconds=self.cache_ttl_seconds)
+        return before - len(self.analysis_cache)
+
     async def warmup_cache(self, symbol: str, recent_ticks: List[Dict[str, Any]]):
         """Pre-process recent ticks to warm up cache."""
         for tick in recent_ticks[-100:]:  # Last 100 ticks
@@ -5,6 +5,8 @@ from typing import Dict, Any, Optional, List
 import pytz
 
 from config import get_settings
+from services.option_chain import get_option_chains
+from services.quote_scheduler import Priority, get_quote_scheduler
 
 settings = get_settings()
 IST = pytz.timezone('Asia/Kolkata')
@@ -146,9 +148,8 @@ class PCRService:
         """Initialize KiteConnect if not already done."""
         if not self._initialized and settings.zerodha_api_key and settings.zerodha_access_token:
             try:
-                from kiteconnect import KiteConnect
-                self.kite = KiteConnect(api_key=settings.zerodha_api_key)
-                self.kite.set_access_token(settings.zerodha_access_token)
+                from services.kite_gateway import get_kite_gateway
+                self.kite = get_kite_gateway().sync_client()
                 
                 # 🔥 CRITICAL FIX: Validate token immediately by making a simple API call
                 try:
@@ -213,6 +214,13 @@ class PCRService:
             if elapsed < 10:  # 10 seconds — fast enough for intraday OI shifts
                 return _PCR_CACHE[symbol]
         
+        # Live option-chain mirror (KiteTicker) — no REST calls, no token needed here
+        mirrored = self._pcr_from_mirror(symbol)
+        if mirrored is not None:
+            _PCR_CACHE[symbol] = mirrored
+            _LAST_UPDATE[symbol] = now
+            return mirrored
+        
         # Default values
         default_data = {
             "pcr": 0.0,
@@ -273,6 +281,18 @@ class PCRService:
             print(f"[ERROR] No cached PCR for {symbol}, returning zeros")
             return default_data
     
+    def _pcr_from_mirror(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """PCR from the streaming option chain's window, or None while it is not live."""
+        chain = get_option_chains().get(symbol)
+        if chain is None:
+            return None
+        strike_map = chain.strike_map()
+        if symbol in _STRIKE_OI_MAP:
+            _STRIKE_OI_PREV[symbol] = _STRIKE_OI_MAP[symbol]
+        _STRIKE_OI_MAP[symbol] = strike_map
+        totals = chain.pcr()
+        return _pcr_payload(totals["call_oi"], totals["put_oi"])
+    
     def _get_cached_instruments(self, exchange: str) -> List:
         """Get instruments with smart daily caching."""
         today = datetime.now(IST).date()
@@ -365,7 +385,7 @@ class PCRService:
             
             # Zerodha quote needs instrument tokens as strings
             try:
-                quotes = self.kite.quote([str(t) for t in all_tokens[:200]])
+                quotes = get_quote_scheduler().quote_sync(all_tokens[:200], Priority.ANALYTICS)
                 print(f"[QUOTES] Fetched quotes for {len(quotes)} instruments")
             except Exception as e:
                 print(f"[ERROR] Failed to fetch quotes: {e}")
@@ -411,25 +431,11 @@ class PCRService:
             _STRIKE_OI_MAP[symbol] = strike_map
             
             # Calculate PCR
-            pcr = round(total_put_oi / total_call_oi, 2) if total_call_oi > 0 else 0.0
+            result = _pcr_payload(total_call_oi, total_put_oi)
             
-            print(f"[PCR] {symbol} PCR Calculated: {pcr:.2f} (CallOI:{total_call_oi:,}, PutOI:{total_put_oi:,})")
+            print(f"[PCR] {symbol} PCR Calculated: {result['pcr']:.2f} (CallOI:{total_call_oi:,}, PutOI:{total_put_oi:,})")
             
-            # Determine sentiment
-            if pcr > 1.2:
-                sentiment = "bullish"  # High PCR = more puts = bullish (contrarian)
-            elif pcr < 0.8:
-                sentiment = "bearish"  # Low PCR = more calls = bearish (contrarian)
-            else:
-                sentiment = "neutral"
-            
-            return {
-                "pcr": pcr,
-                "callOI": total_call_oi,
-                "putOI": total_put_oi,
-                "oi": total_call_oi + total_put_oi,
-                "sentiment": sentiment
-            }
+            return result
             
         except Exception as e:
             print(f"❌ PCR fetch error for {symbol}: {e}")
@@ -438,6 +444,24 @@ class PCRService:
             return {"pcr": 0.0, "callOI": 0, "putOI": 0, "oi": 0, "sentiment": "neutral"}
 
 
+def _pcr_payload(total_call_oi: int, total_put_oi: int) -> Dict[str, Any]:
+    """PCR result dict with its contrarian sentiment."""
+    pcr = round(total_put_oi / total_call_oi, 2) if total_call_oi > 0 else 0.0
+    if pcr > 1.2:
+        sentiment = "bullish"  # High PCR = more puts = bullish (contrarian)
+    elif pcr < 0.8:
+        sentiment = "bearish"  # Low PCR = more calls = bearish (contrarian)
+    else:
+        sentiment = "neutral"
+    return {
+        "pcr": pcr,
+        "callOI": total_call_oi,
+        "putOI": total_put_oi,
+        "oi": total_call_oi + total_put_oi,
+        "sentiment": sentiment
+    }
+
+
 # Singleton instance
 _pcr_service: Optional[PCRService] = None
 
@@ -18,7 +18,7 @@ Data path:
      with `1` if future_price - price > NOISE_FLOOR * price, else `0`.
      Samples where |move| < NOISE_FLOOR are discarded (flat).
   3. Every REFIT_INTERVAL new labels the model is retrained on the
-     rolling buffer (max BUFFER_SIZE samples).
+     rolling buffer (max QUANTEDGE_ML_BUFFER_SIZE samples, default 800).
   4. Prediction is emitted only after MIN_TRAIN_SAMPLES have been
      observed; before that the predictor returns UNKNOWN.
 
@@ -36,6 +36,8 @@ from collections import deque
 from dataclasses import dataclass, field
 from typing import Any, Deque, Dict, List, Optional, Tuple
 
+from config import get_settings
+
 logger = logging.getLogger(__name__)
 
 try:  # optional heavy dep — provided by backend/requirements.txt
@@ -48,9 +50,9 @@ except Exception:  # pragma: no cover - fallback path
 # ── Tunables ──────────────────────────────────────────────────────────────
 HORIZON_TICKS = 30              # ≈ 60 s look-ahead at RULE_REFRESH_INTERVAL=2 s
 NOISE_FLOOR = 0.0005            # 0.05 % — anything smaller counts as "flat"
-BUFFER_SIZE = 800               # rolling training buffer per symbol
-REFIT_INTERVAL = 40             # retrain every N new labelled samples
 MIN_TRAIN_SAMPLES = 120         # emit predictions only after this many samples
+BUFFER_SIZE = 800               # rolling training buffer per symbol (settings: QUANTEDGE_ML_BUFFER_SIZE)
+REFIT_INTERVAL = 40             # retrain every N new labelled samples
 CONFIDENT_PROB = 0.65           # prob above this triggers the feedback loop
 VETO_PROB = 0.70                # prob above this on the *opposite* side vetoes
 MODEL_DIR_ENV = "QUANTEDGE_ML_DIR"
@@ -191,8 +193,11 @@ class _SymbolState:
 class QuantEdgeMLPredictor:
     """Online ML forecaster shared across NIFTY / BANKNIFTY / SENSEX."""
 
-    def __init__(self, symbols: List[str], model_dir: Optional[str] = None):
-        self._states: Dict[str, _SymbolState] = {s: _SymbolState() for s in symbols}
+    def __init__(self, symbols: List[str], model_dir: Optional[str] = None,
+                 buffer_size: Optional[int] = None):
+        # Hard cap per symbol; never below what a first fit needs
+        self.buffer_size = max(MIN_TRAIN_SAMPLES, buffer_size or get_settings().quantedge_ml_buffer_size)
+        self._states: Dict[str, _SymbolState] = {s: self._new_state() for s in symbols}
         self._model_dir = model_dir or os.environ.get(MODEL_DIR_ENV) or os.path.join(
             os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "quantedge_ml"
         )
@@ -203,6 +208,9 @@ class QuantEdgeMLPredictor:
             self._load(s)
         logger.info("QuantEdge ML predictor ready (backend=%s, dir=%s)", self._backend_name, self._model_dir)
 
+    def _new_state(self) -> _SymbolState:
+        return _SymbolState(buffer_X=deque(maxlen=self.buffer_size), buffer_y=deque(maxlen=self.buffer_size))
+
     # ── Persistence ────────────────────────────────────────────────
     def _model_path(self, symbol: str) -> str:
         ext = "lgb.txt" if self._backend_name == "lightgbm" else "pkl"
@@ -297,7 +305,7 @@ class QuantEdgeMLPredictor:
     # ── Public API ─────────────────────────────────────────────────
     def observe_and_predict(self, symbol: str, features: List[float], price: float) -> Dict[str, Any]:
         if symbol not in self._states:
-            self._states[symbol] = _SymbolState()
+            self._states[symbol] = self._new_state()
         st = self._states[symbol]
         st.tick_counter += 1
 
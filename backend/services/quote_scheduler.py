@@ -0,0 +1,356 @@
+"""Cross-service Kite quote merger with a prioritised, rate-limited dispatcher.
+
+PCR, strike intelligence, expiry explosion, compass, market edge, liquidity,
+Smart AI and the VIX router all ask Zerodha for quotes on their own clocks,
+often for the same instruments in the same second, and all of them draw on
+one per-second quote quota. Here every request joins one queue:
+
+    • requests arriving within ``kite_quote_window_ms`` are merged — tokens are
+      deduped and packed into the largest batch the endpoint allows (500 for
+      /quote, 1000 for /quote/ltp and /quote/ohlc)
+    • one token bucket (``kite_quote_rate`` per second, ``kite_quote_burst``
+      deep) gates every batch, so the quota is never exceeded
+    • the batch is led by the highest-priority request — order execution >
+      live tick path > analytics > UI — and lower-priority requests ride along
+      while there is room; an ORDER request skips the merge window
+    • a full quote also serves ltp / ohlc requests for the same tokens, and
+      when everything pending fits one /quote batch it goes out as one call
+    • each caller gets back only its own slice, keyed as Kite keys it
+      (``"NSE:NIFTY 50"``, or ``"256265"`` for a bare token)
+
+Usage:
+
+    quotes = get_quote_scheduler()
+    q = quotes.quote_sync(keys, Priority.ANALYTICS)               # worker threads
+    q = await quotes.quote(["NSE:INDIA VIX"], Priority.UI)        # event loop
+    q = await quotes.quote(keys, Priority.LIVE, mode="ltp")
+
+Local sources registered with ``add_source(fn)`` — the option-chain mirror,
+which holds live ticker data for the strikes around ATM — answer first; only
+the keys they cannot serve are queued, and a request they fully serve never
+waits for the bucket. Requests larger than one batch are split across batches
+and resolved when the last part lands. A batch failure fails every request in it; instruments Kite
+does not recognise are simply absent from the slice, as with ``kite.quote``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from enum import IntEnum
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+_MODE_RANK = {"ltp": 0, "ohlc": 1, "quote": 2}
+_BATCH_LIMIT = {"ltp": 1000, "ohlc": 1000, "quote": 500}
+
+
+class Priority(IntEnum):
+    ORDER = 0        # order placement / execution price checks
+    LIVE = 1         # live tick path (REST fallback when the ticker is down)
+    ANALYTICS = 2    # background engines
+    UI = 3           # request-driven router reads
+
+
+class TokenBucket:
+    """Classic token bucket on the monotonic clock (not thread-safe on its own)."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        self.rate = max(float(rate), 1e-6)
+        self.burst = max(int(burst), 1)
+        self._tokens = float(self.burst)
+        self._at = time.monotonic()
+
+    def delay(self, now: Optional[float] = None) -> float:
+        """Seconds until one token is available (0.0 if one is now)."""
+        now = time.monotonic() if now is None else now
+        self._tokens = min(self.burst, self._tokens + max(now - self._at, 0.0) * self.rate)
+        self._at = now
+        return 0.0 if self._tokens >= 1.0 else (1.0 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1.0
+
+
+def _project(row: Dict[str, Any], mode: str) -> Dict[str, Any]:
+    """Cut a full quote down to what /quote/ltp or /quote/ohlc would have returned."""
+    if mode == "quote":
+        return row
+    out = {"instrument_token": row.get("instrument_token"), "last_price": row.get("last_price")}
+    if mode == "ohlc":
+        out["ohlc"] = row.get("ohlc")
+    return out
+
+
+class _Request:
+    __slots__ = ("priority", "seq", "mode", "remaining", "result", "future", "enqueued", "started")
+
+    def __init__(self, priority: int, seq: int, mode: str, keys: Iterable[str]) -> None:
+        self.priority = priority
+        self.seq = seq
+        self.mode = mode
+        self.remaining: Dict[str, None] = dict.fromkeys(keys)   # ordered set
+        self.result: Dict[str, Any] = {}
+        self.future: Future = Future()
+        self.enqueued = time.monotonic()
+        self.started = False
+
+
+class QuoteScheduler:
+    """Merges quote requests from every service into rate-limited batches."""
+
+    def __init__(
+        self,
+        gateway: Any,
+        *,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        window_ms: Optional[float] = None,
+    ) -> None:
+        settings = get_settings()
+        self._gateway = gateway
+        self._bucket = TokenBucket(rate or settings.kite_quote_rate, burst or settings.kite_quote_burst)
+        self._window = (settings.kite_quote_window_ms if window_ms is None else window_ms) / 1000.0
+        self._pending: List[_Request] = []
+        self._sources: List[Callable[[List[str]], Dict[str, Any]]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._stats: Dict[str, float] = dict.fromkeys(
+            ("requests", "batches", "errors", "instrumentsRequested", "instrumentsSent", "servedLocally",
+             "throttledMs"), 0
+        )
+        self._wait_ms: Dict[str, List[float]] = {p.name: [0, 0.0] for p in Priority}
+
+    # --- public API ---------------------------------------------------------
+
+    def submit(self, instruments: Iterable[Any], priority: int = Priority.ANALYTICS,
+               mode: str = "quote") -> Future:
+        """Queue a request; the returned future resolves to this caller's slice."""
+        if mode not in _MODE_RANK:
+            raise ValueError(f"unknown quote mode {mode!r}")
+        req = _Request(int(priority), next(self._seq), mode, (str(i) for i in instruments))
+        if not req.remaining:
+            req.future.set_result({})
+            return req.future
+        requested = len(req.remaining)
+        local = self._serve_locally(req)
+        with self._cond:
+            self._stats["requests"] += 1
+            self._stats["instrumentsRequested"] += requested
+            self._stats["servedLocally"] += local
+            if req.remaining:
+                self._ensure_running()
+                self._pending.append(req)
+                self._cond.notify()
+        if not req.remaining:
+            req.future.set_result(req.result)
+        return req.future
+
+    def quote_sync(self, instruments: Iterable[Any], priority: int = Priority.ANALYTICS,
+                   mode: str = "quote", timeout: Optional[float] = 15.0) -> Dict[str, Any]:
+        """Blocking form, for services already on a worker thread."""
+        future = self.submit(instruments, priority, mode)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    async def quote(self, instruments: Iterable[Any], priority: int = Priority.UI,
+                    mode: str = "quote", timeout: Optional[float] = 15.0) -> Dict[str, Any]:
+        return await asyncio.wait_for(asyncio.wrap_future(self.submit(instruments, priority, mode)), timeout)
+
+    def add_source(self, source: Callable[[List[str]], Dict[str, Any]]) -> None:
+        """Register ``source(keys) -> {key: full quote row}``, asked before any REST call."""
+        if source not in self._sources:
+            self._sources.append(source)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            pending = len(self._pending)
+            waits = {name: round(total / n, 1) if n else 0.0 for name, (n, total) in self._wait_ms.items()}
+        sent = stats["instrumentsSent"]
+        return {
+            "rate": self._bucket.rate,
+            "burst": self._bucket.burst,
+            "windowMs": round(self._window * 1000, 1),
+            "pending": pending,
+            "requests": int(stats["requests"]),
+            "batches": int(stats["batches"]),
+            "errors": int(stats["errors"]),
+            "instrumentsRequested": int(stats["instrumentsRequested"]),
+            "instrumentsSent": int(sent),
+            "dedupeRatio": round((stats["instrumentsRequested"] - stats["servedLocally"]) / sent, 2) if sent else 0.0,
+            "servedLocally": int(stats["servedLocally"]),
+            "throttledMs": round(stats["throttledMs"], 1),
+            "avgQueueMs": waits,
+        }
+
+    def stop(self) -> None:
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+            pending, self._pending = self._pending, []
+        for req in pending:
+            if not req.future.done():
+                req.future.cancel() or req.future.set_exception(RuntimeError("quote scheduler stopped"))
+
+    def _serve_locally(self, req: _Request) -> int:
+        served = 0
+        for source in self._sources:
+            try:
+                rows = source(list(req.remaining))
+            except Exception as exc:
+                logger.warning("Local quote source failed: %s", exc)
+                continue
+            for key, row in rows.items():
+                if key in req.remaining:
+                    req.result[key] = _project(row, req.mode)
+                    del req.remaining[key]
+                    served += 1
+            if not req.remaining:
+                break
+        return served
+
+    # --- dispatcher ---------------------------------------------------------
+
+    def _ensure_running(self) -> None:
+        if not self._running:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="kite-quotes", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                batch = self._next_batch()
+            if batch is None:
+                return
+            mode, keys, members = batch
+            try:
+                data = self._gateway.call_sync(mode, keys) or {}
+            except Exception as exc:
+                self._fail(members, exc)
+            else:
+                self._deliver(members, data)
+
+    def _next_batch(self) -> Optional[Tuple[str, List[str], List[Tuple[_Request, List[str]]]]]:
+        """Wait out the merge window and the bucket, then plan one batch (lock held)."""
+        while True:
+            while self._running and not self._pending:
+                self._cond.wait()
+            if not self._running:
+                return None
+            # Merge window, measured from the oldest request; ORDER goes at once
+            while self._running and not any(r.priority == Priority.ORDER for r in self._pending):
+                left = min(r.enqueued for r in self._pending) + self._window - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            # Requests that arrive while we wait for the bucket join this batch
+            while self._running and (delay := self._bucket.delay()) > 0:
+                self._stats["throttledMs"] += delay * 1000
+                self._cond.wait(delay)
+            if not self._running:
+                return None
+            batch = self._plan()
+            if batch is not None:
+                self._bucket.take()
+                return batch
+
+    def _plan(self) -> Optional[Tuple[str, List[str], List[Tuple[_Request, List[str]]]]]:
+        live = []
+        for req in self._pending:
+            if req.started or req.future.set_running_or_notify_cancel():
+                req.started = True
+                live.append(req)
+        self._pending = live
+        if not live:
+            return None
+        live.sort(key=lambda r: (r.priority, r.seq))
+        mode = live[0].mode
+        # Quota is the scarce resource: if everything pending fits one full
+        # quote, send that instead of an ltp/ohlc batch plus a second call
+        if mode != "quote" and any(r.mode != mode for r in live):
+            union = set().union(*(r.remaining for r in live))
+            if len(union) <= _BATCH_LIMIT["quote"]:
+                mode = max((r.mode for r in live), key=_MODE_RANK.__getitem__)
+        rank, limit = _MODE_RANK[mode], _BATCH_LIMIT[mode]
+        keys: Dict[str, None] = {}
+        members: List[Tuple[_Request, List[str]]] = []
+        now = time.monotonic()
+        for req in live:
+            if _MODE_RANK[req.mode] > rank:
+                continue
+            for key in req.remaining:
+                if len(keys) >= limit:
+                    break
+                keys.setdefault(key)
+            served = [k for k in req.remaining if k in keys]
+            if served:
+                members.append((req, served))
+                if len(served) == len(req.remaining):
+                    wait = self._wait_ms[Priority(req.priority).name]
+                    wait[0] += 1
+                    wait[1] += (now - req.enqueued) * 1000
+        self._stats["batches"] += 1
+        self._stats["instrumentsSent"] += len(keys)
+        return mode, list(keys), members
+
+    def _deliver(self, members: List[Tuple[_Request, List[str]]], data: Dict[str, Any]) -> None:
+        done = []
+        with self._cond:
+            for req, served in members:
+                for key in served:
+                    row = data.get(key)
+                    if row is not None:
+                        req.result[key] = _project(row, req.mode)
+                    req.remaining.pop(key, None)
+                if not req.remaining:
+                    done.append(req)
+            if done:
+                self._pending = [r for r in self._pending if r.remaining]
+        for req in done:
+            if not req.future.done():          # stop() may have failed it meanwhile
+                req.future.set_result(req.result)
+
+    def _fail(self, members: List[Tuple[_Request, List[str]]], exc: Exception) -> None:
+        failed = {id(req) for req, _ in members}
+        with self._cond:
+            self._stats["errors"] += 1
+            self._pending = [r for r in self._pending if id(r) not in failed]
+        logger.warning("Kite quote batch failed for %d request(s): %s", len(members), exc)
+        for req, _ in members:
+            if not req.future.done():
+                req.future.set_exception(exc)
+
+
+_scheduler: Optional[QuoteScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_quote_scheduler() -> QuoteScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                from services.kite_gateway import get_kite_gateway
+                _scheduler = QuoteScheduler(get_kite_gateway())
+    return _scheduler
+
+
+def close_quote_scheduler() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
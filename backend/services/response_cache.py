@@ -0,0 +1,185 @@
+"""
+Response Cache — request coalescing + stale-while-revalidate for REST endpoints.
+
+The analysis endpoints used to check a short-TTL cache and compute on a miss.
+When the TTL expired under load every concurrent request recomputed (and
+re-fetched history). Decorating the endpoint instead gives:
+
+    • one in-flight computation per key; concurrent callers await the same task
+    • stale-while-revalidate: an expired entry is still served for `stale`
+      seconds while a single background refresh runs
+    • per-route TTLs by market phase (session_clock status: PRE_OPEN / FREEZE /
+      LIVE / CLOSED, with "default" as the fallback); a TTL of 0 exempts the
+      route in that phase — every request computes, nothing is stored
+    • hit / stale / miss / coalesced / refresh / bypass / error counters per route
+
+    @router.get("/zone-control/{symbol}")
+    @cached_response("zone_control", ttl={"LIVE": 5, "default": 60}, stale=30)
+    async def get_zone_control(symbol: str): ...
+
+The key is the route name plus the upper-cased call arguments. Entries live
+in-process (coalescing is per process anyway) and are swept by the memory
+guard. Exceptions and `{"status": "ERROR"}` payloads are never cached; an
+exception is re-raised to every caller that was waiting on that computation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PhaseSeconds = Union[float, Mapping[str, float]]
+
+_COUNTERS = ("hits", "stale", "misses", "coalesced", "refreshes", "bypassed", "errors")
+
+
+def _default_cacheable(result: Any) -> bool:
+    return not (isinstance(result, dict) and result.get("status") == "ERROR")
+
+
+def _market_status() -> str:
+    from services.session_clock import session_clock
+    return session_clock.status()
+
+
+def _for_phase(value: PhaseSeconds, status: str) -> float:
+    if isinstance(value, Mapping):
+        return float(value.get(status, value.get("default", 0)))
+    return float(value)
+
+
+class ResponseCache:
+    """Process-local entries + in-flight tasks keyed by route and arguments."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 status: Callable[[], str] = _market_status) -> None:
+        self.clock = clock
+        self.status = status
+        # key -> (value, fresh_until, stale_until)
+        self._entries: Dict[str, Tuple[Any, float, float]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, route: str, counter: str) -> None:
+        stats = self._stats.get(route)
+        if stats is None:
+            stats = self._stats[route] = dict.fromkeys(_COUNTERS, 0)
+        stats[counter] += 1
+
+    async def get_or_compute(
+        self,
+        route: str,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: PhaseSeconds,
+        stale: PhaseSeconds = 0,
+        cacheable: Callable[[Any], bool] = _default_cacheable,
+    ) -> Any:
+        if _for_phase(ttl, self.status()) <= 0:
+            self._count(route, "bypassed")
+            return await compute()
+
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self._count(route, "hits")
+                return value
+            if now < stale_until:
+                self._count(route, "stale")
+                if key not in self._inflight:
+                    self._count(route, "refreshes")
+                    self._start(route, key, compute, ttl, stale, cacheable, background=True)
+                return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count(route, "coalesced")
+        else:
+            self._count(route, "misses")
+            task = self._start(route, key, compute, ttl, stale, cacheable)
+        # shield: a disconnecting client must not cancel everyone else's result
+        return await asyncio.shield(task)
+
+    def _start(self, route, key, compute, ttl, stale, cacheable, background: bool = False) -> asyncio.Task:
+        async def run():
+            try:
+                result = await compute()
+            except Exception as exc:
+                self._count(route, "errors")
+                if background:
+                    logger.warning("Response cache refresh failed for %s: %s", key, exc)
+                raise
+            finally:
+                self._inflight.pop(key, None)
+            if cacheable(result):
+                status = self.status()
+                fresh_until = self.clock() + _for_phase(ttl, status)
+                self._entries[key] = (result, fresh_until, fresh_until + _for_phase(stale, status))
+            return result
+
+        task = asyncio.get_running_loop().create_task(run())
+        self._inflight[key] = task
+        # Background refreshes (and computations whose callers all went away) have no
+        # awaiter; retrieve the exception so it isn't reported as never retrieved.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return task
+
+    def invalidate(self, prefix: str = "") -> int:
+        """Drop entries whose key starts with ``prefix`` (all entries by default)."""
+        keys = [k for k in self._entries if k.startswith(prefix)]
+        for k in keys:
+            del self._entries[k]
+        return len(keys)
+
+    def sweep_expired(self) -> int:
+        """Drop entries past their stale window (memory guard trimmer)."""
+        now = self.clock()
+        keys = [k for k, (_, _, stale_until) in self._entries.items() if stale_until <= now]
+        for k in keys:
+            del self._entries[k]
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "routes": {route: dict(counts) for route, counts in self._stats.items()},
+        }
+
+
+response_cache = ResponseCache()
+
+
+def get_response_cache() -> ResponseCache:
+    return response_cache
+
+
+def cached_response(
+    route: str,
+    ttl: PhaseSeconds,
+    stale: PhaseSeconds = 0,
+    cacheable: Callable[[Any], bool] = _default_cacheable,
+    cache: Optional[ResponseCache] = None,
+):
+    """Decorate an async endpoint with coalescing + stale-while-revalidate caching."""
+    def decorator(fn: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)  # FastAPI reads the endpoint signature through __wrapped__
+        async def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = ":".join([route, *(str(v).upper() for v in bound.arguments.values())])
+            return await (cache or response_cache).get_or_compute(
+                route, key, lambda: fn(*args, **kwargs), ttl, stale, cacheable)
+
+        return wrapper
+    return decorator
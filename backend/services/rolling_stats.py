@@ -0,0 +1,384 @@
+"""Rolling statistics — fixed-window accumulators with O(1) push and query.
+
+Engines kept their history in deques and refitted it on every read:
+`_linear_slope(list(buf))` per property in expiry explosion's OIHistory,
+`_std_dev` in market regime, `np.asarray(deque)` in the compass AI, and
+`statistics.mean/stdev` over generators for compass correlations. Each read
+cost O(window) (statistics' exact Fraction arithmetic far more). These
+accumulators update running moments as values enter and leave the window, so
+a push and every query are O(1):
+
+    RollingStats(n)        mean, variance / std (windowed Welford), z-score, sum
+    RollingSlope(n)        + OLS slope / intercept of the values against 0..len-1,
+                           identical to the `_linear_slope` it replaces
+    RollingCovariance(n)   paired (x, y): covariance, correlation, beta
+    Ewma(span | alpha)     exponentially weighted mean / variance / z-score
+
+    oi = RollingSlope(40)
+    oi.push(12_500_000)
+    oi.slope, oi.mean, oi.zscore()
+
+Rolling windows also keep their values (iterable oldest → newest, indexable,
+`len()`, `last`), so they stand in for the deques they replace. Running sums drift
+over millions of updates; each window recomputes its moments exactly from
+the ring whenever the ring wraps, which is O(n) once every n pushes, so the
+cost stays O(1) amortised. `linear_slope` and `pearson` are single-pass
+helpers for callers that only hold a list.
+
+Not thread-safe; each accumulator belongs to the one engine that feeds it.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class _Ring:
+    """Fixed-capacity float ring; push returns the value it evicted (or None)."""
+
+    __slots__ = ("maxlen", "_buf", "_head", "_count")
+
+    def __init__(self, maxlen: int) -> None:
+        if maxlen < 1:
+            raise ValueError("window must hold at least one value")
+        self.maxlen = int(maxlen)
+        self._buf: List[float] = [0.0] * self.maxlen
+        self._head = 0              # slot of the oldest value once full, else of the next write
+        self._count = 0
+
+    def push(self, value: float) -> Optional[float]:
+        if self._count < self.maxlen:
+            self._buf[self._count] = value
+            self._count += 1
+            return None
+        evicted = self._buf[self._head]
+        self._buf[self._head] = value
+        self._head = (self._head + 1) % self.maxlen
+        return evicted
+
+    @property
+    def wrapped(self) -> bool:
+        """True right after the push that completed a lap of the ring."""
+        return self._count == self.maxlen and self._head == 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i: int) -> float:
+        """Value at position ``i`` of the window (0 = oldest, −1 = newest)."""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("rolling window index out of range")
+        return self._buf[(self._head + i) % self.maxlen if self._count == self.maxlen else i]
+
+    def __iter__(self) -> Iterator[float]:
+        if self._count < self.maxlen:
+            return iter(self._buf[:self._count])
+        return iter(self._buf[self._head:] + self._buf[:self._head])
+
+    @property
+    def last(self) -> Optional[float]:
+        if not self._count:
+            return None
+        return self._buf[(self._head - 1) % self.maxlen if self._count == self.maxlen else self._count - 1]
+
+    def clear(self) -> None:
+        self._head = self._count = 0
+
+
+class RollingStats:
+    """Mean and variance of the last ``maxlen`` values (windowed Welford)."""
+
+    def __init__(self, maxlen: int) -> None:
+        self._ring = _Ring(maxlen)
+        self._mean = 0.0
+        self._m2 = 0.0              # Σ (x − mean)²
+
+    @property
+    def maxlen(self) -> int:
+        return self._ring.maxlen
+
+    def push(self, value: float) -> Optional[float]:
+        """Add ``value``; returns the value that fell out of the window, if any."""
+        value = float(value)
+        evicted = self._ring.push(value)
+        n = len(self._ring)
+        if evicted is None:
+            delta = value - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (value - self._mean)
+        else:
+            old_mean = self._mean
+            self._mean += (value - evicted) / n
+            self._m2 += (value - evicted) * (value - self._mean + evicted - old_mean)
+        if self._ring.wrapped:
+            self._resync()
+        return evicted
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.push(value)
+
+    def _resync(self) -> None:
+        values = list(self._ring)
+        n = len(values)
+        self._mean = sum(values) / n if n else 0.0
+        self._m2 = sum((v - self._mean) ** 2 for v in values)
+
+    def clear(self) -> None:
+        self._ring.clear()
+        self._mean = self._m2 = 0.0
+
+    # ── Queries, all O(1) ───────────────────────────────────────────────
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def __iter__(self) -> Iterator[float]:
+        return iter(self._ring)
+
+    def __getitem__(self, i: int) -> float:
+        return self._ring[i]
+
+    @property
+    def full(self) -> bool:
+        return len(self._ring) == self._ring.maxlen
+
+    @property
+    def last(self) -> Optional[float]:
+        return self._ring.last
+
+    @property
+    def mean(self) -> float:
+        return self._mean if len(self._ring) else 0.0
+
+    @property
+    def sum(self) -> float:
+        return self._mean * len(self._ring)
+
+    @property
+    def variance(self) -> float:
+        """Population variance (÷ n), as np.std."""
+        n = len(self._ring)
+        return max(self._m2 / n, 0.0) if n else 0.0
+
+    @property
+    def sample_variance(self) -> float:
+        n = len(self._ring)
+        return max(self._m2 / (n - 1), 0.0) if n > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def zscore(self, value: Optional[float] = None) -> float:
+        """Standard score of ``value`` (default: the newest) against the window."""
+        value = self.last if value is None else value
+        std = self.std
+        return (value - self._mean) / std if value is not None and std > 0 else 0.0
+
+
+class RollingSlope(RollingStats):
+    """RollingStats plus the least-squares slope of the values against 0..len-1."""
+
+    def __init__(self, maxlen: int) -> None:
+        super().__init__(maxlen)
+        self._sum_iy = 0.0          # Σ i·y, i = position in the window (0 = oldest)
+
+    def push(self, value: float) -> Optional[float]:
+        value = float(value)
+        n_before = len(self._ring)
+        sum_before = self.sum
+        evicted = super().push(value)
+        if self._ring.wrapped:
+            return evicted                      # _resync rebuilt Σ i·y exactly
+        if evicted is None:
+            self._sum_iy += n_before * value
+        else:
+            # Everyone left of the new value shifts down one position
+            self._sum_iy += -(sum_before - evicted) + (n_before - 1) * value
+        return evicted
+
+    def _resync(self) -> None:
+        super()._resync()
+        self._sum_iy = sum(i * v for i, v in enumerate(self._ring))
+
+    def clear(self) -> None:
+        super().clear()
+        self._sum_iy = 0.0
+
+    @property
+    def slope(self) -> float:
+        """Units per step; 0.0 below three values."""
+        n = len(self._ring)
+        if n < 3:
+            return 0.0
+        x_mean = (n - 1) / 2.0
+        return (self._sum_iy - x_mean * self.sum) / (n * (n * n - 1) / 12.0)
+
+    @property
+    def intercept(self) -> float:
+        """Fitted value at the oldest position."""
+        return self.mean - self.slope * (len(self._ring) - 1) / 2.0
+
+
+class RollingCovariance:
+    """Covariance and correlation of the last ``maxlen`` (x, y) pairs."""
+
+    def __init__(self, maxlen: int) -> None:
+        self._xs = _Ring(maxlen)
+        self._ys = _Ring(maxlen)
+        self._mx = self._my = 0.0
+        self._m2x = self._m2y = 0.0
+        self._cxy = 0.0             # Σ (x − mx)(y − my)
+
+    @property
+    def maxlen(self) -> int:
+        return self._xs.maxlen
+
+    def push(self, x: float, y: float) -> None:
+        x, y = float(x), float(y)
+        old_x, old_y = self._xs.push(x), self._ys.push(y)
+        if old_x is not None:
+            self._remove(old_x, old_y, len(self._xs) - 1)
+        self._add(x, y, len(self._xs))
+        if self._xs.wrapped:
+            self._resync()
+
+    def extend(self, pairs: Iterable[Tuple[float, float]]) -> None:
+        for x, y in pairs:
+            self.push(x, y)
+
+    def _add(self, x: float, y: float, n: int) -> None:
+        dx, dy = x - self._mx, y - self._my
+        self._mx += dx / n
+        self._my += dy / n
+        self._m2x += dx * (x - self._mx)
+        self._m2y += dy * (y - self._my)
+        self._cxy += dx * (y - self._my)
+
+    def _remove(self, x: float, y: float, n: int) -> None:
+        """Take (x, y) out of a window of n + 1, leaving n."""
+        if n == 0:
+            self._mx = self._my = self._m2x = self._m2y = self._cxy = 0.0
+            return
+        mx_without = self._mx - (x - self._mx) / n
+        my_without = self._my - (y - self._my) / n
+        self._m2x -= (x - mx_without) * (x - self._mx)
+        self._m2y -= (y - my_without) * (y - self._my)
+        self._cxy -= (x - mx_without) * (y - self._my)
+        self._mx, self._my = mx_without, my_without
+
+    def _resync(self) -> None:
+        xs, ys = list(self._xs), list(self._ys)
+        n = len(xs)
+        self._mx, self._my = sum(xs) / n, sum(ys) / n
+        self._m2x = sum((x - self._mx) ** 2 for x in xs)
+        self._m2y = sum((y - self._my) ** 2 for y in ys)
+        self._cxy = sum((x - self._mx) * (y - self._my) for x, y in zip(xs, ys))
+
+    def clear(self) -> None:
+        self._xs.clear()
+        self._ys.clear()
+        self._mx = self._my = self._m2x = self._m2y = self._cxy = 0.0
+
+    def __len__(self) -> int:
+        return len(self._xs)
+
+    @property
+    def mean_x(self) -> float:
+        return self._mx
+
+    @property
+    def mean_y(self) -> float:
+        return self._my
+
+    @property
+    def covariance(self) -> float:
+        """Population covariance (÷ n)."""
+        n = len(self._xs)
+        return self._cxy / n if n else 0.0
+
+    @property
+    def correlation(self) -> float:
+        """Pearson r in [−1, 1]; 0.0 when either side is flat."""
+        den = self._m2x * self._m2y
+        if len(self._xs) < 2 or den <= 0:
+            return 0.0
+        return max(-1.0, min(1.0, self._cxy / math.sqrt(den)))
+
+    @property
+    def beta(self) -> float:
+        """Slope of y on x."""
+        return self._cxy / self._m2x if self._m2x > 0 else 0.0
+
+
+class Ewma:
+    """Exponentially weighted mean and variance; give ``span`` (α = 2/(span+1)) or ``alpha``."""
+
+    __slots__ = ("alpha", "mean", "variance", "count", "last")
+
+    def __init__(self, span: Optional[float] = None, alpha: Optional[float] = None) -> None:
+        if alpha is None:
+            if span is None or span < 1:
+                raise ValueError("Ewma needs span >= 1 or 0 < alpha <= 1")
+            alpha = 2.0 / (span + 1.0)
+        if not 0.0 < alpha <= 1.0:
+            raise ValueError("Ewma alpha must be in (0, 1]")
+        self.alpha = float(alpha)
+        self.mean = 0.0
+        self.variance = 0.0
+        self.count = 0
+        self.last: Optional[float] = None
+
+    def push(self, value: float) -> float:
+        value = float(value)
+        if self.count == 0:
+            self.mean = value
+        else:
+            delta = value - self.mean
+            self.mean += self.alpha * delta
+            self.variance = (1.0 - self.alpha) * (self.variance + self.alpha * delta * delta)
+        self.count += 1
+        self.last = value
+        return self.mean
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def zscore(self, value: Optional[float] = None) -> float:
+        value = self.last if value is None else value
+        std = self.std
+        return (value - self.mean) / std if value is not None and std > 0 else 0.0
+
+
+def linear_slope(values: Sequence[float]) -> float:
+    """One-pass least-squares slope against 0..n-1 (0.0 below three values)."""
+    n = len(values)
+    if n < 3:
+        return 0.0
+    sum_y = sum_iy = 0.0
+    for i, v in enumerate(values):
+        sum_y += v
+        sum_iy += i * v
+    return (sum_iy - (n - 1) / 2.0 * sum_y) / (n * (n * n - 1) / 12.0)
+
+
+def pearson(xs: Sequence[float], ys: Sequence[float]) -> float:
+    """Pearson correlation of two equal-length series (0.0 if mismatched, short or flat)."""
+    n = len(xs)
+    if n != len(ys) or n < 2:
+        return 0.0
+    mx, my = sum(xs) / n, sum(ys) / n
+    sxx = syy = sxy = 0.0
+    for x, y in zip(xs, ys):
+        dx, dy = x - mx, y - my
+        sxx += dx * dx
+        syy += dy * dy
+        sxy += dx * dy
+    if sxx <= 0 or syy <= 0:
+        return 0.0
+    return max(-1.0, min(1.0, sxy / math.sqrt(sxx * syy)))
@@ -0,0 +1,390 @@
+"""
+Session Clock — precomputed trading-day phase timeline.
+
+`get_market_status()` used to rebuild `datetime.now(IST)`, run the session
+controller, format a date string and look up the holiday calendar on every
+call (several times per tick). The session clock does that work once per
+day instead:
+
+    • builds the day's timeline of (start_epoch, status) segments from the
+      session controller, `config/market_session.py` timings and the
+      `config/nse_holidays.py` calendar
+    • answers "current status" in O(1) from a monotonic clock — a cached
+      segment is returned until the next boundary is crossed
+    • fires async transition events (PRE_OPEN → FREEZE → LIVE → CLOSED)
+    • accepts a `SimulatedClock` so tests can step through a session
+
+Two timelines are kept per day: the calendar view, and the view used when
+Zerodha is actively streaming ticks (the exchange overrides a stale local
+holiday/weekend calendar during market hours).
+
+Public surface:
+    session_clock.status(ticks_live=False) -> "PRE_OPEN" | "FREEZE" | "LIVE" | "CLOSED"
+    session_clock.status_at(when)             # the same answer for any other instant
+    session_clock.phase() -> MarketPhase
+    session_clock.add_listener(async_fn)      # async fn(TransitionEvent)
+    await session_clock.wait_for("LIVE")
+    session_clock.invalidate()                # after editing the holiday calendar
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import logging
+import time as time_module
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import pytz
+
+from config.market_session import get_market_session
+from config.nse_holidays import is_holiday
+from services.market_session_controller import market_session, MarketPhase
+
+logger = logging.getLogger(__name__)
+
+market_config = get_market_session()
+IST = pytz.timezone(market_config.TIMEZONE)
+
+# Window in which live Zerodha ticks override the local calendar.
+_TICK_OVERRIDE_START = time(8, 55)
+_TICK_OVERRIDE_END = time(15, 35)
+
+_STATUS_TO_PHASE = {
+    "PRE_OPEN": MarketPhase.PRE_OPEN,
+    "FREEZE": MarketPhase.AUCTION_FREEZE,
+    "LIVE": MarketPhase.LIVE,
+    "CLOSED": MarketPhase.CLOSED,
+}
+
+
+# ---------------------------------------------------------------------------
+# Reference rules (evaluated once per timeline segment, never per call)
+# ---------------------------------------------------------------------------
+
+def calendar_status(now: datetime) -> str:
+    """Market status from the session controller + configured calendar."""
+    current_time = now.time()
+    phase = market_session.get_current_phase(now)
+    if phase == MarketPhase.PRE_OPEN:
+        return "PRE_OPEN"
+    if phase == MarketPhase.AUCTION_FREEZE:
+        return "FREEZE"
+    if phase == MarketPhase.LIVE:
+        return "LIVE"
+
+    # Fallback to the configured calendar only when the session controller
+    # says the market is closed.
+    if now.weekday() in market_config.WEEKEND_DAYS or is_holiday(now.strftime("%Y-%m-%d")):
+        return "CLOSED"
+    if market_config.PRE_OPEN_START <= current_time < market_config.PRE_OPEN_END:
+        return "PRE_OPEN"
+    if market_config.PRE_OPEN_END <= current_time < market_config.MARKET_OPEN:
+        return "FREEZE"
+    if market_config.MARKET_OPEN <= current_time <= market_config.MARKET_CLOSE:
+        return "LIVE"
+    return "CLOSED"
+
+
+def live_ticks_status(now: datetime) -> str:
+    """Market status while the exchange is actively sending fresh ticks."""
+    current_time = now.time()
+    if _TICK_OVERRIDE_START <= current_time <= _TICK_OVERRIDE_END:
+        if market_config.PRE_OPEN_START <= current_time < market_config.MARKET_OPEN:
+            return "PRE_OPEN"
+        if market_config.MARKET_OPEN <= current_time <= market_config.MARKET_CLOSE:
+            return "LIVE"
+    return calendar_status(now)
+
+
+def _after(t: time) -> time:
+    """First instant strictly after ``t`` (closes an inclusive ``<= t`` window)."""
+    return (datetime.combine(date.min, t) + timedelta(microseconds=1)).time()
+
+
+def _boundary_times() -> List[time]:
+    """Every time-of-day at which either reference rule can change value."""
+    from services import market_session_controller as msc
+
+    candidates = {
+        time(0, 0),
+        market_config.PRE_OPEN_START,
+        market_config.PRE_OPEN_END,
+        market_config.MARKET_OPEN,
+        _after(market_config.MARKET_CLOSE),
+        msc.PRE_OPEN_START,
+        msc.PRE_OPEN_END,
+        msc.AUCTION_FREEZE_END,
+        msc.MARKET_OPEN,
+        _after(msc.MARKET_CLOSE),
+        _TICK_OVERRIDE_START,
+        _after(_TICK_OVERRIDE_END),
+    }
+    return sorted(candidates)
+
+
+# ---------------------------------------------------------------------------
+# Clocks
+# ---------------------------------------------------------------------------
+
+class SystemClock:
+    """Wall time anchored to ``time.monotonic`` (immune to NTP steps mid-day)."""
+
+    def __init__(self) -> None:
+        self._anchor_wall = time_module.time()
+        self._anchor_mono = time_module.monotonic()
+
+    def reanchor(self) -> None:
+        self._anchor_wall = time_module.time()
+        self._anchor_mono = time_module.monotonic()
+
+    def now(self) -> float:
+        return self._anchor_wall + (time_module.monotonic() - self._anchor_mono)
+
+    async def sleep(self, seconds: float) -> None:
+        await asyncio.sleep(seconds)
+
+
+class SimulatedClock:
+    """Manually advanced clock for tests and replays."""
+
+    def __init__(self, start: datetime) -> None:
+        if start.tzinfo is None:
+            start = IST.localize(start)
+        self._now = start.timestamp()
+        self._advanced = asyncio.Event()
+
+    def reanchor(self) -> None:
+        pass
+
+    def now(self) -> float:
+        return self._now
+
+    def set(self, when: datetime) -> None:
+        if when.tzinfo is None:
+            when = IST.localize(when)
+        self._now = when.timestamp()
+        self._wake()
+
+    def advance(self, seconds: float) -> None:
+        self._now += seconds
+        self._wake()
+
+    def _wake(self) -> None:
+        self._advanced.set()
+
+    async def sleep(self, seconds: float) -> None:
+        # Simulated time only moves via advance()/set(); yield until it does.
+        self._advanced.clear()
+        await self._advanced.wait()
+
+
+# ---------------------------------------------------------------------------
+# Timeline + transitions
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class TransitionEvent:
+    previous: str
+    current: str
+    at: datetime
+
+    @property
+    def phase(self) -> MarketPhase:
+        return _STATUS_TO_PHASE[self.current]
+
+
+@dataclass
+class _Timeline:
+    day: date
+    starts: List[float]       # segment start epochs, ascending
+    statuses: List[str]
+    end: float                # next midnight (exclusive)
+    cursor: int = 0
+
+    def locate(self, ts: float) -> int:
+        """Advance the cursor to the segment containing ``ts`` (amortised O(1))."""
+        i = self.cursor
+        if ts < self.starts[i]:
+            i = 0
+        last = len(self.starts) - 1
+        while i < last and ts >= self.starts[i + 1]:
+            i += 1
+        self.cursor = i
+        return i
+
+    def next_boundary(self, i: int) -> float:
+        return self.starts[i + 1] if i + 1 < len(self.starts) else self.end
+
+
+Listener = Callable[[TransitionEvent], Awaitable[None]]
+
+
+class SessionClock:
+    """Precomputed per-day phase timeline with O(1) lookups and transition events."""
+
+    def __init__(self, clock: Optional[object] = None) -> None:
+        self._clock = clock or SystemClock()
+        self._timelines: Dict[bool, _Timeline] = {}
+        # (valid_from_epoch, valid_until_epoch, status) fast path per timeline
+        self._fast: Dict[bool, Tuple[float, float, str]] = {}
+        self._listeners: List[Listener] = []
+        self._last_status: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+    # --- timeline construction ------------------------------------------
+
+    @staticmethod
+    def build_timeline(day: date, ticks_live: bool = False) -> _Timeline:
+        rule = live_ticks_status if ticks_live else calendar_status
+        starts: List[float] = []
+        statuses: List[str] = []
+        for t in _boundary_times():
+            at = IST.localize(datetime.combine(day, t))
+            status = rule(at)
+            if statuses and statuses[-1] == status:
+                continue
+            starts.append(at.timestamp())
+            statuses.append(status)
+        end = IST.localize(datetime.combine(day + timedelta(days=1), time(0, 0))).timestamp()
+        return _Timeline(day=day, starts=starts, statuses=statuses, end=end)
+
+    def _timeline(self, ts: float, ticks_live: bool) -> _Timeline:
+        tl = self._timelines.get(ticks_live)
+        if tl is None or ts >= tl.end or ts < tl.starts[0]:
+            self._clock.reanchor()
+            day = datetime.fromtimestamp(ts, IST).date()
+            tl = self._timelines[ticks_live] = self.build_timeline(day, ticks_live)
+        return tl
+
+    def invalidate(self) -> None:
+        """Drop cached timelines (call after editing the holiday calendar)."""
+        self._timelines.clear()
+        self._fast.clear()
+
+    # --- queries ----------------------------------------------------------
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self._clock.now(), IST)
+
+    def status(self, ticks_live: bool = False) -> str:
+        ts = self._clock.now()
+        fast = self._fast.get(ticks_live)
+        if fast is not None and fast[0] <= ts < fast[1]:
+            return fast[2]
+        tl = self._timeline(ts, ticks_live)
+        i = tl.locate(ts)
+        status = tl.statuses[i]
+        self._fast[ticks_live] = (tl.starts[i], tl.next_boundary(i), status)
+        return status
+
+    def status_at(self, when: datetime, ticks_live: bool = False) -> str:
+        """Status at ``when`` (naive means IST); reuses today's timeline when it covers it."""
+        if when.tzinfo is None:
+            when = IST.localize(when)
+        ts = when.timestamp()
+        tl = self._timelines.get(ticks_live)
+        if tl is None or not tl.starts[0] <= ts < tl.end:
+            tl = self.build_timeline(when.astimezone(IST).date(), ticks_live)
+        return tl.statuses[bisect.bisect_right(tl.starts, ts) - 1]
+
+    def phase(self, ticks_live: bool = False) -> MarketPhase:
+        return _STATUS_TO_PHASE[self.status(ticks_live)]
+
+    def is_live(self) -> bool:
+        return self.status() == "LIVE"
+
+    def seconds_until_next_transition(self) -> float:
+        ts = self._clock.now()
+        tl = self._timeline(ts, False)
+        return max(0.0, tl.next_boundary(tl.locate(ts)) - ts)
+
+    def timeline(self, day: Optional[date] = None) -> List[Dict[str, str]]:
+        """Human-readable calendar timeline (for diagnostics endpoints)."""
+        tl = self.build_timeline(day or self.now().date())
+        return [
+            {"start": datetime.fromtimestamp(s, IST).strftime("%H:%M:%S"), "status": st}
+            for s, st in zip(tl.starts, tl.statuses)
+        ]
+
+    # --- transition events ----------------------------------------------
+
+    def add_listener(self, listener: Listener) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Listener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    async def poll(self) -> Optional[TransitionEvent]:
+        """Fire listeners if the calendar status changed since the last poll."""
+        current = self.status()
+        previous, self._last_status = self._last_status, current
+        if previous is None or previous == current:
+            return None
+        event = TransitionEvent(previous=previous, current=current, at=self.now())
+        logger.info("Session transition %s → %s", previous, current)
+        for listener in list(self._listeners):
+            try:
+                await listener(event)
+            except Exception as exc:
+                logger.error("Session transition listener failed: %s", exc, exc_info=True)
+        return event
+
+    async def wait_for(self, status: str) -> TransitionEvent:
+        """Wait until the calendar status is ``status`` (at once if it already is;
+        the event then has ``previous == current``)."""
+        current = self.status()
+        if current == status:
+            return TransitionEvent(previous=current, current=current, at=self.now())
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+
+        async def _on(event: TransitionEvent) -> None:
+            if event.current == status and not fut.done():
+                fut.set_result(event)
+
+        self.add_listener(_on)
+        try:
+            return await fut
+        finally:
+            self.remove_listener(_on)
+
+    async def _loop(self) -> None:
+        await self.poll()
+        while self._running:
+            try:
+                # Sleep to the next boundary (capped so wall-clock jumps are noticed).
+                await self._clock.sleep(min(self.seconds_until_next_transition() + 0.001, 60.0))
+                await self.poll()
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                logger.error("Session clock loop error: %s", exc)
+                await asyncio.sleep(1.0)
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+session_clock = SessionClock()
+
+
+def get_session_clock() -> SessionClock:
+    return session_clock
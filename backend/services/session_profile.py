@@ -0,0 +1,392 @@
+"""Session volume profile and VWAP bands built from index-futures ticks.
+
+`/api/market/vwap-live`, `VWAPIntradayFilter` and the volume-profile
+analyzer each rebuilt the session from scratch on every call: a fresh
+KiteConnect, a historical_data fetch of every 5m candle since 09:15 and a
+pandas pass over them. The current-month NIFTY / BANKNIFTY / SENSEX futures
+already tick on the feed's KiteTicker connection, so one accumulator per
+contract folds each tick's `volume_traded` delta in as it arrives:
+
+    VWAP and σ     Σv, Σv·x, Σv·x² with x = price − first price of the session
+                   (anchored so the variance does not cancel catastrophically)
+    histogram      dense NumPy volume-at-price array, one bucket per `step`
+                   points, widened when price leaves the covered range
+    POC            updated on every add (the histogram only grows)
+    value area     70% expansion from the POC, recomputed on read only when
+                   ticks arrived since the last read (a few hundred buckets)
+
+Reads are O(1) apart from that value-area walk. A profile knows whether it
+covers the whole session: its first tick arrived by 09:16 (so the first
+`volume_traded` is the session's volume so far, booked at that price), or
+`seed()` folded in the 5m candles from 09:15 up to the first tick. Until
+then `ready` is False and callers keep using the historical path, which
+seeds the profile once it has the candles anyway.
+
+    profiles = get_session_profiles()
+    result = profiles.vwap_result("NIFTY")          # None until ready
+    profile = profiles.for_symbol("NIFTY")          # SessionProfile of NIFTY-FUT
+    profile.snapshot()["value_area"]
+
+Ticks arrive on the KiteTicker thread through the universe's "session_profile"
+slice listener; readers on the event loop take the profile's lock.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+from services.candle_archive import IST
+from services.instrument_universe import INDEX_SYMBOLS, InstrumentUniverse, get_instrument_universe
+
+logger = logging.getLogger(__name__)
+
+SESSION_OPEN = (9, 15)
+OPEN_GRACE_S = 60           # a first tick up to 09:16 still counts as "from the open"
+LIVE_AFTER_S = 60           # profile is live while the contract ticked in the last minute
+VALUE_AREA_PCT = 0.70
+BAND_SIGMAS = (1, 2, 3)
+_NICE_STEPS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 2.5, 5.0, 10.0, 20.0, 25.0, 50.0, 100.0)
+_PAD_BUCKETS = 64
+
+
+def bucket_step(price: float) -> float:
+    """Smallest "nice" bucket ≥ 2 bp of price: NIFTY 5, BANKNIFTY / SENSEX 20."""
+    target = price * 0.0002
+    for step in _NICE_STEPS:
+        if step >= target:
+            return step
+    return _NICE_STEPS[-1]
+
+
+def _session_of(epoch: float) -> date:
+    return datetime.fromtimestamp(epoch, IST).date()
+
+
+def _open_epoch(session: date) -> float:
+    return IST.localize(datetime(session.year, session.month, session.day, *SESSION_OPEN)).timestamp()
+
+
+def _epoch_of(value: Any) -> float:
+    """Epoch seconds of a candle timestamp (datetime, pandas Timestamp or ISO string; naive = IST)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        value = IST.localize(value)
+    return float(value.timestamp())
+
+
+class SessionProfile:
+    """Incremental VWAP / σ bands / volume-at-price for one instrument and one session."""
+
+    def __init__(self, symbol: str) -> None:
+        self.symbol = symbol
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, session: Optional[date]) -> None:
+        self.session = session
+        self.complete = False
+        self.anchor: Optional[float] = None
+        self.step: Optional[float] = None
+        self.hist = np.zeros(0, dtype=np.float64)
+        self.base = 0                        # bucket number of hist[0]
+        self.poc = -1                        # index into hist
+        self.sum_v = 0.0
+        self.sum_vx = 0.0
+        self.sum_vx2 = 0.0
+        self.high = -math.inf
+        self.low = math.inf
+        self.last_price: Optional[float] = None
+        self.last_volume: Optional[int] = None   # cumulative volume_traded at the last tick
+        self.seeded_volume = 0
+        self.first_tick: Optional[tuple] = None  # (price, volume_traded, epoch) when it was not from the open
+        self.first_epoch: Optional[float] = None
+        self.last_epoch: Optional[float] = None
+        self.ticks = 0
+        self.version = 0
+        self._value_area: Optional[tuple] = None
+
+    # ── writes ───────────────────────────────────────────────────────────────
+
+    def _add(self, price: float, volume: float) -> None:
+        if self.anchor is None:
+            self.anchor = price
+            self.step = bucket_step(price)
+        bucket = int(round(price / self.step))
+        index = bucket - self.base
+        if index < 0 or index >= len(self.hist):
+            self._widen(bucket)
+            index = bucket - self.base
+        self.hist[index] += volume
+        if self.poc < 0 or self.hist[index] > self.hist[self.poc]:
+            self.poc = index
+        x = price - self.anchor
+        self.sum_v += volume
+        self.sum_vx += volume * x
+        self.sum_vx2 += volume * x * x
+        self.version += 1
+
+    def _widen(self, bucket: int) -> None:
+        if not len(self.hist):
+            self.base = bucket - _PAD_BUCKETS
+            self.hist = np.zeros(2 * _PAD_BUCKETS + 1, dtype=np.float64)
+            return
+        low = min(self.base, bucket - _PAD_BUCKETS)
+        high = max(self.base + len(self.hist), bucket + _PAD_BUCKETS + 1)
+        hist = np.zeros(high - low, dtype=np.float64)
+        shift = self.base - low
+        hist[shift:shift + len(self.hist)] = self.hist
+        self.hist = hist
+        self.poc += shift
+        self.base = low
+
+    def add_tick(self, price: float, volume_traded: int, epoch: float) -> None:
+        """Fold one tick in; ``volume_traded`` is the contract's cumulative day volume."""
+        if price <= 0:
+            return
+        with self._lock:
+            session = _session_of(epoch)
+            if session != self.session:
+                self._reset(session)
+            if self.last_volume is None:
+                if self.complete:                                    # seeded before the first tick
+                    traded = volume_traded - self.seeded_volume
+                elif epoch <= _open_epoch(session) + OPEN_GRACE_S:
+                    traded = volume_traded
+                    self.complete = True
+                else:
+                    traded = 0
+                    self.first_tick = (price, volume_traded, epoch)
+                self.first_epoch = epoch
+            else:
+                traded = volume_traded - self.last_volume
+            self.last_volume = volume_traded
+            if traded > 0:
+                self._add(price, float(traded))
+            if price > self.high:
+                self.high = price
+            if price < self.low:
+                self.low = price
+            self.last_price = price
+            self.last_epoch = epoch
+            self.ticks += 1
+
+    def seed(self, candles: Iterable[Dict[str, Any]], interval_s: int = 300) -> int:
+        """Fold in intraday candles from 09:15 up to the first tick; returns candles used.
+
+        Candles are historical_data rows (``date``) or cache candles
+        (``timestamp``) with high / low / close / volume. Each is booked at its
+        typical price. Volume between the last whole candle and the first tick
+        is booked at the first tick's price, so the total matches volume_traded.
+        """
+        rows = []
+        for candle in candles:
+            start = _epoch_of(candle.get("date", candle.get("timestamp")))
+            rows.append((start, candle))
+        if not rows:
+            return 0
+        rows.sort(key=lambda row: row[0])
+        with self._lock:
+            if self.complete:
+                return 0
+            session = _session_of(rows[0][0])
+            if self.session is None:
+                self._reset(session)
+            elif session != self.session:
+                return 0
+            if rows[0][0] > _open_epoch(session):
+                return 0                                             # does not reach back to the open
+            cutoff = self.first_tick[2] if self.first_tick else math.inf
+            used = 0
+            for start, candle in rows:
+                if start + interval_s > cutoff or _session_of(start) != session:
+                    break
+                volume = float(candle.get("volume") or 0)
+                if volume > 0:
+                    typical = (float(candle["high"]) + float(candle["low"]) + float(candle["close"])) / 3
+                    self._add(typical, volume)
+                    self.seeded_volume += int(volume)
+                    self.high = max(self.high, float(candle["high"]))
+                    self.low = min(self.low, float(candle["low"]))
+                used += 1
+            if self.first_tick:
+                price, volume_traded, _ = self.first_tick
+                if volume_traded > self.seeded_volume:
+                    self._add(price, float(volume_traded - self.seeded_volume))
+                self.first_tick = None
+            self.complete = True
+            return used
+
+    # ── reads ────────────────────────────────────────────────────────────────
+
+    @property
+    def ready(self) -> bool:
+        """Covers the session from the open and has volume — safe to serve."""
+        return self.complete and self.sum_v > 0 and self.session == _session_of(time.time())
+
+    @property
+    def live(self) -> bool:
+        return self.last_epoch is not None and time.time() - self.last_epoch < LIVE_AFTER_S
+
+    def _price(self, index: int) -> float:
+        return round((self.base + index) * self.step, 2)
+
+    def _compute_value_area(self) -> tuple:
+        hist = self.hist
+        target = self.sum_v * VALUE_AREA_PCT
+        lo = hi = self.poc
+        total = hist[self.poc]
+        last = len(hist) - 1
+        while total < target and (lo > 0 or hi < last):
+            below = hist[lo - 1] if lo > 0 else -1.0
+            above = hist[hi + 1] if hi < last else -1.0
+            if above >= below:
+                hi += 1
+                total += above
+            else:
+                lo -= 1
+                total += below
+        return self._price(lo), self._price(hi), total
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if self.sum_v <= 0:
+                return None
+            mean = self.sum_vx / self.sum_v
+            sigma = math.sqrt(max(self.sum_vx2 / self.sum_v - mean * mean, 0.0))
+            vwap = self.anchor + mean
+            if self._value_area is None or self._value_area[0] != self.version:
+                self._value_area = (self.version, self._compute_value_area())
+            va_low, va_high, va_volume = self._value_area[1]
+            bands = {}
+            for k in BAND_SIGMAS:
+                bands[f"upper_{k}"] = round(vwap + k * sigma, 2)
+                bands[f"lower_{k}"] = round(vwap - k * sigma, 2)
+            return {
+                "symbol": self.symbol,
+                "session": self.session.isoformat(),
+                "complete": self.complete,
+                "vwap": round(vwap, 2),
+                "sigma": round(sigma, 2),
+                "bands": bands,
+                "poc": self._price(self.poc),
+                "value_area": {"high": va_high, "low": va_low,
+                               "volume_pct": round(va_volume / self.sum_v * 100, 1)},
+                "bucket": self.step,
+                "total_volume": int(self.sum_v),
+                "high": self.high,
+                "low": self.low,
+                "last_price": self.last_price,
+                "ticks": self.ticks,
+                "first_tick": self.first_epoch,
+                "last_tick": self.last_epoch,
+                "live": self.live,
+            }
+
+    def levels(self) -> Dict[float, float]:
+        """{bucket price: volume} for every non-empty bucket (VolumeProfileAnalyzer input)."""
+        with self._lock:
+            nonzero = np.flatnonzero(self.hist)
+            return {self._price(int(i)): float(self.hist[i]) for i in nonzero}
+
+
+class SessionProfiles:
+    """One SessionProfile per index future, fed by the universe's tick listener."""
+
+    def __init__(self, universe: Optional[InstrumentUniverse] = None) -> None:
+        self.universe = universe or get_instrument_universe()
+        self._profiles: Dict[int, SessionProfile] = {}
+        self.slice = self.universe.declare(
+            "session_profile", symbols=tuple(f"{s}-FUT" for s in INDEX_SYMBOLS),
+            mode="quote", on_tick=self.on_tick,
+        )
+
+    def _profile(self, iid: int) -> SessionProfile:
+        profile = self._profiles.get(iid)
+        if profile is None:
+            profile = self._profiles.setdefault(iid, SessionProfile(self.universe[iid].symbol))
+        return profile
+
+    def on_tick(self, iid: int, price: float, volume: int, oi: int, epoch: float) -> None:
+        self._profile(iid).add_tick(price, volume, epoch)
+
+    def _iid(self, symbol: str) -> Optional[int]:
+        symbol = symbol.upper()
+        iid = self.universe.id_of(f"{symbol}-FUT")
+        if iid is None:
+            iid = self.universe.id_of(symbol)
+        return iid if iid is not None and iid in self.slice else None
+
+    def for_symbol(self, symbol: str) -> Optional[SessionProfile]:
+        """Profile of ``symbol``'s current future (NIFTY → NIFTY-FUT); None if not tracked."""
+        iid = self._iid(symbol)
+        return self._profile(iid) if iid is not None else None
+
+    def seed(self, symbol: str, candles: Iterable[Dict[str, Any]], interval_s: int = 300,
+             token: Optional[int] = None) -> int:
+        """Seed from historical candles; skipped when they are for a different contract than ``token``."""
+        iid = self._iid(symbol)
+        if iid is None or (token is not None and self.universe[iid].token != token):
+            return 0
+        used = self._profile(iid).seed(candles, interval_s)
+        if used:
+            logger.info("Session profile %s seeded from %d candles", self.universe[iid].symbol, used)
+        return used
+
+    def vwap_result(self, symbol: str, current_price: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """`VWAPLiveCalculator.get_live_vwap_complete`-shaped result from ticks, or None if not ready."""
+        from services.vwap_live_service import VWAPLiveCalculator
+
+        profile = self.for_symbol(symbol)
+        if profile is None or not profile.ready:
+            return None
+        snapshot = profile.snapshot()
+        if snapshot is None:
+            return None
+        price = current_price if current_price is not None else snapshot["last_price"]
+        last = datetime.fromtimestamp(snapshot["last_tick"], IST) if snapshot["last_tick"] else None
+        return {
+            "symbol": symbol.upper(),
+            "success": True,
+            "vwap": snapshot["vwap"],
+            "current_price": price,
+            "position": VWAPLiveCalculator.get_vwap_position(price, snapshot["vwap"]),
+            "candles_used": 0,
+            "market_open": f"{snapshot['session']} {SESSION_OPEN[0]:02d}:{SESSION_OPEN[1]:02d} IST",
+            "last_update": last.strftime("%Y-%m-%d %H:%M IST") if last else None,
+            "total_volume": snapshot["total_volume"],
+            "average_price_weighted": snapshot["vwap"],
+            "sigma": snapshot["sigma"],
+            "bands": snapshot["bands"],
+            "poc": snapshot["poc"],
+            "value_area": snapshot["value_area"],
+            "live": snapshot["live"],
+            "source": "ticks",
+            "error": None,
+        }
+
+    def report(self) -> Dict[str, Any]:
+        out = {}
+        for iid, profile in list(self._profiles.items()):
+            snapshot = profile.snapshot()
+            out[profile.symbol] = {
+                "ready": profile.ready,
+                "ticks": profile.ticks,
+                **({k: snapshot[k] for k in ("session", "vwap", "sigma", "poc", "value_area", "total_volume",
+                                              "live")} if snapshot else {}),
+            }
+        return out
+
+
+session_profiles = SessionProfiles()
+
+
+def get_session_profiles() -> SessionProfiles:
+    return session_profiles
@@ -71,12 +71,16 @@ from datetime import date, datetime
 from typing import Any, Dict, List, Optional
 
 import pytz
-import httpx
 from kiteconnect import KiteConnect
 from kiteconnect.exceptions import PermissionException
 
 from services.cache import CacheService
+from services.cadence import get_cadence_controller
+from services.http_client import get_http_pool
+from services.kite_gateway import get_kite_gateway
+from services.quote_scheduler import Priority, get_quote_scheduler
 from services.quantedge_ml import QuantEdgeMLPredictor, extract_features
+from services.snapshot_bus import ANALYSIS, MARKET, snapshot_bus
 from config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -102,7 +106,7 @@ TRAILING_SL_TRIGGER_RATIO = 0.5
 #  • Rule engine must reach HIGH_CONFLUENCE_SCORE before AI is invoked
 AI_COOLDOWN_SEC = 60          # minimum gap between AI calls per symbol
 HIGH_CONFLUENCE_SCORE = 70    # alpha_score threshold (0-100) that unlocks AI enrichment
-RULE_REFRESH_INTERVAL = 2     # rule engine runs every 2s (zero cost)
+RULE_REFRESH_INTERVAL = 2     # rule engine base cadence (s), adapted by services/cadence.py
 MAX_CONCURRENT_AI = 1         # single semaphore — no parallel API calls
 AI_MAX_TOKENS = 150           # tight cap: signal+conf+1-line reason fits in 80
 
@@ -347,6 +351,7 @@ class SmartAIAlgoService:
         self._results: Dict[str, Dict[str, Any]] = {s: self._empty(s) for s in SYMBOLS}
         self._running = False
         self._ai_semaphore = asyncio.Semaphore(MAX_CONCURRENT_AI)
+        self._cadence = get_cadence_controller().register("smart_ai_algo", base=RULE_REFRESH_INTERVAL)
         # AI enabled by default when OpenAI is configured; user can still toggle it off.
         self._ai_enabled: bool = bool(_settings().openai_api_key)
         # Track last AI call time and last signal per symbol for change-detection
@@ -450,11 +455,13 @@ class SmartAIAlgoService:
         await self._warm_price_history()
         logger.info("🤖 Smart AI Algo: started")
         while self._running:
+            started = time.perf_counter()
             try:
                 await self._tick()
             except Exception as exc:
                 logger.error("Smart AI Algo tick error: %s", exc, exc_info=True)
-            await asyncio.sleep(RULE_REFRESH_INTERVAL)
+            self._cadence.record(time.perf_counter() - started)
+            await asyncio.sleep(self._cadence.interval)
 
     async def _warm_price_history(self) -> None:
         """Seed moving averages from recent candle history so the first live ticks are meaningful."""
@@ -519,10 +526,16 @@ class SmartAIAlgoService:
 
     async def _tick_symbol(self, symbol: str, candidates: List[tuple]) -> None:
         """Process one symbol's tick. Any exception here is contained by the caller."""
-        try:
-            tick = await self._cache.get_market_data(symbol)
-        except Exception:
-            tick = None
+        # The feed's latest tick by reference (no JSON decode); the cache only
+        # answers, from persisted state, before this process has seen a tick.
+        snap = snapshot_bus.get(MARKET, symbol)
+        if snap is not None:
+            tick = snap.value
+        else:
+            try:
+                tick = await self._cache.get_market_data(symbol)
+            except Exception:
+                tick = None
 
         now_ms = int(time.time() * 1000)
         if not tick or not isinstance(tick, dict):
@@ -536,7 +549,7 @@ class SmartAIAlgoService:
             return
 
         # Compute tick age so the UI can show whether reasoning is fresh or frozen.
-        tick_age_seconds = self._compute_tick_age_seconds(tick)
+        tick_age_seconds = int(snap.age()) if snap is not None else self._compute_tick_age_seconds(tick)
         if tick_age_seconds < 0:
             data_status = "UNKNOWN"
         elif tick_age_seconds <= 10:
@@ -1024,7 +1037,7 @@ class SmartAIAlgoService:
         quote_map: Dict[str, Any] = {}
         if quote_keys:
             try:
-                quote_map = kite.quote(quote_keys) or {}
+                quote_map = get_quote_scheduler().quote_sync(quote_keys, Priority.ORDER) or {}
             except Exception:
                 quote_map = {}
 
@@ -1153,7 +1166,7 @@ class SmartAIAlgoService:
         quote_map: Dict[str, Any] = {}
         if quote_keys:
             try:
-                quote_map = kite.quote(quote_keys) or {}
+                quote_map = get_quote_scheduler().quote_sync(quote_keys, Priority.ANALYTICS) or {}
             except Exception:
                 quote_map = {}
 
@@ -1255,8 +1268,7 @@ class SmartAIAlgoService:
             return
 
         try:
-            kite = KiteConnect(api_key=cfg.zerodha_api_key)
-            kite.set_access_token(cfg.zerodha_access_token)
+            kite = get_kite_gateway().sync_client(cfg.zerodha_access_token)
             contract = self._resolve_preview_contract(kite, symbol, side, spot)
         except Exception as exc:
             logger.debug("Option preview resolve failed for %s: %s", symbol, exc)
@@ -1385,15 +1397,16 @@ class SmartAIAlgoService:
         }
 
         try:
-            async with httpx.AsyncClient(timeout=cfg.openai_timeout) as client:
-                resp = await client.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    json=payload,
-                    headers={
-                        "Authorization": f"Bearer {cfg.openai_api_key}",
-                        "Content-Type": "application/json",
-                    },
-                )
+            resp = await get_http_pool().post(
+                "https://api.openai.com/v1/chat/completions",
+                provider="openai",
+                json=payload,
+                headers={
+                    "Authorization": f"Bearer {cfg.openai_api_key}",
+                    "Content-Type": "application/json",
+                },
+                timeout=cfg.openai_timeout,
+            )
             if resp.status_code != 200:
                 return False, f"AI confirmation HTTP {resp.status_code}", 0
 
@@ -1515,8 +1528,7 @@ class SmartAIAlgoService:
             logger.warning("Smart AI LIVE trade skipped for %s %s: Zerodha credentials missing", symbol, side)
             return
 
-        kite = KiteConnect(api_key=cfg.zerodha_api_key)
-        kite.set_access_token(cfg.zerodha_access_token)
+        kite = get_kite_gateway().sync_client(cfg.zerodha_access_token)
 
         try:
             # For options strategy, we always BUY contracts (CE or PE).
@@ -1558,7 +1570,7 @@ class SmartAIAlgoService:
             option_best_bid = 0.0
             option_best_ask = 0.0
             try:
-                q = kite.quote([f"{live_exchange}:{tradingsymbol}"])
+                q = get_quote_scheduler().quote_sync([f"{live_exchange}:{tradingsymbol}"], Priority.ORDER)
                 quote_item = q.get(f"{live_exchange}:{tradingsymbol}") or {}
                 option_ltp = float(quote_item.get("last_price", 0) or 0)
                 depth = quote_item.get("depth") or {}
@@ -1838,8 +1850,9 @@ class SmartAIAlgoService:
         ema200 = _ema(hist, 200) if len(hist) >= 200 else price
         rsi = _rsi(hist) if len(hist) >= 15 else 50.0
 
-        # Analysis payload (VWAP if pre-computed elsewhere)
-        analysis = tick.get("analysis") or {}
+        # Analysis payload (VWAP if pre-computed elsewhere): the tick's copy, else
+        # the latest one the feed published
+        analysis = tick.get("analysis") or snapshot_bus.value(ANALYSIS, symbol) or {}
         vwap = float(analysis.get("vwap", 0) or 0) or price
 
         # QuantEdge feature block ------------------------------------------------
@@ -2341,15 +2354,16 @@ class SmartAIAlgoService:
             "max_tokens": AI_MAX_TOKENS,
         }
 
-        async with httpx.AsyncClient(timeout=settings.openai_timeout) as client:
-            resp = await client.post(
-                "https://api.openai.com/v1/chat/completions",
-                json=payload,
-                headers={
-                    "Authorization": f"Bearer {settings.openai_api_key}",
-                    "Content-Type": "application/json",
-                },
-            )
+        resp = await get_http_pool().post(
+            "https://api.openai.com/v1/chat/completions",
+            provider="openai",
+            json=payload,
+            headers={
+                "Authorization": f"Bearer {settings.openai_api_key}",
+                "Content-Type": "application/json",
+            },
+            timeout=settings.openai_timeout,
+        )
 
         if resp.status_code != 200:
             logger.warning("OpenAI batch → HTTP %s", resp.status_code)
@@ -0,0 +1,158 @@
+"""
+Snapshot Bus — in-process registry of the latest result each producer has
+computed, per symbol, for other services to read without a cache round-trip.
+
+    from services.snapshot_bus import MARKET, REGIME, get_snapshot_bus
+
+    bus = get_snapshot_bus()
+    bus.publish(REGIME, "NIFTY", result)             # producer, once per cycle
+    snap = bus.get(MARKET, "NIFTY")                  # consumer: O(1), no JSON
+    if snap and snap.age() < 5: ...
+    snap = await bus.wait(REGIME, "NIFTY", after=seen, timeout=2.0)
+
+A `Snapshot` is frozen: (topic, symbol, version, value, published_at). The
+version counts publishes per (topic, symbol) from 1, so "has anything changed
+since I last looked" is an integer compare, and `wait(after=N)` parks until
+version N+1 lands. `age()` is seconds since publish — the staleness a
+consumer used to infer from cache TTLs or by parsing the tick's timestamp.
+
+The value is handed over by reference: readers get the producer's object, not
+a copy. The contract that makes that safe is the one the services already
+follow for their `_latest` maps — a producer publishes a freshly built object
+every cycle and never mutates it afterwards, and readers treat it as
+read-only (copy before decorating it).
+
+Topics are declared here, each with the type its value must be, so a
+producer publishing the wrong shape fails at publish time, not in a reader.
+Unlike CacheService entries, snapshots never expire: a stale snapshot is still
+the latest known value, and its age says how stale.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Topic:
+    """A named stream of per-symbol results; `type` is what publish accepts."""
+
+    name: str
+    type: type = dict
+    doc: str = ""
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    topic: str
+    symbol: str
+    version: int
+    value: Any
+    published_at: float
+
+    def age(self, now: Optional[float] = None) -> float:
+        """Seconds since this snapshot was published."""
+        return max((now if now is not None else time.time()) - self.published_at, 0.0)
+
+    def fresh(self, max_age: float, now: Optional[float] = None) -> bool:
+        return self.age(now) <= max_age
+
+
+MARKET    = Topic("market", dict, "normalized index tick, as written to market:{SYMBOL}")
+ANALYSIS  = Topic("analysis", dict, "InstantSignal result, as written to ws_analysis:{SYMBOL}")
+COMPASS   = Topic("compass", dict, "CompassService per-index result")
+LIQUIDITY = Topic("liquidity", dict, "LiquidityService per-index result")
+REGIME    = Topic("regime", dict, "MarketRegimeService per-index result")
+
+TOPICS: Tuple[Topic, ...] = (MARKET, ANALYSIS, COMPASS, LIQUIDITY, REGIME)
+
+
+class SnapshotBus:
+    """Latest versioned snapshot per (topic, symbol), with change waiters."""
+
+    def __init__(self) -> None:
+        self._snapshots: Dict[Tuple[str, str], Snapshot] = {}
+        self._waiters: Dict[Tuple[str, str], List[asyncio.Future]] = {}
+        # Publishing can happen off the event loop (KiteTicker thread, executors)
+        self._lock = threading.Lock()
+
+    def publish(self, topic: Topic, symbol: str, value: Any, at: Optional[float] = None) -> Snapshot:
+        """Replace the latest `topic` value for `symbol`; returns the new snapshot."""
+        if not isinstance(value, topic.type):
+            raise TypeError(
+                f"{topic.name} snapshot must be {topic.type.__name__}, got {type(value).__name__}"
+            )
+        key = (topic.name, symbol)
+        with self._lock:
+            prev = self._snapshots.get(key)
+            snap = Snapshot(topic.name, symbol, prev.version + 1 if prev else 1, value,
+                            at if at is not None else time.time())
+            self._snapshots[key] = snap
+            waiters = self._waiters.pop(key, None)
+        for fut in waiters or ():
+            fut.get_loop().call_soon_threadsafe(_resolve, fut, snap)
+        return snap
+
+    def get(self, topic: Topic, symbol: str) -> Optional[Snapshot]:
+        return self._snapshots.get((topic.name, symbol))
+
+    def value(self, topic: Topic, symbol: str, max_age: Optional[float] = None, default: Any = None) -> Any:
+        """The latest value, or `default` if none was published or it is older than `max_age`."""
+        snap = self._snapshots.get((topic.name, symbol))
+        if snap is None or (max_age is not None and snap.age() > max_age):
+            return default
+        return snap.value
+
+    def version(self, topic: Topic, symbol: str) -> int:
+        snap = self._snapshots.get((topic.name, symbol))
+        return snap.version if snap else 0
+
+    async def wait(self, topic: Topic, symbol: str, after: int = 0,
+                   timeout: Optional[float] = None) -> Optional[Snapshot]:
+        """The first snapshot with version > `after`; None if `timeout` elapses first."""
+        key = (topic.name, symbol)
+        with self._lock:
+            snap = self._snapshots.get(key)
+            if snap is not None and snap.version > after:
+                return snap
+            fut = asyncio.get_running_loop().create_future()
+            self._waiters.setdefault(key, []).append(fut)
+        try:
+            return await asyncio.wait_for(fut, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self._lock:
+                pending = self._waiters.get(key)
+                if pending and fut in pending:
+                    pending.remove(fut)
+
+    def symbols(self, topic: Topic) -> List[str]:
+        return [symbol for name, symbol in list(self._snapshots) if name == topic.name]
+
+    def report(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Per topic, per symbol: version and age — for the health endpoint."""
+        now = time.time()
+        out: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for (name, symbol), snap in sorted(list(self._snapshots.items())):
+            out.setdefault(name, {})[symbol] = {
+                "version": snap.version,
+                "age_s": round(snap.age(now), 3),
+            }
+        return out
+
+
+def _resolve(fut: asyncio.Future, snap: Snapshot) -> None:
+    if not fut.done():
+        fut.set_result(snap)
+
+
+snapshot_bus = SnapshotBus()
+
+
+def get_snapshot_bus() -> SnapshotBus:
+    return snapshot_bus
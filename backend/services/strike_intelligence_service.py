@@ -25,15 +25,18 @@ import logging
 import math
 import time as time_mod
 from datetime import datetime, time, date
-from typing import Dict, Any, Optional, List, Set
+from typing import Dict, Any, Optional, List
 from pathlib import Path
 
-from fastapi import WebSocket
 import pytz
 
 from services.cache import CacheService, _SHARED_CACHE
+from services.cadence import get_cadence_controller
 from services.global_indices_service import get_global_indices_service
+from services.quote_scheduler import Priority, get_quote_scheduler
+from services.session_clock import session_clock
 from services.strike_intelligence_ai import StrikeIntelligenceAIEngine
+from services.ws_outbox import BroadcastManager
 from config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -64,48 +67,11 @@ _STRIKE_AI_ENGINE = StrikeIntelligenceAIEngine()
 
 # ── Isolated WebSocket manager ───────────────────────────────────────────────
 
-class StrikeIntelConnectionManager:
+class StrikeIntelConnectionManager(BroadcastManager):
     """Completely isolated WebSocket manager for Strike Intelligence."""
 
-    def __init__(self):
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket):
-        await ws.accept()
-        async with self._lock:
-            self._connections.add(ws)
-
-    async def disconnect(self, ws: WebSocket):
-        async with self._lock:
-            self._connections.discard(ws)
-
-    async def broadcast(self, data: Dict[str, Any]):
-        if not self._connections:
-            return
-        msg = json.dumps(data, default=str)
-        dead: Set[WebSocket] = set()
-        async with self._lock:
-            clients = list(self._connections)
-        for ws in clients:
-            try:
-                await asyncio.wait_for(ws.send_text(msg), timeout=3.0)
-            except Exception:
-                dead.add(ws)
-        if dead:
-            async with self._lock:
-                self._connections -= dead
-
-    async def send_personal(self, ws: WebSocket, data: Dict[str, Any]):
-        try:
-            await asyncio.wait_for(
-                ws.send_text(json.dumps(data, default=str)), timeout=3.0
-            )
-        except Exception:
-            await self.disconnect(ws)
 
-
-strike_intel_manager = StrikeIntelConnectionManager()
+strike_intel_manager = StrikeIntelConnectionManager("strike_intelligence")
 
 
 # ── Helpers ──────────────────────────────────────────────────────────────────
@@ -128,10 +94,6 @@ def _clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
 
-def _chunked(items: List[str], size: int) -> List[List[str]]:
-    return [items[i:i + size] for i in range(0, len(items), size)]
-
-
 def _get_atm_strike(spot: float, step: int) -> int:
     """Round spot price to nearest strike (standard half-up, not banker's rounding)."""
     return int(spot / step + 0.5) * step
@@ -1680,7 +1642,8 @@ class StrikeIntelligenceService:
         self._instruments_cache: Dict[str, List] = {}
         self._instruments_cache_date: Dict[str, date] = {}
         self._last_save_time: float = 0.0
-        self._cadence_live = 0.5        # Broadcast every 0.5s during market hours
+        self._cadence_live = 0.5        # Base live broadcast cadence, adapted by services/cadence.py
+        self._cadence = get_cadence_controller().register("strike_intelligence", base=self._cadence_live)
         self._cadence_fetch = 1.5       # Full Zerodha quote fetch every 1.5s (was 2s)
         self._cadence_closed = 60.0
         self._heartbeat_interval = 30.0
@@ -2146,9 +2109,8 @@ class StrikeIntelligenceService:
             return
 
         try:
-            from kiteconnect import KiteConnect
-            self._kite = KiteConnect(api_key=cfg.zerodha_api_key)
-            self._kite.set_access_token(cfg.zerodha_access_token)
+            from services.kite_gateway import get_kite_gateway
+            self._kite = get_kite_gateway().sync_client()
             try:
                 self._kite.profile()
                 self._kite_initialized = True
@@ -2222,16 +2184,9 @@ class StrikeIntelligenceService:
     # ── Market phase detection ───────────────────────────────────────────
 
     def _get_market_phase(self) -> str:
-        now = datetime.now(IST)
-        wd = now.weekday()
-        if wd >= 5:
-            return "CLOSED"
-        t = now.time()
-        if time(9, 15) <= t <= time(15, 30):
-            return "LIVE"
-        if time(9, 0) <= t < time(9, 15):
-            return "PRE_OPEN"
-        return "CLOSED"
+        # Session clock: O(1) lookup on the precomputed timeline (holidays included).
+        status = session_clock.status()
+        return "PRE_OPEN" if status == "FREEZE" else status
 
     def _get_spot_price(self, symbol: str, *, allow_persistent_fallback: bool = True) -> float:
         """Get spot price from cache, with optional persistent fallback for closed-market mode."""
@@ -2369,9 +2324,8 @@ class StrikeIntelligenceService:
             return None
 
         try:
-            quotes: Dict[str, Any] = {}
-            for batch in _chunked(list(all_tokens_map.keys()), 200):
-                quotes.update(self._kite.quote(batch))
+            # Merged with other services' requests and split into batches by the scheduler
+            quotes: Dict[str, Any] = get_quote_scheduler().quote_sync(all_tokens_map, Priority.ANALYTICS)
         except Exception as e:
             logger.debug("Quote fetch failed for %s: %s", symbol, e)
             return None
@@ -2727,6 +2681,7 @@ class StrikeIntelligenceService:
         _closed_fetch_done = False
 
         while self._running:
+            started = time_mod.perf_counter()
             try:
                 phase = self._get_market_phase()
                 now_ts = time_mod.time()
@@ -2787,7 +2742,8 @@ class StrikeIntelligenceService:
                                 "data": broadcast_data,
                             })
 
-                    await asyncio.sleep(self._cadence_live)
+                    self._cadence.record(time_mod.perf_counter() - started)
+                    await asyncio.sleep(self._cadence.interval)
 
                 # ── CLOSED ───────────────────────────────────────────────────
                 else:
@@ -75,6 +75,14 @@ class TokenWatcher(FileSystemEventHandler):
                 # Update stored token
                 self.last_token = new_token
                 
+                # Swap it into the shared Kite REST client before anyone calls out
+                from services.kite_gateway import get_kite_gateway
+                get_kite_gateway().set_access_token(new_token)
+                
+                # Drop the token manager's cached verdict for the old token
+                from services.global_token_manager import get_token_manager
+                get_token_manager().force_recheck()
+                
                 # Update unified auth regardless of sync/async implementation.
                 maybe_awaitable = self.unified_auth.update_token(new_token)
                 if inspect.isawaitable(maybe_awaitable):
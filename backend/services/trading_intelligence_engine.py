@@ -10,7 +10,7 @@ Stack (all optional except NumPy — graceful degradation):
     TensorFlow  — 5-class softmax head (NumPy softmax fallback)
 
 Architecture:
-    Zerodha tick → MarketFeed → cache (market:{SYMBOL})
+    Zerodha tick → MarketFeed → snapshot bus (MARKET)
                                       │
                                       ▼
                        TradingIntelligenceEngine
@@ -25,17 +25,18 @@ Architecture:
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import time
 from collections import deque
 from threading import Lock
-from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from typing import Any, Deque, Dict, List, Optional, Tuple
 
 import numpy as np
-from fastapi import WebSocket
 
 from services.cache import CacheService
+from services.cadence import get_cadence_controller
+from services.snapshot_bus import MARKET, snapshot_bus
+from services.ws_outbox import BroadcastManager
 
 logger = logging.getLogger(__name__)
 
@@ -205,44 +206,12 @@ if _TF_HEAD: logger.info("[TIE] TensorFlow head warm-trained")
 
 # ── Connection manager ───────────────────────────────────────────────────────
 
-class IntelligenceConnectionManager:
-    def __init__(self) -> None:
-        self._clients: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
-
-    async def connect(self, ws: WebSocket) -> None:
-        await ws.accept()
-        async with self._lock:
-            self._clients.add(ws)
-
-    async def disconnect(self, ws: WebSocket) -> None:
-        async with self._lock:
-            self._clients.discard(ws)
+class IntelligenceConnectionManager(BroadcastManager):
+    """Isolated WebSocket manager for the trading intelligence stream."""
 
     @property
     def clients(self) -> int:
-        return len(self._clients)
-
-    async def send_personal(self, ws: WebSocket, payload: Dict[str, Any]) -> None:
-        try:
-            await ws.send_text(json.dumps(payload, default=str))
-        except Exception:
-            pass
-
-    async def broadcast(self, payload: Dict[str, Any]) -> None:
-        if not self._clients:
-            return
-        text = json.dumps(payload, default=str)
-        dead: List[WebSocket] = []
-        for ws in list(self._clients):
-            try:
-                await ws.send_text(text)
-            except Exception:
-                dead.append(ws)
-        if dead:
-            async with self._lock:
-                for ws in dead:
-                    self._clients.discard(ws)
+        return self.client_count
 
 
 # ── Per-symbol rolling state ─────────────────────────────────────────────────
@@ -594,7 +563,10 @@ class TradingIntelligenceEngine:
         return snap
 
     async def refresh_from_cache(self, symbol: str) -> Optional[Dict[str, Any]]:
-        tick = await self.cache.get_market_data(symbol)
+        # Live ticks come straight off the snapshot bus; the cache only answers
+        # (with the persisted last-known state) before this process has a tick.
+        snap = snapshot_bus.get(MARKET, symbol)
+        tick = snap.value if snap is not None else await self.cache.get_market_data(symbol)
         if not tick:
             return self._state[symbol].snapshot
         return self.infer(symbol, tick)
@@ -611,7 +583,7 @@ class TradingIntelligenceEngine:
 # ── Singletons ───────────────────────────────────────────────────────────────
 
 intelligence_engine = TradingIntelligenceEngine()
-intelligence_manager = IntelligenceConnectionManager()
+intelligence_manager = IntelligenceConnectionManager("trading_intelligence")
 
 _loop_task: Optional[asyncio.Task] = None
 _loop_running: bool = False
@@ -623,8 +595,10 @@ async def _broadcast_loop() -> None:
     global _loop_running
     _loop_running = True
     logger.info("[TIE] Broadcast loop started")
+    cadence = get_cadence_controller().register("trading_intelligence", base=1.5)
     try:
         while _loop_running:
+            started = time.perf_counter()
             try:
                 snaps = await intelligence_engine.snapshot_all()
                 any_live = any(s.get("status") == "LIVE" for s in snaps.values())
@@ -634,7 +608,8 @@ async def _broadcast_loop() -> None:
                         "data": snaps,
                         "timestamp": time.time(),
                     })
-                await asyncio.sleep(1.5 if any_live else 15.0)
+                cadence.record(time.perf_counter() - started)
+                await asyncio.sleep(cadence.interval if any_live else 15.0)
             except Exception:
                 logger.exception("[TIE] Broadcast iteration failed")
                 await asyncio.sleep(3.0)
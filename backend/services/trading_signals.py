@@ -337,43 +337,39 @@ def generate_trading_signals(df: pd.DataFrame) -> pd.DataFrame:
     df["buy_cross"] = crossed_above(df["ema20"], df["ema50"])
     df["sell_cross"] = crossed_below(df["ema20"], df["ema50"])
     
-    # Market bias (using 200 EMA anchor)
-    df["bias"] = df.apply(determine_market_bias, axis=1)
-    
-    # Entry signals
-    df["signal"] = df.apply(generate_entry_signal, axis=1)
+    # Market bias (using 200 EMA anchor) — determine_market_bias, column-wise
+    threshold = df["ema200"] * 0.005
+    df["bias"] = np.select(
+        [df["close"] > df["ema200"] + threshold, df["close"] < df["ema200"] - threshold],
+        ["BULL", "BEAR"],
+        default="SIDEWAYS",
+    )
     
-    # Calculate confidence based on EMA alignment
-    def calculate_signal_confidence(row):
-        """Higher confidence when EMAs are well-aligned"""
-        if row["signal"] == "HOLD":
-            return 0.0
-        
-        # Count how many EMAs are correctly aligned
-        if row["signal"] == "BUY":
-            # For BUY: EMA20 > EMA50 > EMA100 (ideally > EMA200)
-            alignment = 0
-            if row["ema20"] > row["ema50"]:
-                alignment += 1
-            if row["ema50"] > row["ema100"]:
-                alignment += 1
-            if row["ema100"] > row["ema200"]:
-                alignment += 1
-            confidence = 0.5 + (alignment * 0.15)  # 0.5 to 0.95
-        else:  # SELL
-            # For SELL: EMA20 < EMA50 < EMA100 (ideally < EMA200)
-            alignment = 0
-            if row["ema20"] < row["ema50"]:
-                alignment += 1
-            if row["ema50"] < row["ema100"]:
-                alignment += 1
-            if row["ema100"] < row["ema200"]:
-                alignment += 1
-            confidence = 0.5 + (alignment * 0.15)
-        
-        return min(confidence, 0.95)
+    # Entry signals — generate_entry_signal, column-wise
+    df["signal"] = np.select(
+        [
+            (df["bias"] == "BULL") & df["buy_cross"] & (df["close"] >= df["ema50"]),
+            (df["bias"] == "BEAR") & df["sell_cross"] & (df["close"] <= df["ema50"]),
+        ],
+        ["BUY", "SELL"],
+        default="HOLD",
+    )
     
-    df["confidence"] = df.apply(calculate_signal_confidence, axis=1)
+    # Confidence from EMA alignment: 0.5 + 0.15 per correctly ordered pair (max 0.95)
+    bullish_alignment = (
+        (df["ema20"] > df["ema50"]).astype(int)
+        + (df["ema50"] > df["ema100"]).astype(int)
+        + (df["ema100"] > df["ema200"]).astype(int)
+    )
+    bearish_alignment = (
+        (df["ema20"] < df["ema50"]).astype(int)
+        + (df["ema50"] < df["ema100"]).astype(int)
+        + (df["ema100"] < df["ema200"]).astype(int)
+    )
+    alignment = np.where(df["signal"] == "BUY", bullish_alignment, bearish_alignment)
+    df["confidence"] = np.where(
+        df["signal"] == "HOLD", 0.0, np.minimum(0.5 + alignment * 0.15, 0.95)
+    )
     
     return df
 
@@ -398,36 +394,35 @@ def extract_trades(df: pd.DataFrame, sl_points: float = 10, rr_ratio: float = 2.
     """
     trades = []
     
-    for idx, row in df.iterrows():
-        if row["signal"] in ["BUY", "SELL"]:
-            entry_price = float(row["close"])
-            direction = row["signal"]
-            
-            # Calculate SL and Target
-            sl, target = calculate_risk_reward(entry_price, direction, sl_points, rr_ratio)
-            
-            # Create trade signal
-            trade = TradeSignal(
-                timestamp=row.get("time", datetime.now()) if "time" in df.columns else datetime.now(),
-                symbol=row.get("symbol", "UNKNOWN"),
-                signal=direction,
-                entry_price=round(entry_price, 2),
-                stop_loss=sl,
-                target=target,
-                bias=row.get("bias", "UNKNOWN"),
-                confidence=float(row.get("confidence", 0)),
-                ema_20=round(float(row.get("ema20", 0)), 2),
-                ema_50=round(float(row.get("ema50", 0)), 2),
-                ema_100=round(float(row.get("ema100", 0)), 2),
-                ema_200=round(float(row.get("ema200", 0)), 2),
-                reasons=[
-                    f"EMA20 {'crossed above' if direction == 'BUY' else 'crossed below'} EMA50",
-                    f"{direction} bias confirmed ({row.get('bias', 'UNKNOWN')})",
-                    f"Price at ₹{entry_price:.2f}",
-                    f"Confidence: {float(row.get('confidence', 0)):.0%}"
-                ]
-            )
-            trades.append(trade)
+    for row in df[df["signal"].isin(["BUY", "SELL"])].to_dict("records"):
+        entry_price = float(row["close"])
+        direction = row["signal"]
+        
+        # Calculate SL and Target
+        sl, target = calculate_risk_reward(entry_price, direction, sl_points, rr_ratio)
+        
+        # Create trade signal
+        trade = TradeSignal(
+            timestamp=row.get("time", datetime.now()) if "time" in df.columns else datetime.now(),
+            symbol=row.get("symbol", "UNKNOWN"),
+            signal=direction,
+            entry_price=round(entry_price, 2),
+            stop_loss=sl,
+            target=target,
+            bias=row.get("bias", "UNKNOWN"),
+            confidence=float(row.get("confidence", 0)),
+            ema_20=round(float(row.get("ema20", 0)), 2),
+            ema_50=round(float(row.get("ema50", 0)), 2),
+            ema_100=round(float(row.get("ema100", 0)), 2),
+            ema_200=round(float(row.get("ema200", 0)), 2),
+            reasons=[
+                f"EMA20 {'crossed above' if direction == 'BUY' else 'crossed below'} EMA50",
+                f"{direction} bias confirmed ({row.get('bias', 'UNKNOWN')})",
+                f"Price at ₹{entry_price:.2f}",
+                f"Confidence: {float(row.get('confidence', 0)):.0%}"
+            ]
+        )
+        trades.append(trade)
     
     return trades
 
@@ -166,13 +166,10 @@ class UnifiedAuthService:
         try:
             print(f"🔍 UNIFIED AUTH: Validating token...")
             
-            from kiteconnect import KiteConnect
             from kiteconnect.exceptions import TokenException
-            kite = KiteConnect(api_key=self.settings.zerodha_api_key)
-            kite.set_access_token(self._token)
-            
-            # Quick profile check
-            profile = kite.profile()
+            from services.kite_gateway import get_kite_gateway
+            # Quick profile check with this token; the shared client keeps its own
+            profile = await get_kite_gateway().profile(token=self._token)
             
             self._status = AuthStatus.VALID
             self._user_info = profile
@@ -1,17 +1,38 @@
 """Lightweight user analytics service.
 
-Tracks login counts, unique visitors, and currently active app users.
-All state is in-memory and isolated from trading functionality.
+Tracks login counts, unique visitors, and currently active app users,
+isolated from trading functionality.
+
+Bookkeeping is synchronous and in-memory — a WebSocket connect records its
+session without awaiting anything — and get_summary reads incrementally
+maintained counters (active identities are reference-counted per session).
+Each change also queues an event; a background batcher group-commits the
+queue every ANALYTICS_FLUSH_MS to data/analytics/analytics.db together with
+the records it touched (services/analytics_store.py), so logins, visitors
+and totals survive a restart. If the database cannot be opened the service
+carries on in memory.
 """
 
 from __future__ import annotations
 
 import asyncio
 import hashlib
+import heapq
+import logging
 import re
+import time
+from collections import Counter
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any
 
+from config import get_settings
+from services.analytics_store import DB_NAME, LOGIN, USER, AnalyticsStore
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data" / "analytics"
+
 
 _ID_PATTERN = re.compile(r"[^a-zA-Z0-9._:@-]")
 
@@ -42,58 +63,92 @@ def _display_name(user_name: str | None, user_id: str | None, visitor_id: str) -
 
 
 class UserAnalyticsService:
-    """In-memory analytics registry for user usage stats."""
+    """Analytics registry: in-memory counters, persisted by a background batcher."""
 
-    def __init__(self) -> None:
-        self._lock = asyncio.Lock()
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        flush_interval: float | None = None,
+        max_pending: int | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.path = Path(path) if path is not None else DATA_DIR / DB_NAME
+        self.flush_interval = flush_interval if flush_interval is not None else settings.analytics_flush_ms / 1000.0
+        self.max_pending = max(int(max_pending if max_pending is not None else settings.analytics_max_pending), 1)
         self._login_events = 0
         self._visit_events = 0
         self._logins: dict[str, dict[str, Any]] = {}
         self._users: dict[str, dict[str, Any]] = {}
-        self._sessions: dict[str, dict[str, Any]] = {}
-
-    async def register_login(self, user_id: str, user_name: str | None = None) -> None:
+        self._sessions: dict[str, str] = {}          # session id → identity (user id, else visitor id)
+        self._active: Counter[str] = Counter()       # identity → open sessions
+
+        # Write-behind queue, drained by _loop
+        self._pending: list[tuple[str, str, dict[str, Any]]] = []
+        self._dirty_users: set[str] = set()
+        self._dirty_logins: set[str] = set()
+        self._store: AnalyticsStore | None = None
+        self._store_failed = False
+        self._task: asyncio.Task | None = None
+        self._running = False
+        self.flushes = 0
+        self.flushed_events = 0
+        self.dropped_events = 0
+        self.last_flush_ms = 0.0
+
+    # ── Bookkeeping (synchronous, never touches disk) ─────────────────────
+
+    def _record(self, kind: str, at: str, **payload: Any) -> None:
+        self._pending.append((at, kind, payload))
+        overflow = len(self._pending) - self.max_pending
+        if overflow > 0:                              # disk lagging or unavailable: keep the newest
+            del self._pending[:overflow]
+            self.dropped_events += overflow
+
+    def register_login(self, user_id: str, user_name: str | None = None) -> None:
         uid = _sanitize_identifier(user_id, "user")
         now = _now_iso()
 
-        async with self._lock:
-            self._login_events += 1
-            login_entry = self._logins.get(uid)
-            if login_entry is None:
-                login_entry = {
-                    "user_id": uid,
-                    "user_name": (user_name or uid)[:64],
-                    "login_count": 0,
-                    "last_login_at": now,
-                }
-                self._logins[uid] = login_entry
-
-            login_entry["login_count"] += 1
-            login_entry["last_login_at"] = now
-            if user_name and user_name.strip():
-                login_entry["user_name"] = user_name.strip()[:64]
-
-            combined = self._users.get(uid)
-            if combined is None:
-                combined = {
-                    "id": uid,
-                    "display_name": _display_name(user_name, uid, uid),
-                    "user_id": uid,
-                    "visitor_id": uid,
-                    "source": "login",
-                    "first_seen_at": now,
-                    "last_seen_at": now,
-                    "visit_count": 0,
-                    "login_count": 0,
-                }
-                self._users[uid] = combined
+        self._login_events += 1
+        login_entry = self._logins.get(uid)
+        if login_entry is None:
+            login_entry = {
+                "user_id": uid,
+                "user_name": (user_name or uid)[:64],
+                "login_count": 0,
+                "last_login_at": now,
+            }
+            self._logins[uid] = login_entry
+
+        login_entry["login_count"] += 1
+        login_entry["last_login_at"] = now
+        if user_name and user_name.strip():
+            login_entry["user_name"] = user_name.strip()[:64]
+
+        combined = self._users.get(uid)
+        if combined is None:
+            combined = {
+                "id": uid,
+                "display_name": _display_name(user_name, uid, uid),
+                "user_id": uid,
+                "visitor_id": uid,
+                "source": "login",
+                "first_seen_at": now,
+                "last_seen_at": now,
+                "visit_count": 0,
+                "login_count": 0,
+            }
+            self._users[uid] = combined
+
+        combined["last_seen_at"] = now
+        combined["login_count"] = login_entry["login_count"]
+        if user_name and user_name.strip():
+            combined["display_name"] = user_name.strip()[:64]
 
-            combined["last_seen_at"] = now
-            combined["login_count"] = login_entry["login_count"]
-            if user_name and user_name.strip():
-                combined["display_name"] = user_name.strip()[:64]
+        self._dirty_logins.add(uid)
+        self._dirty_users.add(uid)
+        self._record("login", now, user_id=uid, user_name=login_entry["user_name"])
 
-    async def register_visit(
+    def register_visit(
         self,
         visitor_id: str,
         user_id: str | None = None,
@@ -104,34 +159,36 @@ class UserAnalyticsService:
         key = uid or vid
         now = _now_iso()
 
-        async with self._lock:
-            self._visit_events += 1
-            record = self._users.get(key)
-            if record is None:
-                record = {
-                    "id": key,
-                    "display_name": _display_name(user_name, uid, vid),
-                    "user_id": uid,
-                    "visitor_id": vid,
-                    "source": "auth" if uid else "visitor",
-                    "first_seen_at": now,
-                    "last_seen_at": now,
-                    "visit_count": 0,
-                    "login_count": self._logins.get(uid, {}).get("login_count", 0) if uid else 0,
-                }
-                self._users[key] = record
-
-            record["last_seen_at"] = now
-            record["visit_count"] += 1
-            record["source"] = "auth" if uid else record["source"]
-            record["visitor_id"] = vid
-            if uid:
-                record["user_id"] = uid
-                record["login_count"] = self._logins.get(uid, {}).get("login_count", record["login_count"])
-            if user_name and user_name.strip():
-                record["display_name"] = user_name.strip()[:64]
-
-    async def connect_session(
+        self._visit_events += 1
+        record = self._users.get(key)
+        if record is None:
+            record = {
+                "id": key,
+                "display_name": _display_name(user_name, uid, vid),
+                "user_id": uid,
+                "visitor_id": vid,
+                "source": "auth" if uid else "visitor",
+                "first_seen_at": now,
+                "last_seen_at": now,
+                "visit_count": 0,
+                "login_count": self._logins.get(uid, {}).get("login_count", 0) if uid else 0,
+            }
+            self._users[key] = record
+
+        record["last_seen_at"] = now
+        record["visit_count"] += 1
+        record["source"] = "auth" if uid else record["source"]
+        record["visitor_id"] = vid
+        if uid:
+            record["user_id"] = uid
+            record["login_count"] = self._logins.get(uid, {}).get("login_count", record["login_count"])
+        if user_name and user_name.strip():
+            record["display_name"] = user_name.strip()[:64]
+
+        self._dirty_users.add(key)
+        self._record("visit", now, visitor_id=vid, user_id=uid)
+
+    def connect_session(
         self,
         session_id: str,
         visitor_id: str,
@@ -141,70 +198,172 @@ class UserAnalyticsService:
         sid = _sanitize_identifier(session_id, "session")
         vid = _sanitize_identifier(visitor_id, "visitor")
         uid = _sanitize_identifier(user_id, "user") if user_id else None
-        now = _now_iso()
 
-        await self.register_visit(visitor_id=vid, user_id=uid, user_name=user_name)
+        self.register_visit(visitor_id=vid, user_id=uid, user_name=user_name)
 
-        async with self._lock:
-            self._sessions[sid] = {
-                "session_id": sid,
-                "visitor_id": vid,
-                "user_id": uid,
-                "connected_at": now,
-                "last_seen_at": now,
-            }
+        identity = uid or vid
+        previous = self._sessions.get(sid)
+        if previous is not None:
+            self._release(previous)
+        self._sessions[sid] = identity
+        self._active[identity] += 1
+        self._record("connect", _now_iso(), session_id=sid, visitor_id=vid, user_id=uid)
 
-    async def disconnect_session(self, session_id: str) -> None:
+    def disconnect_session(self, session_id: str) -> None:
         sid = _sanitize_identifier(session_id, "session")
-        async with self._lock:
-            self._sessions.pop(sid, None)
-
-    async def get_summary(self, limit: int = 10) -> dict[str, Any]:
+        identity = self._sessions.pop(sid, None)
+        if identity is None:
+            return
+        self._release(identity)
+        self._record("disconnect", _now_iso(), session_id=sid)
+
+    def _release(self, identity: str) -> None:
+        self._active[identity] -= 1
+        if self._active[identity] <= 0:
+            del self._active[identity]
+
+    def get_summary(self, limit: int = 10) -> dict[str, Any]:
         safe_limit = max(1, min(limit, 50))
-
-        async with self._lock:
-            active_identity_ids = {
-                session.get("user_id") or session.get("visitor_id")
-                for session in self._sessions.values()
-                if (session.get("user_id") or session.get("visitor_id"))
-            }
-
-            users = []
-            for entry in self._users.values():
-                user_id = entry.get("user_id")
-                identity_key = user_id or entry.get("visitor_id")
-                users.append(
-                    {
-                        "id": entry.get("id"),
-                        "display_name": entry.get("display_name"),
-                        "user_id": user_id,
-                        "source": entry.get("source", "visitor"),
-                        "visit_count": entry.get("visit_count", 0),
-                        "login_count": entry.get("login_count", 0),
-                        "last_seen_at": entry.get("last_seen_at"),
-                        "is_active": identity_key in active_identity_ids,
-                    }
-                )
-
-            users.sort(
-                key=lambda item: (
-                    item.get("is_active", False),
-                    item.get("last_seen_at") or "",
-                ),
-                reverse=True,
+        active = self._active
+
+        def rank(entry: dict[str, Any]) -> tuple[bool, str]:
+            identity = entry.get("user_id") or entry.get("visitor_id")
+            return identity in active, entry.get("last_seen_at") or ""
+
+        users = []
+        for entry in heapq.nlargest(safe_limit, self._users.values(), key=rank):
+            user_id = entry.get("user_id")
+            users.append(
+                {
+                    "id": entry.get("id"),
+                    "display_name": entry.get("display_name"),
+                    "user_id": user_id,
+                    "source": entry.get("source", "visitor"),
+                    "visit_count": entry.get("visit_count", 0),
+                    "login_count": entry.get("login_count", 0),
+                    "last_seen_at": entry.get("last_seen_at"),
+                    "is_active": (user_id or entry.get("visitor_id")) in active,
+                }
             )
 
-            return {
-                "totals": {
-                    "logged_in_users": len(self._logins),
-                    "login_events": self._login_events,
-                    "app_users": len(self._users),
-                    "active_users": len(active_identity_ids),
-                    "visit_events": self._visit_events,
-                },
-                "users": users[:safe_limit],
-                "generated_at": _now_iso(),
-            }
+        return {
+            "totals": {
+                "logged_in_users": len(self._logins),
+                "login_events": self._login_events,
+                "app_users": len(self._users),
+                "active_users": len(active),
+                "visit_events": self._visit_events,
+            },
+            "users": users,
+            "generated_at": _now_iso(),
+        }
+
+    # ── Persistence (background group commit) ─────────────────────────────
+
+    def _open_store(self) -> AnalyticsStore | None:
+        if self._store is None and not self._store_failed:
+            try:
+                self._store = AnalyticsStore(self.path)
+            except Exception as exc:
+                self._store_failed = True
+                logger.warning("📊 Analytics: store unavailable, keeping analytics in memory — %s", exc)
+        return self._store
+
+    def _restore(self, records: dict[str, dict[str, dict[str, Any]]], totals: dict[str, int]) -> None:
+        """Merge persisted state under anything recorded since this process started."""
+        for uid, entry in records.get(LOGIN, {}).items():
+            self._logins.setdefault(uid, entry)
+        for key, entry in records.get(USER, {}).items():
+            self._users.setdefault(key, entry)
+        self._login_events += totals.get("login_events", 0)
+        self._visit_events += totals.get("visit_events", 0)
+
+    async def start(self) -> None:
+        """Load persisted analytics and start the batcher."""
+        if self._running:
+            return
+        store = await asyncio.to_thread(self._open_store)
+        if store is not None:
+            try:
+                self._restore(*await asyncio.to_thread(store.load))
+            except Exception as exc:
+                logger.warning("📊 Analytics: could not load %s — %s", self.path, exc)
+        self._running = True
+        self._task = asyncio.create_task(self._loop(), name="analytics_batcher")
+
+    async def stop(self) -> None:
+        """Stop the batcher and commit whatever is still queued."""
+        self._running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    async def _loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as exc:
+                logger.error("📊 Analytics flush failed: %s", exc)
+
+    async def flush(self) -> int:
+        """Commit queued events and touched records in one transaction; returns events written."""
+        if not (self._pending or self._dirty_users or self._dirty_logins):
+            return 0
+        store = self._store or await asyncio.to_thread(self._open_store)
+        if store is None:
+            self._pending.clear()
+            self._dirty_users.clear()
+            self._dirty_logins.clear()
+            return 0
+
+        # Detach the batch on the loop thread; the writer thread gets copies.
+        events, self._pending = self._pending, []
+        users, self._dirty_users = self._dirty_users, set()
+        logins, self._dirty_logins = self._dirty_logins, set()
+        records = [(USER, key, dict(self._users[key])) for key in users if key in self._users]
+        records += [(LOGIN, uid, dict(self._logins[uid])) for uid in logins if uid in self._logins]
+        totals = {"login_events": self._login_events, "visit_events": self._visit_events}
+
+        started = time.perf_counter()
+        try:
+            written = await asyncio.to_thread(store.write_batch, events, records, totals)
+        except Exception:
+            self._pending[:0] = events               # retried on the next tick, still bounded
+            self._dirty_users |= users
+            self._dirty_logins |= logins
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped_events += overflow
+            raise
+        self.flushes += 1
+        self.flushed_events += written
+        self.last_flush_ms = (time.perf_counter() - started) * 1000.0
+        return written
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "persisting": self._store is not None,
+            "path": str(self.path),
+            "flushIntervalMs": round(self.flush_interval * 1000),
+            "pendingEvents": len(self._pending),
+            "flushes": self.flushes,
+            "flushedEvents": self.flushed_events,
+            "droppedEvents": self.dropped_events,
+            "lastFlushMs": round(self.last_flush_ms, 2),
+            "activeSessions": len(self._sessions),
+        }
 
 
 user_analytics = UserAnalyticsService()
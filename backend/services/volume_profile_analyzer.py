@@ -16,6 +16,8 @@ from typing import Dict, List, Tuple, Optional
 import statistics
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -107,14 +109,16 @@ class VolumeProfileAnalyzer:
         
         Args:
             symbol: Trading symbol
-            candle_data: List of OHLCV candles (recent data)
+            candle_data: List of OHLCV candles (recent data); empty → the
+                tick-built session profile of the symbol's future, if it has one
             
         Returns:
             VolumeProfileReport with profile analysis
         """
         with self.lock:
             if not candle_data:
-                return VolumeProfileReport(symbol=symbol, timestamp=datetime.now())
+                return self._report_from_session(symbol) or VolumeProfileReport(symbol=symbol,
+                                                                                timestamp=datetime.now())
             
             # Build price-level map
             price_volume_map = self._build_price_volume_map(candle_data)
@@ -157,31 +161,66 @@ class VolumeProfileAnalyzer:
                 likely_next_move=likely_move,
             )
     
+    def _report_from_session(self, symbol: str) -> Optional[VolumeProfileReport]:
+        """Report from services.session_profile (volume-at-price built from ticks)."""
+        from services.session_profile import get_session_profiles
+
+        profile = get_session_profiles().for_symbol(symbol)
+        snapshot = profile.snapshot() if profile is not None else None
+        if snapshot is None:
+            return None
+        price_volume_map = profile.levels()
+        price_levels = self._calculate_price_levels(price_volume_map)
+        value_area = (snapshot["value_area"]["low"], snapshot["value_area"]["high"])
+        last = snapshot["last_price"] or snapshot["vwap"]
+        return VolumeProfileReport(
+            symbol=symbol,
+            timestamp=datetime.now(),
+            price_levels=price_levels,
+            point_of_control=snapshot["poc"],
+            value_area_high=value_area[1],
+            value_area_low=value_area[0],
+            concentration=self._calculate_concentration(price_volume_map),
+            asymmetry=self._calculate_asymmetry(price_levels, snapshot["poc"]),
+            accumulation_zones=self._identify_accumulation_zones(price_levels, price_volume_map),
+            distribution_zones=self._identify_distribution_zones(price_levels, price_volume_map),
+            support_level=self._find_support_level(price_levels),
+            resistance_level=self._find_resistance_level(price_levels),
+            likely_next_move=self._predict_next_move([{"open": snapshot["vwap"], "close": last}],
+                                                     price_levels, value_area),
+        )
+
     def _build_price_volume_map(self, candles: List[Dict]) -> Dict[float, float]:
-        """Build mapping of price levels to cumulative volume"""
-        price_volume = {}
+        """Build mapping of price levels to cumulative volume
+
+        Each candle's volume is spread evenly over the 0.05 ladder from its low
+        to its high. The rungs of every candle are laid out in one array and
+        summed per ladder index (~60k rungs for 100 5m candles), rather than
+        one dict update per rung.
+        """
         price_step = 0.05  # Round to nearest 0.05
-        
-        for candle in candles:
-            low = candle.get('low', 0)
-            high = candle.get('high', 0)
-            volume = candle.get('volume', 0)
-            
-            if high <= low or volume == 0:
-                continue
-            
-            # Distribute volume across range
-            price_range = high - low
-            num_steps = max(1, int(price_range / price_step))
-            volume_per_step = volume / num_steps
-            
-            price = low
-            while price <= high:
-                price_rounded = round(price / price_step) * price_step
-                price_volume[price_rounded] = price_volume.get(price_rounded, 0) + volume_per_step
-                price += price_step
-        
-        return price_volume
+        if not candles:
+            return {}
+
+        low, high, volume = np.array(
+            [(c.get('low', 0), c.get('high', 0), c.get('volume', 0)) for c in candles], dtype=float
+        ).T
+        keep = (high > low) & (volume != 0)
+        if not keep.any():
+            return {}
+        low, high, volume = low[keep], high[keep], volume[keep]
+
+        # Distribute volume across range
+        price_range = high - low
+        num_steps = np.maximum(1, (price_range / price_step).astype(np.int64))
+        volume_per_step = volume / num_steps
+        rungs = np.floor(price_range / price_step + 1e-9).astype(np.int64) + 1
+
+        offsets = np.arange(rungs.sum()) - np.repeat(np.cumsum(rungs) - rungs, rungs)
+        index = np.rint((np.repeat(low, rungs) + offsets * price_step) / price_step).astype(np.int64)
+        levels, slot = np.unique(index, return_inverse=True)
+        totals = np.bincount(slot, weights=np.repeat(volume_per_step, rungs))
+        return dict(zip((levels * price_step).tolist(), totals.tolist()))
     
     def _calculate_price_levels(self, price_volume: Dict[float, float]) -> List[PriceLevel]:
         """Calculate price levels with metrics"""
@@ -191,31 +230,31 @@ class VolumeProfileAnalyzer:
         total_volume = sum(price_volume.values())
         
         # Sort by price
-        sorted_levels = sorted(price_volume.items(), key=lambda x: x[0])
+        prices = np.fromiter(price_volume.keys(), dtype=float, count=len(price_volume))
+        volumes = np.fromiter(price_volume.values(), dtype=float, count=len(price_volume))
+        order = np.argsort(prices, kind="stable")
+        prices, volumes = prices[order], volumes[order]
         
         # Calculate cumulative volume and metrics
-        price_levels = []
-        cumulative = 0
-        max_vol = max(price_volume.values())
-        
-        for price, volume in sorted_levels:
-            cumulative += volume
-            percentage = (volume / total_volume * 100) if total_volume > 0 else 0
-            strength = volume / max_vol if max_vol > 0 else 0
-            
-            # Key levels have >5% of total volume
-            is_key_level = percentage > 5
-            
-            price_levels.append(PriceLevel(
+        cumulative = np.cumsum(volumes)
+        max_vol = volumes.max()
+        percentage = volumes / total_volume * 100 if total_volume > 0 else np.zeros_like(volumes)
+        strength = volumes / max_vol if max_vol > 0 else np.zeros_like(volumes)
+        
+        # Key levels have >5% of total volume
+        return [
+            PriceLevel(
                 price=price,
-                cumulative_volume=cumulative,
-                percentage_of_total=percentage,
-                strength=strength,
-                is_key_level=is_key_level,
+                cumulative_volume=cum,
+                percentage_of_total=pct,
+                strength=strg,
+                is_key_level=pct > 5,
                 support_resistance_type="NEUTRAL",
-            ))
-        
-        return price_levels
+            )
+            for price, cum, pct, strg in zip(
+                prices.tolist(), cumulative.tolist(), percentage.tolist(), strength.tolist()
+            )
+        ]
     
     def _find_point_of_control(self, price_levels: List[PriceLevel]) -> float:
         """Find price level with highest volume"""
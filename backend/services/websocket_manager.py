@@ -1,68 +1,31 @@
 """WebSocket connection manager for broadcasting market data."""
-import json
 from typing import Dict, Set, Any
 from fastapi import WebSocket
-import asyncio
 
+from services.ws_outbox import BroadcastManager
 
-class ConnectionManager:
-    """Manages WebSocket connections and broadcasts."""
+
+class ConnectionManager(BroadcastManager):
+    """Manages WebSocket connections and broadcasts.
+
+    Sends go through per-client outboxes (services/ws_outbox.py): a
+    broadcast enqueues once per client and returns, auth_status outranks
+    ticks, ticks outrank analysis, and a client that falls behind is
+    disconnected instead of holding everyone else's cycle.
+    """
     
     def __init__(self):
-        self.active_connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
+        super().__init__("market")
     
     async def connect(self, websocket: WebSocket):
         """Accept and register a new WebSocket connection."""
-        await websocket.accept()
-        async with self._lock:
-            self.active_connections.add(websocket)
-        print(f"📱 Client connected. Total: {len(self.active_connections)}")
+        await super().connect(websocket)
+        print(f"📱 Client connected. Total: {self.connection_count}")
     
     async def disconnect(self, websocket: WebSocket):
         """Remove a WebSocket connection."""
-        async with self._lock:
-            self.active_connections.discard(websocket)
-        print(f"📴 Client disconnected. Total: {len(self.active_connections)}")
-    
-    async def broadcast(self, data: Dict[str, Any]):
-        """Broadcast data to all connected clients.
-        
-        Snapshots the connection set under the lock, then sends
-        outside the lock so one slow client cannot block others.
-        """
-        if not self.active_connections:
-            return
-        
-        message = json.dumps(data)
-        
-        # Snapshot connections under lock (fast)
-        async with self._lock:
-            connections = list(self.active_connections)
-        
-        # Send to all clients concurrently (outside lock)
-        async def _send(conn: WebSocket):
-            try:
-                await asyncio.wait_for(conn.send_text(message), timeout=5.0)
-                return None
-            except Exception:
-                return conn
-        
-        results = await asyncio.gather(*[_send(c) for c in connections], return_exceptions=True)
-        
-        # Collect disconnected clients
-        disconnected = {r for r in results if isinstance(r, WebSocket)}
-        
-        if disconnected:
-            async with self._lock:
-                self.active_connections -= disconnected
-    
-    async def send_personal(self, websocket: WebSocket, data: Dict[str, Any]):
-        """Send data to a specific client."""
-        try:
-            await websocket.send_text(json.dumps(data))
-        except Exception:
-            await self.disconnect(websocket)
+        await super().disconnect(websocket)
+        print(f"📴 Client disconnected. Total: {self.connection_count}")
     
     async def broadcast_ai_update(self, symbol: str, analysis: Dict[str, Any]):
         """Broadcast AI analysis update to all clients."""
@@ -92,10 +55,14 @@ class ConnectionManager:
         await self.broadcast(notification)
         print(f"📢 Broadcasted auth status: {status} - {message}")
     
+    @property
+    def active_connections(self) -> Set[WebSocket]:
+        return self.connections
+    
     @property
     def connection_count(self) -> int:
         """Get the number of active connections."""
-        return len(self.active_connections)
+        return self.client_count
 
 
 # Global manager instance
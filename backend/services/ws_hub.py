@@ -0,0 +1,392 @@
+"""Stream hub — one multiplexed WebSocket for every live topic.
+
+A dashboard tab opened a socket per panel: /ws/market, /ws/analysis,
+/ws/advanced, /ws/compass, /ws/liquidity, /ws/ict, … — around twenty, each
+with its own accept, heartbeat timer and send queue, and the polling
+endpoints (/ws/analysis, /ws/advanced, /ws/algo, /ws/fii-dii) recomputed
+the same payload in a loop per connection.
+
+The hub fans every topic out from one place. A client opens /ws/stream and
+subscribes to named topics, optionally narrowed to symbols; every frame is
+the original message with a ``topic`` field added, so one JSON dispatch on
+the client replaces twenty sockets:
+
+    → {"action": "subscribe", "topics": ["compass", "market_regime"]}
+    → {"action": "subscribe", "topic": "liquidity", "symbols": ["NIFTY"]}
+    ← {"topic": "hub", "type": "subscribed", "topics": {"compass": null, ...}}
+    ← {"topic": "compass", "type": "compass_update", "data": {...}}
+    → {"action": "unsubscribe", "topic": "compass"}
+    → {"type": "ping"}                ← {"topic": "hub", "type": "pong"}
+
+(/ws/stream?topics=compass,market subscribes on connect; &encoding=msgpack
+switches the hot message types to binary frames — services/ws_codec.py.) One
+heartbeat per connection, after STREAM_HEARTBEAT_SECONDS of client silence.
+A connection holds at most MAX_TOPICS_PER_SESSION topics (further subscribes
+get an error frame), and a topic that only ever existed because someone
+subscribed to it — nothing registered, nothing published — is dropped when
+its last subscriber leaves, so made-up names cannot grow the registry.
+
+Topics come from three places:
+
+  * every `BroadcastManager` (services/ws_outbox.py) publishes its broadcasts
+    here under its name — market, compass, ict, liquidity, …;
+  * polled topics (`register(name, poll=..., interval=...)`) run ONE poller
+    while anyone is subscribed and stop when the last subscriber leaves;
+  * anything else that calls `publish(name, message)` (global_news deltas).
+
+A new subscriber gets the topic's `snapshot` provider output when one is
+registered, otherwise the last value of every snapshot key the topic has
+published (latest-value-wins keys from `coalesce_key`), so panels fill
+without waiting for the next cycle. Frames are serialised once per publish
+and go through the same bounded priority outboxes as the managers.
+
+The legacy polling endpoints are now thin adapters — `serve(ws,
+topics=[...], framed=False)` — that receive the unframed messages of one
+topic, so N clients cost one poll instead of N.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Hashable, Iterable, List, Mapping, Optional, Tuple, Union
+
+from fastapi import WebSocketDisconnect
+
+from config import get_settings
+from services.ws_codec import MSGPACK, binary_eligible, pack, requested_encoding
+from services.ws_outbox import SLOW_CLOSE_CODE, ClientOutbox, Priority, _dumps, classify, coalesce_key, set_publisher
+
+logger = logging.getLogger(__name__)
+
+HUB_TOPIC = "hub"
+LAST_VALUES_PER_TOPIC = 64
+MAX_TOPICS_PER_SESSION = 64
+
+Message = Dict[str, Any]
+Provider = Callable[[], Union[Optional[Message], List[Message], Awaitable[Any]]]
+Subscription = Union[Iterable[str], Mapping[str, Optional[Iterable[str]]]]
+
+
+def _symbol_of(message: Message) -> Optional[str]:
+    symbol = message.get("symbol")
+    if symbol is None and isinstance(message.get("data"), dict):
+        symbol = message["data"].get("symbol")
+    return symbol
+
+
+def _as_list(result: Any) -> List[Message]:
+    if result is None:
+        return []
+    return [m for m in (result if isinstance(result, list) else [result]) if isinstance(m, dict)]
+
+
+async def _call(provider: Provider) -> List[Message]:
+    result = provider()
+    if inspect.isawaitable(result):
+        result = await result
+    return _as_list(result)
+
+
+class _Topic:
+    __slots__ = ("name", "snapshot", "poll", "interval", "subscribers", "last", "task", "published")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.snapshot: Optional[Provider] = None
+        self.poll: Optional[Provider] = None
+        self.interval = 0.0
+        self.subscribers: Dict["StreamSession", Optional[FrozenSet[str]]] = {}
+        self.last: "OrderedDict[Hashable, Message]" = OrderedDict()
+        self.task: Optional[asyncio.Task] = None
+        self.published = 0
+
+
+class StreamSession:
+    """One hub connection: its outbox and what it is subscribed to."""
+
+    __slots__ = ("ws", "outbox", "framed", "topics")
+
+    def __init__(self, ws: Any, outbox: ClientOutbox, framed: bool) -> None:
+        self.ws = ws
+        self.outbox = outbox
+        self.framed = framed
+        self.topics: Dict[str, Optional[FrozenSet[str]]] = {}
+
+
+class StreamHub:
+    """Topic registry and fan-out for multiplexed (and legacy adapter) sockets."""
+
+    def __init__(self, max_depth: Optional[int] = None, send_timeout: Optional[float] = None,
+                 max_lag: Optional[float] = None, heartbeat: Optional[float] = None,
+                 dumps: Callable[[Message], Union[str, bytes]] = _dumps) -> None:
+        settings = get_settings()
+        self.max_depth = max_depth or settings.ws_outbox_depth
+        self.send_timeout = send_timeout or settings.ws_send_timeout
+        self.max_lag = settings.ws_max_lag_seconds if max_lag is None else max_lag
+        self.heartbeat = heartbeat or settings.stream_heartbeat_seconds
+        self._dumps = dumps
+        self._topics: Dict[str, _Topic] = {}
+        self._sessions: Dict[Any, StreamSession] = {}
+        self.slow_disconnects = 0
+
+    def _topic(self, name: str) -> _Topic:
+        topic = self._topics.get(name)
+        if topic is None:
+            topic = self._topics[name] = _Topic(name)
+        return topic
+
+    def register(self, name: str, snapshot: Optional[Provider] = None,
+                 poll: Optional[Provider] = None, interval: float = 0.0) -> None:
+        """Give ``name`` a snapshot provider for new subscribers and/or a shared poller."""
+        topic = self._topic(name)
+        topic.snapshot = snapshot or topic.snapshot
+        if poll is not None:
+            topic.poll, topic.interval = poll, max(float(interval), 0.01)
+            if topic.subscribers and topic.task is None:
+                self._start_poller(topic)
+
+    # ── Fan-out ─────────────────────────────────────────────────────────
+
+    def _encode(self, session: StreamSession, name: str, message: Message,
+                cache: Optional[Dict[Tuple[bool, bool], Union[str, bytes]]] = None) -> Union[str, bytes]:
+        variant = (session.framed, session.outbox.binary and binary_eligible(message))
+        if cache is not None and variant in cache:
+            return cache[variant]
+        frame = {"topic": name, **message} if session.framed else message
+        payload = pack(frame) if variant[1] else self._dumps(frame)
+        if cache is not None:
+            cache[variant] = payload
+        return payload
+
+    def publish(self, name: str, message: Message, key: Optional[Hashable] = None) -> int:
+        """Fan ``message`` out to ``name``'s subscribers; returns how many queued it."""
+        topic = self._topic(name)
+        topic.published += 1
+        key = coalesce_key(message) if key is None else key
+        if key is not None:
+            topic.last[key] = message
+            topic.last.move_to_end(key)
+            if len(topic.last) > LAST_VALUES_PER_TOPIC:
+                topic.last.popitem(last=False)
+        if not topic.subscribers:
+            return 0
+        symbol = _symbol_of(message)
+        priority = classify(message)
+        lane_key = None if key is None else (name, key)
+        encoded: Dict[Tuple[bool, bool], Union[str, bytes]] = {}     # each (framed, binary) variant serialised once
+        delivered = 0
+        for session, symbols in list(topic.subscribers.items()):
+            if symbols is not None and symbol is not None and symbol not in symbols:
+                continue
+            if session.outbox.put(self._encode(session, name, message, encoded), priority, lane_key):
+                delivered += 1
+        return delivered
+
+    # ── Subscriptions ───────────────────────────────────────────────────
+
+    async def subscribe(self, session: StreamSession, name: str,
+                        symbols: Optional[Iterable[str]] = None) -> bool:
+        """Subscribe ``session`` to ``name``; False when it already holds MAX_TOPICS_PER_SESSION others."""
+        if name not in session.topics and len(session.topics) >= MAX_TOPICS_PER_SESSION:
+            return False
+        topic = self._topic(name)
+        wanted = frozenset(symbols) if symbols else None
+        topic.subscribers[session] = wanted
+        session.topics[name] = wanted
+        if topic.snapshot is not None:
+            try:
+                initial = await _call(topic.snapshot)
+            except Exception as exc:
+                logger.warning("Stream hub: %s snapshot failed: %s", name, exc)
+                initial = []
+            keys: List[Optional[Hashable]] = [coalesce_key(m) for m in initial]
+        else:
+            initial, keys = list(topic.last.values()), list(topic.last.keys())
+        for message, key in zip(initial, keys):
+            symbol = _symbol_of(message)
+            if wanted is not None and symbol is not None and symbol not in wanted:
+                continue
+            session.outbox.put(self._encode(session, name, message), classify(message),
+                               None if key is None else (name, key))
+        if topic.poll is not None and topic.task is None:
+            self._start_poller(topic)
+        return True
+
+    def unsubscribe(self, session: StreamSession, name: str) -> None:
+        session.topics.pop(name, None)
+        topic = self._topics.get(name)
+        if topic is None:
+            return
+        topic.subscribers.pop(session, None)
+        if topic.subscribers:
+            return
+        if topic.task is not None:
+            topic.task.cancel()
+            topic.task = None
+        if topic.snapshot is None and topic.poll is None and not topic.published:
+            del self._topics[name]                  # only ever named by subscribers
+
+    def _start_poller(self, topic: _Topic) -> None:
+        topic.task = asyncio.get_running_loop().create_task(self._poll(topic))
+
+    async def _poll(self, topic: _Topic) -> None:
+        while topic.subscribers and topic.poll is not None:
+            try:
+                messages = await _call(topic.poll)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("Stream hub: %s poll failed: %s", topic.name, exc)
+                messages = []
+            for message in messages:
+                self.publish(topic.name, message, key=coalesce_key(message) or ("poll", None))
+            await asyncio.sleep(topic.interval)
+        topic.task = None
+
+    # ── Sessions ────────────────────────────────────────────────────────
+
+    def attach(self, ws: Any, framed: bool = True) -> StreamSession:
+        """Register an already-accepted socket."""
+        session = self._sessions.get(ws)
+        if session is None:
+            outbox = ClientOutbox(ws, self.max_depth, self.send_timeout, self.max_lag, on_close=self._closed,
+                                  binary=requested_encoding(ws) == MSGPACK)
+            session = self._sessions[ws] = StreamSession(ws, outbox, framed)
+            if outbox.binary:
+                outbox.greet()
+            outbox.start()
+        return session
+
+    def detach(self, ws: Any) -> None:
+        session = self._sessions.pop(ws, None)
+        if session is None:
+            return
+        for name in list(session.topics):
+            self.unsubscribe(session, name)
+        session.outbox.close()
+
+    def _closed(self, outbox: ClientOutbox, reason: str) -> None:
+        session = self._sessions.get(outbox.ws)
+        if session is None or session.outbox is not outbox:
+            return                                  # detach() already removed it
+        self.detach(outbox.ws)
+        if reason.startswith("slow consumer"):
+            self.slow_disconnects += 1
+            logger.warning("Stream hub: dropping client (%s)", reason)
+            asyncio.get_running_loop().create_task(self._close_socket(outbox.ws))
+
+    @staticmethod
+    async def _close_socket(ws: Any) -> None:
+        try:
+            await asyncio.wait_for(ws.close(code=SLOW_CLOSE_CODE), timeout=1.0)
+        except Exception:
+            pass
+
+    def _control(self, session: StreamSession, kind: str, **fields: Any) -> None:
+        message = {"type": kind, **fields}
+        session.outbox.put(self._encode(session, HUB_TOPIC, message), Priority.CONTROL)
+
+    async def _apply(self, session: StreamSession, request: Message) -> None:
+        if request.get("type") == "ping":
+            self._control(session, "pong")
+            return
+        if not session.framed:
+            return                                  # legacy adapters have fixed topics
+        action = request.get("action")
+        topics = request.get("topics")
+        if topics is None and request.get("topic"):
+            topics = {str(request["topic"]): request.get("symbols")}
+        elif isinstance(topics, list):
+            topics = {str(name): request.get("symbols") for name in topics}
+        if action not in ("subscribe", "unsubscribe") or not isinstance(topics, dict):
+            self._control(session, "error", error="expected {action: subscribe|unsubscribe, topic(s): ...}")
+            return
+        if action == "subscribe":
+            await self._subscribe_all(session, topics)
+        else:
+            for name in topics:
+                self.unsubscribe(session, str(name))
+        self._ack(session)
+
+    async def _subscribe_all(self, session: StreamSession, topics: Mapping[str, Any]) -> None:
+        refused = [str(name) for name, symbols in topics.items()
+                   if not await self.subscribe(session, str(name), symbols)]
+        if refused:
+            self._control(session, "error", error=f"at most {MAX_TOPICS_PER_SESSION} topics per connection",
+                          topics=refused)
+
+    def _ack(self, session: StreamSession) -> None:
+        self._control(session, "subscribed", topics={
+            name: None if symbols is None else sorted(symbols) for name, symbols in session.topics.items()
+        })
+
+    async def serve(self, websocket: Any, topics: Optional[Subscription] = None, framed: bool = True) -> None:
+        """Run one connection until it closes: subscribe, then read client frames."""
+        await websocket.accept()
+        session = self.attach(websocket, framed)
+        try:
+            if topics:
+                if not isinstance(topics, Mapping):
+                    topics = {name: None for name in topics}
+                await self._subscribe_all(session, topics)
+                if framed:
+                    self._ack(session)
+            while not session.outbox.closed:
+                try:
+                    raw = await asyncio.wait_for(websocket.receive_text(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    if framed:
+                        self._control(session, "heartbeat")
+                    continue
+                try:
+                    request = json.loads(raw)
+                except ValueError:
+                    self._control(session, "error", error="invalid JSON")
+                    continue
+                if isinstance(request, dict):
+                    await self._apply(session, request)
+        except WebSocketDisconnect:
+            pass
+        except Exception as exc:
+            logger.debug("Stream hub connection closed: %s", exc)
+        finally:
+            self.detach(websocket)
+
+    # ── Introspection ───────────────────────────────────────────────────
+
+    @property
+    def session_count(self) -> int:
+        return len(self._sessions)
+
+    def report(self) -> Dict[str, Any]:
+        sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "multiplexed": sum(1 for s in sessions if s.framed),
+            "legacyAdapters": sum(1 for s in sessions if not s.framed),
+            "binary": sum(1 for s in sessions if s.outbox.binary),
+            "queued": sum(s.outbox.depth for s in sessions),
+            "dropped": sum(s.outbox.dropped for s in sessions),
+            "slowDisconnects": self.slow_disconnects,
+            "topics": {
+                name: {
+                    "subscribers": len(topic.subscribers),
+                    "published": topic.published,
+                    "lastValues": len(topic.last),
+                    "polling": topic.task is not None,
+                }
+                for name, topic in sorted(self._topics.items())
+            },
+        }
+
+
+stream_hub = StreamHub()
+set_publisher(stream_hub.publish)
+
+
+def get_stream_hub() -> StreamHub:
+    return stream_hub
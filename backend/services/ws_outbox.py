@@ -0,0 +1,356 @@
+"""WebSocket outboxes — bounded per-client send queues with priorities.
+
+Every broadcaster awaited `ws.send_text` per client: the main manager through
+`asyncio.gather` with a 5 s `wait_for`, the per-service managers (compass,
+ICT, liquidity, …) one client after another with 3 s each, smart money over a
+bare list. One phone on a bad link held the whole broadcast cycle for
+seconds, and the producers behind it (the tick path, analysis loops) stalled
+or piled up tasks.
+
+Now each connection gets a `ClientOutbox` and its own writer task; a
+broadcast serialises the message once and only enqueues it, so it costs the
+same whatever the clients are doing. The outbox holds at most
+WS_OUTBOX_DEPTH messages in three lanes, drained highest priority first:
+
+    CONTROL    auth_status, status, error, pong — never coalesced
+    TICK       tick
+    ANALYSIS   everything else (service snapshots / updates / heartbeats)
+
+Snapshot topics (`tick` and `*_update` / `*_snapshot` / `*_heartbeat`…) are
+latest-value-wins: a newer message for the same (type, symbol) replaces the
+queued one in place, so a lagging client gets the current state rather than
+the backlog. When the outbox is full the oldest message of the lowest
+non-empty lane at or below the newcomer's priority is dropped (else the
+newcomer is). A client is slow, and is disconnected (close code 1013), when a
+single send exceeds WS_SEND_TIMEOUT or its oldest queued message has waited
+longer than WS_MAX_LAG_SECONDS.
+
+    compass_manager = BroadcastManager("compass")
+    await compass_manager.broadcast({"type": "compass_update", "symbol": "NIFTY", ...})
+
+`outbox_report()` lists every manager's clients with queue depth, lag, sent,
+coalesced and dropped counts (/health/websockets). Broadcasts are also
+published to the multiplexed stream hub (services/ws_hub.py) under the
+manager's name.
+
+Event-loop only; the writer tasks are created on connect.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+from collections import OrderedDict
+from enum import IntEnum
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple, Union
+
+from config import get_settings
+from services.ws_codec import MSGPACK, binary_eligible, field_table, pack, requested_encoding
+
+logger = logging.getLogger(__name__)
+
+Payload = Union[str, bytes]
+
+SLOW_CLOSE_CODE = 1013      # "try again later"
+
+
+class Priority(IntEnum):
+    CONTROL = 0
+    TICK = 1
+    ANALYSIS = 2
+
+
+CONTROL_TYPES = frozenset({"auth_status", "status", "error", "pong"})
+TICK_TYPES = frozenset({"tick"})
+SNAPSHOT_TYPES = frozenset({"tick", "snapshot", "update", "heartbeat", "keepalive"})
+SNAPSHOT_SUFFIXES = ("_update", "_snapshot", "_heartbeat")
+
+
+def classify(message: Dict[str, Any]) -> Priority:
+    kind = message.get("type")
+    if kind in CONTROL_TYPES:
+        return Priority.CONTROL
+    if kind in TICK_TYPES:
+        return Priority.TICK
+    return Priority.ANALYSIS
+
+
+def coalesce_key(message: Dict[str, Any]) -> Optional[Tuple[str, Any]]:
+    """(type, symbol) for snapshot topics, None for messages that must all be delivered."""
+    kind = message.get("type")
+    if not isinstance(kind, str) or kind in CONTROL_TYPES:
+        return None
+    if kind not in SNAPSHOT_TYPES and not kind.endswith(SNAPSHOT_SUFFIXES):
+        return None
+    symbol = message.get("symbol")
+    if symbol is None and isinstance(message.get("data"), dict):
+        symbol = message["data"].get("symbol")
+    return kind, symbol
+
+
+def _dumps(message: Dict[str, Any]) -> str:
+    return json.dumps(message, default=str)
+
+
+class ClientOutbox:
+    """One connection's bounded, prioritised send queue and its writer task."""
+
+    def __init__(self, ws: Any, max_depth: int, send_timeout: float, max_lag: float,
+                 on_close: Optional[Callable[["ClientOutbox", str], None]] = None,
+                 clock: Callable[[], float] = time.monotonic, binary: bool = False) -> None:
+        self.ws = ws
+        self.binary = binary                    # negotiated MessagePack (services/ws_codec.py)
+        self.fields_sent: Optional[int] = None  # field-table entries this client knows (None: not greeted)
+        self.max_depth = max(int(max_depth), 1)
+        self.send_timeout = send_timeout
+        self.max_lag = max_lag
+        self._on_close = on_close
+        self._clock = clock
+        self._lanes: List["OrderedDict[Hashable, List[Any]]"] = [OrderedDict() for _ in Priority]
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.connected_at = clock()
+        self.closed: Optional[str] = None       # reason, once closed
+        self.sent = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.peak_depth = 0
+        self.last_send_ms = 0.0
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    # ── Producer side ───────────────────────────────────────────────────
+
+    @property
+    def depth(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+    @property
+    def lag(self) -> float:
+        """Seconds the oldest queued message has waited."""
+        oldest = min((next(iter(lane.values()))[1] for lane in self._lanes if lane), default=None)
+        return 0.0 if oldest is None else self._clock() - oldest
+
+    def put(self, payload: Payload, priority: Priority = Priority.ANALYSIS,
+            key: Optional[Hashable] = None) -> bool:
+        """Queue ``payload``; False when it was dropped or the client is gone."""
+        if self.closed:
+            return False
+        if self.max_lag and self.depth and self.lag > self.max_lag:
+            self.close(f"slow consumer: {self.lag:.1f}s behind")
+            return False
+        if type(payload) is bytes and (self.fields_sent or 0) < len(field_table):
+            self.greet()                        # field ids ahead of the frame that uses them
+        lane = self._lanes[priority]
+        if key is not None and key in lane:
+            lane[key][0] = payload              # latest value wins, keeps its place in line
+            self.coalesced += 1
+            return True
+        if self.depth >= self.max_depth and not self._evict(priority):
+            self.dropped += 1
+            return False
+        lane[key if key is not None else ("#", next(self._seq))] = [payload, self._clock()]
+        self.peak_depth = max(self.peak_depth, self.depth)
+        self._wake.set()
+        return True
+
+    def greet(self) -> None:
+        """Send the codec handshake, or the field-table entries added since the last one."""
+        known = len(field_table)
+        message = field_table.hello() if self.fields_sent is None else field_table.since(self.fields_sent)
+        self.fields_sent = known
+        self.put(_dumps(message), Priority.CONTROL)
+
+    def _evict(self, priority: Priority) -> bool:
+        for lane in reversed(self._lanes[priority:]):
+            if lane:
+                lane.popitem(last=False)
+                self.dropped += 1
+                return True
+        return False
+
+    def _pop(self) -> Optional[Payload]:
+        for lane in self._lanes:
+            if lane:
+                return lane.popitem(last=False)[1][0]
+        return None
+
+    # ── Writer ──────────────────────────────────────────────────────────
+
+    async def _run(self) -> None:
+        ws = self.ws
+        while not self.closed:
+            payload = self._pop()
+            if payload is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            started = self._clock()
+            send = ws.send_bytes(payload) if isinstance(payload, bytes) else ws.send_text(payload)
+            try:
+                await asyncio.wait_for(send, timeout=self.send_timeout)
+            except asyncio.TimeoutError:
+                self.close(f"slow consumer: send took over {self.send_timeout:g}s")
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.close(f"send failed: {type(exc).__name__}")
+                return
+            self.sent += 1
+            self.last_send_ms = (self._clock() - started) * 1000.0
+
+    def close(self, reason: str = "disconnected") -> None:
+        if self.closed:
+            return
+        self.closed = reason
+        for lane in self._lanes:
+            lane.clear()
+        self._wake.set()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        if self._on_close is not None:
+            self._on_close(self, reason)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "depth": self.depth,
+            "encoding": MSGPACK if self.binary else "json",
+            "depthByPriority": {p.name.lower(): len(self._lanes[p]) for p in Priority},
+            "peakDepth": self.peak_depth,
+            "lagSeconds": round(self.lag, 3),
+            "sent": self.sent,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "lastSendMs": round(self.last_send_ms, 2),
+            "connectedFor": round(self._clock() - self.connected_at, 1),
+        }
+
+
+_managers: Dict[str, "BroadcastManager"] = {}
+
+# Stream hub publish hook (services/ws_hub.py): every manager broadcast is also
+# published to the multiplexed /ws/stream under the manager's name.
+_publisher: Optional[Callable[[str, Dict[str, Any]], Any]] = None
+
+
+def set_publisher(publish: Optional[Callable[[str, Dict[str, Any]], Any]]) -> None:
+    global _publisher
+    _publisher = publish
+
+
+class BroadcastManager:
+    """Connection set whose sends go through per-client outboxes."""
+
+    def __init__(self, name: str, max_depth: Optional[int] = None, send_timeout: Optional[float] = None,
+                 max_lag: Optional[float] = None, dumps: Callable[[Dict[str, Any]], Payload] = _dumps) -> None:
+        settings = get_settings()
+        self.name = name
+        self.max_depth = max_depth or settings.ws_outbox_depth
+        self.send_timeout = send_timeout or settings.ws_send_timeout
+        self.max_lag = settings.ws_max_lag_seconds if max_lag is None else max_lag
+        self._dumps = dumps
+        self._outboxes: Dict[Any, ClientOutbox] = {}
+        self.slow_disconnects = 0
+        self.send_failures = 0
+        _managers.setdefault(name, self)
+
+    async def connect(self, ws: Any) -> None:
+        await ws.accept()
+        self.attach(ws)
+
+    def attach(self, ws: Any) -> ClientOutbox:
+        """Register an already-accepted socket."""
+        outbox = self._outboxes.get(ws)
+        if outbox is None:
+            outbox = self._outboxes[ws] = ClientOutbox(ws, self.max_depth, self.send_timeout, self.max_lag,
+                                                       on_close=self._closed,
+                                                       binary=requested_encoding(ws) == MSGPACK)
+            if outbox.binary:
+                outbox.greet()
+            outbox.start()
+        return outbox
+
+    async def disconnect(self, ws: Any) -> None:
+        outbox = self._outboxes.pop(ws, None)
+        if outbox is not None:
+            outbox.close()
+
+    def _closed(self, outbox: ClientOutbox, reason: str) -> None:
+        if self._outboxes.get(outbox.ws) is not outbox:
+            return                                  # disconnect() already removed it
+        del self._outboxes[outbox.ws]
+        if reason.startswith("slow consumer"):
+            self.slow_disconnects += 1
+            logger.warning("WS %s: dropping client (%s)", self.name, reason)
+            asyncio.get_running_loop().create_task(self._close_socket(outbox.ws))
+        else:
+            self.send_failures += 1
+
+    @staticmethod
+    async def _close_socket(ws: Any) -> None:
+        try:
+            await asyncio.wait_for(ws.close(code=SLOW_CLOSE_CODE), timeout=1.0)
+        except Exception:
+            pass
+
+    async def broadcast(self, data: Dict[str, Any], priority: Optional[Priority] = None) -> None:
+        """Queue ``data`` for every client; never waits on a client."""
+        if _publisher is not None:
+            _publisher(self.name, data)
+        if not self._outboxes:
+            return
+        priority = classify(data) if priority is None else priority
+        key = coalesce_key(data)
+        binary = binary_eligible(data)
+        encoded: Dict[bool, Payload] = {}         # JSON / MessagePack, each serialised at most once
+        for outbox in list(self._outboxes.values()):
+            outbox.put(self._encode(data, binary and outbox.binary, encoded), priority, key)
+
+    def _encode(self, data: Dict[str, Any], binary: bool, cache: Dict[bool, Payload]) -> Payload:
+        payload = cache.get(binary)
+        if payload is None:
+            payload = cache[binary] = pack(data) if binary else self._dumps(data)
+        return payload
+
+    async def send_personal(self, ws: Any, data: Dict[str, Any], priority: Optional[Priority] = None) -> None:
+        outbox = self._outboxes.get(ws)
+        if outbox is None:                          # never attached: plain bounded send
+            try:
+                await asyncio.wait_for(ws.send_text(self._dumps(data)), timeout=self.send_timeout)
+            except Exception:
+                pass
+            return
+        payload = self._encode(data, outbox.binary and binary_eligible(data), {})
+        outbox.put(payload, classify(data) if priority is None else priority, coalesce_key(data))
+
+    @property
+    def client_count(self) -> int:
+        return len(self._outboxes)
+
+    @property
+    def connections(self) -> Set[Any]:
+        return set(self._outboxes)
+
+    def report(self) -> Dict[str, Any]:
+        clients = [outbox.report() for outbox in list(self._outboxes.values())]
+        return {
+            "clients": len(clients),
+            "queued": sum(c["depth"] for c in clients),
+            "dropped": sum(c["dropped"] for c in clients),
+            "slowDisconnects": self.slow_disconnects,
+            "sendFailures": self.send_failures,
+            "perClient": clients,
+        }
+
+
+def outbox_report() -> Dict[str, Any]:
+    return {
+        "maxDepth": get_settings().ws_outbox_depth,
+        "managers": {name: manager.report() for name, manager in sorted(_managers.items())},
+    }
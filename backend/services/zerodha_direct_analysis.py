@@ -8,6 +8,7 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 import os
 from config import get_settings
+from services.quote_scheduler import Priority, get_quote_scheduler
 
 
 class ZerodhaDirectAnalysis:
@@ -19,13 +20,11 @@ class ZerodhaDirectAnalysis:
         self.api_key = settings.zerodha_api_key
         self.access_token = settings.zerodha_access_token
         
-        # Initialize KiteConnect
-        from kiteconnect import KiteConnect
-        self.kite = KiteConnect(api_key=self.api_key)
+        # Shared Kite gateway client
+        from services.kite_gateway import get_kite_gateway
+        self.kite = get_kite_gateway().sync_client(self.access_token)
         
-        if self.access_token:
-            self.kite.set_access_token(self.access_token)
-        else:
+        if not self.access_token:
             print("⚠️ No access token - using fallback mode")
         
         # Symbol tokens from settings
@@ -58,7 +57,7 @@ class ZerodhaDirectAnalysis:
             print(f"🔍 Fetching quote for {instrument}...")
             
             # Direct REST API call
-            quotes = self.kite.quote([instrument])
+            quotes = get_quote_scheduler().quote_sync([instrument], Priority.UI)
             
             if instrument in quotes:
                 quote = quotes[instrument]
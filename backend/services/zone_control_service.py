@@ -272,10 +272,12 @@ class ZoneControlEngine:
         )
         
         # 🔥 NEW: Professional trading quality metrics
-        # Get candles near this zone for quality analysis
-        candles_near_zone = df[
-            (df['low'] <= level * 1.02) & (df['high'] >= level * 0.98)
-        ].tail(20)  # Last 20 candles near zone
+        # Get candles near this zone for quality analysis, as column arrays
+        near = (df['low'].to_numpy() <= level * 1.02) & (df['high'].to_numpy() >= level * 0.98)
+        candles_near_zone = {
+            col: df[col].to_numpy(dtype=float)[near][-20:]  # Last 20 candles near zone
+            for col in ('open', 'high', 'low', 'close', 'volume')
+        }
         
         # Calculate quality metrics with NaN protection
         rejection_speed = self._calculate_rejection_speed(candles_near_zone, level)
@@ -343,7 +345,7 @@ class ZoneControlEngine:
     # 🔥 PROFESSIONAL TRADING QUALITY METRICS
     # ═══════════════════════════════════════════════════════════════
     
-    def _calculate_rejection_speed(self, candles_near_zone: pd.DataFrame, zone_level: float) -> float:
+    def _calculate_rejection_speed(self, candles_near_zone: Dict[str, np.ndarray], zone_level: float) -> float:
         """
         Measure how FAST price rejects from zone
         Fast rejection = Strong opposing force (institutional activity)
@@ -351,70 +353,53 @@ class ZoneControlEngine:
         
         Returns: 0-100 (higher = faster rejection = stronger zone)
         """
-        if len(candles_near_zone) < 2:
+        close = candles_near_zone['close']
+        if len(close) < 2:
             return 50.0
         
-        # Calculate average time spent near zone before rejection
-        rejection_speeds = []
+        # Candle touched zone and the next candle closed further away from it
+        touched_zone = (candles_near_zone['low'][:-1] <= zone_level) & (zone_level <= candles_near_zone['high'][:-1])
+        rejected = np.abs(close[1:] - zone_level) > np.abs(close[:-1] - zone_level)
         
-        for idx in range(len(candles_near_zone) - 1):
-            candle = candles_near_zone.iloc[idx]
-            next_candle = candles_near_zone.iloc[idx + 1]
-            
-            # Check if candle touched zone and next candle rejected
-            touched_zone = (candle['low'] <= zone_level <= candle['high'])
-            rejected = abs(next_candle['close'] - zone_level) > abs(candle['close'] - zone_level)
-            
-            if touched_zone and rejected:
-                # Fast rejection = large move away in 1 candle
-                move_size = abs(next_candle['close'] - zone_level) / zone_level * 100
-                rejection_speeds.append(move_size)
+        # Fast rejection = large move away in 1 candle
+        rejection_speeds = np.abs(close[1:][touched_zone & rejected] - zone_level) / zone_level * 100
         
-        if rejection_speeds:
+        if rejection_speeds.size:
             avg_speed = np.mean(rejection_speeds)
             # Convert to 0-100 score (faster = higher score)
             return min(avg_speed * 20, 100.0)  # 5% move = 100 score
         
         return 50.0
     
-    def _calculate_absorption_strength(self, candles_near_zone: pd.DataFrame, zone_level: float) -> float:
+    def _calculate_absorption_strength(self, candles_near_zone: Dict[str, np.ndarray], zone_level: float) -> float:
         """
         Detect institutional ABSORPTION (accumulation/distribution)
         High volume + small candle bodies = Smart money absorbing supply/demand
         
         Returns: 0-100 (higher = more absorption = stronger zone)
         """
-        if len(candles_near_zone) < 3:
+        close, volume = candles_near_zone['close'], candles_near_zone['volume']
+        if len(close) < 3:
             return 50.0
         
-        absorption_scores = []
+        # Volume vs body size ratio of candles closing near the zone
+        near_zone = np.abs(close - zone_level) / zone_level * 100 < 1.0
+        body_size = np.abs(close - candles_near_zone['open'])
+        candle_range = candles_near_zone['high'] - candles_near_zone['low']
+        has_range = candle_range > 0
+        body_ratio = np.divide(body_size, candle_range, out=np.zeros_like(body_size), where=has_range)
+        avg_vol_near = volume.mean()
+        volume_ratio = volume / avg_vol_near if avg_vol_near > 0 else np.ones_like(volume)
         
-        for idx in range(len(candles_near_zone)):
-            candle = candles_near_zone.iloc[idx]
-            
-            # Check if near zone
-            near_zone = abs(candle['close'] - zone_level) / zone_level * 100 < 1.0
-            
-            if near_zone:
-                # Calculate volume vs body size ratio
-                body_size = abs(candle['close'] - candle['open'])
-                candle_range = candle['high'] - candle['low']
-                
-                if candle_range > 0:
-                    body_ratio = body_size / candle_range
-                    avg_vol_near = candles_near_zone['volume'].mean()
-                    volume_ratio = (candle['volume'] / avg_vol_near) if avg_vol_near > 0 else 1.0
-                    
-                    # High volume + small body = Absorption
-                    if volume_ratio > 1.5 and body_ratio < 0.3:
-                        absorption_scores.append(volume_ratio * 30)
-        
-        if absorption_scores:
+        # High volume + small body = Absorption
+        absorption_scores = volume_ratio[near_zone & has_range & (volume_ratio > 1.5) & (body_ratio < 0.3)] * 30
+        
+        if absorption_scores.size:
             return min(np.mean(absorption_scores), 100.0)
         
         return 50.0
     
-    def _calculate_wick_dominance(self, candles_near_zone: pd.DataFrame, zone_level: float, zone_type: str) -> float:
+    def _calculate_wick_dominance(self, candles_near_zone: Dict[str, np.ndarray], zone_level: float, zone_type: str) -> float:
         """
         Measure WICK DOMINANCE at zone
         Large wicks = Stop hunting / Liquidity grab (institutional manipulation)
@@ -424,37 +409,26 @@ class ZoneControlEngine:
         
         Returns: 0-100 (higher = more wick dominance = potential trap zone)
         """
-        if len(candles_near_zone) < 2:
+        open_, high, low, close = (candles_near_zone[c] for c in ('open', 'high', 'low', 'close'))
+        if len(close) < 2:
             return 50.0
         
-        wick_scores = []
+        near_zone = np.abs(close - zone_level) / zone_level * 100 < 1.5
+        candle_range = high - low
+        has_range = candle_range > 0
         
-        for idx in range(len(candles_near_zone)):
-            candle = candles_near_zone.iloc[idx]
-            
-            # Check if near zone
-            near_zone = abs(candle['close'] - zone_level) / zone_level * 100 < 1.5
-            
-            if near_zone:
-                body_size = abs(candle['close'] - candle['open'])
-                candle_range = candle['high'] - candle['low']
-                
-                if zone_type == 'SUPPORT':
-                    # Lower wick size (stop hunt below support)
-                    lower_wick = min(candle['open'], candle['close']) - candle['low']
-                    if candle_range > 0:
-                        wick_ratio = lower_wick / candle_range
-                        if wick_ratio > 0.5:  # Wick > 50% of candle
-                            wick_scores.append(wick_ratio * 100)
-                else:  # RESISTANCE
-                    # Upper wick size (stop hunt above resistance)
-                    upper_wick = candle['high'] - max(candle['open'], candle['close'])
-                    if candle_range > 0:
-                        wick_ratio = upper_wick / candle_range
-                        if wick_ratio > 0.5:
-                            wick_scores.append(wick_ratio * 100)
-        
-        if wick_scores:
+        if zone_type == 'SUPPORT':
+            # Lower wick size (stop hunt below support)
+            wick = np.minimum(open_, close) - low
+        else:  # RESISTANCE
+            # Upper wick size (stop hunt above resistance)
+            wick = high - np.maximum(open_, close)
+        wick_ratio = np.divide(wick, candle_range, out=np.zeros_like(wick), where=has_range)
+        
+        # Wick > 50% of candle
+        wick_scores = wick_ratio[near_zone & has_range & (wick_ratio > 0.5)] * 100
+        
+        if wick_scores.size:
             return min(np.mean(wick_scores), 100.0)
         
         return 50.0
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test the vectorized backtest engine: column-wise signals match the row-wise
+rules they replace, first-touch exits, session square-off, daily candles
+holding across sessions, one position at a time, and sweeps across a process
+pool.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from benchmarks import fixtures
+from services import backtest_engine as bt
+from services.intraday_entry_filter import IntraDayEntrySystem, VWMAEntryFilter
+from services.trading_signals import (
+    determine_market_bias,
+    extract_trades,
+    generate_entry_signal,
+    generate_trading_signals,
+)
+
+
+def _frame(n=600, symbol="NIFTY"):
+    candles = fixtures.synthetic_candles(symbol, n)
+    return pd.DataFrame({
+        "time": [c["timestamp"] for c in candles],
+        **{k: [c[k] for c in candles] for k in ("open", "high", "low", "close", "volume")},
+    })
+
+
+def _columns(rows, sessions=None):
+    """rows: (high, low, close) per candle."""
+    high, low, close = (np.array(col, dtype=float) for col in zip(*rows))
+    return bt.CandleColumns(
+        symbol="TEST",
+        timestamp=np.arange(len(rows)).astype("datetime64[s]"),
+        session=np.array(sessions if sessions is not None else [0] * len(rows), dtype=np.int64),
+        open=close.copy(), high=high, low=low, close=close,
+        volume=np.zeros(len(rows)),
+    )
+
+
+def test_vectorized_signals_match_row_wise_rules():
+    df = generate_trading_signals(_frame())
+    assert list(df["bias"]) == list(df.apply(determine_market_bias, axis=1))
+    assert list(df["signal"]) == list(df.apply(generate_entry_signal, axis=1))
+    assert (df["signal"] != "HOLD").any()
+
+    trades = extract_trades(df, sl_points=15, rr_ratio=2.5)
+    assert len(trades) == int((df["signal"] != "HOLD").sum())
+    for trade in trades:
+        expected = 0.5 + 0.15 * sum(
+            (trade.ema_20 > trade.ema_50, trade.ema_50 > trade.ema_100, trade.ema_100 > trade.ema_200)
+            if trade.signal == "BUY" else
+            (trade.ema_20 < trade.ema_50, trade.ema_50 < trade.ema_100, trade.ema_100 < trade.ema_200))
+        assert trade.confidence == pytest.approx(min(expected, 0.95), abs=0.151)
+        assert abs(trade.entry_price - trade.stop_loss) == pytest.approx(15)
+
+
+def test_vwma_entry_signals_match_filter():
+    rng = np.random.default_rng(7)
+    n = 400
+    vwma = 22000 + rng.normal(0, 40, n)
+    price = vwma * (1 + rng.normal(0, 0.006, n))
+    prev_vwma = vwma + rng.normal(0, 10, n)
+    prev_price = prev_vwma * (1 + rng.normal(0, 0.006, n))
+    avg = np.full(n, 1000.0)
+    volume = avg * rng.uniform(0.5, 2.0, n)
+    ema20 = 22000 + rng.normal(0, 30, n)
+    ema50 = 22000 + rng.normal(0, 30, n)
+
+    codes, confidence = bt.vwma_entry_signals(price, vwma, prev_price, prev_vwma, volume, avg, ema20, ema50)
+    names = {bt.VWMA_BUY: "BUY", bt.VWMA_BUY_CONTINUATION: "BUY_CONTINUATION",
+             bt.VWMA_SELL: "SELL", bt.VWMA_HOLD: "HOLD", 0: None}
+    for i in range(n):
+        expected = VWMAEntryFilter.analyze_vwma_entry(
+            float(price[i]), float(vwma[i]), float(prev_price[i]), float(prev_vwma[i]),
+            float(volume[i]), float(avg[i]), float(ema20[i]), float(ema50[i]))
+        assert names[int(codes[i])] == expected["signal"]
+        assert round(float(confidence[i]), 1) == expected["confidence"]
+
+
+def test_first_touch_exit_and_stop_before_target():
+    # Long at 100 (SL 10 → 90, RR 2 → 120); candle 2 reaches 121.
+    cols = _columns([(100, 100, 100), (105, 95, 102), (121, 101, 118), (119, 117, 118)])
+    params = bt.BacktestParams(sl_mode="points", sl_points=10, rr_ratio=2.0)
+    long_ = np.array([True, False, False, False])
+    trades = bt.simulate(cols, long_, np.zeros(4, bool), params)
+    assert trades["exit_index"].tolist() == [2]
+    assert trades["exit_price"].tolist() == [120]
+    assert bt.EXIT_NAMES[trades["exit_reason"][0]] == "target"
+
+    # Same candle touches both → counted as the stop.
+    cols = _columns([(100, 100, 100), (125, 85, 100), (100, 100, 100)])
+    trades = bt.simulate(cols, np.array([True, False, False]), np.zeros(3, bool), params)
+    assert trades["pnl"].tolist() == [-10]
+    assert bt.EXIT_NAMES[trades["exit_reason"][0]] == "stop"
+
+
+def test_squareoff_at_session_end_and_single_position():
+    rows = [(100, 100, 100), (101, 99, 100), (102, 99, 101), (101, 99, 100), (101, 99, 100), (101, 99, 99)]
+    cols = _columns(rows, sessions=[1, 1, 1, 2, 2, 2])
+    params = bt.BacktestParams(sl_mode="points", sl_points=10, rr_ratio=2.0)
+    short = np.array([True, True, False, True, False, True])   # second short is inside the first trade
+    trades = bt.simulate(cols, np.zeros(6, bool), short, params)
+    assert trades["entry_index"].tolist() == [0, 3]            # last candle of a session never enters
+    assert trades["exit_index"].tolist() == [2, 5]
+    assert trades["pnl"].tolist() == [-1, 1]
+    assert all(bt.EXIT_NAMES[r] == "squareoff" for r in trades["exit_reason"])
+
+    metrics = bt.performance(trades)
+    assert metrics["hit_rate"] == 50.0
+    assert metrics["max_drawdown_points"] == 1.0
+    assert metrics["exits"]["squareoff"] == 2
+
+
+def test_daily_candles_hold_across_sessions():
+    rows = [(100, 100, 100), (104, 98, 103), (112, 103, 110), (121, 109, 119), (119, 95, 96), (97, 94, 95)]
+    cols = _columns(rows, sessions=[1, 2, 3, 4, 5, 6])                 # one candle per trading day
+    assert not cols.intraday
+    params = bt.BacktestParams(sl_mode="points", sl_points=10, rr_ratio=2.0)
+    long_ = np.array([True, False, False, False, True, False])
+    trades = bt.simulate(cols, long_, np.zeros(6, bool), params)
+    assert trades["entry_index"].tolist() == [0, 4]
+    assert trades["exit_index"].tolist() == [3, 5]                      # target on day 4; then end of data
+    assert [bt.EXIT_NAMES[r] for r in trades["exit_reason"]] == ["target", "squareoff"]
+
+    held = bt.simulate(cols, long_, np.zeros(6, bool), bt.BacktestParams(sl_mode="points", sl_points=10,
+                                                                          rr_ratio=2.0, max_hold_bars=2))
+    assert held["exit_index"].tolist()[0] == 2 and bt.EXIT_NAMES[held["exit_reason"][0]] == "max_hold"
+
+    daily = bt.CandleColumns.from_candles("NIFTY", fixtures.synthetic_candles("NIFTY", 300, interval_minutes=24 * 60))
+    assert daily.sessions == len(daily) == 300
+    assert sum(m["trades"] for m in bt.run_backtest(daily)["strategies"].values()) > 0
+
+
+def test_camarilla_uses_previous_session_levels():
+    rows = [(110, 90, 100)] * 3 + [(100, 95, 99)] * 3
+    cols = _columns(rows, sessions=[1, 1, 1, 2, 2, 2])
+    levels = bt.camarilla_levels(cols)
+    assert np.isnan(levels[:3]).all()
+    assert levels[3, 1] == pytest.approx(100 + 0.55 * 20)      # H3 from day 1
+    assert levels[3, 7] == pytest.approx(100 - 0.55 * 20)      # L3 from day 1
+    long_, short = bt.strategy_masks("camarilla", cols, bt.BacktestParams())
+    assert not (long_[:3] | short[:3]).any()
+
+
+def test_run_backtest_on_recorded_candles():
+    cols = bt.CandleColumns.from_candles("NIFTY", fixtures.recorded_candles("NIFTY"))
+    assert np.all(np.diff(cols.timestamp.astype(np.int64)) > 0)
+    report = bt.run_backtest(cols, include_trades=True)
+    assert set(report["strategies"]) == set(bt.STRATEGIES)
+    for metrics in report["strategies"].values():
+        assert metrics["trades"] == len(metrics["trade_log"])
+        assert metrics["wins"] + metrics["losses"] <= metrics["trades"]
+        assert metrics["max_drawdown_points"] >= 0
+    with pytest.raises(ValueError):
+        bt.run_backtest(cols, ["nope"])
+
+
+def test_sweep_pool_matches_inline():
+    cols = bt.CandleColumns.from_candles("NIFTY", fixtures.synthetic_candles("NIFTY", 1500))
+    grid = {"st_multiplier": [0.5, 1.0], "rr_ratio": [1.5, 2.0]}
+    inline = bt.run_sweep(cols, "supertrend", grid, processes=1)
+    pooled = bt.run_sweep(cols, "supertrend", grid, processes=2)
+    assert len(inline) == 4
+    assert inline == pooled
+    assert [r["pnl_points"] for r in inline] == sorted((r["pnl_points"] for r in inline), reverse=True)
+    with pytest.raises(ValueError):
+        bt.run_sweep(cols, "supertrend", {"bogus": [1]})
+
+
+def test_intraday_backtest_counts_and_outcomes():
+    frame = _frame(300)
+    frame["vwma_20"] = frame["close"].rolling(20, min_periods=1).mean()
+    frame["ema_20"] = frame["close"].ewm(span=20, adjust=False).mean()
+    frame["ema_50"] = frame["close"].ewm(span=50, adjust=False).mean()
+    frame["avg_volume"] = frame["volume"].rolling(50, min_periods=1).mean()
+    frame["atr"] = (frame["high"] - frame["low"]).rolling(10, min_periods=1).mean()
+    candles = frame.rename(columns={"time": "timestamp"}).to_dict("records")
+
+    expected = sum(
+        IntraDayEntrySystem.generate_intraday_signal(
+            price_5m=c["close"], vwma_20_5m=c["vwma_20"], ema_20_5m=c["ema_20"], ema_50_5m=c["ema_50"],
+            volume_5m=c["volume"], avg_volume_5m=c["avg_volume"],
+            prev_price_5m=candles[i - 1]["close"] if i else c["close"],
+            prev_vwma_20_5m=candles[i - 1]["vwma_20"] if i else c["vwma_20"],
+            atr_5m=c["atr"],
+        )["signal"] in ("BUY", "SELL")
+        for i, c in enumerate(candles)
+    )
+    result = IntraDayEntrySystem.backtest_intraday_logic(candles)
+    assert result["signals_generated"] == expected
+    assert result["winning_trades"] + result["losing_trades"] <= result["trades_taken"] <= expected
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
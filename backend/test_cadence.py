@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Test the adaptive cadence controller: bounds parsing and registration,
+tick-rate surges speeding loops up and quiet spells slowing them down within
+bounds, ATR of finished 3m bars, compute time and event-loop lag backing
+loops off, and the sampler's lag measurement.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.cadence import CadenceController, parse_bounds
+from services.instrument_universe import INDEX_SYMBOLS, InstrumentUniverse
+
+EPOCH = 1_760_000_400          # a 3m bucket boundary is found from here
+
+
+def _universe():
+    universe = InstrumentUniverse(capacity=8)
+    for token, symbol in enumerate(INDEX_SYMBOLS, start=1):
+        universe.add(token, symbol)
+    return universe
+
+
+def _controller(universe=None, **kwargs):
+    kwargs.setdefault("sample_seconds", 1.0)
+    controller = CadenceController(universe=universe or _universe(), **kwargs)
+    controller.lag_threshold = 0.05
+    controller.compute_budget = 0.5
+    controller.bounds = {}
+    return controller
+
+
+def _ticks(universe, n, price=25000.0, epoch=EPOCH):
+    iid = universe.id_of("NIFTY")
+    for _ in range(n):
+        universe.on_tick(iid, price, 0, 0, epoch)
+
+
+def test_bounds_and_registration():
+    assert parse_bounds("compass=1:6, liquidity=0.5:3,bad=2,worse=3:1,=1:2") == {
+        "compass": (1.0, 6.0), "liquidity": (0.5, 3.0)}
+    controller = _controller()
+    controller.bounds = {"liquidity": (0.5, 3.0)}
+    compass = controller.register("compass", base=2.0)
+    assert (compass.lo, compass.hi, compass.interval) == (1.0, 6.0, 2.0)
+    assert controller.register("compass", base=9.0) is compass               # idempotent
+    assert (controller.register("liquidity", base=1.0).hi, controller.register("edge", 1.5, lo=1, hi=2).lo) == (3.0, 1)
+
+    assert compass.record(0.01) == 2.0 and compass.reason == "normal"       # no signals yet
+    fixed = _controller(adaptive=False)
+    busy = fixed.register("compass", base=2.0)
+    fixed.loop_lag.push(1.0)
+    assert busy.record(5.0) == 2.0 and busy.reason.startswith("fixed")
+
+
+def test_tick_rate_surge_speeds_up_and_quiet_slows_down():
+    universe = _universe()
+    controller = _controller(universe)
+    cadence = controller.register("liquidity", base=1.0)
+    for _ in range(30):
+        _ticks(universe, 10)
+        controller.sample(1.0)
+    assert controller.tick_ratio == pytest.approx(1.0) and controller.atr_ratio is None
+    assert cadence.record(0.01) == 1.0
+
+    for _ in range(10):
+        _ticks(universe, 60)
+        controller.sample(1.0)
+    assert controller.tick_ratio > 2
+    assert cadence.record(0.01) == 0.5 and cadence.reason.startswith("volatile") and "(at min)" in cadence.reason
+
+    for _ in range(60):
+        controller.sample(1.0)
+    assert controller.activity == 0.25
+    assert cadence.record(0.01) == 3.0 and cadence.reason.startswith("quiet") and "(at max)" in cadence.reason
+    report = controller.report()
+    assert report["services"]["liquidity"]["intervalSec"] == 3.0 and report["signals"]["activity"] == 0.25
+
+
+def test_atr_of_finished_bars():
+    universe = _universe()
+    controller = _controller(universe)
+    book = universe.candles["3m"]
+    iid = universe.id_of("BANKNIFTY")
+    start = book.bucket_of(EPOCH)
+    for bar in range(16):
+        swing = 10.0 if bar < 12 else 80.0                  # the last bars range 8x wider
+        epoch = start + bar * book.seconds
+        for offset, price in enumerate((50000.0, 50000.0 + swing, 50000.0 - swing, 50000.0)):
+            universe.on_tick(iid, price, 0, 0, epoch + offset)
+            universe.update_candles(iid, price, 0, 0, epoch + offset)
+        controller.sample(1.0)
+    tracker = controller._atr["BANKNIFTY"]
+    assert tracker.slow.count == 15                          # every finished bar, none of the open one
+    assert tracker.fast.last == pytest.approx(160.0 / 50000.0)
+    assert controller.atr_ratio > 1.5 and controller._atr["NIFTY"].ratio is None       # NIFTY never ticked
+    cadence = controller.register("compass", base=2.0)
+    assert cadence.record(0.01) < 2.0 and cadence.reason.startswith("volatile")
+
+
+def test_compute_time_and_loop_lag_back_off():
+    controller = _controller()
+    cadence = controller.register("expiry_explosion", base=2.0)
+    for _ in range(10):
+        cadence.record(1.5)                                  # 1.5 s per run > half of 2 s
+    assert cadence.interval == pytest.approx(3.0, rel=0.01) and cadence.reason.startswith("compute-bound")
+    assert controller.report()["services"]["expiry_explosion"]["computeMs"] == pytest.approx(1500.0, rel=0.01)
+
+    fresh = controller.register("strike_intelligence", base=0.5)
+    for _ in range(10):
+        controller.sample(1.0, lag=0.15)
+    assert fresh.record(0.01) == pytest.approx(1.5, rel=0.01) and fresh.reason.startswith("loop lag")
+    assert cadence.record(1.5) == 6.0 and cadence.reason.endswith("(at max)")
+
+
+def test_sampler_measures_loop_lag():
+    async def run():
+        controller = _controller(sample_seconds=0.01)
+        await controller.start()
+        await asyncio.sleep(0.05)
+        assert controller.samples >= 2 and controller.loop_lag.mean < 0.05
+        asyncio.get_running_loop().call_soon(time.sleep, 0.3)                       # block the loop
+        await asyncio.sleep(0.03)                               # the sampler's overdue wake-up runs first
+        assert controller.loop_lag.last > 0.2 and controller.loop_lag.mean > 0.05
+        await controller.stop()
+        assert controller.report()["running"] is False
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
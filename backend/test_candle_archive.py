@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test the columnar candle archive: idempotent appends, changed-row rewrites,
+torn-tail recovery, range reads across month partitions, reads working from
+an index snapshot while appends land, timeframe roll-ups, the one-time
+legacy JSON import and the backup/restore round trip.
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pytz")
+pytest.importorskip("pydantic_settings")
+
+from services import candle_backup_service
+from services.cache import _SHARED_CACHE, CacheService
+from services.candle_archive import (
+    IST,
+    RECORD,
+    CandleArchive,
+    aggregate,
+    candles_from_records,
+    records_from_candles,
+)
+
+
+def _candles(start, n, step=300, price=22000.0):
+    t0 = IST.localize(start)
+    return [
+        {
+            "timestamp": (t0 + timedelta(seconds=i * step)).isoformat(),
+            "open": price + i, "high": price + i + 5, "low": price + i - 5, "close": price + i + 1,
+            "volume": 1000 + i, "oi": 5000 + i, "oi_prev": 4990 + i,
+        }
+        for i in range(n)
+    ]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return CandleArchive(root=tmp_path / "archive", legacy_dir=tmp_path / "legacy")
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    saved = dict(_SHARED_CACHE)
+    _SHARED_CACHE.clear()
+    yield
+    _SHARED_CACHE.clear()
+    _SHARED_CACHE.update(saved)
+
+
+def test_append_is_idempotent_and_rewrites_changed_rows(archive):
+    candles = _candles(datetime(2026, 3, 2, 9, 15), 75)
+    assert archive.append("NIFTY", "5m", candles) == 75
+    assert archive.append("NIFTY", "5m", candles) == 0
+
+    candles[10]["close"] += 3
+    assert archive.append("NIFTY", "5m", candles[5:20]) == 1
+    data = archive.read("NIFTY", "5m")
+    assert len(data) == 75
+    assert data["close"][10] == candles[10]["close"]
+    assert candles_from_records(data[:1])[0] == candles[0]
+
+
+def test_torn_tail_is_truncated_before_append(archive):
+    candles = _candles(datetime(2026, 3, 2, 9, 15), 20)
+    archive.append("NIFTY", "5m", candles[:10])
+    path = archive.root / archive.partitions("NIFTY")[0]["file"]
+    with open(path, "ab") as fh:
+        fh.write(b"\x00" * (RECORD.itemsize // 2))   # crash mid-write
+
+    assert archive.append("NIFTY", "5m", candles[10:]) == 10
+    assert path.stat().st_size == 20 * RECORD.itemsize
+    assert len(archive.read("NIFTY", "5m")) == 20
+
+
+def test_range_reads_span_month_partitions(archive):
+    candles = _candles(datetime(2026, 3, 31, 23, 0), 48)    # crosses into April (IST)
+    archive.append("BANKNIFTY", "5m", candles)
+    assert sorted(p["month"] for p in archive.partitions("BANKNIFTY")) == ["2026-03", "2026-04"]
+
+    tail = archive.last("BANKNIFTY", "5m", 20)
+    assert [c["timestamp"] for c in candles_from_records(tail)] == [c["timestamp"] for c in candles[-20:]]
+
+    window = archive.read("BANKNIFTY", "5m", candles[5]["timestamp"], candles[30]["timestamp"])
+    assert len(window) == 26
+    assert np.all(np.diff(window["ts"]) == 300)
+
+    cols = archive.columns("BANKNIFTY", "5m")
+    assert len(cols) == 48
+    assert cols.sessions == 2
+
+
+def test_reads_work_from_an_index_snapshot(archive):
+    candles = _candles(datetime(2026, 3, 31, 23, 0), 48)   # March, then April
+    archive.append("NIFTY", "5m", candles[:6])
+    path_of = archive._partition_path
+    pending = [candles[6:]]
+
+    def append_mid_read(*args):                            # a writer lands while the index is walked
+        if pending:
+            archive.append("NIFTY", "5m", pending.pop())
+        return path_of(*args)
+
+    archive._partition_path = append_mid_read
+    rows = archive.read("NIFTY", "5m")
+    assert len(rows) == 6 and rows["ts"][-1] == records_from_candles(candles[5:6])["ts"][0]
+
+    pending.append(_candles(datetime(2026, 5, 4, 9, 15), 3))
+    assert sorted(p["month"] for p in archive.partitions("NIFTY")) == ["2026-03", "2026-04"]
+    archive._partition_path = path_of
+    assert len(archive.read("NIFTY", "5m")) == 51 and len(archive.last("NIFTY", "5m", 40)) == 40
+
+
+def test_aggregate_to_15m_and_daily():
+    records = records_from_candles(_candles(datetime(2026, 3, 2, 9, 15), 75))
+    fifteen = aggregate(records, "15m")
+    assert len(fifteen) == 25
+    assert fifteen["open"][0] == records["open"][0]
+    assert fifteen["close"][0] == records["close"][2]
+    assert fifteen["volume"][0] == records["volume"][:3].sum()
+
+    daily = aggregate(records, "1d")
+    assert len(daily) == 1
+    assert daily["high"][0] == records["high"].max()
+    assert daily["low"][0] == records["low"].min()
+    assert candles_from_records(daily)[0]["timestamp"].startswith("2026-03-02T00:00:00")
+
+
+def test_legacy_json_backups_import_once(archive):
+    archive.legacy_dir.mkdir()
+    for day in (2, 3):
+        candles = _candles(datetime(2026, 3, day, 9, 15), 75)
+        payload = {"symbol": "SENSEX", "candle_count": len(candles), "candles": candles}
+        (archive.legacy_dir / f"SENSEX_candles_2026-03-0{day}.json").write_text(json.dumps(payload))
+
+    assert len(archive.last("SENSEX", "5m", 500)) == 150
+    assert len(archive.read("SENSEX", "1d")) == 2
+    assert archive.ensure_imported("SENSEX") == 0
+
+
+def test_lpush_accepts_several_values():
+    async def run():
+        cache = CacheService()
+        await cache.lpush("l", "a")
+        await cache.lpush("l", "b", "c")
+        return await cache.lrange("l", 0, -1)
+
+    assert asyncio.run(run()) == ["c", "b", "a"]
+
+
+def test_backup_restore_round_trip(archive, monkeypatch):
+    monkeypatch.setattr(candle_backup_service, "get_candle_archive", lambda: archive)
+    five = _candles(datetime(2026, 3, 2, 9, 15), 150)
+    fifteen = _candles(datetime(2026, 3, 2, 9, 15), 50, step=900)
+
+    async def run():
+        cache = CacheService()
+        for key, candles in (("analysis_candles:NIFTY", five), ("analysis_candles_15m:NIFTY", fifteen)):
+            for candle in candles:
+                await cache.lpush(key, json.dumps(candle))
+        assert await candle_backup_service.CandleBackupService.backup_candles(cache, "NIFTY")
+
+        await cache.delete("analysis_candles:NIFTY")
+        await cache.delete("analysis_candles_15m:NIFTY")
+        assert await candle_backup_service.CandleBackupService.restore_candles(cache, "NIFTY")
+        return (await cache.lrange("analysis_candles:NIFTY", 0, -1),
+                await cache.lrange("analysis_candles_15m:NIFTY", 0, -1))
+
+    restored_5m, restored_15m = asyncio.run(run())
+    assert len(restored_5m) == candle_backup_service.RESTORE_CANDLES
+    assert json.loads(restored_5m[0]) == five[-1]                      # newest at the head
+    assert [json.loads(c) for c in reversed(restored_15m)] == fifteen
+    assert len(archive.read("NIFTY", "1d")) == 1
+
+    listed = candle_backup_service.CandleBackupService.list_backup_files()
+    assert {(b["timeframe"], b["candle_count"]) for b in listed} == {("5m", 150), ("15m", 50), ("1d", 1)}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -15,6 +15,7 @@ import pytz
 sys.path.insert(0, str(Path(__file__).parent))
 
 from services.candle_backup_service import CandleBackupService
+from services.candle_archive import candles_from_records, get_candle_archive
 from services.cache import CacheService
 
 IST = pytz.timezone('Asia/Kolkata')
@@ -111,29 +112,26 @@ async def test_backup_restore():
             else:
                 print(f"   ❌ {symbol}: No candles found")
         
-        # Test 6: Check file size and structure
-        print("\n📍 Test 6: Verifying backup file structure...\n")
+        # Test 6: Check archive partition structure
+        print("\n📍 Test 6: Verifying archive partition structure...\n")
         
         sample_backup = backups[0] if backups else None
         if sample_backup:
-            backup_file = CandleBackupService.get_backup_file_path(sample_backup['symbol'])
+            archive = get_candle_archive()
+            records = archive.last(sample_backup['symbol'], sample_backup['timeframe'], 1)
             
-            with open(backup_file, 'r') as f:
-                data = json.load(f)
-            
-            size_kb = backup_file.stat().st_size / 1024
-            
-            print(f"   File: {backup_file.name}")
-            print(f"   Size: {size_kb:.1f} KB")
+            print(f"   File: {sample_backup['file']}")
+            print(f"   Size: {archive.root.joinpath(sample_backup['file']).stat().st_size / 1024:.1f} KB")
             print(f"   Structure:")
-            print(f"      - symbol: {data.get('symbol')}")
-            print(f"      - backup_date: {data.get('backup_date')}")
-            print(f"      - candle_count: {data.get('candle_count')}")
-            print(f"      - has_candles: {'candles' in data}")
+            print(f"      - symbol: {sample_backup['symbol']}")
+            print(f"      - timeframe: {sample_backup['timeframe']}")
+            print(f"      - month: {sample_backup['month']}")
+            print(f"      - candle_count: {sample_backup['candle_count']}")
+            print(f"      - record fields: {list(records.dtype.names)}")
             
-            if data.get('candles'):
-                first = data['candles'][0]
-                print(f"      - first_candle keys: {list(first.keys())}")
+            if len(records):
+                last = candles_from_records(records)[0]
+                print(f"      - last_candle keys: {list(last.keys())}")
         
         # Test 7: Test cleanup
         print("\n📍 Test 7: Testing cleanup function...\n")
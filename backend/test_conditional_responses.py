@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Test conditional GET + compression on polled JSON endpoints: ETag, 304 on
+If-None-Match, gzip negotiation, encoded-body reuse and pass-through for
+anything that is not a 200 JSON response under /api/.
+"""
+
+import gzip
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from services import conditional_responses as cr
+
+BIG = {"rows": [{"symbol": "NIFTY", "i": i, "signal": "NEUTRAL"} for i in range(200)]}
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    state = {"version": 1}
+
+    @app.middleware("http")          # re-streams bodies in chunks, like the CORS middleware in main.py
+    async def passthrough(request, call_next):
+        return await call_next(request)
+
+    @app.get("/api/advanced/big")
+    async def big():
+        return BIG
+
+    @app.get("/api/analysis/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/api/analysis/versioned")
+    async def versioned(response: Response):
+        response.headers["ETag"] = f'"snapshot-{state["version"]}"'
+        return {"version": state["version"], "pad": "x" * 2000}
+
+    @app.get("/api/text")
+    async def text():
+        return PlainTextResponse("hello" * 500)
+
+    @app.get("/api/stream")
+    async def stream():
+        return StreamingResponse(iter([b'{"a":', b"1}"]), media_type="application/json")
+
+    @app.get("/health")
+    async def health():
+        return BIG
+
+    app.add_middleware(cr.ConditionalResponseMiddleware, prefixes=("/api/",))
+    client = TestClient(app)
+    client.state = state
+    return client
+
+
+def test_etag_and_not_modified(client):
+    first = client.get("/api/analysis/small")
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "no-cache"
+    assert "Accept-Encoding" in first.headers["vary"]
+
+    again = client.get("/api/analysis/small", headers={"If-None-Match": f'"other", {etag}'})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert "content-type" not in again.headers
+
+
+def test_gzip_for_large_bodies_and_reuse_across_clients(client):
+    before = cr.conditional_metrics()["encode_reused"]
+    raw = client.get("/api/advanced/big", headers={"Accept-Encoding": "gzip"})
+    assert raw.headers["content-encoding"] == "gzip"
+    assert raw.json() == BIG                                    # httpx decodes transparently
+    assert int(raw.headers["content-length"]) < len(raw.content) // 4
+
+    client.get("/api/advanced/big", headers={"Accept-Encoding": "gzip;q=1.0, identity"})
+    assert cr.conditional_metrics()["encode_reused"] == before + 1
+
+    plain = client.get("/api/advanced/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    small = client.get("/api/analysis/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+
+def test_endpoint_supplied_etag_is_kept(client):
+    first = client.get("/api/analysis/versioned")
+    assert first.headers["etag"] == '"snapshot-1"'
+    assert client.get("/api/analysis/versioned", headers={"If-None-Match": '"snapshot-1"'}).status_code == 304
+    client.state["version"] = 2
+    assert client.get("/api/analysis/versioned", headers={"If-None-Match": '"snapshot-1"'}).status_code == 200
+
+
+def test_non_json_and_unprefixed_paths_pass_through(client):
+    assert "etag" not in client.get("/api/text").headers
+    streamed = client.get("/api/stream")                        # small chunked JSON is buffered
+    assert streamed.json() == {"a": 1}
+    assert "etag" in streamed.headers
+    assert "etag" not in client.get("/health").headers
+
+
+def test_negotiation_and_etag_matching():
+    assert cr.negotiate_encoding("gzip;q=0, deflate") is None
+    assert cr.negotiate_encoding("*") == ("br" if cr._BROTLI else "gzip")
+    assert cr.negotiate_encoding(None) is None
+    assert cr.etag_matches('"abc"', 'W/"abc"')
+    assert cr.etag_matches("*", '"x"')
+    assert not cr.etag_matches('"abd"', '"abc"')
+    assert gzip.decompress(cr.encode(b"{}" * 600, "gzip", '"t"')) == b"{}" * 600
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
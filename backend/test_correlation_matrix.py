@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test the cross-asset correlation matrix: incremental co-moments against NumPy
+refits at every lag (across resyncs), lead-lag detection, readiness gating and
+price → return alignment, the bar sampler over the instrument universe and
+global indices, and the readers (market compass correlations, global impact
+VIX correlation, compass futures leading, market edge basis weighting).
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.correlation_matrix import CorrelationMatrix, CorrelationService
+from services.instrument_universe import InstrumentUniverse
+
+
+def _returns(n, seed=11):
+    """a leads b by one bar, c is independent, d mirrors a, e is flat."""
+    rng = np.random.default_rng(seed)
+    lead = rng.normal(0, 1e-3, n + 1)
+    return np.column_stack([
+        lead[1:],
+        0.8 * lead[:-1] + rng.normal(0, 5e-4, n),
+        rng.normal(0, 1e-3, n),
+        -lead[1:] + rng.normal(0, 3e-4, n),
+        np.zeros(n),
+    ])
+
+
+class StubService:
+    def __init__(self, matrix):
+        self.matrix = matrix
+
+    def futures_lead(self, symbol):
+        return self.matrix.lead_lag(f"{symbol}-FUT", symbol)
+
+
+def test_incremental_matrix_matches_refit_at_every_lag():
+    rows = _returns(400)
+    matrix = CorrelationMatrix("abcde", window=50, max_lag=3, min_samples=5)
+    for t, row in enumerate(rows):
+        matrix.push(row)
+        window = rows[max(0, t - 49):t + 1]
+        if len(window) >= 3:
+            assert np.allclose(matrix.correlation()[:4, :4], np.corrcoef(window[:, :4].T), atol=1e-9)
+            assert np.allclose(matrix.covariance(), np.cov(window.T, bias=True), atol=1e-15)
+        for k in (1, 2, 3):
+            ts = np.arange(max(k, t - 49), t + 1)
+            if len(ts) >= 3:
+                x, y = rows[ts - k], rows[ts]
+                assert matrix.correlation(k)[0, 1] == pytest.approx(np.corrcoef(x[:, 0], y[:, 1])[0, 1], abs=1e-9)
+                assert matrix.correlation(-k)[1, 0] == matrix.correlation(k)[0, 1]
+    assert matrix.samples == 50 and not matrix.correlation()[4].any()              # flat series → 0
+    with pytest.raises(ValueError):
+        matrix.correlation(4)
+
+
+def test_lead_lag_and_readiness():
+    matrix = CorrelationMatrix("abcde", window=120, max_lag=3)
+    rows = _returns(300)
+    for row in rows[:19]:
+        matrix.push(row)
+    assert matrix.lead_lag("a", "b") is None and matrix.correlation_of("a", "d") is None
+    for row in rows[19:]:
+        matrix.push(row)
+    lead = matrix.lead_lag("a", "b")
+    assert lead["leader"] == "a" and lead["lag"] == 1 and lead["correlation"] > 0.7
+    assert abs(lead["contemporaneous"]) < 0.3 and set(lead["byLag"]) == {"-3", "-2", "-1", "0", "1", "2", "3"}
+    back = matrix.lead_lag("b", "a")
+    assert back["leader"] == "a" and back["lag"] == -1 and back["correlation"] == lead["correlation"]
+    assert matrix.lead_lag("a", "d")["leader"] is None and matrix.correlation_of("a", "d") < -0.9
+    window = rows[-120:]
+    assert matrix.beta("d", "a") == pytest.approx(np.polyfit(window[:, 0], window[:, 3], 1)[0], rel=1e-6)
+    assert [p["symbol"] for p in matrix.strongest("a")][:1] == ["d"]
+
+
+def test_prices_become_aligned_log_returns():
+    matrix = CorrelationMatrix(["X", "Y"], window=10, max_lag=1, min_samples=2)
+    matrix.push_prices({"X": 100.0, "Y": 50.0})
+    matrix.push_prices({"X": 101.0})                                               # Y has no price this bar
+    matrix.push_prices({"X": 102.01, "Y": 50.5})
+    rows = matrix._rows[:3]
+    assert rows[0].tolist() == [0.0, 0.0] and rows[1, 1] == 0.0
+    assert rows[1, 0] == pytest.approx(np.log(1.01)) and rows[2, 1] == pytest.approx(np.log(1.01))
+    assert matrix._observed.tolist() == [2, 1] and not matrix.ready("Y") and matrix.ready("X")
+
+
+def test_sampler_aligns_universe_and_global_indices():
+    universe = InstrumentUniverse()
+    for token, symbol, kind in ((1, "NIFTY", "INDEX"), (2, "NIFTY-FUT", "FUTURE"), (3, "INDIAVIX", "INDEX")):
+        universe.add(token, symbol, kind=kind)
+    service = CorrelationService(universe, bar_seconds=60, window=30, max_lag=2)
+    assert "SPX" in service.matrix.assets and "BANKNIFTY" in service.matrix.assets
+    assert not service.sample(now=1000.0, global_snapshot={})                     # nothing ticked yet
+
+    rng = np.random.default_rng(5)
+    nifty, fut, vix, spx = 25000.0, 25100.0, 13.0, 6000.0
+    moves = rng.normal(0, 1e-3, 60)
+    for bar, move in enumerate(moves):
+        epoch = 1000.0 + 60 * (bar + 1)
+        fut_move = moves[bar + 1] if bar + 1 < len(moves) else 0.0                 # futures one bar ahead
+        nifty *= np.exp(move)
+        fut *= np.exp(fut_move)
+        vix *= np.exp(-3 * move)
+        universe.on_tick(universe.id_of("NIFTY"), nifty, 0, 0, epoch - 1)
+        universe.on_tick(universe.id_of("NIFTY-FUT"), fut, 0, 0, epoch - 1)
+        universe.on_tick(universe.id_of("INDIAVIX"), vix, 0, 0, epoch - 1)
+        snapshot = {"SPX": {"price": spx, "status": "LIVE"}, "DAX": {"price": 0, "status": "UNAVAILABLE"}}
+        assert service.sample(now=epoch, global_snapshot=snapshot)
+    assert not service.sample(now=1000.0 + 60 * 62, global_snapshot={})            # feed went quiet
+    assert service.bars == 60 and service.skipped == 2 and service.matrix.samples == 30
+
+    assert service.futures_lead("NIFTY")["leader"] == "NIFTY-FUT"
+    assert service.futures_lead("BANKNIFTY") is None                               # never priced
+    assert service.matrix.correlation_of("NIFTY", "INDIAVIX") == pytest.approx(-1.0)
+    assert service.matrix.correlation_of("NIFTY", "SPX") == 0.0                    # flat global
+    report = service.report()
+    assert report["bars"] == 60 and "DAX" not in report["assets"] and report["futuresLead"]["NIFTY"]["lag"] == 1
+
+
+def test_readers_use_the_matrix(monkeypatch):
+    from services import global_impact_analyzer as gia
+    from services import market_compass_engine as mce
+    from services import market_edge_service as mes
+
+    rows = _returns(150)
+    matrix = CorrelationMatrix(["NIFTY", "NIFTY-FUT", "SPX", "INDIAVIX", "BANKNIFTY"], window=120, max_lag=3)
+    for row in rows:
+        matrix.push(row[[1, 0, 2, 3, 4]])                                          # futures lead NIFTY
+    stub = StubService(matrix)
+    for module in (gia, mce, mes):
+        monkeypatch.setattr(module, "get_correlation_service", lambda: stub)
+
+    engine = mce.MarketCompassEngine()
+    correlations = asyncio.run(engine._detect_correlations("NIFTY-FUT"))
+    assert [c.symbol2 for c in correlations] == ["INDIAVIX"]
+    assert correlations[0].strength == "STRONG_NEGATIVE" and correlations[0].lookback_bars == 120
+
+    analyzer = gia.GlobalImpactAnalyzer()
+    vix_corr = [abs(matrix.correlation_of("INDIAVIX", index)) for index in ("NIFTY", "BANKNIFTY")]  # SENSEX unknown
+    assert analyzer._calculate_correlation_to_vix() == pytest.approx(sum(vix_corr) / 2, abs=1e-4)
+    assert analyzer._calculate_confidence(2.0, 2.0) == 1.0                         # global links not intraday
+    monkeypatch.setattr(gia, "get_correlation_service", lambda: StubService(CorrelationMatrix(["X"])))
+    assert analyzer._calculate_correlation_to_vix() == 0.65 and analyzer._calculate_confidence(2.0, 2.0) == 1.0
+
+    from services.compass_service import _futures_leading
+    candles = [{"open": 25000.0}]
+    same_bar = {"leader": None, "lag": 0, "correlation": 0.95}
+    assert _futures_leading("NIFTY", stub.futures_lead("NIFTY"), candles, 25000.0, 0.0)
+    assert _futures_leading("NIFTY", same_bar, candles, 25100.0, 0.2)               # lag 0: %chg heuristic
+    assert not _futures_leading("NIFTY", same_bar, candles, 25010.0, 0.2)
+
+    history = mes.EdgeHistory()
+    plain = mes._futures_basis_signal(25100.0, 25000.0, history)
+    leading = mes._futures_basis_signal(25100.0, 25000.0, history, stub.futures_lead("NIFTY"))
+    assert leading["score"] == pytest.approx(plain["score"] * 1.25)
+    assert leading["extra"]["leader"] == "FUTURES" and leading["extra"]["leadBars"] == 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the depth book: snapshots round-trip through the NumPy ring, per-tick
+microstructure features (microprice, imbalance, OFI, depletion /
+replenishment / cancellation), rolling horizons, ring wrap-around and memory
+size, and OrderFlowAnalyzer reading depth from the book instead of copying
+the ladders into every metric.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.depth_book import FEATURES, DepthBook, DepthBooks
+from services.instrument_universe import InstrumentUniverse
+
+
+def _ladder(prices, quantities, orders=None):
+    orders = orders or [q // 75 or 1 for q in quantities]
+    return [{"price": p, "quantity": q, "orders": o} for p, q, o in zip(prices, quantities, orders)]
+
+
+BIDS = [25000.0, 24999.95, 24999.9, 24999.85, 24999.8]
+ASKS = [25000.1, 25000.15, 25000.2, 25000.25, 25000.3]
+
+
+def test_snapshot_round_trip_and_features():
+    book = DepthBook("NIFTY-FUT", capacity=16)
+    seq = book.update(_ladder(BIDS, [300, 450, 600, 750, 900]), _ladder(ASKS, [100, 450, 600, 750, 900]),
+                      epoch=1000.0, last_price=25000.05, volume_traded=10_000)
+    assert seq == 0
+    assert book.levels()["buy"][0] == {"price": 25000.0, "quantity": 300, "orders": 4}
+    assert [l["price"] for l in book.levels()["sell"]] == ASKS
+    f = book.latest()
+    assert f["mid"] == pytest.approx(25000.05, abs=0.01)
+    assert f["spread"] == pytest.approx(0.1, abs=1e-3)
+    # microprice leans to the thin ask: (25000.1*300 + 25000.0*100) / 400
+    assert f["microprice"] == pytest.approx(25000.075, abs=0.01)
+    assert f["l1_imbalance"] == pytest.approx(0.5)
+    assert f["imbalance"] == pytest.approx(200 / 5800, abs=1e-4)
+    assert f["ofi"] == 0 and f["traded"] == 0                               # nothing to diff against yet
+    assert book.totals() == {"bid": 25000.0, "ask": 25000.1, "bid_qty": 3000, "ask_qty": 2800,
+                             "bid_orders": 40, "ask_orders": 37}
+
+
+def test_ofi_depletion_and_cancellation():
+    book = DepthBook("NIFTY-FUT", capacity=16)
+    book.update(_ladder(BIDS, [300, 450, 600, 750, 900]), _ladder(ASKS, [200, 450, 600, 750, 900]),
+                epoch=1000.0, last_price=25000.05, volume_traded=10_000)
+    # Sellers hit the bid: 150 traded at 25000.0, and 100 more pulled from that queue;
+    # 50 added to the best ask queue.
+    book.update(_ladder(BIDS, [50, 450, 600, 750, 900]), _ladder(ASKS, [250, 450, 600, 750, 900]),
+                epoch=1001.0, last_price=25000.0, volume_traded=10_150)
+    f = book.latest()
+    assert f["traded"] == 150
+    assert f["ofi"] == (50 - 300) - (250 - 200)                             # −300: selling pressure
+    assert f["bid_depleted"] == 250 and f["bid_cancelled"] == 100
+    assert f["ask_added"] == 50 and f["ask_depleted"] == 0
+
+    # Touch moves up: new bid level 25000.05 appears (added), ask 25000.1 fully taken
+    book.update(_ladder([25000.05] + BIDS[:4], [500, 50, 450, 600, 750]),
+                _ladder(ASKS[1:] + [25000.35], [450, 600, 750, 900, 300]),
+                epoch=1002.0, last_price=25000.1, volume_traded=10_400)
+    f = book.latest()
+    assert f["bid_added"] == 500
+    assert f["ask_depleted"] == 250 and f["ask_cancelled"] == 0              # all of it traded
+    assert f["ofi"] == 500 - (-250)
+
+
+def test_rolling_horizons():
+    book = DepthBook("NIFTY-FUT", capacity=256)
+    bids, asks = _ladder(BIDS, [300] * 5), _ladder(ASKS, [300] * 5)
+    for i in range(120):
+        book.update(bids, asks, epoch=1000.0 + i, last_price=25000.05, volume_traded=1000 + 10 * i)
+    rolling = book.rolling((10, 60), now=1119.0)
+    assert rolling["10s"]["ticks"] == 10 and rolling["60s"]["ticks"] == 60
+    assert rolling["10s"]["traded"] == 100 and rolling["60s"]["traded"] == 600
+    assert rolling["60s"]["spread_mean"] == pytest.approx(0.1, abs=1e-3)
+    assert book.rolling((10,)) is book.rolling((10,))                       # memoised per snapshot
+
+
+def test_ring_wraps_and_stays_small():
+    book = DepthBook("NIFTY-FUT", capacity=8)
+    for i in range(20):
+        book.update(_ladder([100.0 + i * 0.05], [i + 1]), _ladder([100.1 + i * 0.05], [1]), epoch=float(i))
+    assert book.seq == 20 and book.count == 8
+    history = book.history()
+    assert history["epoch"].tolist() == [float(i) for i in range(12, 20)]
+    assert history["qty"][:, 0, 0].tolist() == list(range(13, 21))
+    assert book.levels(5) == {"buy": [], "sell": []}                        # overwritten
+    assert book.levels(19)["buy"][0]["quantity"] == 20
+    per_snapshot = DepthBook("X", capacity=1000).nbytes / 1000
+    assert per_snapshot < 200 and len(FEATURES) == 15
+    assert DepthBook("X", capacity=32768).nbytes < 6_000_000                # hours of history, few MB
+
+
+def test_order_flow_reads_depth_from_book(monkeypatch):
+    from services import order_flow_analyzer as module
+
+    universe = InstrumentUniverse()
+    fut = universe.add(7, "NIFTY-FUT", kind="FUTURE", exchange="NFO", underlying="NIFTY")
+    books = DepthBooks(universe, capacity=64)
+    monkeypatch.setattr(module, "get_depth_books", lambda: books)
+    analyzer = module.OrderFlowAnalyzer(history_maxlen=5, symbols=["NIFTY", "NIFTYSTOCK"])
+    assert universe.desired_subscriptions()[7] == "full"
+
+    depth = {"buy": _ladder(BIDS, [900, 450, 600, 750, 900]), "sell": _ladder(ASKS, [100, 450, 600, 750, 900])}
+    metrics = asyncio.run(analyzer.process_zerodha_tick(
+        {"last_price": 101.0, "volume_traded": 5, "depth": depth, "bid": 25000.0, "ask": 25000.1}, "NIFTYSTOCK"))
+    assert metrics.bid_levels == [] and metrics.total_bid_qty == 3600 and metrics.delta == 800
+    out = analyzer.get_current_metrics("NIFTYSTOCK")
+    assert out["bidLevels"][0] == {"price": 25000.0, "quantity": 900, "orders": 12}
+    assert out["microstructure"]["source"] == "NIFTYSTOCK" and "60s" in out["microstructure"]["rolling"]
+
+    # Index tick without depth: the live NIFTY-FUT book stands in for the order book
+    books.on_tick(fut, {"last_price": 25000.05, "volume_traded": 100, "depth": depth}, time.time())
+    asyncio.run(analyzer.process_zerodha_tick({"last_price": 24990.0, "volume_traded": 0, "depth": {}}, "NIFTY"))
+    out = analyzer.get_current_metrics("NIFTY")
+    assert out["microstructure"]["source"] == "NIFTY-FUT"
+    assert out["bid"] == 25000.0 and out["totalBidQty"] == 3600
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test incremental news ingestion: streaming RSS/Atom parse, content-hash
+classification cache and headline deltas for WebSocket clients (pushed when
+headlines, ranking or the heat / summary counts change).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("httpx")
+pytest.importorskip("pytz")
+
+from services import global_news_service as gns
+
+
+def _rss(titles):
+    items = "".join(
+        f"<item><title>{t}</title><link>https://x/{i}</link>"
+        f"<description>&lt;b&gt;desc {i}&lt;/b&gt;</description></item>"
+        for i, t in enumerate(titles)
+    )
+    return f"<?xml version='1.0'?><rss><channel>{items}</channel></rss>"
+
+
+def test_parse_rss_stops_at_feed_limit_and_reads_description():
+    index = gns._AnalysisIndex()
+    titles = [f"Fed rate cut headline {i}" for i in range(50)]
+    items = gns._parse_rss(_rss(titles), "Test Feed", index)
+
+    assert len(items) == gns._MAX_ITEMS_PER_FEED
+    assert items[0]["description"] == "desc 0"
+    assert items[0]["signal"] == "STRONG_BULLISH"
+    assert items[0]["impact_tier"] in {"high", "medium", "low", "volatility"}
+    # Only the items actually consumed were classified
+    assert index.misses == gns._MAX_ITEMS_PER_FEED
+
+
+def test_parse_atom_entries():
+    xml = (
+        "<feed xmlns='http://www.w3.org/2005/Atom'>"
+        "<entry><title>Crude falls sharply</title><link href='https://a/1'/>"
+        "<summary>Brent falls</summary><updated>2026-01-01</updated></entry>"
+        "</feed>"
+    )
+    items = gns._parse_rss(xml, "Atom", gns._AnalysisIndex())
+    assert len(items) == 1
+    assert items[0]["link"] == "https://a/1"
+    assert items[0]["published"] == "2026-01-01"
+
+
+def test_repeat_headlines_hit_the_classification_cache():
+    index = gns._AnalysisIndex()
+    xml = _rss(["RBI rate cut announced", "War fears grow"])
+    gns._parse_rss(xml, "A", index)
+    gns._parse_rss(xml, "A", index)
+    assert index.stats() == {"entries": 2, "hits": 2, "misses": 2}
+
+
+def test_index_is_bounded():
+    index = gns._AnalysisIndex(max_entries=3)
+    for i in range(10):
+        index.analyze(f"headline {i}", "")
+    assert index.stats()["entries"] == 3
+
+
+def test_malformed_xml_returns_items_parsed_so_far():
+    xml = _rss(["First headline"])[:-len("</channel></rss>")] + "<item><title>broken"
+    items = gns._parse_rss(xml + "</rss>", "Broken", gns._AnalysisIndex())
+    assert [i["title"] for i in items] == ["First headline"]
+
+
+def test_delta_carries_only_new_items_and_order():
+    svc = gns.GlobalNewsService()
+    svc._cache = gns._parse_rss(_rss(["Rate cut", "Crude falls"]), "A", svc._index)
+    added = svc._cache[:1]
+    delta = svc.build_delta(added, ["gone"])
+
+    assert delta["type"] == "global_news_delta"
+    assert delta["added"] == added
+    assert delta["removed"] == ["gone"]
+    assert delta["order"] == [i["id"] for i in svc._cache]
+    assert "items" not in delta and "signal_meta" not in delta
+    assert delta["total"] == 2
+
+
+def test_refresh_pushes_ranking_and_heat_changes(monkeypatch):
+    import asyncio
+
+    def item(id_, score):
+        return {"id": id_, "score": score, "source": "A", "confidence": 50,
+                "signal": "NEUTRAL", "impact_tier": "low"}
+
+    feed = {"items": [item("a", 80), item("b", 60)]}
+
+    async def fetch(pool, f, index, previous):
+        return list(feed["items"])
+
+    monkeypatch.setattr(gns, "_RSS_FEEDS", [{"name": "A", "url": "https://a"}])
+    monkeypatch.setattr(gns, "_fetch_feed", fetch)
+    monkeypatch.setattr(gns, "get_http_pool", lambda: None)
+    svc = gns.GlobalNewsService()
+    sent = []
+
+    async def broadcast(payload=None):
+        sent.append(payload)
+
+    svc.broadcast = broadcast
+
+    async def refresh():
+        await svc._refresh()
+        await asyncio.sleep(0)
+
+    async def run():
+        await refresh()                                   # a, b arrive
+        await refresh()                                   # nothing changed: no push
+        feed["items"] = [item("a", 60), item("b", 80)]
+        await refresh()                                   # same ids, new ranking
+        feed["items"] = [item("a", 55), item("b", 90)]
+        await refresh()                                   # same ranking, hotter
+
+    asyncio.run(run())
+    assert len(sent) == 3
+    assert [d["added"] for d in sent[1:]] == [[], []] and [d["removed"] for d in sent[1:]] == [[], []]
+    assert sent[1]["order"] == ["b", "a"] and sent[2]["order"] == ["b", "a"]
+    assert sent[2]["heat_score"] > sent[1]["heat_score"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
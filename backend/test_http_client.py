@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test the shared async HTTP layer against a local stub server:
+pooled clients, conditional GET (ETag / 304), hedged requests and metrics.
+"""
+
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("httpx")
+
+from services.http_client import HttpClientPool, hedged
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    hits = {"/feed": 0, "/boom": 0}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == "/feed":
+            _StubHandler.hits["/feed"] += 1
+            if self.headers.get("If-None-Match") == '"v1"':
+                self.send_response(304)
+                self.end_headers()
+                return
+            body = b"<rss><channel><item><title>hello</title></item></channel></rss>"
+            self.send_response(200)
+            self.send_header("ETag", '"v1"')
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            _StubHandler.hits["/boom"] += 1
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def test_conditional_get_returns_cached_body_on_304(stub_url):
+    async def run():
+        pool = HttpClientPool(timeout=2.0)
+        try:
+            first = await pool.get_conditional(f"{stub_url}/feed", provider="stub")
+            second = await pool.get_conditional(f"{stub_url}/feed", provider="stub")
+            return first, second, pool.metrics()
+        finally:
+            await pool.aclose()
+
+    first, second, metrics = asyncio.run(run())
+    assert first.status_code == 200 and not first.not_modified
+    assert second.status_code == 304 and second.not_modified
+    assert second.text == first.text
+    stub = metrics["providers"]["stub"]
+    assert stub["requests"] == 2
+    assert stub["notModified"] == 1
+    assert stub["errors"] == 0
+    # One keep-alive client for the single stub host
+    assert len(metrics["hosts"]) == 1
+
+
+def test_error_status_is_counted(stub_url):
+    async def run():
+        pool = HttpClientPool(timeout=2.0)
+        try:
+            resp = await pool.get(f"{stub_url}/boom", provider="broken")
+            return resp.status_code, pool.metrics()
+        finally:
+            await pool.aclose()
+
+    status, metrics = asyncio.run(run())
+    assert status == 500
+    assert metrics["providers"]["broken"]["errors"] == 1
+    assert metrics["providers"]["broken"]["lastError"] == "HTTP 500"
+
+
+def test_hedged_prefers_fast_fallback_over_slow_primary():
+    started = []
+
+    async def slow():
+        started.append("slow")
+        await asyncio.sleep(1.0)
+        return "slow"
+
+    async def fast():
+        started.append("fast")
+        return "fast"
+
+    result = asyncio.run(hedged([slow, fast], delay=0.05))
+    assert result == "fast"
+    assert started == ["slow", "fast"]
+
+
+def test_hedged_does_not_launch_fallback_when_primary_is_quick():
+    started = []
+
+    async def primary():
+        started.append("primary")
+        return {"price": 1}
+
+    async def fallback():
+        started.append("fallback")
+        return {"price": 2}
+
+    result = asyncio.run(hedged([primary, fallback], delay=0.5))
+    assert result == {"price": 1}
+    assert started == ["primary"]
+
+
+def test_hedged_skips_failed_and_empty_results():
+    async def fails():
+        raise RuntimeError("provider down")
+
+    async def empty():
+        return None
+
+    async def good():
+        return "ok"
+
+    assert asyncio.run(hedged([fails, empty, good], delay=0.5)) == "ok"
+    assert asyncio.run(hedged([fails, empty], delay=0.5)) is None
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test the instrument universe: dense ids and array growth (no ticks lost to a
+concurrent grow), slices that follow
+later registrations, KiteTicker subscription deltas (mode upgrades, releases,
+token cap), IST-aligned candle books, and the feed routing non-index
+instruments into the universe instead of the broadcast path.
+"""
+
+import asyncio
+import json
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.candle_archive import IST
+from services.instrument_universe import InstrumentUniverse
+
+
+class FakeTicker:
+    MODE_LTP, MODE_QUOTE, MODE_FULL = "ltp", "quote", "full"
+
+    def __init__(self):
+        self.calls = []
+
+    def subscribe(self, tokens):
+        self.calls.append(("subscribe", sorted(tokens)))
+
+    def unsubscribe(self, tokens):
+        self.calls.append(("unsubscribe", sorted(tokens)))
+
+    def set_mode(self, mode, tokens):
+        self.calls.append((mode, sorted(tokens)))
+
+
+def _epoch(hh, mm, ss=0):
+    return IST.localize(datetime(2026, 10, 16, hh, mm, ss)).timestamp()
+
+
+def test_dense_ids_and_growth_keep_state():
+    universe = InstrumentUniverse(capacity=2)
+    assert [universe.add(100 + i, f"S{i}", kind="EQUITY") for i in range(5)] == [0, 1, 2, 3, 4]
+    assert universe.add(101, "S1", kind="EQUITY") == 1                     # idempotent
+    universe.on_tick(1, 250.5, 1000, 0, 1.0)
+    universe.candles["5m"].update(1, 250.5, 1000, 0, _epoch(9, 16))
+    universe.add(200, "LATE", kind="EQUITY")                                # crosses capacity 4 → 8
+    assert universe.capacity == 8
+    assert universe.state.last_price[1] == 250.5
+    assert universe.candles["5m"].candle(1)["open"] == 250.5
+    assert universe.id_of_token(104) == 4 and universe.id_of("LATE") == 5
+    with pytest.raises(ValueError):
+        universe.add(300, "X", kind="BOND")
+
+
+def test_growth_never_drops_concurrent_ticks(monkeypatch):
+    universe = InstrumentUniverse(capacity=2)
+    universe.add(1, "NIFTY")
+    grow = type(universe.state).grow
+    blocked, ticks = [], []
+
+    def spy(state, capacity):
+        # A tick from the KiteTicker thread, or one timeframe's candle write,
+        # arriving mid-grow waits for the swap
+        for target, args in ((universe.on_tick, (0, 25100.0, 10, 0, 2.0)),
+                             (universe.update_candle, ("5m", 0, 25100.0, 10, 0, 2.0))):
+            tick = threading.Thread(target=target, args=args)
+            tick.start()
+            tick.join(timeout=0.05)
+            blocked.append(tick.is_alive())
+            ticks.append(tick)
+        grow(state, capacity)
+
+    monkeypatch.setattr(type(universe.state), "grow", spy)
+    universe.on_tick(0, 25000.0, 5, 0, 1.0)
+    universe.add(2, "BANKNIFTY")
+    universe.add(3, "SENSEX")                               # crosses capacity 2 → 4
+    for tick in ticks:
+        tick.join(timeout=5)
+    assert blocked == [True, True] and universe.capacity == 4
+    assert universe.state.ticks[0] == 2 and universe.state.last_price[0] == 25100.0
+    assert universe.candles["5m"].candle(0, live=True)["close"] == 25100.0
+
+
+def test_slices_follow_registrations():
+    universe = InstrumentUniverse()
+    universe.add(1, "NIFTY")
+    strikes = universe.declare("strikes", kinds={"OPTION"}, underlyings={"NIFTY"})
+    universe.add_kite_instruments([
+        {"instrument_token": 11, "tradingsymbol": "NIFTY26OCT25000CE", "name": "NIFTY", "segment": "NFO-OPT",
+         "instrument_type": "CE", "exchange": "NFO", "strike": 25000.0, "expiry": "2026-10-27", "lot_size": 75},
+        {"instrument_token": 12, "tradingsymbol": "BANKNIFTY26OCT55000PE", "name": "BANKNIFTY",
+         "segment": "NFO-OPT", "instrument_type": "PE", "exchange": "NFO", "strike": 55000.0},
+        {"instrument_token": 13, "tradingsymbol": "NIFTY26OCTFUT", "name": "NIFTY", "segment": "NFO-FUT",
+         "instrument_type": "FUT", "exchange": "NFO"},
+    ])
+    assert universe.symbols("strikes") == ["NIFTY26OCT25000CE"]
+    ce = universe[universe.id_of("NIFTY26OCT25000CE")]
+    assert (ce.strike, ce.option_type, ce.lot_size) == (25000.0, "CE", 75)
+    index_and_future = universe.declare("nifty", underlyings={"NIFTY"}, kinds={"INDEX", "FUTURE"})
+    assert sorted(universe[i].symbol for i in index_and_future.members) == ["NIFTY", "NIFTY26OCTFUT"]
+    assert universe.consumers_of(universe.id_of("NIFTY26OCT25000CE")) == ["strikes"]
+    universe.state.last_price[strikes.ids] = 112.5
+    assert universe.state.last_price[ce.iid] == 112.5
+
+
+def test_subscription_delta_modes_release_and_cap():
+    universe = InstrumentUniverse(max_tokens=3)
+    for token, symbol in ((1, "NIFTY"), (2, "BANKNIFTY"), (3, "FUT1"), (4, "FUT2")):
+        universe.add(token, symbol, kind="INDEX" if token < 3 else "FUTURE")
+    universe.declare("feed", symbols={"NIFTY", "BANKNIFTY"}, mode="full")
+    universe.declare("ltp_watch", symbols={"NIFTY", "FUT1"}, mode="ltp")
+    ws = FakeTicker()
+    assert universe.subscriptions_pending
+    universe.apply_subscriptions(ws)
+    assert ws.calls == [("subscribe", [1, 2]), ("full", [1, 2]), ("subscribe", [3]), ("ltp", [3])]
+    assert not universe.subscriptions_pending
+
+    universe.declare("quotes", kinds={"FUTURE"}, mode="quote")             # FUT1 ltp → quote, FUT2 over the cap
+    ws.calls.clear()
+    assert universe.apply_subscriptions(ws) == {"subscribed": 1, "unsubscribed": 0, "total": 3}
+    assert ws.calls == [("quote", [3])]
+
+    universe.release("quotes")
+    universe.release("ltp_watch")
+    ws.calls.clear()
+    universe.apply_subscriptions(ws)
+    assert ws.calls == [("unsubscribe", [3])]
+    ws.calls.clear()
+    universe.apply_subscriptions(ws, resubscribe=True)                      # after a reconnect
+    assert ws.calls == [("subscribe", [1, 2]), ("full", [1, 2])]
+
+
+def test_candle_book_ist_buckets():
+    universe = InstrumentUniverse()
+    iid = universe.add(1, "NIFTY")
+    book = universe.candles["5m"]
+    assert book.update(iid, 100.0, 1000, 0, _epoch(9, 15, 5)) is None
+    book.update(iid, 104.0, 1600, 50, _epoch(9, 17))
+    book.update(iid, 99.0, 1900, 60, _epoch(9, 19, 59))
+    finished = universe.update_candles(iid, 101.0, 2500, 70, _epoch(9, 20))
+    assert [tf for tf, _ in finished] == ["5m"]                              # 3m bucket 09:18 still open
+    assert finished[0][1] == {"timestamp": "2026-10-16T09:15:00+05:30", "open": 100.0, "high": 104.0,
+                              "low": 99.0, "close": 99.0, "volume": 900, "oi": 60, "oi_prev": 50}
+    live = book.candle(iid, live=True)
+    assert live["timestamp"] == "2026-10-16T09:20:00+05:30" and live["_live"]
+    json.dumps(live)
+
+
+def test_feed_routes_non_index_ticks_to_universe():
+    from services.cache import CacheService
+    from services.market_feed import MarketFeedService, TOKEN_SYMBOL_MAP
+
+    svc = MarketFeedService(CacheService(), ws_manager=None)
+    iid = svc.universe.add(990001, "TESTSTOCK26OCTFUT", kind="FUTURE", exchange="NFO", underlying="TESTSTOCK")
+    nifty_token = next(t for t, s in TOKEN_SYMBOL_MAP.items() if s == "NIFTY")
+
+    svc._on_ticks(None, [{"instrument_token": 990001, "last_price": 812.5, "volume_traded": 4000, "oi": 9000},
+                         {"instrument_token": nifty_token, "last_price": 25010.0}])
+    assert svc.universe.state.last_price[iid] == 812.5
+    assert svc._tick_queue.qsize() == 1                                     # only NIFTY goes to broadcast
+    assert svc._tick_queue.get_nowait()["symbol"] == "NIFTY"
+
+    async def run():
+        svc._instrument_ticks.clear()
+        svc._instrument_ticks.append((iid, 812.5, 4000, 9000, _epoch(10, 1)))
+        svc._instrument_ticks.append((iid, 815.0, 4600, 9100, _epoch(10, 6)))
+        assert await svc._drain_instrument_ticks() == 2
+        return await svc.cache.lrange("analysis_candles:TESTSTOCK26OCTFUT", 0, -1)
+
+    candles = asyncio.run(run())
+    assert len(candles) == 1
+    candle = json.loads(candles[0]) if isinstance(candles[0], str) else candles[0]
+    assert candle["timestamp"].endswith("10:00:00+05:30") and candle["close"] == 812.5
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Test the Kite gateway against the local fake Kite server: awaitable calls on
+the dedicated executor with per-endpoint metrics, bounded admission, token
+hot-swap from .env, error accounting, token validation that leaves the
+shared token alone, and the token manager no longer blocking the event loop.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("kiteconnect")
+
+from benchmarks.fake_kite import FakeKite
+from services import kite_gateway as gateway_module
+from services.kite_gateway import KiteGateway
+
+
+@pytest.fixture
+def fake():
+    with FakeKite(tokens={"tok-1", "tok-2"}) as server:
+        yield server
+
+
+def test_calls_run_on_gateway_executor_with_metrics(fake):
+    gw = KiteGateway("key", "tok-1", root=fake.url, pool_size=2, env_file=None)
+
+    async def scenario():
+        threads = []
+        original = gw.call_sync
+
+        def spy(method, *args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return original(method, *args, **kwargs)
+
+        gw.call_sync = spy
+        profile = await gw.profile()
+        quotes = await gw.quote(["NSE:NIFTY 50", "NFO:NIFTY26JANFUT"])
+        candles = await gw.historical_data(256265, "2026-01-05 09:15:00", "2026-01-05 10:00:00", "5minute")
+        nfo = await gw.instruments("NFO")
+        return threads, profile, quotes, candles, nfo
+
+    threads, profile, quotes, candles, nfo = asyncio.run(scenario())
+    assert all(name.startswith("kite") for name in threads)
+    assert profile["user_id"] == "FK0001"
+    assert quotes["NFO:NIFTY26JANFUT"]["depth"]["buy"][0]["quantity"] == 300
+    assert len(candles) == 10 and candles[0]["open"] == 25000.0
+    assert {row["tradingsymbol"] for row in nfo} == {"NIFTY26JANFUT", "BANKNIFTY26JANFUT"}
+
+    metrics = gw.metrics()
+    assert metrics["root"] == fake.url and metrics["poolSize"] == 2 and metrics["inFlight"] == 0
+    assert set(metrics["endpoints"]) == {"profile", "quote", "historical_data", "instruments"}
+    assert metrics["endpoints"]["quote"]["requests"] == 1
+    assert all(token == "tok-1" for _, _, token in fake.requests)
+    gw.shutdown()
+
+
+def test_admission_is_bounded(fake):
+    fake.latency = 0.05
+    gw = KiteGateway("key", "tok-1", root=fake.url, pool_size=2, max_pending=3, env_file=None)
+    peak = {"in_flight": 0}
+
+    async def scenario():
+        async def watch():
+            while True:
+                peak["in_flight"] = max(peak["in_flight"], gw.metrics()["inFlight"])
+                await asyncio.sleep(0.005)
+
+        watcher = asyncio.create_task(watch())
+        results = await asyncio.gather(*(gw.ltp(["NSE:NIFTY 50"]) for _ in range(12)))
+        watcher.cancel()
+        return results
+
+    started = time.perf_counter()
+    results = asyncio.run(scenario())
+    elapsed = time.perf_counter() - started
+    assert len(results) == 12 and all(r["NSE:NIFTY 50"]["last_price"] == 25000.0 for r in results)
+    assert peak["in_flight"] <= 2                      # never more than the pool's threads
+    assert elapsed >= 12 / 2 * 0.05 * 0.9              # two at a time, not twelve
+    assert fake.count("/quote/ltp") == 12
+    gw.shutdown()
+
+
+def test_token_hot_swap_from_env(fake, tmp_path, monkeypatch):
+    from config import get_settings
+
+    env = tmp_path / ".env"
+    env.write_text("ZERODHA_API_KEY=key\nZERODHA_ACCESS_TOKEN=tok-1\n")
+    monkeypatch.setenv("ZERODHA_API_KEY", "key")
+    monkeypatch.setenv("ZERODHA_ACCESS_TOKEN", "tok-1")
+    get_settings.cache_clear()
+    try:
+        gw = KiteGateway(root=fake.url, env_file=env)
+        holder = gw.sync_client()                       # e.g. a service's self.kite
+        assert holder.profile()["user_id"] == "FK0001"
+
+        # Login flow rewrites .env; the settings reload picks up the new value
+        monkeypatch.setenv("ZERODHA_ACCESS_TOKEN", "tok-2")
+        env.write_text("ZERODHA_API_KEY=key\nZERODHA_ACCESS_TOKEN=tok-2\n")
+        os.utime(env, (time.time() + 5, time.time() + 5))
+        gw._env_checked -= 10                           # skip the once-per-second throttle
+        assert holder.profile()["user_id"] == "FK0001"
+        assert [token for _, _, token in fake.requests] == ["tok-1", "tok-2"]
+        assert gw.metrics()["tokenSwaps"] == 1
+        assert gw.reload_token() is False               # unchanged file: no swap
+
+        assert gw.set_access_token("tok-1") is True
+        assert gw.access_token == "tok-1" and holder.access_token == "tok-1"
+        assert holder.EXCHANGE_NFO == "NFO"             # SDK constants read through
+        gw.shutdown()
+    finally:
+        get_settings.cache_clear()
+
+
+def test_errors_are_counted_per_endpoint(fake):
+    from kiteconnect.exceptions import GeneralException, TokenException
+
+    gw = KiteGateway("key", "stale", root=fake.url, env_file=None)
+    with pytest.raises(TokenException):
+        asyncio.run(gw.profile())
+    gw.set_access_token("tok-1")
+    fake.fail_next(1, status=500)
+    with pytest.raises(GeneralException):
+        gw.call_sync("margins")
+    assert gw.call_sync("margins")["equity"]["enabled"] is True
+
+    endpoints = gw.metrics()["endpoints"]
+    assert endpoints["profile"]["errors"] == 1 and "TokenException" in endpoints["profile"]["lastError"]
+    assert endpoints["margins"]["requests"] == 2 and endpoints["margins"]["errors"] == 1
+    gw.shutdown()
+
+
+def test_validating_a_token_never_swaps_the_shared_one(fake, monkeypatch):
+    from kiteconnect.exceptions import TokenException
+    from services import global_token_manager
+
+    gw = KiteGateway("key", "tok-2", root=fake.url, env_file=None)
+    monkeypatch.setattr(gateway_module, "_gateway", gw)
+    manager = global_token_manager.GlobalTokenManager()
+    monkeypatch.setattr(manager.settings, "zerodha_access_token", "tok-1", raising=False)
+
+    assert asyncio.run(manager.is_token_valid()) is True               # a stale cached token
+    with pytest.raises(TokenException):
+        asyncio.run(gw.profile(token="stale"))
+    pinned = gw.sync_client("tok-1")
+    assert pinned.profile()["user_id"] == "FK0001" and pinned.access_token == "tok-1"
+    assert gw.call_sync("margins")["equity"]["enabled"] is True
+
+    assert gw.access_token == "tok-2" and gw.metrics()["tokenSwaps"] == 0
+    assert [token for _, _, token in fake.requests] == ["tok-1", "stale", "tok-1", "tok-2"]
+    assert gw.metrics()["endpoints"]["profile"]["requests"] == 3
+    gw.shutdown()
+
+
+def test_token_manager_does_not_block_the_loop(fake, monkeypatch):
+    from services import global_token_manager
+
+    fake.latency = 0.2
+    gw = KiteGateway("key", "tok-1", root=fake.url, env_file=None)
+    monkeypatch.setattr(gateway_module, "_gateway", gw)
+    manager = global_token_manager.GlobalTokenManager()
+    monkeypatch.setattr(manager.settings, "zerodha_access_token", "tok-1", raising=False)
+
+    async def scenario():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        valid = await manager.is_token_valid()
+        beat.cancel()
+        return valid, ticks
+
+    valid, ticks = asyncio.run(scenario())
+    assert valid is True and manager.get_token_status()["user_info"]["user_name"] == "Fake Trader"
+    assert ticks >= 10                                  # the loop kept running during the 200ms call
+    assert gw.metrics()["endpoints"]["profile"]["requests"] == 1
+    gw.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
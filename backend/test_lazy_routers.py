@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Test lazy router registration: source-scanned paths match the real routes of
+every lazily mounted router, the first request installs the router in place
+(route order kept) for HTTP and WebSocket, the OpenAPI schema sees every
+route, system health component reports resolved on request, and the
+-X importtime parser.
+"""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from services import lazy_routers
+from services.import_profiler import parse_importtime, summarize
+
+DEMO = '''
+from fastapi import APIRouter, WebSocket
+
+http_router = APIRouter(prefix="/demo", tags=["Demo"])
+ws_router = APIRouter()
+LOADS = []
+LOADS.append(1)
+
+
+@http_router.get("/items/{symbol}")
+async def item(symbol: str):
+    return {"symbol": symbol}
+
+
+@http_router.post("/items")
+async def create():
+    return {"created": True}
+
+
+@ws_router.websocket("/demo")
+async def demo_ws(websocket: WebSocket):
+    await websocket.accept()
+    await websocket.send_json({"hello": "ws"})
+    await websocket.close()
+'''
+
+
+@pytest.fixture
+def demo_module(tmp_path, monkeypatch):
+    name = f"lazy_demo_{tmp_path.name.replace('-', '_')}"
+    (tmp_path / f"{name}.py").write_text(textwrap.dedent(DEMO))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield name
+    sys.modules.pop(name, None)
+
+
+def _app(demo_module):
+    app = FastAPI()
+    before = APIRouter()
+
+    @before.get("/api/first")
+    async def first():
+        return {"first": True}
+
+    app.include_router(before)
+    lazy_routers.add_lazy_router(app, demo_module, [("ws_router", "/ws"), ("http_router", "/api")],
+                                 tags=["Demo"])
+
+    @app.get("/api/{anything}/{symbol}")
+    async def catch_all(anything: str, symbol: str):
+        return {"catch_all": True}
+
+    return app
+
+
+def test_scanned_paths_match_feature_routers():
+    import main
+
+    for module, mounts, _tags in main.FEATURE_ROUTERS:
+        imported = __import__(module, fromlist=["_"])
+        real = []
+        for attr, prefix in mounts:
+            probe = FastAPI()
+            probe.include_router(getattr(imported, attr), prefix=prefix)
+            real += [(r.path, type(r).__name__ == "APIWebSocketRoute")
+                     for r in probe.router.routes if hasattr(r, "endpoint") and r.path not in
+                     ("/openapi.json", "/docs", "/docs/oauth2-redirect", "/redoc")]
+        assert lazy_routers.route_paths(module, mounts) == real, module
+
+
+def test_first_request_installs_router_in_place(demo_module):
+    app = _app(demo_module)
+    client = TestClient(app)
+    assert demo_module not in sys.modules
+
+    assert client.get("/api/first").json() == {"first": True}
+    assert demo_module not in sys.modules                   # unrelated path does not load it
+
+    assert client.get("/api/demo/items/NIFTY").json() == {"symbol": "NIFTY"}   # not the catch-all
+    assert client.post("/api/demo/items").json() == {"created": True}
+    assert sys.modules[demo_module].LOADS == [1]
+
+    paths = [getattr(r, "path", None) for r in app.router.routes]
+    assert paths.index("/api/first") < paths.index("/api/demo/items/{symbol}") < paths.index("/api/{anything}/{symbol}")
+    report = lazy_routers.lazy_router_report(app)
+    assert report[0]["loaded"] and report[0]["trigger"] == "/api/demo/items/NIFTY"
+    assert report[0]["routes"] == 3
+
+
+def test_websocket_path_loads_router(demo_module):
+    client = TestClient(_app(demo_module))
+    with client.websocket_connect("/ws/demo") as ws:
+        assert ws.receive_json() == {"hello": "ws"}
+
+
+def test_openapi_and_eager_mode_see_every_route(demo_module):
+    app = _app(demo_module)
+    assert "/api/demo/items/{symbol}" in app.openapi()["paths"]
+    assert lazy_routers.lazy_router_report(app)[0]["trigger"] == "load_all"
+
+    eager = FastAPI()
+    lazy_routers.add_lazy_router(eager, demo_module, [("http_router", "/api")], lazy=False)
+    assert any(getattr(r, "path", "") == "/api/demo/items" for r in eager.router.routes)
+    assert lazy_routers.lazy_router_report(eager) == []
+
+
+def test_system_health_components_import_on_request():
+    probe = textwrap.dedent("""\
+        import sys
+        import routers.system_health
+        print(sorted(m for m in sys.modules if m.startswith("services.")))
+    """)
+    loaded = subprocess.run([sys.executable, "-c", probe], cwd=Path(__file__).parent,
+                            capture_output=True, text=True, timeout=60).stdout.strip().splitlines()[-1]
+    assert "services.option_chain" not in loaded and "services.cadence" not in loaded
+
+    from routers import system_health
+    app = FastAPI()
+    app.include_router(system_health.router, prefix="/api/system")
+    client = TestClient(app)
+    assert set(client.get("/api/system/health/components").json()) == set(system_health._COMPONENTS)
+    assert client.get("/api/system/health/response-cache").json()["routes"] is not None
+    assert "phase" in client.get("/api/system/health/market").json()                # explicit routes win
+    assert client.get("/api/system/health/no-such-thing").status_code == 404
+
+
+def test_parse_importtime():
+    trace = textwrap.dedent("""\
+        import time: self [us] | cumulative | imported package
+        import time:       120 |        120 |     numpy.core
+        import time:      3000 |       3120 |   numpy
+        import time:       500 |       3620 | pandas
+        import time:       200 |        200 | routers.vix
+    """)
+    records = parse_importtime(trace)
+    assert [(r.module, r.depth) for r in records] == [("numpy.core", 2), ("numpy", 1), ("pandas", 0), ("routers.vix", 0)]
+    report = summarize(records, top=2)
+    assert report["total_ms"] == 3.8
+    assert report["slowest_cumulative"][0]["module"] == "pandas"
+    assert report["packages_ms"] == {"numpy": 3.1, "pandas": 0.5}
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
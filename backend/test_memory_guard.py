@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Test memory accounting and bounded-memory housekeeping: shared-cache TTL
+sweep, hard caps with eviction policies, size estimates and the per-structure
+caps in the order-flow services and the QuantEdge training buffer.
+"""
+
+import asyncio
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("pydantic_settings")
+pytest.importorskip("pytz")
+
+from services.cache import _SHARED_CACHE, enforce_limits, shared_cache_stats, sweep_expired
+from services.memory_guard import MemoryGuard, approx_size
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    saved = dict(_SHARED_CACHE)
+    _SHARED_CACHE.clear()
+    yield
+    _SHARED_CACHE.clear()
+    _SHARED_CACHE.update(saved)
+
+
+def _put(key, expire_in, value="x" * 100):
+    _SHARED_CACHE[key] = (value, time.time() + expire_in)
+
+
+def test_sweep_removes_only_expired_keys():
+    _put("zone_control:NIFTY", -1)
+    _put("zone_control:BANKNIFTY", 60)
+    _put("all_analysis:NIFTY", -5)
+    assert sweep_expired() == 2
+    assert list(_SHARED_CACHE) == ["zone_control:BANKNIFTY"]
+
+
+def test_volatile_ttl_evicts_soonest_expiring_and_spares_market_keys():
+    _put("market:NIFTY", 1)
+    _put("a:1", 10)
+    _put("a:2", 500)
+    _put("a:3", 100)
+    assert enforce_limits(max_keys=2, max_bytes=0, policy="volatile-ttl") == 2
+    assert set(_SHARED_CACHE) == {"market:NIFTY", "a:2"}
+
+
+def test_fifo_evicts_oldest_written():
+    for i in range(5):
+        _put(f"k:{i}", 1000 - i)
+    enforce_limits(max_keys=3, max_bytes=0, policy="fifo")
+    assert list(_SHARED_CACHE) == ["k:2", "k:3", "k:4"]
+
+
+def test_byte_cap():
+    for i in range(10):
+        _put(f"big:{i}", 60, value="y" * 10_000)
+    enforce_limits(max_keys=0, max_bytes=35_000)
+    assert shared_cache_stats()["bytes"] <= 35_000
+    assert len(_SHARED_CACHE) == 3
+
+
+def test_stats_group_by_prefix():
+    _put("zone_control:NIFTY", 60)
+    _put("zone_control:SENSEX", 60)
+    _put("market:NIFTY", -1)
+    stats = shared_cache_stats()
+    assert stats["keys"] == 3
+    assert stats["expiredPending"] == 1
+    assert stats["prefixes"]["zone_control"]["keys"] == 2
+
+
+def test_approx_size_extrapolates_large_containers():
+    small = [{"price": float(i), "quantity": i} for i in range(64)]
+    large = deque(({"price": float(i), "quantity": i} for i in range(6400)), maxlen=10_000)
+    assert approx_size(large) > 50 * approx_size(small)
+    shared = {"a": 1}
+    assert approx_size([shared, shared]) < 2 * approx_size(shared) + 200
+
+
+def test_guard_sweep_runs_trimmers_and_samples_rss():
+    _put("old:1", -1)
+    guard = MemoryGuard(interval=0.01, max_keys=0, max_mb=0)
+    guard.register_trimmer("custom", lambda: 3)
+    result = guard.sweep_once()
+    assert result["expired"] == 1
+    assert result["trimmed"]["custom"] == 3
+    report = guard.report()
+    assert report["guard"]["runs"] == 1
+    assert "sharedCache" in report and "subsystems" in report
+
+
+def test_guard_loop_sweeps_in_background():
+    async def run():
+        guard = MemoryGuard(interval=0.01, max_keys=0, max_mb=0)
+        _put("old:2", -1)
+        await guard.start()
+        await asyncio.sleep(0.05)
+        await guard.stop()
+        return guard.runs
+
+    assert asyncio.run(run()) >= 1
+    assert "old:2" not in _SHARED_CACHE
+
+
+def test_order_flow_history_cap_and_depth_retired():
+    from services.order_flow_analyzer import OrderFlowAnalyzer
+
+    analyzer = OrderFlowAnalyzer(history_maxlen=5)
+    depth = {
+        "buy": [{"price": 100 - i, "quantity": 10, "orders": 1} for i in range(5)],
+        "sell": [{"price": 101 + i, "quantity": 10, "orders": 1} for i in range(5)],
+    }
+    for i in range(12):
+        asyncio.run(analyzer.process_zerodha_tick(
+            {"last_price": 100.5 + i, "bid": 100, "ask": 101, "depth": depth}, "NIFTY"))
+
+    history = list(analyzer.symbol_history["NIFTY"])
+    assert len(history) == 5
+    assert all(not m.bid_levels for m in history)                  # ladders live in the DepthBook ring
+    seqs = [m.depth_seq for m in history]
+    assert seqs == list(range(seqs[0], seqs[0] + 5))
+    assert len(analyzer.get_current_metrics("NIFTY")["bidLevels"]) == 5
+
+
+def test_order_flow_optimizer_cache_is_capped():
+    from services.order_flow_optimizer import OrderFlowOptimizer
+
+    opt = OrderFlowOptimizer()
+    opt.cache_max_entries = 10
+    for i in range(50):
+        asyncio.run(opt._process_single_tick("NIFTY", {"last_price": 100 + i}))
+    assert len(opt.analysis_cache) == 10
+    assert set(opt.analysis_cache) == set(opt.cache_timestamps)
+    assert "NIFTY:149" in opt.analysis_cache
+
+
+def test_quantedge_buffer_size_comes_from_settings(monkeypatch, tmp_path):
+    from config import get_settings
+    from services.quantedge_ml import MIN_TRAIN_SAMPLES, QuantEdgeMLPredictor
+
+    monkeypatch.setenv("QUANTEDGE_ML_BUFFER_SIZE", "300")
+    get_settings.cache_clear()
+    try:
+        predictor = QuantEdgeMLPredictor(["NIFTY"], model_dir=str(tmp_path))
+        assert predictor.buffer_size == 300
+        assert predictor._states["NIFTY"].buffer_X.maxlen == 300
+        predictor.observe_and_predict("BANKNIFTY", [0.0] * 4, 50000.0)
+        assert predictor._states["BANKNIFTY"].buffer_y.maxlen == 300
+        assert QuantEdgeMLPredictor([], model_dir=str(tmp_path), buffer_size=10).buffer_size == MIN_TRAIN_SAMPLES
+    finally:
+        get_settings.cache_clear()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Test the observatory outcome store: rankings from the SQLite rollups match a
+full rescan of the JSON reports, re-recording a day replaces it, windows and
+streaks honour the date cut-off, JSON reports are imported on first use, and
+today's snapshot endpoint pages by cursor instead of returning everything.
+"""
+
+import asyncio
+import json
+import shutil
+import sys
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services import observatory_service as module
+from services.observatory_store import ObservatoryStore
+
+
+def _report(day, outcomes):
+    """outcomes: {symbol: {strategy: (signal, confidence, was_correct)}}"""
+    return {
+        "date": day,
+        "generated_at": f"{day}T15:31:00+05:30",
+        "symbols": {
+            sym: {"strategy_performance": {
+                key: {"morning_signal": sig, "morning_confidence": conf,
+                      "actual_direction": "UP", "was_correct": ok}
+                for key, (sig, conf, ok) in strategies.items()
+            }}
+            for sym, strategies in outcomes.items()
+        },
+    }
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(module, "DATA_DIR", tmp_path)
+    return module.ObservatoryService()
+
+
+def _days_ago(n):
+    return (module._now_ist().date() - timedelta(days=n)).isoformat()
+
+
+def test_rankings_match_json_rescan(service, tmp_path):
+    source = Path(__file__).parent / "data" / "observatory"
+    for fp in source.glob("????-??-??.json"):
+        shutil.copy(fp, tmp_path / fp.name)
+    reports = [json.loads(fp.read_text()) for fp in sorted(tmp_path.glob("*.json"))]
+    assert reports, "repo ships sample observatory reports"
+
+    expected = service._compute_rankings(reports)
+    store = service._get_store()                                       # imports every JSON report
+    assert store.report_dates() == sorted((r["date"] for r in reports), reverse=True)
+    got = service._rank(store.window("0000-00-00"))
+    assert got == expected
+
+
+def test_record_is_idempotent_and_windowed(tmp_path):
+    store = ObservatoryStore(tmp_path / "o.db", symbols=("NIFTY", "BANKNIFTY"))
+    store.record_report(_report("2026-01-05", {"NIFTY": {"vwap": ("BULLISH", 80, True)}}))
+    store.record_report(_report("2026-01-06", {"NIFTY": {"vwap": ("BEARISH", 60, False)},
+                                               "BANKNIFTY": {"vwap": ("BULLISH", 40, None)}}))
+    store.record_report(_report("2026-01-06", {"NIFTY": {"vwap": ("BULLISH", 60, True)}}))   # regenerated
+    assert store.window("2026-01-01")["vwap"] == {"correct": 2, "total": 2, "w_correct": 140,
+                                                  "w_total": 140, "streak": 2}
+    assert store.window("2026-01-06")["vwap"]["total"] == 1
+    assert store.window("2026-02-01") == {}
+    assert [o["date"] for o in store.outcomes("vwap")] == ["2026-01-06", "2026-01-05"]
+
+
+def test_streak_counts_from_last_miss_in_symbol_order(tmp_path):
+    store = ObservatoryStore(tmp_path / "o.db", symbols=("NIFTY", "BANKNIFTY", "SENSEX"))
+    store.record_report(_report("2026-01-05", {"NIFTY": {"ema": ("BULLISH", 70, True)}}))
+    # Dict order deliberately differs from SYMBOLS: SENSEX (miss) ranks after NIFTY (hit)
+    store.record_report(_report("2026-01-06", {"SENSEX": {"ema": ("BEARISH", 70, False)},
+                                               "NIFTY": {"ema": ("BULLISH", 70, True)}}))
+    store.record_report(_report("2026-01-07", {"NIFTY": {"ema": ("BULLISH", 70, True)},
+                                               "BANKNIFTY": {"ema": ("BULLISH", 70, True)}}))
+    assert store.window("2026-01-01")["ema"]["streak"] == 2
+    assert store.window("2026-01-07")["ema"]["streak"] == 2
+    store.record_report(_report("2026-01-08", {"NIFTY": {"ema": ("BULLISH", 70, None)}}))  # FLAT day
+    assert store.window("2026-01-01")["ema"]["streak"] == 2
+
+
+def test_service_rankings_and_persist(service, tmp_path):
+    service._persist_report(module.date.fromisoformat(_days_ago(2)),
+                            _report(_days_ago(2), {"NIFTY": {"pcr": ("BULLISH", 90, True)}}))
+    (tmp_path / f"{_days_ago(20)}.json").write_text(
+        json.dumps(_report(_days_ago(20), {"NIFTY": {"pcr": ("BULLISH", 30, False)}})))
+    fresh = module.ObservatoryService()                                # picks up the JSON-only day
+    ten, ninety = fresh.get_strategy_rankings(10), fresh.get_strategy_rankings(90)
+    assert ten["days_analyzed"] == 1 and ten["rankings"][0]["accuracy"] == 100.0
+    assert ninety["days_analyzed"] == 2
+    pcr = ninety["best_strategy"]
+    assert (pcr["correct"], pcr["total"], pcr["streak"]) == (1, 2, 1)
+    assert pcr["weighted_accuracy"] == 75.0 and pcr["avg_confidence"] == 60.0
+
+
+def test_today_snapshot_pages_by_cursor(service, monkeypatch):
+    pytest.importorskip("fastapi")
+    from routers import observatory as router
+
+    async def strategies(symbol, market_data, analysis):
+        return {"vwap": {"signal": "BULLISH", "confidence": 70}}
+
+    async def nothing(symbol):
+        return None
+
+    monkeypatch.setattr(service, "_extract_all_strategies", strategies)
+    monkeypatch.setattr(service, "_fetch_market_data", nothing)
+    monkeypatch.setattr(service, "_fetch_analysis", nothing)
+    monkeypatch.setattr(router, "get_observatory_service", lambda: service)
+    for _ in range(3):
+        asyncio.run(service._take_snapshot(module._now_ist()))          # 3 × 3 symbols
+
+    first = asyncio.run(router.get_today_snapshot(since=0, limit=4))["data"]
+    assert "all_snapshots" not in first
+    assert first["cursor"] == 4 and first["has_more"]
+    assert [s["id"] for s in first["snapshots"]["NIFTY"]] == [1, 4]
+    rest = service.get_today_snapshot(since=first["cursor"], limit=20)
+    assert rest["cursor"] == 9 and not rest["has_more"]
+    assert sum(len(v) for v in rest["snapshots"].values()) == 5
+    idle = service.get_today_snapshot(since=rest["cursor"])
+    assert idle["snapshots"] == {} and idle["cursor"] == 9
+    assert idle["current_strategies"]["SENSEX"]["vwap"]["signal"] == "BULLISH"
+
+    captured = asyncio.run(router.manual_capture())["snapshot"]
+    assert [s["id"] for v in captured["snapshots"].values() for s in v] == [10, 11, 12]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
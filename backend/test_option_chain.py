@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Test the streaming option-chain mirror: universe subscriptions spilling onto a
+second ticker connection, nearest-expiry chain loading and ATM re-centring,
+tick-driven PCR / max pain / OI change, rolling to the next series after an
+expiry with the expired contracts' universe ids reused, the quote scheduler
+answering window strikes without REST, and the PCR service reading the mirror.
+"""
+
+import asyncio
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.instrument_universe import InstrumentUniverse
+from services.option_chain import OptionChains
+
+STRIKES = [24000 + 50 * i for i in range(41)]          # 24000 … 26000
+
+
+class FakeTicker:
+    MODE_LTP, MODE_QUOTE, MODE_FULL = "ltp", "quote", "full"
+
+    def __init__(self):
+        self.calls = []
+
+    def subscribe(self, tokens):
+        self.calls.append(("subscribe", sorted(tokens)))
+
+    def unsubscribe(self, tokens):
+        self.calls.append(("unsubscribe", sorted(tokens)))
+
+    def set_mode(self, mode, tokens):
+        self.calls.append((mode, sorted(tokens)))
+
+
+def _rows():
+    rows = []
+    for expiry, base in ((date(2026, 10, 20), 5_000_000), (date(2026, 10, 27), 6_000_000)):
+        for i, strike in enumerate(STRIKES):
+            for leg, kind in enumerate(("CE", "PE")):
+                rows.append({"instrument_token": base + 2 * i + leg, "tradingsymbol": f"NIFTY{expiry:%y%m%d}{strike}{kind}",
+                             "name": "NIFTY", "exchange": "NFO", "segment": "NFO-OPT", "instrument_type": kind,
+                             "expiry": expiry, "strike": float(strike), "lot_size": 75, "last_price": 100.0})
+    rows.append({"instrument_token": 7_000_001, "tradingsymbol": "BANKNIFTY26OCT55000CE", "name": "BANKNIFTY",
+                 "exchange": "NFO", "instrument_type": "CE", "expiry": date(2026, 10, 20), "strike": 55000.0})
+    return rows
+
+
+def _chains(width=4):
+    universe = InstrumentUniverse()
+    universe.add(256265, "NIFTY", kind="INDEX")
+    chains = OptionChains(universe, width=width, mode="full")
+    chain = chains.load("NIFTY", _rows(), today=date(2026, 10, 16))
+    return universe, chains, chain
+
+
+def _spot(universe, price):
+    universe.on_tick(universe.id_of("NIFTY"), price, 0, 0, time.time())
+
+
+def _tick_window(universe, chain, oi, volume=None, epoch=None):
+    """One full-mode tick per window leg; oi / volume are (2, width) arrays."""
+    lo, hi = chain.window
+    epoch = epoch or time.time()
+    for leg in range(2):
+        for j, i in enumerate(range(lo, hi)):
+            iid = universe.id_of_token(int(chain.tokens[leg, i]))
+            tick = {"last_price": 10.0 + j, "volume_traded": int(volume[leg][j]) if volume is not None else 0,
+                    "oi": int(oi[leg][j]), "ohlc": {"open": 9.0, "high": 12.0, "low": 8.0, "close": 9.5},
+                    "depth": {"buy": [{"price": 9.95, "quantity": 75, "orders": 1}] * 5,
+                              "sell": [{"price": 10.05, "quantity": 150, "orders": 2}] * 5}}
+            yield iid, tick, epoch
+
+
+def test_subscriptions_spill_onto_second_connection():
+    universe = InstrumentUniverse(max_tokens=3, max_connections=2)
+    for token in range(1, 6):
+        universe.add(token, f"S{token}", kind="EQUITY")
+    universe.declare("all", kinds={"EQUITY"}, mode="quote")
+    assert universe.connections_needed() == 2
+    ws0, ws1 = FakeTicker(), FakeTicker()
+    universe.apply_subscriptions(ws0)
+    universe.apply_subscriptions(ws1, connection=1)
+    assert ws0.calls == [("subscribe", [1, 2, 3]), ("quote", [1, 2, 3])]
+    assert ws1.calls == [("subscribe", [4, 5]), ("quote", [4, 5])]
+    assert not universe.pending(1) and universe.report()["subscribed_per_connection"] == [3, 2]
+
+    # Dropping S2 frees room on connection 0 for a newcomer; S4 / S5 stay put
+    universe.add(6, "S6", kind="EQUITY")
+    universe.declare("all", predicate=lambda i: i.symbol != "S2", mode="quote")
+    ws0.calls.clear(); ws1.calls.clear()
+    universe.apply_subscriptions(ws0)
+    universe.apply_subscriptions(ws1, connection=1)
+    assert ws0.calls == [("unsubscribe", [2]), ("subscribe", [6]), ("quote", [6])]
+    assert ws1.calls == []
+
+
+def test_chain_loads_nearest_expiry_and_recenters():
+    universe, chains, chain = _chains(width=4)
+    assert chain.expiry == "2026-10-20" and len(chain.strikes) == 41
+    assert chain.window == (0, 0) and universe.symbols("option_chain") == []      # no spot yet
+
+    _spot(universe, 25010.0)
+    assert float(chain.strikes[chain.center]) == 25000.0
+    assert len(universe.symbols("option_chain")) == 18                             # 9 strikes × CE/PE
+    ws = FakeTicker()
+    universe.apply_subscriptions(ws)
+    first = {t for call, tokens in ws.calls if call == "subscribe" for t in tokens}
+
+    _spot(universe, 25040.0)                                                       # inside the hysteresis
+    assert chain.recenters == 1 and not universe.subscriptions_pending
+    _spot(universe, 25160.0)                                                       # ATM 25150: 3 strikes away
+    assert chain.recenters == 2 and float(chain.strikes[chain.center]) == 25150.0
+    ws.calls.clear()
+    universe.apply_subscriptions(ws)
+    removed, added = set(ws.calls[0][1]), set(ws.calls[1][1])
+    assert ws.calls[0][0] == "unsubscribe" and len(removed) == len(added) == 6     # 3 strikes out, 3 in
+    assert removed <= first and not (added & first)
+    assert chains.report()["chains"]["NIFTY"]["window"] == [24950.0, 25350.0]
+
+
+def test_ticks_drive_pcr_max_pain_and_oi_change():
+    universe, chains, chain = _chains(width=4)
+    _spot(universe, 25000.0)
+    ce_oi = np.array([10, 20, 30, 40, 50, 400, 300, 200, 100]) * 1000
+    pe_oi = np.array([100, 200, 500, 600, 300, 50, 40, 30, 20]) * 1000
+    volume = np.full((2, 9), 500)
+    for iid, tick, epoch in _tick_window(universe, chain, (ce_oi, pe_oi), volume):
+        chains.on_tick(iid, tick, epoch)
+    assert chains.get("NIFTY") is chain and chains.get("BANKNIFTY") is None
+
+    pcr = chain.pcr()
+    assert pcr["pcr"] == round(pe_oi.sum() / ce_oi.sum(), 2) and pcr["volume_pcr"] == 1.0
+    strikes = np.array(STRIKES[16:25], dtype=float)
+    payout = [sum(c * max(k - s, 0) + p * max(s - k, 0) for s, c, p in zip(strikes, ce_oi, pe_oi)) for k in strikes]
+    assert chain.max_pain() == strikes[int(np.argmin(payout))]
+
+    # OI builds at 25050 CE, unwinds at 24900 PE
+    lo = chain.window[0]
+    ce_iid = universe.id_of_token(int(chain.tokens[0, lo + 5]))
+    pe_iid = universe.id_of_token(int(chain.tokens[1, lo + 2]))
+    chains.on_tick(ce_iid, {"last_price": 20.0, "oi": 460_000}, time.time())
+    chains.on_tick(pe_iid, {"last_price": 30.0, "oi": 420_000}, time.time())
+    change = chain.oi_change()
+    assert change["ce"]["total"] == 60_000 and change["ce"]["top"][0] == {"strike": 25050.0, "change": 60_000}
+    assert change["pe"]["total"] == -80_000 and change["pe"]["top"][0]["strike"] == 24900.0
+    assert chain.depth_qty[0, lo, 1].tolist() == [150] * 5 and chain.ohlc[0, lo, 3] == 9.5
+    assert not chain.live(now=time.time() + 10)                                     # ticks stopped
+
+
+def test_daily_reload_rolls_past_expiry():
+    class Gateway:
+        def __init__(self, rows):
+            self.rows, self.calls = rows, []
+
+        async def instruments(self, exchange):
+            self.calls.append(exchange)
+            if exchange != "NFO":
+                raise RuntimeError("BFO dump unavailable")
+            return self.rows
+
+    universe, chains, chain = _chains(width=2)
+    chains._gateway = Gateway(_rows())
+    _spot(universe, 25000.0)
+    ws = FakeTicker()
+    universe.apply_subscriptions(ws)
+    old = {t for call, tokens in ws.calls if call == "subscribe" for t in tokens} - {256265}
+    old_ids = [universe.id_of_token(t) for t in sorted(old)]
+    rows_before = len(universe)
+    assert chains.due(date(2026, 10, 16))
+
+    assert asyncio.run(chains.reload(date(2026, 10, 21))) == 1                     # the day after expiry
+    rolled = chains.chains["NIFTY"]
+    assert rolled.expiry == "2026-10-27" and float(rolled.strikes[rolled.center]) == 25000.0
+    assert "BANKNIFTY" not in chains.chains and chains.loaded_on is None            # BFO failed: retry later
+    ws.calls.clear()
+    universe.apply_subscriptions(ws)
+    unsubscribed = {t for call, tokens in ws.calls if call == "unsubscribe" for t in tokens}
+    subscribed = {t for call, tokens in ws.calls if call == "subscribe" for t in tokens}
+    assert unsubscribed == old and len(subscribed) == 10 and all(t >= 6_000_000 for t in subscribed)
+    assert len(universe) == rows_before and universe.report()["retired"] == 0       # 27 Oct took the 20 Oct ids
+
+    assert universe.id_of_token(5_000_000 + 2 * 20) is None                         # old ATM CE retired
+    assert all(universe[iid].expiry == "2026-10-27" for iid in old_ids)
+    assert chain.ticks == 0 and rolled.ticks == 0
+
+    chains._gateway = Gateway([r for r in _rows() if r["expiry"] != date(2026, 10, 27)])
+    asyncio.run(chains.reload(date(2026, 10, 28)))                                  # nothing listed after
+    assert chains.chains == {} and universe.symbols("option_chain") == []
+    assert chains.report()["reloads"] == 2
+
+
+def test_retired_ids_are_reused_by_the_next_series():
+    universe, chains, chain = _chains(width=2)
+    expired = [r for r in _rows() if r["expiry"] == date(2026, 10, 20) and r["name"] == "NIFTY"]
+    n = len(universe)
+    first = universe.id_of_token(expired[0]["instrument_token"])
+    universe.on_tick(first, 101.0, 500, 75, time.time())
+    assert universe.retire_expired(date(2026, 10, 21)) == 82                        # the 20 Oct series
+    next_series = [{**r, "instrument_token": r["instrument_token"] + 2_000_000, "expiry": date(2026, 11, 3),
+                    "tradingsymbol": r["tradingsymbol"] + "X"} for r in expired]
+    ids = universe.add_kite_instruments(next_series)
+    assert len(universe) == n and universe.report()["retired"] == 0                 # no growth, ids reused
+    assert first in ids and universe[first].expiry == "2026-11-03"
+    assert universe.state.ticks[first] == 0 and universe.state.last_price[first] == 0.0
+    strikes = universe.declare("strikes", kinds={"OPTION"}, underlyings={"NIFTY"})
+    assert sorted(strikes.members) == sorted(ids) and universe.id_of(expired[0]["tradingsymbol"]) is None
+
+
+def test_scheduler_serves_window_strikes_without_rest():
+    pytest.importorskip("kiteconnect")
+    from benchmarks.fake_kite import FakeKite
+    from services.kite_gateway import KiteGateway
+    from services.quote_scheduler import Priority, QuoteScheduler
+
+    universe, chains, chain = _chains(width=4)
+    _spot(universe, 25000.0)
+    for iid, tick, epoch in _tick_window(universe, chain, (np.full(9, 1000), np.full(9, 2000))):
+        chains.on_tick(iid, tick, epoch)
+    lo = chain.window[0]
+    window_keys = [str(int(t)) for t in chain.tokens[:, lo:lo + 3].ravel()]
+    by_symbol = f"NFO:{chain.symbols[1][lo]}"
+
+    with FakeKite(tokens={"tok"}) as fake:
+        gateway = KiteGateway("key", "tok", root=fake.url, env_file=None)
+        qs = QuoteScheduler(gateway, rate=10, burst=1, window_ms=0)
+        qs.add_source(chains.quotes)
+        quotes = qs.quote_sync(window_keys + [by_symbol], Priority.ANALYTICS)
+        ltp = qs.quote_sync(window_keys[:1], Priority.LIVE, mode="ltp")
+        assert fake.requests == []                                                 # no quota spent
+        assert quotes[window_keys[0]]["oi"] == 1000 and quotes[by_symbol]["oi"] == 2000
+        assert quotes[window_keys[0]]["depth"]["sell"][0]["quantity"] == 150
+        assert set(ltp[window_keys[0]]) == {"instrument_token", "last_price"}
+
+        mixed = qs.quote_sync([window_keys[0], "NSE:NIFTY 50"], Priority.UI)       # only the index goes out
+        assert mixed["NSE:NIFTY 50"]["last_price"] == 25000.0 and len(mixed) == 2
+        assert fake.requests == [("GET", "/quote", "tok")]
+        metrics = qs.metrics()
+        assert metrics["servedLocally"] == 9 and metrics["instrumentsSent"] == 1
+        qs.stop()
+        gateway.shutdown()
+
+
+def test_pcr_service_reads_the_mirror(monkeypatch):
+    from services import pcr_service
+
+    universe, chains, chain = _chains(width=2)
+    _spot(universe, 25000.0)
+    for iid, tick, epoch in _tick_window(universe, chain, ([100, 200, 300, 200, 100], [50, 100, 900, 300, 150])):
+        chains.on_tick(iid, tick, epoch)
+    monkeypatch.setattr(pcr_service, "get_option_chains", lambda: chains)
+    for name in ("_PCR_CACHE", "_LAST_UPDATE", "_STRIKE_OI_MAP", "_STRIKE_OI_PREV"):
+        monkeypatch.setattr(pcr_service, name, {})
+
+    service = pcr_service.PCRService()
+    monkeypatch.setattr(service, "_fetch_pcr_from_zerodha", lambda symbol: pytest.fail("REST path used"))
+    result = asyncio.run(service.get_pcr_data("NIFTY"))
+    assert result == {"pcr": 1.67, "callOI": 900, "putOI": 1500, "oi": 2400, "sentiment": "bullish"}
+    assert pcr_service.get_strike_oi("NIFTY", 25010.0)["pe_oi"] == 900
+    assert sorted(pcr_service._STRIKE_OI_MAP["NIFTY"]) == [24900, 24950, 25000, 25050, 25100]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
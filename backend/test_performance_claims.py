@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Check the documented performance claims (docstring budgets) with the
+benchmark harness in benchmarks/. Every engine benchmark must run within
+loose limits (3x its wall-clock budget, exponent + 0.3) so a gross
+regression fails anywhere; BENCHMARK_BUDGETS=1 asserts the budgets as
+written, since those numbers depend on the host. Full runs and history:
+python -m benchmarks.run
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("pytz")
+
+from benchmarks import fixtures
+from benchmarks.harness import BUDGETS_ENV, BenchmarkResult, budget_failures, load_suites, registry, run_benchmark, scaling_exponent
+
+load_suites()
+
+def test_fixtures_are_deterministic():
+    assert fixtures.synthetic_candles("NIFTY", 50) == fixtures.synthetic_candles("NIFTY", 50)
+    assert fixtures.synthetic_ticks("BANKNIFTY", 5)[0]["price"] == fixtures.synthetic_ticks("BANKNIFTY", 5)[0]["price"]
+    recorded = fixtures.recorded_candles("NIFTY")
+    stamps = [c["timestamp"] for c in recorded]
+    assert stamps == sorted(set(stamps))
+
+
+def test_scaling_exponent_fit():
+    sizes = [100, 200, 400, 800]
+    assert scaling_exponent(sizes, [n * 0.01 for n in sizes]) == pytest.approx(1.0)
+    assert scaling_exponent(sizes, [(n ** 2) * 0.01 for n in sizes]) == pytest.approx(2.0)
+
+
+def test_budget_tolerance(monkeypatch):
+    slower = BenchmarkResult("x", budget_ms=10.0, median_ms=25.0)
+    steeper = BenchmarkResult("y", max_exponent=0.2, exponent=0.4)
+    monkeypatch.delenv(BUDGETS_ENV, raising=False)
+    assert budget_failures(slower) == [] and budget_failures(steeper) == []
+    assert budget_failures(BenchmarkResult("z", budget_ms=10.0, median_ms=31.0)) == ["median 31.000ms > budget 30ms"]
+    monkeypatch.setenv(BUDGETS_ENV, "1")
+    assert len(budget_failures(slower)) == 1 and len(budget_failures(steeper)) == 1
+
+
+@pytest.mark.parametrize("name", [n for n in sorted(registry) if n.startswith("engines.")])
+def test_engine_claims(name):
+    result = run_benchmark(registry[name], repeat=20)
+    assert not budget_failures(result), f"{name} ({result.claim}): {budget_failures(result)}"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test the quote scheduler against the local fake Kite server: requests from
+several callers merged and deduped into one batch, per-caller slices (with
+ltp / ohlc projections), priority order under the rate limit, splitting of
+oversized requests, and batch failures reaching every caller.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("kiteconnect")
+
+from benchmarks.fake_kite import FakeKite, INSTRUMENTS
+from services.kite_gateway import KiteGateway
+from services.quote_scheduler import Priority, QuoteScheduler, TokenBucket
+
+
+@pytest.fixture
+def fake():
+    with FakeKite(tokens={"tok"}) as server:
+        yield server
+
+
+@pytest.fixture
+def gateway(fake):
+    gw = KiteGateway("key", "tok", root=fake.url, env_file=None)
+    yield gw
+    gw.shutdown()
+
+
+def test_concurrent_callers_share_one_deduped_batch(fake, gateway):
+    qs = QuoteScheduler(gateway, rate=10, burst=1, window_ms=50)
+
+    async def scenario():
+        return await asyncio.gather(
+            qs.quote(["NSE:NIFTY 50", "256265"], Priority.UI),
+            qs.quote(["NSE:NIFTY 50", "NFO:NIFTY26JANFUT"], Priority.ANALYTICS, mode="ltp"),
+            asyncio.to_thread(qs.quote_sync, [260105, "NSE:NIFTY 50", "NSE:UNKNOWN"], Priority.LIVE, "ohlc"),
+        )
+
+    ui, ltp, ohlc = asyncio.run(scenario())
+    assert fake.requests == [("GET", "/quote", "tok")]                 # one call for all three
+    assert set(ui) == {"NSE:NIFTY 50", "256265"} and "depth" in ui["NSE:NIFTY 50"]
+    assert ltp["NFO:NIFTY26JANFUT"] == {"instrument_token": 12683010, "last_price": 25050.0}
+    assert set(ohlc) == {"260105", "NSE:NIFTY 50"}                     # unknown instrument absent, as in Kite
+    assert set(ohlc["260105"]) == {"instrument_token", "last_price", "ohlc"}
+
+    m = qs.metrics()
+    assert m["requests"] == 3 and m["batches"] == 1
+    assert m["instrumentsRequested"] == 7 and m["instrumentsSent"] == 5 and m["dedupeRatio"] == 1.4
+    qs.stop()
+
+
+def test_priority_order_under_rate_limit(fake, gateway):
+    fake.instruments = [dict(INSTRUMENTS[0], instrument_token=1_000_000 + i, tradingsymbol=f"OPT{i}")
+                        for i in range(700)] + INSTRUMENTS
+    qs = QuoteScheduler(gateway, rate=5, burst=1, window_ms=0)
+    qs.quote_sync(["NSE:NIFTY 50"])                                     # drain the bucket
+
+    # Queued behind the empty bucket, lowest priority first. Together they
+    # exceed one /quote batch, so they cannot all go out as one call.
+    ui = qs.submit([1_000_000 + i for i in range(400)], Priority.UI)
+    analytics = qs.submit([1_000_400 + i for i in range(300)], Priority.ANALYTICS, mode="ltp")
+    order = qs.submit(["NFO:NIFTY26JANFUT"], Priority.ORDER, mode="ltp")
+    assert order.result(5)["NFO:NIFTY26JANFUT"]["last_price"] == 25050.0
+    assert len(analytics.result(5)) == 300 and len(ui.result(5)) == 400
+
+    # ORDER leads an ltp batch that ANALYTICS rides along in; UI's full quote goes next
+    assert [path for _, path, _ in fake.requests[1:]] == ["/quote/ltp", "/quote"]
+    waits = qs.metrics()["avgQueueMs"]
+    assert waits["ORDER"] <= waits["UI"]
+    qs.stop()
+
+
+def test_bucket_spaces_batches(fake, gateway):
+    qs = QuoteScheduler(gateway, rate=10, burst=1, window_ms=0)
+    started = time.perf_counter()
+    for key in ("NSE:NIFTY 50", "NSE:NIFTY BANK", "BSE:SENSEX"):
+        qs.quote_sync([key], Priority.ANALYTICS)
+    assert time.perf_counter() - started >= 0.18                        # 3 batches at 10/s
+    assert qs.metrics()["throttledMs"] > 100 and qs.metrics()["batches"] == 3
+    qs.stop()
+
+    t0 = time.monotonic()
+    bucket = TokenBucket(rate=2, burst=2)
+    assert bucket.delay(now=t0) == 0.0
+    bucket.take(); bucket.take()
+    assert bucket.delay(now=t0) == pytest.approx(0.5, abs=0.01)
+    assert bucket.delay(now=t0 + 0.5) == 0.0
+
+
+def test_oversized_request_is_split(fake, gateway):
+    many = [dict(INSTRUMENTS[0], instrument_token=1_000_000 + i, tradingsymbol=f"OPT{i}") for i in range(1200)]
+    fake.instruments = many
+    qs = QuoteScheduler(gateway, rate=100, burst=5, window_ms=0)
+    result = qs.quote_sync([i["instrument_token"] for i in many], Priority.ANALYTICS)
+    assert len(result) == 1200 and result["1000999"]["instrument_token"] == 1000999
+    assert [path for _, path, _ in fake.requests] == ["/quote"] * 3        # 500 + 500 + 200
+    ltp = qs.quote_sync([f"NSE:OPT{i}" for i in range(1200)], Priority.ANALYTICS, mode="ltp")
+    assert len(ltp) == 1200 and fake.count("/quote/ltp") == 2            # ltp batches hold 1000
+    qs.stop()
+
+
+def test_batch_failure_reaches_every_caller(fake, gateway):
+    from kiteconnect.exceptions import GeneralException
+
+    qs = QuoteScheduler(gateway, rate=50, burst=1, window_ms=50)
+    fake.fail_next(1, status=500)
+    a = qs.submit(["NSE:NIFTY 50"], Priority.ANALYTICS)
+    b = qs.submit(["BSE:SENSEX"], Priority.UI)
+    for future in (a, b):
+        with pytest.raises(GeneralException):
+            future.result(5)
+    assert qs.metrics()["errors"] == 1 and qs.metrics()["pending"] == 0
+    assert qs.quote_sync(["BSE:SENSEX"])["BSE:SENSEX"]["last_price"] == 82000.0    # next batch fine
+    assert gateway.metrics()["endpoints"]["quote"]["errors"] == 1
+    qs.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
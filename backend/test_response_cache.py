@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Test the REST response cache: one computation per key under concurrency,
+stale-while-revalidate with a single background refresh, per-phase TTLs and
+phases exempt from caching, errors shared but never cached, FastAPI-visible
+endpoint signatures, and zone control reporting the current token status on
+cache hits.
+"""
+
+import asyncio
+import inspect
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.response_cache import ResponseCache, cached_response
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.status = "LIVE"
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def cache(clock):
+    return ResponseCache(clock=clock, status=lambda: clock.status)
+
+
+def _endpoint(cache, calls, **options):
+    options.setdefault("ttl", {"LIVE": 5, "default": 60})
+
+    @cached_response("demo", cache=cache, **options)
+    async def endpoint(symbol: str, lookback: int = 100):
+        calls.append(symbol)
+        n = len(calls)
+        await asyncio.sleep(0.01)
+        return {"symbol": symbol, "n": n}
+
+    return endpoint
+
+
+def test_concurrent_misses_share_one_computation(cache):
+    calls = []
+    endpoint = _endpoint(cache, calls)
+
+    async def run():
+        return await asyncio.gather(*(endpoint("nifty") for _ in range(20)), endpoint("BANKNIFTY"))
+
+    results = asyncio.run(run())
+    assert calls == ["nifty", "BANKNIFTY"]
+    assert all(r == {"symbol": "nifty", "n": 1} for r in results[:20])
+    stats = cache.stats()["routes"]["demo"]
+    assert stats["misses"] == 2
+    assert stats["coalesced"] == 19
+
+
+def test_stale_entry_served_while_one_refresh_runs(cache, clock):
+    calls = []
+    endpoint = _endpoint(cache, calls, stale=30)
+
+    async def run():
+        first = await endpoint("NIFTY")
+        clock.now += 10                                  # past the 5s LIVE ttl, inside stale window
+        stale = await asyncio.gather(*(endpoint("NIFTY") for _ in range(5)))
+        await asyncio.sleep(0.05)                        # let the background refresh land
+        fresh = await endpoint("NIFTY")
+        return first, stale, fresh
+
+    first, stale, fresh = asyncio.run(run())
+    assert all(r == first for r in stale)
+    assert fresh["n"] == 2
+    assert len(calls) == 2
+    stats = cache.stats()["routes"]["demo"]
+    assert (stats["stale"], stats["refreshes"], stats["hits"]) == (5, 1, 1)
+
+
+def test_ttl_follows_market_phase(cache, clock):
+    calls = []
+    endpoint = _endpoint(cache, calls)
+
+    async def run():
+        await endpoint("NIFTY")
+        clock.now += 6
+        await endpoint("NIFTY")                          # LIVE ttl 5s → recompute
+        clock.status = "CLOSED"
+        clock.now += 6
+        await endpoint("NIFTY")                          # recompute, now cached for 60s
+        clock.now += 50
+        await endpoint("NIFTY")
+
+    asyncio.run(run())
+    assert len(calls) == 3
+    assert cache.sweep_expired() == 0
+    clock.now += 20
+    assert cache.sweep_expired() == 1
+
+
+def test_zero_ttl_phase_is_exempt(cache, clock):
+    calls = []
+    endpoint = _endpoint(cache, calls, ttl={"LIVE": 0, "default": 60}, stale=30)
+
+    async def run():
+        await endpoint("NIFTY")
+        await endpoint("NIFTY")                          # LIVE: computed every request
+        clock.status = "CLOSED"
+        await endpoint("NIFTY")
+        await endpoint("NIFTY")                          # cached for 60s
+        clock.status = "LIVE"
+        return await endpoint("NIFTY")                   # the CLOSED entry is not served
+
+    assert asyncio.run(run())["n"] == 4
+    stats = cache.stats()["routes"]["demo"]
+    assert (stats["bypassed"], stats["misses"], stats["hits"]) == (3, 1, 1)
+
+
+def test_errors_reach_every_waiter_and_are_not_cached(cache):
+    calls = []
+
+    @cached_response("boom", ttl=60, cache=cache)
+    async def failing(symbol: str):
+        calls.append(symbol)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    @cached_response("soft", ttl=60, cache=cache)
+    async def soft_error(symbol: str):
+        calls.append(symbol)
+        return {"status": "ERROR"}
+
+    async def run():
+        outcomes = await asyncio.gather(*(failing("NIFTY") for _ in range(3)), return_exceptions=True)
+        await soft_error("NIFTY")
+        await soft_error("NIFTY")
+        return outcomes
+
+    outcomes = asyncio.run(run())
+    assert all(isinstance(o, ValueError) for o in outcomes)
+    assert calls == ["NIFTY", "NIFTY", "NIFTY"]
+    assert cache.stats()["routes"]["boom"]["errors"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_wrapped_endpoint_keeps_signature(cache):
+    endpoint = _endpoint(cache, [])
+    assert list(inspect.signature(endpoint).parameters) == ["symbol", "lookback"]
+    assert inspect.iscoroutinefunction(endpoint)
+
+
+def test_zone_control_cache_hit_reports_current_token_status():
+    pytest.importorskip("pandas")
+    from benchmarks.bench_routers import _patched_router
+    from services import global_token_manager as gtm
+    from services.response_cache import response_cache
+
+    async def expired():
+        return {"valid": False}
+
+    async def run():
+        patched = _patched_router()
+        aa, _ = await patched.__anext__()
+        try:
+            first = await aa.get_zone_control("NIFTY")
+            gtm.check_global_token_status = expired      # restored when the patch closes
+            second = await aa.get_zone_control("NIFTY")
+            third = await aa.get_zone_control("NIFTY")
+        finally:
+            await patched.aclose()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first["token_valid"] is True and second["token_valid"] is False
+    assert {**second, "token_valid": True} == first
+    assert third == second
+    assert response_cache.stats()["routes"]["zone_control"]["hits"] >= 2
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
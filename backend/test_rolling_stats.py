@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Test the rolling-statistics accumulators against NumPy refits over the same
+windows (slope, Welford variance, covariance / correlation, EWMA), drift
+control on long streams, and the engines that now read them: expiry
+explosion's OIHistory, the compass AI drift / dispersion and the compass
+correlation.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+np = pytest.importorskip("numpy")
+
+from services.rolling_stats import Ewma, RollingCovariance, RollingSlope, RollingStats, linear_slope, pearson
+
+
+def _walk(n, seed=3, start=25000.0, step=5.0):
+    rng = np.random.default_rng(seed)
+    return (start + np.cumsum(rng.normal(0, step, n))).tolist()
+
+
+@pytest.mark.parametrize("window", [1, 3, 40, 120])
+def test_slope_and_variance_match_refit(window):
+    values = _walk(600)
+    rolling = RollingSlope(window)
+    for k, value in enumerate(values):
+        rolling.push(value)
+        win = np.array(values[max(0, k + 1 - window):k + 1])
+        assert list(rolling) == win.tolist() and rolling.last == value and rolling[0] == win[0]
+        assert rolling.mean == pytest.approx(win.mean(), abs=1e-8)
+        assert rolling.std == pytest.approx(win.std(), abs=1e-6)
+        assert rolling.sample_variance == pytest.approx(win.var(ddof=1) if len(win) > 1 else 0.0, abs=1e-5)
+        assert rolling.slope == pytest.approx(linear_slope(win.tolist()), abs=1e-8)
+        if len(win) >= 3:
+            fit = np.polyfit(np.arange(len(win)), win, 1)
+            assert rolling.slope == pytest.approx(fit[0], abs=1e-8)
+            assert rolling.intercept == pytest.approx(fit[1], abs=1e-6)
+    assert rolling.zscore() == pytest.approx((values[-1] - rolling.mean) / rolling.std if window > 1 else 0.0)
+
+
+def test_covariance_and_correlation_match_numpy():
+    xs = _walk(500, seed=1)
+    ys = [0.6 * x + noise for x, noise in zip(xs, _walk(500, seed=2, start=0.0, step=2.0))]
+    cov = RollingCovariance(50)
+    for k, (x, y) in enumerate(zip(xs, ys)):
+        cov.push(x, y)
+        lo = max(0, k - 49)
+        wx, wy = np.array(xs[lo:k + 1]), np.array(ys[lo:k + 1])
+        if len(wx) >= 3:
+            assert cov.correlation == pytest.approx(np.corrcoef(wx, wy)[0, 1], abs=1e-8)
+            assert cov.covariance == pytest.approx(np.cov(wx, wy, bias=True)[0, 1], rel=1e-8)
+            assert cov.beta == pytest.approx(np.polyfit(wx, wy, 1)[0], rel=1e-6)
+    assert pearson(xs[-50:], ys[-50:]) == pytest.approx(cov.correlation, abs=1e-10)
+    assert pearson([1.0, 1.0, 1.0], [1.0, 2.0, 3.0]) == 0.0 and pearson([1.0], [2.0]) == 0.0
+    flat = RollingCovariance(5)
+    flat.extend((1.0, float(i)) for i in range(5))
+    assert flat.correlation == 0.0 and flat.beta == 0.0
+
+
+def test_long_streams_do_not_drift():
+    # Large offset, tiny variance: the worst case for running sums
+    values = [1e7 + (i % 7) * 1e-3 for i in range(200_003)]
+    stats = RollingSlope(64)
+    stats.extend(values)
+    win = np.array(values[-64:])
+    assert stats.std == pytest.approx(win.std(), rel=1e-6)
+    assert stats.slope == pytest.approx(np.polyfit(np.arange(64), win - 1e7, 1)[0], abs=1e-9)
+
+    ewma = Ewma(span=9)
+    for value in (10.0, 12.0, 11.0, 15.0):
+        ewma.push(value)
+    alpha, mean, var = 0.2, 10.0, 0.0
+    for value in (12.0, 11.0, 15.0):
+        delta = value - mean
+        mean += alpha * delta
+        var = (1 - alpha) * (var + alpha * delta * delta)
+    assert ewma.mean == pytest.approx(mean) and ewma.variance == pytest.approx(var)
+    assert ewma.zscore() == pytest.approx((15.0 - mean) / var ** 0.5)
+    with pytest.raises(ValueError):
+        Ewma()
+    with pytest.raises(ValueError):
+        RollingStats(0)
+
+
+def test_engines_read_rolling_windows():
+    from services.compass_ai import CompassAIEngine
+    from services.expiry_explosion_service import OIHistory
+    from services.market_compass_engine import MarketCompassEngine
+
+    history = OIHistory()
+    oi, price = _walk(60, seed=4, start=1e7, step=1e4), _walk(60, seed=5)
+    for k in range(60):
+        history.push(oi[k], price[k], 1000 + k, 0.9 + k / 100, oi[k] * 0.5, oi[k] * 0.6)
+    assert history.oi_slope == pytest.approx(np.polyfit(np.arange(40), oi[-40:], 1)[0], rel=1e-9)
+    assert history.price_slope == pytest.approx(np.polyfit(np.arange(40), price[-40:], 1)[0], rel=1e-9)
+    assert history.pcr_slope == pytest.approx(0.01) and history.pcr_extremity == 0.0
+    vols = [1000 + k for k in range(20, 60)]
+    assert history.volume_surge_ratio == pytest.approx(vols[-1] / np.mean(vols[:-1]))
+    assert len(history._oi_buf) == 40 and list(history._price_buf)[-10:] == price[-10:]
+
+    engine = CompassAIEngine()
+    scores = _walk(30, seed=6, start=0.0, step=1.0)
+    for score in scores:
+        buf = engine._buf(engine._score_buffers, "NIFTY")
+        buf.push(score)
+    arr = np.array(scores)
+    assert engine._drift(buf) == pytest.approx(np.mean(np.diff(arr[-10:])))
+    assert buf.std == pytest.approx(np.std(arr[-20:]))
+
+    compass = MarketCompassEngine()
+    a, b = _walk(100, seed=8), _walk(100, seed=9)
+    assert compass._calculate_correlation(a, b) == pytest.approx(np.corrcoef(a, b)[0, 1])
+
+
+def test_benchmark_claims():
+    from benchmarks.harness import budget_failures, load_suites, registry, run_benchmark
+
+    load_suites()
+    for name in ("stats.slope.scaling", "stats.oi_history.rolling"):
+        result = run_benchmark(registry[name], repeat=10)
+        assert not budget_failures(result), f"{name}: {budget_failures(result)}"   # loose unless BENCHMARK_BUDGETS=1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Test the precomputed session clock against the per-call reference rules,
+look up arbitrary instants (and the helpers that pass one in), and step
+through a simulated session to check transition events.
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+pytest.importorskip("pytz")
+pytest.importorskip("pydantic_settings")
+
+from services.session_clock import (
+    IST,
+    SessionClock,
+    SimulatedClock,
+    calendar_status,
+    live_ticks_status,
+)
+
+
+def _sweep(day: datetime, ticks_live: bool):
+    clock = SimulatedClock(day)
+    sc = SessionClock(clock)
+    rule = live_ticks_status if ticks_live else calendar_status
+    mismatches = []
+    for second in range(0, 24 * 3600, 30):
+        now = IST.localize(day + timedelta(seconds=second))
+        clock.set(now)
+        if sc.status(ticks_live=ticks_live) != rule(now):
+            mismatches.append(now.strftime("%H:%M:%S"))
+    return mismatches
+
+
+@pytest.mark.parametrize("day", [
+    datetime(2026, 3, 10),   # regular Tuesday
+    datetime(2026, 3, 14),   # Saturday
+    datetime(2026, 1, 26),   # session-controller holiday
+])
+@pytest.mark.parametrize("ticks_live", [False, True])
+def test_timeline_matches_reference_rules(day, ticks_live):
+    assert _sweep(day, ticks_live) == []
+
+
+def test_regular_day_phases_and_inclusive_close():
+    clock = SimulatedClock(datetime(2026, 3, 10, 9, 5))
+    sc = SessionClock(clock)
+    assert sc.status() == "PRE_OPEN"
+    clock.set(datetime(2026, 3, 10, 9, 10))
+    assert sc.status() == "FREEZE"
+    clock.set(datetime(2026, 3, 10, 15, 30))
+    assert sc.status() == "LIVE"
+    clock.advance(0.5)
+    assert sc.status() == "CLOSED"
+
+
+def test_status_at_any_instant_and_helpers_honour_it():
+    from services.market_hours_scheduler import MarketHoursScheduler
+    from services.market_regime_service import MarketRegimeService
+
+    sc = SessionClock(SimulatedClock(datetime(2026, 3, 14, 20, 0)))        # a closed Saturday
+    assert sc.status_at(datetime(2026, 3, 10, 15, 30)) == "LIVE"           # inclusive close
+    assert sc.status_at(IST.localize(datetime(2026, 3, 10, 15, 30, 1))) == "CLOSED"
+    assert sc.status_at(datetime(2026, 3, 14, 10, 0)) == "CLOSED"
+    assert sc.status_at(datetime(2026, 3, 14, 10, 0), ticks_live=True) == "LIVE"
+    assert sc.status() == "CLOSED"
+
+    # Whatever the wall clock says, the helpers answer for the time they are given
+    live, closed = IST.localize(datetime(2026, 3, 10, 9, 15)), IST.localize(datetime(2026, 3, 10, 15, 31))
+    assert MarketRegimeService._is_market_live(live) is True
+    assert MarketRegimeService._is_market_live(closed) is False
+    assert MarketRegimeService._is_market_live(IST.localize(datetime(2026, 3, 14, 11, 0))) is False   # Saturday
+    scheduler = MarketHoursScheduler(market_feed_service=None)
+    assert scheduler._get_market_phase(IST.localize(datetime(2026, 3, 10, 9, 3))).startswith("🟡 PRE-OPEN")
+    assert scheduler._get_market_phase(IST.localize(datetime(2026, 3, 10, 15, 30))) == "🟢 LIVE TRADING"
+    assert scheduler._get_market_phase(closed) == "🔴 POST-MARKET (cooling down)"
+    assert scheduler._get_market_phase(IST.localize(datetime(2026, 3, 10, 8, 0))).startswith("🔵 PREPARING")
+
+
+def test_weekend_ticks_override_calendar():
+    clock = SimulatedClock(datetime(2026, 3, 14, 10, 0))
+    sc = SessionClock(clock)
+    assert sc.status() == "CLOSED"
+    assert sc.status(ticks_live=True) == "LIVE"
+
+
+def test_rolls_over_to_next_day():
+    clock = SimulatedClock(datetime(2026, 3, 10, 23, 59, 59))
+    sc = SessionClock(clock)
+    assert sc.status() == "CLOSED"
+    clock.advance(9 * 3600 + 1)   # Wednesday 09:00
+    assert sc.status() == "PRE_OPEN"
+    assert sc.now().date().isoformat() == "2026-03-11"
+
+
+def test_transition_events_fire_once_per_boundary():
+    async def run():
+        clock = SimulatedClock(datetime(2026, 3, 10, 9, 14, 58))
+        sc = SessionClock(clock)
+        events = []
+
+        async def on_event(event):
+            events.append((event.previous, event.current))
+
+        sc.add_listener(on_event)
+        assert await sc.poll() is None          # first poll only records state
+        clock.advance(1)
+        assert await sc.poll() is None          # still FREEZE
+        clock.advance(2)
+        await sc.poll()
+        await sc.poll()
+        return events
+
+    assert asyncio.run(run()) == [("FREEZE", "LIVE")]
+
+
+def test_background_loop_and_wait_for():
+    async def run():
+        clock = SimulatedClock(datetime(2026, 3, 10, 15, 29, 0))
+        sc = SessionClock(clock)
+        await sc.start()
+        waiter = asyncio.create_task(sc.wait_for("CLOSED"))
+        await asyncio.sleep(0)
+        clock.set(datetime(2026, 3, 10, 15, 31))
+        event = await asyncio.wait_for(waiter, timeout=1.0)
+        already = await asyncio.wait_for(sc.wait_for("CLOSED"), timeout=1.0)       # no wait for tomorrow
+        await sc.stop()
+        return event, already
+
+    event, already = asyncio.run(run())
+    assert (event.previous, event.current) == ("LIVE", "CLOSED")
+    assert (already.previous, already.current) == ("CLOSED", "CLOSED")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
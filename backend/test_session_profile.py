@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test the tick-built session profile: VWAP / σ against a direct computation,
+POC and value area, seeding from 5m candles when ticks start late, the
+universe listener routing futures ticks into it, and the VWAP route / volume
+profile analyzer serving from it without a Zerodha call.
+"""
+
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.candle_archive import IST
+from services.instrument_universe import InstrumentUniverse
+from services.session_profile import SessionProfile, SessionProfiles, bucket_step
+
+
+def _epoch(hh, mm, ss=0):
+    today = datetime.now(IST).date()
+    return IST.localize(datetime(today.year, today.month, today.day, hh, mm, ss)).timestamp()
+
+
+def _ticks(n=400, seed=7):
+    rng = np.random.default_rng(seed)
+    prices = 25000 + np.cumsum(rng.normal(0, 3, n))
+    traded = rng.integers(75, 3000, n)
+    return prices, traded
+
+
+def test_vwap_sigma_match_direct_computation():
+    profile = SessionProfile("NIFTY-FUT")
+    prices, traded = _ticks()
+    cumulative = 0
+    for i, (price, qty) in enumerate(zip(prices, traded)):
+        cumulative += int(qty)
+        profile.add_tick(float(price), cumulative, _epoch(9, 15, 2) + i)
+    snap = profile.snapshot()
+    vwap = np.average(prices, weights=traded)
+    sigma = np.sqrt(np.average((prices - vwap) ** 2, weights=traded))
+    assert profile.ready and snap["complete"]
+    assert snap["vwap"] == pytest.approx(vwap, abs=0.01)
+    assert snap["sigma"] == pytest.approx(sigma, abs=0.01)
+    assert snap["bands"]["upper_2"] == pytest.approx(vwap + 2 * sigma, abs=0.02)
+    assert snap["total_volume"] == int(traded.sum())
+    assert bucket_step(25000) == 5.0 and bucket_step(55000) == 20.0
+
+
+def test_poc_and_value_area():
+    profile = SessionProfile("NIFTY-FUT")
+    cumulative = 0
+    for i, (price, qty) in enumerate([(25000, 100), (25010, 500), (25010, 400), (25005, 200),
+                                      (25015, 150), (24990, 50), (25050, 100)]):
+        cumulative += qty
+        profile.add_tick(price, cumulative, _epoch(9, 15) + i)
+    snap = profile.snapshot()
+    assert snap["poc"] == 25010.0
+    # 70% of 1500 = 1050: 25010 (900) then 25005 (200) beats 25015 (150)
+    assert snap["value_area"] == {"high": 25010.0, "low": 25005.0, "volume_pct": 73.3}
+    profile.add_tick(25200.0, cumulative + 5000, _epoch(9, 20))      # widens the histogram upwards
+    assert profile.snapshot()["poc"] == 25200.0
+    assert profile.levels()[25010.0] == 900.0
+
+
+def test_late_start_needs_seed_from_candles():
+    profile = SessionProfile("NIFTY-FUT")
+    profile.add_tick(25040.0, 120_000, _epoch(9, 31, 30))             # baseline only: partial session
+    profile.add_tick(25045.0, 121_000, _epoch(9, 31, 40))
+    assert not profile.ready and profile.snapshot()["total_volume"] == 1000
+
+    candles = [{"date": datetime.fromtimestamp(_epoch(9, 15 + 5 * k), IST),
+                "open": 25000, "high": 25020 + k, "low": 24990, "close": 25010, "volume": 30_000}
+               for k in range(4)]                                      # 09:15 … 09:30 (09:30 holds the tick)
+    assert profile.seed(candles) == 3
+    snap = profile.snapshot()
+    assert profile.ready
+    assert snap["total_volume"] == 121_000                             # matches volume_traded exactly
+    assert profile.seed(candles) == 0                                  # already complete
+
+
+def test_universe_listener_feeds_profiles():
+    universe = InstrumentUniverse()
+    universe.add(1, "NIFTY")
+    fut = universe.add(2, "NIFTY-FUT", kind="FUTURE", exchange="NFO", underlying="NIFTY")
+    profiles = SessionProfiles(universe)
+    other = universe.add(3, "BANKNIFTY-FUT", kind="FUTURE", exchange="NFO", underlying="BANKNIFTY")
+    assert universe.slice("session_profile").members == [fut, other]
+    assert universe.desired_subscriptions()[2] == "quote"
+
+    universe.on_tick(fut, 25000.0, 5000, 0, _epoch(9, 15, 1))
+    universe.on_tick(fut, 25010.0, 7000, 0, _epoch(9, 15, 2))
+    universe.on_tick(0, 25000.0, 0, 0, _epoch(9, 15, 2))               # index: no listener
+    result = profiles.vwap_result("nifty", current_price=25100.0)
+    assert result["source"] == "ticks" and result["success"]
+    assert result["vwap"] == pytest.approx((25000 * 5000 + 25010 * 2000) / 7000, abs=0.01)
+    assert result["position"]["position"] == "ABOVE"
+    assert profiles.vwap_result("BANKNIFTY") is None                   # no ticks yet
+    universe.release("session_profile")
+    universe.on_tick(fut, 25020.0, 9000, 0, _epoch(9, 15, 3))
+    assert profiles.for_symbol("NIFTY").ticks == 2                     # listener gone with the slice
+
+
+def test_route_and_analyzer_serve_from_profile(monkeypatch):
+    pytest.importorskip("fastapi")
+    from routers import market
+    from services import session_profile
+    from services.volume_profile_analyzer import VolumeProfileAnalyzer
+
+    universe = InstrumentUniverse()
+    fut = universe.add(2, "SENSEX-FUT", kind="FUTURE", exchange="BFO", underlying="SENSEX")
+    profiles = SessionProfiles(universe)
+    for i, (price, cumulative) in enumerate([(82000.0, 1000), (82040.0, 3000), (82020.0, 3500)]):
+        universe.on_tick(fut, price, cumulative, 0, _epoch(9, 15) + i)
+    monkeypatch.setattr(session_profile, "session_profiles", profiles)
+    monkeypatch.setattr(market, "_vwap_kite_client",
+                        lambda: pytest.fail("served from ticks, must not touch Zerodha"))
+
+    result = asyncio.run(market.get_vwap_live("SENSEX"))
+    assert result["source"] == "ticks" and result["current_price"] == 82020.0
+    assert set(result["bands"]) == {"upper_1", "lower_1", "upper_2", "lower_2", "upper_3", "lower_3"}
+
+    report = asyncio.run(VolumeProfileAnalyzer().analyze_volume_profile("SENSEX", []))
+    assert report.point_of_control == 82040.0
+    assert report.value_area_low <= 82020.0 <= report.value_area_high
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test the snapshot bus: versioned publish / read with staleness, type checks,
+waiting for "version > N" (also across threads), and the producers and
+consumers wired to it — the cache's market writes, market positioning, the
+intelligence engine and the observatory's cross-service reads.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services import snapshot_bus as bus_module
+from services.snapshot_bus import ANALYSIS, COMPASS, LIQUIDITY, MARKET, REGIME, SnapshotBus, Topic
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    fresh = SnapshotBus()
+    monkeypatch.setattr(bus_module, "snapshot_bus", fresh)
+    return fresh
+
+
+def test_publish_versions_and_staleness():
+    bus = SnapshotBus()
+    assert bus.get(MARKET, "NIFTY") is None and bus.version(MARKET, "NIFTY") == 0
+    first = {"price": 25000.0}
+    snap = bus.publish(MARKET, "NIFTY", first, at=time.time() - 10)
+    assert snap.version == 1 and bus.get(MARKET, "NIFTY").value is first       # by reference
+    assert 9.5 < snap.age() < 11 and not snap.fresh(5)
+    assert bus.value(MARKET, "NIFTY", max_age=5) is None
+    assert bus.value(MARKET, "NIFTY", max_age=5, default={}) == {}
+
+    bus.publish(MARKET, "NIFTY", {"price": 25010.0})
+    bus.publish(REGIME, "NIFTY", {"regime": "TRENDING"})
+    assert bus.version(MARKET, "NIFTY") == 2 and bus.value(MARKET, "NIFTY", max_age=5)["price"] == 25010.0
+    assert snap.value is first                                                 # old snapshot untouched
+    with pytest.raises(Exception):
+        snap.version = 9                                                       # frozen
+    report = bus.report()
+    assert report["market"]["NIFTY"]["version"] == 2 and "regime" in report
+    assert bus.symbols(MARKET) == ["NIFTY"]
+
+
+def test_type_is_checked_at_publish():
+    bus = SnapshotBus()
+    with pytest.raises(TypeError, match="market snapshot must be dict"):
+        bus.publish(MARKET, "NIFTY", '{"price": 1}')
+    prices = Topic("prices", float)
+    assert bus.publish(prices, "NIFTY", 25000.0).version == 1
+
+
+def test_wait_for_newer_version():
+    bus = SnapshotBus()
+
+    async def scenario():
+        bus.publish(COMPASS, "NIFTY", {"direction": "BULLISH"})
+        assert (await bus.wait(COMPASS, "NIFTY", after=0)).version == 1        # already newer
+        assert await bus.wait(COMPASS, "NIFTY", after=1, timeout=0.05) is None
+        assert bus._waiters.get(("compass", "NIFTY")) == []                   # timed-out waiter removed
+
+        waiter = asyncio.create_task(bus.wait(COMPASS, "NIFTY", after=1, timeout=2))
+        await asyncio.sleep(0)
+        bus.publish(COMPASS, "NIFTY", {"direction": "BEARISH"})
+        assert (await waiter).value["direction"] == "BEARISH"
+
+        # A publish from another thread (e.g. the ticker thread) wakes the loop
+        waiter = asyncio.create_task(bus.wait(COMPASS, "NIFTY", after=2, timeout=2))
+        await asyncio.sleep(0)
+        threading.Thread(target=bus.publish, args=(COMPASS, "NIFTY", {"direction": "NEUTRAL"})).start()
+        assert (await waiter).version == 3
+
+    asyncio.run(scenario())
+
+
+def test_market_writes_reach_readers_without_json(bus, monkeypatch):
+    pytest.importorskip("fastapi")
+    from services import cache as cache_module
+    from routers import market_positioning
+    from services import trading_intelligence_engine as tie
+
+    monkeypatch.setattr(cache_module, "snapshot_bus", bus)
+    monkeypatch.setattr(market_positioning, "snapshot_bus", bus)
+    monkeypatch.setattr(tie, "snapshot_bus", bus)
+    monkeypatch.setattr(cache_module.PersistentMarketState, "save_market_state", lambda *a: None)
+
+    tick = {"symbol": "NIFTY", "price": 25000.0, "change": 12.0, "changePercent": 0.05,
+            "volume": 1000, "oi": 0, "status": "LIVE", "timestamp": "2026-01-05T10:00:00"}
+    asyncio.run(cache_module.CacheService().set_market_data("NIFTY", tick))
+    assert bus.get(MARKET, "NIFTY").value is tick
+
+    # Cache entry gone (TTL / eviction): positioning still reads the latest tick
+    cache_module._SHARED_CACHE.pop("market:NIFTY", None)
+    assert asyncio.run(market_positioning._get_symbol_data("NIFTY")) is tick
+
+    engine = tie.TradingIntelligenceEngine()
+
+    async def no_cache(symbol):
+        pytest.fail("tick must come from the snapshot bus")
+
+    monkeypatch.setattr(engine.cache, "get_market_data", no_cache)
+    out = asyncio.run(engine.refresh_from_cache("NIFTY"))
+    assert out["price"] == 25000.0
+
+
+def test_observatory_reads_producers_from_bus(bus, monkeypatch, tmp_path):
+    from services import observatory_service as module
+
+    monkeypatch.setattr(module, "snapshot_bus", bus)
+    monkeypatch.setattr(module, "DATA_DIR", tmp_path)
+    bus.publish(MARKET, "BANKNIFTY", {"price": 55000.0})
+    bus.publish(ANALYSIS, "BANKNIFTY", {"signal": "BUY", "confidence": 72, "trend_strength": 60})
+    bus.publish(REGIME, "BANKNIFTY", {"direction": "BULLISH", "directionStrength": 81, "regime": "TRENDING"})
+    bus.publish(LIQUIDITY, "BANKNIFTY", {"direction": "BEARISH", "confidence": 64, "oiProfile": "PUT_WRITING"})
+    bus.publish(COMPASS, "BANKNIFTY", {"direction": "BULLISH", "confidence": 77})
+
+    svc = module.ObservatoryService()
+    market, analysis = asyncio.run(svc._fetch_market_data("BANKNIFTY")), asyncio.run(svc._fetch_analysis("BANKNIFTY"))
+    assert market["price"] == 55000.0 and analysis["signal"] == "BUY"          # a dict, not a JSON string
+    strategies = asyncio.run(asyncio.wait_for(
+        svc._extract_all_strategies("BANKNIFTY", market, analysis), timeout=30))
+    assert strategies["overall_signal"]["signal"] == "BULLISH"
+    assert strategies["market_regime"]["confidence"] == 81
+    assert strategies["liquidity_score"]["signal"] == "BEARISH"
+    assert strategies["institutional_compass"]["confidence"] == 77
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test the multiplexed stream hub: topic framing and symbol filters, last-value
+and snapshot replay for new subscribers, manager broadcasts published as
+topics, one shared poller per polled topic behind the legacy adapters, the
+per-connection topic cap and reaping of topics nobody publishes, and the
+/ws/stream protocol end to end.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.ws_hub import HUB_TOPIC, MAX_TOPICS_PER_SESSION, StreamHub
+from services.ws_outbox import BroadcastManager
+
+
+class FakeSocket:
+    """Records sends; ``incoming`` feeds receive_text (None → client went away)."""
+
+    def __init__(self):
+        self.sent = []
+        self.incoming = asyncio.Queue()
+        self.accepted = False
+
+    async def accept(self):
+        self.accepted = True
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def receive_text(self):
+        item = await self.incoming.get()
+        if item is None:
+            raise ConnectionError("client closed")
+        return item
+
+    async def close(self, code=1000):
+        pass
+
+    def of(self, topic):
+        return [m for m in self.sent if m.get("topic") == topic]
+
+
+async def _settle(rounds=10):
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+def test_frames_carry_topic_and_respect_symbol_filters():
+    async def run():
+        hub = StreamHub(heartbeat=30)
+        ws, narrow = FakeSocket(), FakeSocket()
+        everything, nifty_only = hub.attach(ws), hub.attach(narrow)
+        await hub.subscribe(everything, "liquidity")
+        await hub.subscribe(nifty_only, "liquidity", ["NIFTY"])
+        assert hub.publish("liquidity", {"type": "liquidity_update", "symbol": "NIFTY", "v": 1}) == 2
+        assert hub.publish("liquidity", {"type": "liquidity_update", "data": {"symbol": "SENSEX"}, "v": 2}) == 1
+        assert hub.publish("liquidity", {"type": "alert", "v": 3}) == 2                 # no symbol → everyone
+        assert hub.publish("compass", {"type": "compass_update", "v": 4}) == 0          # nobody subscribed
+        await _settle()
+        assert [m["v"] for m in ws.sent] == [1, 2, 3] and all(m["topic"] == "liquidity" for m in ws.sent)
+        assert [m["v"] for m in narrow.sent] == [1, 3]
+        hub.detach(ws)
+        hub.detach(narrow)
+        assert hub.report()["topics"]["liquidity"] == {"subscribers": 0, "published": 3, "lastValues": 2,
+                                                      "polling": False}
+
+    asyncio.run(run())
+
+
+def test_new_subscribers_get_last_values_or_the_snapshot():
+    async def run():
+        hub = StreamHub(heartbeat=30)
+        for v in range(3):
+            hub.publish("ict", {"type": "ict_update", "symbol": "NIFTY", "v": v})
+        hub.publish("ict", {"type": "ict_update", "symbol": "BANKNIFTY", "v": 9})
+        hub.publish("ict", {"type": "ict_alert", "v": 5})                                # not a snapshot topic
+        ws = FakeSocket()
+        await hub.subscribe(hub.attach(ws), "ict", ["NIFTY"])
+        await _settle()
+        assert [(m["symbol"], m["v"]) for m in ws.sent] == [("NIFTY", 2)]
+
+        async def snapshot():
+            return {"type": "news_snapshot", "items": [1, 2]}
+        hub.register("news", snapshot=snapshot)
+        hub.publish("news", {"type": "news_update", "v": 1})
+        await hub.subscribe(hub.attach(ws), "news")
+        await _settle()
+        assert ws.of("news") == [{"topic": "news", "type": "news_snapshot", "items": [1, 2]}]
+        hub.detach(ws)
+
+    asyncio.run(run())
+
+
+def test_manager_broadcasts_are_published_as_topics():
+    from services.ws_hub import stream_hub
+
+    async def run():
+        manager = BroadcastManager("test_hub_topic", max_depth=8, send_timeout=1, max_lag=0)
+        legacy, stream = FakeSocket(), FakeSocket()
+        await manager.connect(legacy)
+        session = stream_hub.attach(stream)
+        await stream_hub.subscribe(session, "test_hub_topic")
+        await manager.broadcast({"type": "test_update", "symbol": "NIFTY", "v": 1})
+        await _settle()
+        assert legacy.sent == [{"type": "test_update", "symbol": "NIFTY", "v": 1}]
+        assert stream.sent == [{"topic": "test_hub_topic", "type": "test_update", "symbol": "NIFTY", "v": 1}]
+        stream_hub.detach(stream)
+        await manager.disconnect(legacy)
+        assert stream_hub.report()["topics"]["test_hub_topic"]["published"] == 1
+
+    asyncio.run(run())
+
+
+def test_legacy_adapters_share_one_poller():
+    async def run():
+        hub = StreamHub(heartbeat=30)
+        calls = []
+
+        async def poll():
+            calls.append(len(calls))
+            return {"type": "analysis_update", "n": calls[-1]}
+
+        first, second = FakeSocket(), FakeSocket()
+        a, b = hub.attach(first, framed=False), hub.attach(second, framed=False)
+        await hub.subscribe(a, "analysis")                         # registered later: poller starts then
+        assert hub.report()["topics"]["analysis"]["polling"] is False
+        hub.register("analysis", poll=poll, interval=0.02)
+        await _settle()
+        await hub.subscribe(b, "analysis")
+        await asyncio.sleep(0.05)
+        polls = len(calls)
+        assert 2 <= polls <= 4                                     # once per interval, not once per client
+        assert first.sent[0] == {"type": "analysis_update", "n": 0}            # unframed for legacy clients
+        assert second.sent[0]["n"] == 0 and len(second.sent) == polls          # late joiner got the last value
+        hub.detach(first)
+        assert hub.report()["topics"]["analysis"]["polling"] is True
+        hub.detach(second)
+        await asyncio.sleep(0.05)
+        assert hub.report()["topics"]["analysis"]["polling"] is False and len(calls) == polls
+
+    asyncio.run(run())
+
+
+def test_made_up_topics_are_capped_and_reaped():
+    async def run():
+        hub = StreamHub(heartbeat=30)
+        hub.register("news", snapshot=lambda: None)
+        hub.publish("compass", {"type": "compass_update", "v": 1})
+        ws = FakeSocket()
+        serving = asyncio.ensure_future(hub.serve(ws, topics=["compass", "news"]))
+        await _settle()
+        junk = [f"junk-{i}" for i in range(MAX_TOPICS_PER_SESSION + 10)]
+        ws.incoming.put_nowait(json.dumps({"action": "subscribe", "topics": junk}))
+        await _settle(30)
+        error, ack = ws.of(HUB_TOPIC)[-2:]
+        assert error["type"] == "error" and error["topics"] == junk[MAX_TOPICS_PER_SESSION - 2:]
+        assert len(ack["topics"]) == MAX_TOPICS_PER_SESSION and "compass" in ack["topics"]
+        assert len(hub.report()["topics"]) == MAX_TOPICS_PER_SESSION
+
+        ws.incoming.put_nowait(None)
+        await serving
+        assert sorted(hub.report()["topics"]) == ["compass", "news"]       # real topics stay
+
+    asyncio.run(run())
+
+
+def test_stream_protocol():
+    async def run():
+        hub = StreamHub(heartbeat=0.05)
+        ws = FakeSocket()
+        serving = asyncio.ensure_future(hub.serve(ws, topics=["compass"]))
+        await _settle()
+        assert ws.accepted and ws.of(HUB_TOPIC) == [{"topic": "hub", "type": "subscribed", "topics": {"compass": None}}]
+
+        ws.incoming.put_nowait(json.dumps({"action": "subscribe", "topic": "ict", "symbols": ["NIFTY"]}))
+        ws.incoming.put_nowait(json.dumps({"action": "unsubscribe", "topics": ["compass"]}))
+        ws.incoming.put_nowait(json.dumps({"type": "ping"}))
+        ws.incoming.put_nowait("not json")
+        ws.incoming.put_nowait(json.dumps({"action": "dance"}))
+        await _settle(30)
+        control = [m["type"] for m in ws.of(HUB_TOPIC)]
+        assert control == ["subscribed", "subscribed", "subscribed", "pong", "error", "error"]
+        assert ws.of(HUB_TOPIC)[2]["topics"] == {"ict": ["NIFTY"]}
+
+        hub.publish("compass", {"type": "compass_update", "v": 1})
+        hub.publish("ict", {"type": "ict_update", "symbol": "NIFTY", "v": 2})
+        await asyncio.sleep(0.08)
+        assert [m["v"] for m in ws.sent if "v" in m] == [2]
+        assert ws.of(HUB_TOPIC)[-1]["type"] == "heartbeat"
+
+        ws.incoming.put_nowait(None)
+        await serving
+        assert hub.session_count == 0 and hub.report()["topics"]["ict"]["subscribers"] == 0
+
+    asyncio.run(run())
+
+
+def test_stream_endpoint_over_fastapi():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from routers import stream
+    from services.ws_hub import stream_hub
+
+    app = FastAPI()
+    app.include_router(stream.router, prefix="/ws")
+    with TestClient(app) as client:
+        with client.websocket_connect("/ws/stream?topics=test_endpoint") as ws:
+            assert ws.receive_json() == {"topic": "hub", "type": "subscribed", "topics": {"test_endpoint": None}}
+            ws.send_text(json.dumps({"type": "ping"}))
+            assert ws.receive_json() == {"topic": "hub", "type": "pong"}
+            assert stream_hub.report()["multiplexed"] >= 1
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test user analytics: summary counters maintained incrementally, synchronous
+bookkeeping with no disk I/O on the connect path, group commits by the
+background batcher, state restored across a restart, and a bounded queue
+when the store is unavailable.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.analytics_store import AnalyticsStore
+from services.user_analytics import UserAnalyticsService
+
+
+def _service(tmp_path, **kwargs):
+    kwargs.setdefault("flush_interval", 30)
+    return UserAnalyticsService(path=tmp_path / "analytics.db", **kwargs)
+
+
+def test_summary_counts_logins_visits_and_active_sessions(tmp_path):
+    analytics = _service(tmp_path)
+    analytics.register_login("AB1234", "Asha")
+    analytics.register_visit("visitor-1")
+    analytics.connect_session("s1", "visitor-1")
+    analytics.connect_session("s2", "visitor-1")                   # second tab, same identity
+    analytics.connect_session("s3", "visitor-2", user_id="AB1234")
+    analytics.disconnect_session("s1")
+
+    summary = analytics.get_summary()
+    assert summary["totals"] == {"logged_in_users": 1, "login_events": 1, "app_users": 2,
+                                 "active_users": 2, "visit_events": 4}
+    by_id = {u["id"]: u for u in summary["users"]}
+    assert by_id["AB1234"]["login_count"] == 1 and by_id["AB1234"]["source"] == "auth"
+    assert by_id["visitor-1"]["visit_count"] == 3 and by_id["visitor-1"]["is_active"]
+
+    analytics.disconnect_session("s2")
+    analytics.disconnect_session("s2")                              # repeated disconnects are harmless
+    summary = analytics.get_summary(limit=1)
+    assert summary["totals"]["active_users"] == 1
+    assert [u["id"] for u in summary["users"]] == ["AB1234"]        # active users rank first
+
+
+def test_connect_path_never_touches_the_store(tmp_path, monkeypatch):
+    writes = []
+    monkeypatch.setattr(AnalyticsStore, "write_batch", lambda self, *a: writes.append(a) or 0)
+    analytics = _service(tmp_path)
+    for i in range(50):
+        analytics.connect_session(f"s{i}", f"visitor-{i % 5}")
+    assert writes == [] and analytics.stats()["pendingEvents"] == 100   # visit + connect each
+
+    asyncio.run(analytics.flush())
+    assert len(writes) == 1                                          # one group commit for the lot
+    events, records, totals = writes[0]
+    assert len(events) == 100 and len(records) == 5 and totals["visit_events"] == 50
+
+
+def test_batcher_group_commits_on_its_interval(tmp_path):
+    async def run():
+        analytics = _service(tmp_path, flush_interval=0.02)
+        await analytics.start()
+        analytics.register_login("AB1234", "Asha")
+        analytics.connect_session("s1", "visitor-1")
+        await asyncio.sleep(0.06)
+        stats = analytics.stats()
+        assert stats["persisting"] and stats["pendingEvents"] == 0 and stats["flushedEvents"] == 3
+        flushes = stats["flushes"]
+        await asyncio.sleep(0.05)
+        assert analytics.stats()["flushes"] == flushes                # nothing queued, nothing written
+        analytics.disconnect_session("s1")
+        await analytics.stop()                                        # final flush on shutdown
+        store = AnalyticsStore(tmp_path / "analytics.db")
+        assert [e["kind"] for e in store.events()] == ["disconnect", "connect", "visit", "login"]
+        store.close()
+
+    asyncio.run(run())
+
+
+def test_state_survives_a_restart(tmp_path):
+    async def run():
+        first = _service(tmp_path)
+        await first.start()
+        first.register_login("AB1234", "Asha")
+        first.connect_session("s1", "visitor-1")
+        first.register_visit("visitor-1")
+        await first.stop()
+
+        second = _service(tmp_path)
+        second.register_visit("visitor-9")                            # recorded before start(): kept
+        await second.start()
+        second.register_login("AB1234")
+        totals = second.get_summary()["totals"]
+        assert totals == {"logged_in_users": 1, "login_events": 2, "app_users": 3,
+                          "active_users": 0, "visit_events": 3}
+        users = {u["id"]: u for u in second.get_summary()["users"]}
+        assert users["visitor-1"]["visit_count"] == 2 and users["AB1234"]["display_name"] == "Asha"
+        assert users["AB1234"]["login_count"] == 2
+        await second.stop()
+
+    asyncio.run(run())
+
+
+def test_unavailable_store_keeps_memory_and_bounds_the_queue(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("")
+    analytics = UserAnalyticsService(path=blocker / "analytics.db", flush_interval=30, max_pending=10)
+    for i in range(20):
+        analytics.register_visit(f"visitor-{i}")
+    stats = analytics.stats()
+    assert stats["pendingEvents"] == 10 and stats["droppedEvents"] == 10
+
+    async def run():
+        await analytics.start()
+        assert await analytics.flush() == 0
+        await analytics.stop()
+
+    asyncio.run(run())
+    assert analytics.stats()["persisting"] is False and analytics.stats()["pendingEvents"] == 0
+    assert analytics.get_summary()["totals"]["app_users"] == 20
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test the opt-in binary WebSocket encoding: field-id compaction and round
+trips, negotiation with JSON fallback, one encode per format per broadcast,
+field-table updates delivered ahead of the frames that use them (across
+managers), and binary frames on the multiplexed stream.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+msgpack = pytest.importorskip("msgpack")
+
+from services import ws_codec
+from services.ws_codec import FieldTable, field_table, pack, requested_encoding
+from services.ws_outbox import BroadcastManager
+
+
+class FakeSocket:
+    def __init__(self, encoding=None):
+        self.query_params = {"encoding": encoding} if encoding else {}
+        self.sent = []
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.sent.append(json.loads(text))
+
+    async def send_bytes(self, data):
+        self.sent.append(data)
+
+    async def close(self, code=1000):
+        pass
+
+
+class Decoder:
+    """What frontend/lib/wsCodec.ts does."""
+
+    def __init__(self):
+        self.fields = []
+
+    def expand(self, value):
+        if isinstance(value, dict):
+            return {self.fields[k] if isinstance(k, int) else k: self.expand(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.expand(v) for v in value]
+        return value
+
+    def __call__(self, frame):
+        if isinstance(frame, bytes):
+            return self.expand(msgpack.unpackb(frame, strict_map_key=False))
+        if frame.get("type") == "codec":
+            self.fields = list(frame["fields"])
+        elif frame.get("type") == "codec_fields":
+            self.fields[frame["start"]:] = frame["fields"]
+        else:
+            return frame
+        return None
+
+    def decode_all(self, frames):
+        return [m for m in map(self, frames) if m is not None]
+
+
+async def _settle(rounds=10):
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+def _tick(symbol="NIFTY", **extra):
+    levels = [{"price": 25000.0 + i * 0.05, "quantity": 75 * (i + 1), "orders": i + 1} for i in range(5)]
+    return {"type": "tick", "data": {"symbol": symbol, "price": 25011.65, "changePercent": 0.45,
+                                     "orderFlow": {"bidLevels": levels, "askLevels": levels,
+                                                   "buyerAggressionRatio": 0.556, **extra}}}
+
+
+def test_field_table_compaction_round_trips():
+    table = FieldTable(limit=6)
+    message = {"type": "tick", "id": 7, 25000: "strike", "data": {"symbol": "NIFTY", "bidLevels": [{"price": 1.5}]}}
+    compact = table.compact(message)
+    assert table.names == ["type", "data", "symbol", "bidLevels", "price"]   # "id": too short to pay off
+    assert compact == {0: "tick", "id": 7, "25000": "strike", 1: {2: "NIFTY", 3: [{4: 1.5}]}}
+    table.compact({"quantity": 1, "orders": 2})                               # the sixth fits, the seventh does not
+    assert table.names[-1] == "quantity" and "orders" not in table.ids
+    decoder = Decoder()
+    decoder(table.hello())
+    expected = json.loads(json.dumps(message))
+    assert decoder(msgpack.packb(table.compact(message))) == expected
+
+    tick = _tick()
+    assert len(pack(tick)) * 2 < len(json.dumps(tick))
+
+
+def test_encoding_negotiation(monkeypatch):
+    assert requested_encoding(FakeSocket("msgpack")) == "msgpack"
+    assert requested_encoding(FakeSocket("MsgPack")) == "msgpack"
+    assert requested_encoding(FakeSocket()) == "json" and requested_encoding(object()) == "json"
+    monkeypatch.setattr(ws_codec, "_MSGPACK", None)
+    assert requested_encoding(FakeSocket("msgpack")) == "json" and not ws_codec.binary_eligible(_tick())
+
+
+def test_broadcast_encodes_each_format_once(monkeypatch):
+    from services import ws_outbox
+
+    packed = []
+    real_pack = ws_outbox.pack
+    monkeypatch.setattr(ws_outbox, "pack", lambda message: packed.append(message) or real_pack(message))
+
+    async def run():
+        manager = BroadcastManager("test_codec", max_depth=16, send_timeout=1, max_lag=0)
+        binary = [FakeSocket("msgpack") for _ in range(3)]
+        text = FakeSocket()
+        for ws in binary + [text]:
+            await manager.connect(ws)
+        await manager.broadcast(_tick())
+        await manager.broadcast({"type": "alert", "symbol": "NIFTY", "message": "sweep"})
+        await _settle(30)
+        assert len(packed) == 1
+        for ws in binary:
+            assert ws.sent[0]["type"] == "codec" and sum(isinstance(f, bytes) for f in ws.sent) == 1
+            decoded = Decoder().decode_all(ws.sent)
+            assert decoded[0] == json.loads(json.dumps(_tick()))
+            assert decoded[1] == ws.sent[-1] and ws.sent[-1]["type"] == "alert"   # cold types stay JSON
+        assert [m["type"] for m in text.sent] == ["tick", "alert"]
+        assert manager.report()["perClient"][0]["encoding"] == "msgpack"
+        for ws in binary + [text]:
+            await manager.disconnect(ws)
+
+    asyncio.run(run())
+
+
+def test_new_fields_reach_clients_before_frames_that_use_them():
+    async def run():
+        first = BroadcastManager("test_codec_a", max_depth=16, send_timeout=1, max_lag=0)
+        second = BroadcastManager("test_codec_b", max_depth=16, send_timeout=1, max_lag=0)
+        ws = FakeSocket("msgpack")
+        await first.connect(ws)
+        other = FakeSocket("msgpack")
+        await second.connect(other)
+        await second.broadcast({"type": "compass_update", "data": {"zzOnlyOnSecond": 1}})
+        await first.broadcast({"type": "liquidity_update", "data": {"zzOnlyOnSecond": 2, "zzBrandNew": 3}})
+        await _settle()
+        decoder = Decoder()
+        assert decoder.decode_all(ws.sent) == [{"type": "liquidity_update",
+                                                "data": {"zzOnlyOnSecond": 2, "zzBrandNew": 3}}]
+        assert ws.sent[1]["type"] == "codec_fields" and "zzBrandNew" in ws.sent[1]["fields"]
+        assert "zzOnlyOnSecond" in ws.sent[1]["fields"]        # learned although introduced on the other manager
+        assert decoder.fields == field_table.names
+        await first.disconnect(ws)
+        await second.disconnect(other)
+
+    asyncio.run(run())
+
+
+def test_stream_hub_sends_binary_frames():
+    from services.ws_hub import StreamHub
+
+    async def run():
+        hub = StreamHub(heartbeat=30)
+        ws, plain = FakeSocket("msgpack"), FakeSocket()
+        await hub.subscribe(hub.attach(ws), "market")
+        await hub.subscribe(hub.attach(plain), "market")
+        hub.publish("market", _tick())
+        hub.publish("market", {"type": "status", "status": "LIVE"})
+        await _settle(30)
+        decoded = {m["type"]: m for m in Decoder().decode_all(ws.sent)}    # status is CONTROL: it may lead
+        assert decoded["tick"] == {"topic": "market", **json.loads(json.dumps(_tick()))}
+        assert decoded["status"] == {"topic": "market", "type": "status", "status": "LIVE"}
+        assert sum(isinstance(f, bytes) for f in ws.sent) == 1
+        assert sorted(m["type"] for m in plain.sent) == ["status", "tick"] and plain.sent[0]["topic"] == "market"
+        assert hub.report()["binary"] == 1
+        hub.detach(ws)
+        hub.detach(plain)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test the per-client WebSocket outboxes: priority lanes and latest-value-wins
+coalescing, bounded depth with lowest-priority eviction, slow-consumer
+disconnection (send timeout and queue lag), and broadcasts that never wait on
+a client — through the main manager and the per-service managers.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from services.ws_outbox import SLOW_CLOSE_CODE, BroadcastManager, ClientOutbox, Priority, classify, coalesce_key
+
+
+class FakeSocket:
+    """Records sends; ``gate`` (an Event) holds every send until set."""
+
+    def __init__(self, gate=None, hang=False):
+        self.sent = []
+        self.closed_with = None
+        self.gate = gate
+        self.hang = hang
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.hang:
+            await asyncio.sleep(3600)
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+async def _settle(rounds=5):
+    for _ in range(rounds):
+        await asyncio.sleep(0)
+
+
+def test_priorities_and_coalescing():
+    assert classify({"type": "auth_status"}) == Priority.CONTROL and classify({"type": "tick"}) == Priority.TICK
+    assert classify({"type": "compass_update"}) == Priority.ANALYSIS
+    assert coalesce_key({"type": "tick", "data": {"symbol": "NIFTY"}}) == ("tick", "NIFTY")
+    assert coalesce_key({"type": "global_news_delta"}) is None and coalesce_key({"type": "auth_status"}) is None
+
+    async def run():
+        gate = asyncio.Event()
+        ws = FakeSocket(gate)
+        manager = BroadcastManager("test_priorities", max_depth=10, send_timeout=5, max_lag=0)
+        await manager.connect(ws)
+        await manager.broadcast({"type": "compass_update", "symbol": "NIFTY", "v": 0})   # in flight, held by gate
+        await _settle()
+        for v in range(1, 4):
+            await manager.broadcast({"type": "compass_update", "symbol": "NIFTY", "v": v})
+            await manager.broadcast({"type": "tick", "data": {"symbol": "NIFTY", "v": v}})
+        await manager.broadcast({"type": "alert", "v": 1})
+        await manager.broadcast({"type": "alert", "v": 2})
+        await manager.broadcast({"type": "auth_status", "status": "TOKEN_EXPIRED"})
+        outbox = manager._outboxes[ws]
+        assert outbox.depth == 5 and outbox.coalesced == 4
+        gate.set()
+        await _settle(20)
+        order = [(m["type"], m.get("v", m.get("data", {}).get("v"))) for m in ws.sent]
+        assert order == [("compass_update", 0), ("auth_status", None), ("tick", 3),
+                         ("compass_update", 3), ("alert", 1), ("alert", 2)]
+        assert outbox.report()["sent"] == 6 and outbox.depth == 0
+        await manager.disconnect(ws)
+
+    asyncio.run(run())
+
+
+def test_full_outbox_drops_lowest_priority_first():
+    async def run():
+        outbox = ClientOutbox(FakeSocket(), max_depth=3, send_timeout=1, max_lag=0)   # writer not started
+        assert outbox.put("a1", Priority.ANALYSIS) and outbox.put("a2", Priority.ANALYSIS)
+        assert outbox.put("t1", Priority.TICK)
+        assert outbox.put("c1", Priority.CONTROL)            # evicts a1
+        assert outbox.put("t2", Priority.TICK)               # evicts a2
+        assert outbox.put("t3", Priority.TICK)               # evicts t1 (no analysis left)
+        assert not outbox.put("a3", Priority.ANALYSIS)       # nothing lower to evict → newcomer dropped
+        assert outbox.dropped == 4 and outbox.peak_depth == 3
+        assert [outbox._pop() for _ in range(4)] == ["c1", "t2", "t3", None]
+
+    asyncio.run(run())
+
+
+def test_slow_send_disconnects_only_that_client():
+    async def run():
+        manager = BroadcastManager("test_slow_send", max_depth=8, send_timeout=0.05, max_lag=0)
+        slow, fast = FakeSocket(hang=True), FakeSocket()
+        await manager.connect(slow)
+        await manager.connect(fast)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        for v in range(3):
+            await manager.broadcast({"type": "tick", "data": {"symbol": f"S{v}"}})
+        assert loop.time() - started < 0.01                  # broadcast never waits on a client
+        await asyncio.sleep(0.15)
+        assert len(fast.sent) == 3 and manager.client_count == 1
+        assert slow.closed_with == SLOW_CLOSE_CODE and manager.slow_disconnects == 1
+        await manager.broadcast({"type": "tick", "data": {"symbol": "S9"}})
+        await _settle()
+        assert len(fast.sent) == 4 and manager.connections == {fast}
+
+    asyncio.run(run())
+
+
+def test_lagging_queue_marks_client_slow():
+    async def run():
+        now = [100.0]
+        closed = []
+        outbox = ClientOutbox(FakeSocket(), max_depth=50, send_timeout=1, max_lag=10,
+                              on_close=lambda box, reason: closed.append(reason), clock=lambda: now[0])
+        outbox.put("a", Priority.ANALYSIS, key=("x_update", "NIFTY"))
+        now[0] += 6
+        outbox.put("b", Priority.ANALYSIS, key=("x_update", "NIFTY"))       # coalesced, keeps its age
+        assert outbox.lag == 6.0 and outbox.report()["depthByPriority"]["analysis"] == 1
+        now[0] += 5
+        assert not outbox.put("c", Priority.TICK)
+        assert outbox.closed.startswith("slow consumer") and closed == [outbox.closed] and outbox.depth == 0
+
+    asyncio.run(run())
+
+
+def test_managers_share_the_outbox_path():
+    from services import websocket_manager
+    from services.compass_service import CompassConnectionManager, compass_manager
+    from services.ws_outbox import outbox_report
+
+    assert isinstance(compass_manager, BroadcastManager) and compass_manager.name == "compass"
+
+    async def run():
+        manager = websocket_manager.ConnectionManager()
+        ws, stranger = FakeSocket(), FakeSocket()
+        await manager.connect(ws)
+        assert manager.connection_count == 1 and manager.active_connections == {ws}
+        await manager.broadcast_auth_status("TOKEN_VALID", "ok")
+        await manager.send_personal(ws, {"type": "pong"})
+        await manager.send_personal(stranger, {"type": "pong"})       # never connected: sent directly
+        await _settle()
+        assert [m["type"] for m in ws.sent] == ["auth_status", "pong"] and stranger.sent == [{"type": "pong"}]
+
+        compass = CompassConnectionManager("test_compass")
+        await compass.connect(ws)
+        await compass.broadcast({"type": "compass_update", "symbol": "NIFTY"})
+        await _settle()
+        report = outbox_report()["managers"]
+        assert report["test_compass"]["clients"] == 1 and report["test_compass"]["perClient"][0]["sent"] == 1
+        assert "market" in report and "compass" in report
+        await manager.disconnect(ws)
+        await compass.disconnect(ws)
+        assert manager.connection_count == 0 and compass.client_count == 0
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-v"]))
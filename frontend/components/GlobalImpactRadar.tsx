@@ -34,6 +34,25 @@ interface GlobalNewsSnapshot {
   last_updated: string;
 }
 
+interface GlobalNewsDelta extends Omit<GlobalNewsSnapshot, 'items'> {
+  type: 'global_news_delta';
+  added: RadarNewsItem[];
+  removed: string[];
+  order: string[];
+}
+
+// Server pushes only newly arrived headlines; rebuild the list in server order.
+const applyDelta = (prev: GlobalNewsSnapshot, delta: GlobalNewsDelta): GlobalNewsSnapshot => {
+  const byId = new Map(prev.items.map((item) => [item.id, item]));
+  delta.removed.forEach((id) => byId.delete(id));
+  delta.added.forEach((item) => byId.set(item.id, item));
+  const items = delta.order
+    .map((id) => byId.get(id))
+    .filter((item): item is RadarNewsItem => Boolean(item));
+  const { type: _type, added: _added, removed: _removed, order: _order, ...summary } = delta;
+  return { ...summary, items };
+};
+
 const EMPTY_SNAPSHOT: GlobalNewsSnapshot = {
   items: [],
   heat_score: 50,
@@ -154,6 +173,10 @@ const GlobalImpactRadar = () => {
       try {
         const data = JSON.parse(event.data);
         if (!mounted || data?.type === 'ping') return;
+        if (data?.type === 'global_news_delta') {
+          setSnapshot((prev) => applyDelta(prev, data as GlobalNewsDelta));
+          return;
+        }
         if (data?.items) setSnapshot(data as GlobalNewsSnapshot);
       } catch {
         // ignore malformed packets
@@ -29,11 +29,16 @@ export interface TodaySnapshot {
   snapshot_count: Record<string, number>;
   /** Latest strategies per symbol */
   current_strategies: Record<string, Record<string, StrategySignal>>;
-  all_snapshots: Record<string, Array<{
+  /** Snapshots after the requested cursor (?since=), grouped by symbol */
+  snapshots: Record<string, Array<{
+    id: number;
     time: string;
     timestamp: string;
     strategies: Record<string, StrategySignal>;
   }>>;
+  /** Pass back as ?since= to receive only snapshots captured after this read */
+  cursor: number;
+  has_more: boolean;
 }
 
 export interface StrategyPerformance {
@@ -0,0 +1,111 @@
+/**
+ * Decoder for the opt-in binary WebSocket encoding (backend/services/ws_codec.py).
+ *
+ * Connect with `?encoding=msgpack` (see `withBinaryEncoding`) and set
+ * `ws.binaryType = 'arraybuffer'`. Hot message types (tick, liquidity_update,
+ * compass_update) then arrive as MessagePack frames whose map keys are
+ * integer ids into a field table; everything else stays JSON text. The table
+ * is sent as JSON before any binary frame uses it:
+ *
+ *   {"type": "codec", "fields": [...]}                    on connect
+ *   {"type": "codec_fields", "start": n, "fields": [...]} as it grows
+ *
+ *   const decode = createWsDecoder();
+ *   ws.onmessage = (evt) => {
+ *     const msg = decode(evt.data);
+ *     if (msg) handle(msg);            // null for codec frames
+ *   };
+ */
+
+type Decoded = Record<string, unknown>;
+
+const textDecoder = typeof TextDecoder !== 'undefined' ? new TextDecoder() : null;
+
+export function withBinaryEncoding(url: string): string {
+  return url + (url.includes('?') ? '&' : '?') + 'encoding=msgpack';
+}
+
+/** Minimal MessagePack reader: nil, bool, ints, floats, str, bin, array, map (no ext types). */
+function unpack(bytes: Uint8Array, fields: string[]): unknown {
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  let pos = 0;
+
+  const str = (len: number): string => {
+    const s = textDecoder!.decode(bytes.subarray(pos, pos + len));
+    pos += len;
+    return s;
+  };
+  const array = (len: number): unknown[] => {
+    const out = new Array(len);
+    for (let i = 0; i < len; i++) out[i] = read();
+    return out;
+  };
+  const map = (len: number): Decoded => {
+    const out: Decoded = {};
+    for (let i = 0; i < len; i++) {
+      const key = read();
+      out[typeof key === 'number' ? fields[key] ?? String(key) : String(key)] = read();
+    }
+    return out;
+  };
+
+  function read(): unknown {
+    const b = bytes[pos++];
+    if (b <= 0x7f) return b;
+    if (b >= 0xe0) return b - 0x100;
+    if ((b & 0xf0) === 0x80) return map(b & 0x0f);
+    if ((b & 0xf0) === 0x90) return array(b & 0x0f);
+    if ((b & 0xe0) === 0xa0) return str(b & 0x1f);
+    let v: unknown;
+    switch (b) {
+      case 0xc0: return null;
+      case 0xc2: return false;
+      case 0xc3: return true;
+      case 0xc4: { const n = bytes[pos++]; v = bytes.slice(pos, pos + n); pos += n; return v; }
+      case 0xc5: { const n = view.getUint16(pos); pos += 2; v = bytes.slice(pos, pos + n); pos += n; return v; }
+      case 0xc6: { const n = view.getUint32(pos); pos += 4; v = bytes.slice(pos, pos + n); pos += n; return v; }
+      case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+      case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+      case 0xcc: return bytes[pos++];
+      case 0xcd: v = view.getUint16(pos); pos += 2; return v;
+      case 0xce: v = view.getUint32(pos); pos += 4; return v;
+      case 0xcf: v = Number(view.getBigUint64(pos)); pos += 8; return v;
+      case 0xd0: v = view.getInt8(pos); pos += 1; return v;
+      case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+      case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+      case 0xd3: v = Number(view.getBigInt64(pos)); pos += 8; return v;
+      case 0xd9: { const n = bytes[pos++]; return str(n); }
+      case 0xda: { const n = view.getUint16(pos); pos += 2; return str(n); }
+      case 0xdb: { const n = view.getUint32(pos); pos += 4; return str(n); }
+      case 0xdc: { const n = view.getUint16(pos); pos += 2; return array(n); }
+      case 0xdd: { const n = view.getUint32(pos); pos += 4; return array(n); }
+      case 0xde: { const n = view.getUint16(pos); pos += 2; return map(n); }
+      case 0xdf: { const n = view.getUint32(pos); pos += 4; return map(n); }
+      default:
+        throw new Error(`msgpack: unsupported type 0x${b.toString(16)}`);
+    }
+  }
+
+  return read();
+}
+
+/** One decoder per socket: it holds that connection's field table. */
+export function createWsDecoder(): (data: string | ArrayBuffer) => Decoded | null {
+  let fields: string[] = [];
+
+  return (data) => {
+    if (typeof data !== 'string') {
+      return unpack(new Uint8Array(data), fields) as Decoded;
+    }
+    const msg = JSON.parse(data) as Decoded;
+    if (msg.type === 'codec') {
+      fields = (msg.fields as string[]) ?? [];
+      return null;
+    }
+    if (msg.type === 'codec_fields') {
+      fields.splice(msg.start as number, Infinity, ...((msg.fields as string[]) ?? []));
+      return null;
+    }
+    return msg;
+  };
+}